@@ -10,6 +10,8 @@ from rest_framework.filters import SearchFilter
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 
+from apps.core.api.utils.prefetch import PrefetchPlanMixin
+from apps.core.api.utils.query_budget import QueryBudgetMixin
 from apps.core.models import GameMasterImpactAction, CharacterActionType
 from apps.core.utils.api import CampaignFilterMixin
 from apps.game.services.action import special
@@ -46,6 +48,8 @@ class SpecialActionsViewSet(
 
 
 class CharacterActionsLogViewSet(
+    QueryBudgetMixin,
+    PrefetchPlanMixin,
     CampaignFilterMixin,
     viewsets.mixins.ListModelMixin,
     viewsets.GenericViewSet
@@ -57,6 +61,8 @@ class CharacterActionsLogViewSet(
     filter_backends = [
         SearchFilter,
     ]
+    # user, campaigns and cycles, then count, page, impacts and targets regardless of the page size
+    query_budgets = {"list": 10}
 
     # all actions for now
     def get_queryset(self):
@@ -79,7 +85,7 @@ class CharacterActionsLogViewSet(
             cycle__campaign=campaign,
             accepted=True,
             cycle__in=cycles[:2],
-            position=main_character.position,
+            position_id=main_character.position_id,
         )
         current_cycle_qs = super().get_queryset().filter(
             cycle=current_cycle,
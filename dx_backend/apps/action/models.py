@@ -88,13 +88,17 @@ class CharacterAction(BaseModel):
                                      related_name='action')
     order = models.FloatField(default=1)
 
-    def accept(self, order: float):
+    def mark_accepted(self, order: float):
+        """Set the acceptance fields without saving, `accept` and bulk acceptance save them."""
         self.accepted = True
         self.order = order
         if not self.position_id:
             self.position_id = self.initiator.position_id
-        if not self.fight:
-            self.fight = self.initiator.fight
+        if not self.fight_id:
+            self.fight_id = self.initiator.fight_id
+
+    def accept(self, order: float):
+        self.mark_accepted(order)
         self.save(update_fields=['accepted', 'order', 'updated_at', 'fight_id', 'position_id'])
 
     def perform(self):
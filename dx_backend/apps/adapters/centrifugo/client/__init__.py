@@ -1,25 +1,65 @@
+import json
+import threading
+
 import requests
 from django.conf import settings
 
 
 class CentrifugoClient:
+    timeout = 5
+
     def __init__(self, api_url=None, api_key=None):
         self.api_url = api_url or settings.CENTRIFUGO_API_URL
         self.api_key = api_key or settings.CENTRIFUGO_API_KEY
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # requests.Session keeps a connection pool, but it is not safe to share between threads
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._headers())
+            self._local.session = session
+        return session
+
+    def _headers(self):
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"apikey {self.api_key}"
+        }
 
     def _request(self, method, params):
         data = {
             "method": method,
             "params": params
         }
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"apikey {self.api_key}"
-        }
-        response = requests.post(self.api_url, json=data, headers=headers)
+        response = self.session.post(self.api_url, json=data, timeout=self.timeout)
         response.raise_for_status()
         return response.json()
 
+    def batch(self, commands: list[dict]) -> list[dict]:
+        """
+        Send many commands in one request, commands and replies are new line delimited JSON.
+
+        :param commands: list of {"method": ..., "params": ...} commands
+        :return: list of replies in the order of the commands
+        """
+        if not commands:
+            return []
+        body = "\n".join(json.dumps(command) for command in commands)
+        response = self.session.post(self.api_url, data=body.encode(), timeout=self.timeout)
+        response.raise_for_status()
+        return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    @staticmethod
+    def publish_command(channel, data) -> dict:
+        return {"method": "publish", "params": {"channel": channel, "data": data}}
+
+    @staticmethod
+    def broadcast_command(channels, data) -> dict:
+        return {"method": "broadcast", "params": {"channels": channels, "data": data}}
+
     def publish(self, channel, data):
         return self._request("publish", {"channel": channel, "data": data})
 
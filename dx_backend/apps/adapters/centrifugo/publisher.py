@@ -1,4 +1,12 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
 
 from apps.adapters.centrifugo.client import CentrifugoClient
 from apps.adapters.centrifugo.serializer import JsonSerializer
@@ -8,6 +16,14 @@ from apps.core.bus.base import GameEvent
 
 WSS_CLIENT = CentrifugoClient()
 
+DEFAULT_PUBLISHER_SETTINGS = {
+    "ASYNC": True,
+    "QUEUE_SIZE": 10000,
+    "FLUSH_SIZE": 100,
+    "FLUSH_INTERVAL": 0.05,
+    "PUT_TIMEOUT": 0.0,
+}
+
 
 class CentrifugoPublisher(Sender):
     client = WSS_CLIENT
@@ -22,4 +38,200 @@ class CentrifugoPublisher(Sender):
         self.logger.debug(f"Broadcasting message {message.full_event_name} to {channels}")
         self.client.broadcast(channels, self.serializer(message))
 
-CENTRIFUGO_PUBLISHER = CentrifugoPublisher()
\ No newline at end of file
+
+class BatchingCentrifugoPublisher(Sender):
+    """
+    Non-blocking publisher, messages are put on a bounded queue and a background worker sends them in batches.
+
+    The worker wakes up every `flush_interval` seconds, as soon as `flush_size` messages are queued or when a
+    flush is requested. Messages with the same payload in one batch are coalesced into a single `broadcast`.
+    When the queue is full the message waits up to `put_timeout` seconds for a free slot and is dropped after.
+    """
+    logger = logging.getLogger("apps.adapters.centrifugo.publisher")
+    serializer: EventSerializer = JsonSerializer()
+
+    def __init__(self, client: CentrifugoClient = None, queue_size: int = 10000, flush_size: int = 100,
+                 flush_interval: float = 0.05, put_timeout: float = 0.0):
+        self.client = client or CentrifugoClient()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.metrics = {
+            "enqueued": 0,
+            "dropped": 0,
+            "sent": 0,
+            "coalesced": 0,
+            "commands": 0,
+            "batches": 0,
+            "failed": 0,
+            "max_queue_depth": 0,
+        }
+
+    def send(self, message: GameEvent, channel: str) -> None:
+        self.logger.debug(f"Queueing message {message.full_event_name} to {channel}")
+        self._enqueue([channel], self.serializer(message))
+
+    def broadcast(self, message: GameEvent, channels: list[str]) -> None:
+        self.logger.debug(f"Queueing broadcast {message.full_event_name} to {channels}")
+        self._enqueue(list(channels), self.serializer(message))
+
+    def _enqueue(self, channels: list[str], data) -> None:
+        self.start()
+        try:
+            if self.put_timeout > 0:
+                self.queue.put((channels, data), timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait((channels, data))
+        except queue.Full:
+            self._count("dropped")
+            self.logger.warning(f"Publisher queue is full, dropping message to {channels}")
+            return
+
+        depth = self.queue.qsize()
+        with self._lock:
+            self.metrics["enqueued"] += 1
+            self.metrics["max_queue_depth"] = max(self.metrics["max_queue_depth"], depth)
+        if depth >= self.flush_size:
+            self.request_flush()
+        if connection.in_atomic_block:
+            # on_commit callbacks only set an event, registering one per message is cheap
+            self.flush_on_commit()
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self.metrics[name] += value
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {**self.metrics, "queue_depth": self.queue.qsize()}
+
+    def request_flush(self) -> None:
+        """Wake the worker up without waiting for the flush interval."""
+        self._wakeup.set()
+
+    def flush_on_commit(self, using=None) -> None:
+        """Request a flush as soon as the current transaction commits."""
+        transaction.on_commit(self.request_flush, using=using)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until every queued message is handled by the worker.
+
+        :return: False when the queue was not drained within the timeout
+        """
+        self.start()
+        self.request_flush()
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def start(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stopped.clear()
+            self._worker = threading.Thread(target=self._run, name="centrifugo-publisher", daemon=True)
+            self._worker.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        if not self._worker:
+            return
+        self.flush(timeout)
+        self._stopped.set()
+        self._wakeup.set()
+        self._worker.join(timeout)
+        self._worker = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+        self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            items = []
+            try:
+                while len(items) < self.flush_size:
+                    items.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not items:
+                return
+            try:
+                self._send_batch(items)
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def _send_batch(self, items: list[tuple[list[str], object]]) -> None:
+        commands = self.coalesce(items)
+        try:
+            replies = self.client.batch(commands)
+        except Exception as e:
+            self._count("failed", len(commands))
+            self.logger.warning(f"Failed to publish batch of {len(commands)} commands: {e}")
+            return
+        errors = sum(1 for reply in replies if reply.get("error"))
+        if errors:
+            self.logger.warning(f"Centrifugo rejected {errors} of {len(commands)} commands")
+        with self._lock:
+            self.metrics["sent"] += len(items)
+            self.metrics["coalesced"] += len(items) - len(commands)
+            self.metrics["commands"] += len(commands)
+            self.metrics["batches"] += 1
+            self.metrics["failed"] += errors
+
+    @staticmethod
+    def coalesce(items: list[tuple[list[str], object]]) -> list[dict]:
+        """
+        Merge consecutive messages with the same payload into one broadcast.
+
+        Only neighbours are merged and a channel is never listed twice in one command, so every channel receives
+        its messages in the queued order and a repeated message is delivered again.
+        """
+        runs = []
+        for channels, data in items:
+            key = data if isinstance(data, str) else json.dumps(data, sort_keys=True, default=str)
+            for channel in channels:
+                if not runs or runs[-1][0] != key or channel in runs[-1][2]:
+                    runs.append((key, data, []))
+                runs[-1][2].append(channel)
+
+        commands = []
+        for _, data, channels in runs:
+            if len(channels) == 1:
+                commands.append(CentrifugoClient.publish_command(channels[0], data))
+            else:
+                commands.append(CentrifugoClient.broadcast_command(channels, data))
+        return commands
+
+
+def build_publisher() -> Sender:
+    config = {**DEFAULT_PUBLISHER_SETTINGS, **getattr(settings, "CENTRIFUGO_PUBLISHER", {})}
+    if not config["ASYNC"]:
+        return CentrifugoPublisher()
+    publisher = BatchingCentrifugoPublisher(
+        queue_size=config["QUEUE_SIZE"],
+        flush_size=config["FLUSH_SIZE"],
+        flush_interval=config["FLUSH_INTERVAL"],
+        put_timeout=config["PUT_TIMEOUT"],
+    )
+    atexit.register(publisher.close)
+    return publisher
+
+
+CENTRIFUGO_PUBLISHER = build_publisher()
@@ -0,0 +1,81 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _FakeCentrifugoHandler(BaseHTTPRequestHandler):
+    server: "FakeCentrifugoServer"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        commands = [json.loads(line) for line in body.splitlines() if line.strip()]
+        self.server.record(self.headers, commands)
+
+        replies = "\n".join(json.dumps({"result": {}}) for _ in commands)
+        payload = replies.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeCentrifugoServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the Centrifugo HTTP API, records every received command.
+
+    Usage:
+        with FakeCentrifugoServer() as server:
+            client = CentrifugoClient(api_url=server.api_url, api_key="test")
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _FakeCentrifugoHandler)
+        self.requests: list[list[dict]] = []
+        self.headers: list[dict] = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def record(self, headers, commands: list[dict]):
+        with self._lock:
+            self.headers.append(dict(headers))
+            self.requests.append(commands)
+
+    @property
+    def commands(self) -> list[dict]:
+        with self._lock:
+            return [command for request in self.requests for command in request]
+
+    def published_channels(self) -> list[str]:
+        channels = []
+        for command in self.commands:
+            params = command["params"]
+            channels.extend(params["channels"] if command["method"] == "broadcast" else [params["channel"]])
+        return channels
+
+    def start(self) -> "FakeCentrifugoServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-centrifugo", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeCentrifugoServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,3 +1,79 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from apps.adapters.centrifugo.client import CentrifugoClient
+from apps.adapters.centrifugo.publisher import BatchingCentrifugoPublisher
+from apps.adapters.centrifugo.testing import FakeCentrifugoServer
+from apps.core.bus.base import GameEvent
+
+
+class BatchingCentrifugoPublisherTest(SimpleTestCase):
+
+    def setUp(self):
+        self.server = FakeCentrifugoServer().start()
+        self.addCleanup(self.server.stop)
+        self.client = CentrifugoClient(api_url=self.server.api_url, api_key="test")
+
+    def make_publisher(self, **kwargs) -> BatchingCentrifugoPublisher:
+        kwargs.setdefault("flush_interval", 10)
+        publisher = BatchingCentrifugoPublisher(client=self.client, **kwargs)
+        self.addCleanup(publisher.close)
+        return publisher
+
+    @staticmethod
+    def event(name: str = "test") -> GameEvent:
+        return GameEvent(name=name, data={"name": name})
+
+    def test_messages_are_sent_in_one_batch(self):
+        publisher = self.make_publisher()
+        for i in range(5):
+            publisher.send(self.event(f"event-{i}"), f"character::{i}")
+
+        self.assertTrue(publisher.flush())
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.published_channels(), [f"character::{i}" for i in range(5)])
+        self.assertEqual(self.server.headers[0]["Authorization"], "apikey test")
+        metrics = publisher.get_metrics()
+        self.assertEqual(metrics["sent"], 5)
+        self.assertEqual(metrics["batches"], 1)
+        self.assertEqual(metrics["failed"], 0)
+
+    def test_same_payload_is_coalesced_into_broadcast(self):
+        publisher = self.make_publisher()
+        event = self.event()
+        publisher.send(event, "character::1")
+        publisher.send(event, "character::2")
+        publisher.broadcast(event, ["character::3", "character::4"])
+
+        publisher.flush()
+        [command] = self.server.commands
+        self.assertEqual(command["method"], "broadcast")
+        self.assertEqual(command["params"]["channels"], [f"character::{i}" for i in range(1, 5)])
+        self.assertEqual(publisher.get_metrics()["coalesced"], 2)
+
+    def test_channel_order_and_repeated_messages_are_kept(self):
+        publisher = self.make_publisher()
+        first, second = self.event("first"), self.event("second")
+        publisher.send(first, "character::1")
+        publisher.send(second, "character::1")
+        publisher.broadcast(first, ["character::1", "character::2"])
+        publisher.send(first, "character::2")
+
+        publisher.flush()
+        first, second = publisher.serializer(first), publisher.serializer(second)
+        self.assertEqual(
+            [(command["method"], command["params"]["data"]) for command in self.server.commands],
+            [("publish", first), ("publish", second), ("broadcast", first), ("publish", first)],
+        )
+        self.assertEqual(self.server.commands[2]["params"]["channels"], ["character::1", "character::2"])
+        self.assertEqual(publisher.get_metrics()["coalesced"], 0)
+
+    def test_full_queue_drops_messages(self):
+        publisher = self.make_publisher(queue_size=2)
+        publisher.start = lambda: None  # keep the worker away so the queue fills up
+        for i in range(4):
+            publisher.send(self.event(f"event-{i}"), "world::global")
+
+        metrics = publisher.get_metrics()
+        self.assertEqual(metrics["enqueued"], 2)
+        self.assertEqual(metrics["dropped"], 2)
+        self.assertEqual(metrics["max_queue_depth"], 2)
@@ -3,6 +3,7 @@ from django.utils.html import format_html
 from polymorphic.admin import PolymorphicChildModelAdmin
 
 from apps.game.services.npc.factory import NPCFactory
+from apps.game.services.world.occupancy import occupancy_index
 from apps.core.admin.mixins import CampaignAdminMixin
 from .filters import SubLocationFilter, GridZFilter
 from .inlines import (
@@ -84,19 +85,28 @@ class CharacterAdmin(SkillSelectionMixin, CampaignAdminMixin, PolymorphicChildMo
 
     @admin.action(description='Set selected characters as Active')
     def bulk_set_active(self, request, queryset):
+        self._invalidate_occupancy(queryset)
         updated = queryset.update(is_active=True)
         self.message_user(request, f"{updated} character(s) set as active.")
 
     @admin.action(description='Set selected characters as NPC')
     def bulk_set_npc(self, request, queryset):
+        self._invalidate_occupancy(queryset)
         updated = queryset.update(npc=True)
         self.message_user(request, f"{updated} character(s) set as NPC.")
 
     @admin.action(description='Set selected characters as Inactive')
     def bulk_set_inactive(self, request, queryset):
+        self._invalidate_occupancy(queryset)
         updated = queryset.update(is_active=False)
         self.message_user(request, f"{updated} character(s) set as inactive.")
 
+    @staticmethod
+    def _invalidate_occupancy(queryset):
+        # queryset updates do not send post_save
+        for campaign_id in set(queryset.values_list("campaign_id", flat=True)):
+            occupancy_index.invalidate(campaign_id)
+
     @admin.action(description='Reset stats for selected characters')
     def reset_stats(self, request, queryset):
         for character in queryset:
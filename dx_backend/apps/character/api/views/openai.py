@@ -15,10 +15,13 @@ from apps.character.api.serializers.openapi import OpenaiCharacterSerializer, \
     CharacterStatsSerializer, \
     DetailStatSerializer, SwipeBaseStatSerializer, PublishedCharacterSerializer
 from apps.character.models import Character, Stat, PublishedCharacter
+from apps.core.api.utils.prefetch import PrefetchPlan, PrefetchPlanMixin
+from apps.core.api.utils.query_budget import QueryBudgetMixin
 from apps.core.models import CharacterGenericData
 from apps.game.services.character import CharacterFactory
 from apps.game.services.character.character_base_stats import CharacterBaseStatsService
 from apps.game.services.character.core import CharacterService
+from apps.game.services.character.stats_snapshot import CharacterStatsSnapshot
 from apps.game.services.character.template import CharacterTemplateService
 from apps.game.services.rand_dice import DiceService
 
@@ -92,12 +95,15 @@ class ClientCharacterManagementViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(data=serializer.data)
 
 
-class OpenAICharacterBaseManagementViewSet(viewsets.ReadOnlyModelViewSet):
+class OpenAICharacterBaseManagementViewSet(QueryBudgetMixin, PrefetchPlanMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Character.objects.filter(is_active=True)
     serializer_class = OpenaiCharacterSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_class = NPCFilter
+    # relations read by `CharacterService.get_character_info`
+    character_info_plan = PrefetchPlan(select_related=["position", "rank", "dimension"])
+    query_budgets = {"list": 6, "retrieve": 6, "character_info": 6}
     # TODO move TO THE GAME SETTINGS
     PLAYER_CREATION_LIMIT = 5
 
@@ -106,11 +112,11 @@ class OpenAICharacterBaseManagementViewSet(viewsets.ReadOnlyModelViewSet):
         qs = super().get_queryset()
         if not user.is_superuser:
             qs = qs.filter(
-                position=user.main_character.position,
+                position_id=user.main_character.position_id,
                 is_active=True
             )
         return qs.filter(
-            campaign=user.current_campaign,
+            campaign_id=user.current_campaign_id,
         )
 
     @transaction.atomic
@@ -162,9 +168,10 @@ class OpenAICharacterBaseManagementViewSet(viewsets.ReadOnlyModelViewSet):
         except Exception as e:
             pass
         try:
-            character = user.main_character
-            service = CharacterService(character)
-            character_info = service.get_character_info()
+            character = self.character_info_plan.apply(Character.objects.all()).get(pk=user.main_character_id)
+            # max attributes read three stats with their modifiers
+            with CharacterStatsSnapshot().prefetch([character.pk]).activate():
+                character_info = CharacterService(character).get_character_info(refresh=False)
             return Response(data=character_info.model_dump())
         except Character.DoesNotExist:
             return Response({"detail": "Character not found."},
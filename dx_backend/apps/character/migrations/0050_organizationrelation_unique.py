@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+def remove_duplicate_relations(apps, schema_editor):
+    # keep one relation per organization pair, immutable relations first
+    OrganizationRelation = apps.get_model('character', 'OrganizationRelation')
+    seen = set()
+    duplicates = []
+    for relation in OrganizationRelation.objects.order_by('-immutable', 'id'):
+        pair = (relation.organization_from_id, relation.organization_to_id)
+        if pair in seen:
+            duplicates.append(relation.id)
+        else:
+            seen.add(pair)
+    OrganizationRelation.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('character', '0049_rename_tiktalk_link_publishedcharacter_tiktok_link'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_relations, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='organizationrelation',
+            constraint=models.UniqueConstraint(fields=('organization_from', 'organization_to'), name='unique_organization_relation'),
+        ),
+    ]
@@ -30,6 +30,12 @@ class OrganizationRelation(models.Model):
     class Meta:
         verbose_name = "Organization Relation"
         verbose_name_plural = "Organization Relations"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization_from', 'organization_to'],
+                name='unique_organization_relation',
+            ),
+        ]
 
 
 class CharacterRelation(models.Model):
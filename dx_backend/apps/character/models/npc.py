@@ -86,10 +86,8 @@ class CharacterStatsTemplate(BaseModel):
 
     def get_all_stats(self) -> dict:
         """Return all stats as a dictionary"""
-        stats = {}
-        for stat in CharacterStats:
-            stats[stat] = self.get_stat_value(stat)
-        return stats
+        values = dict(self.stats.values_list("stat", "value"))
+        return {stat: values.get(stat, 10) for stat in CharacterStats}
 
 
 class CharacterStatTemplate(BaseModel):
@@ -0,0 +1,27 @@
+import typing as t
+
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+
+
+def etag_matches(request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return "*" in etags or quote_etag(etag) in etags
+
+
+def streaming_etag_response(request, etag: str, content: t.Callable[[], t.Iterable],
+                            content_type: str = "application/json"):
+    """
+    304 when the client already has `etag`, otherwise stream the content produced by `content`.
+    """
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(content(), content_type=content_type)
+    response["ETag"] = quote_etag(etag)
+    # authenticated endpoints, the content must not be shared between users by proxies
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,160 @@
+import typing as t
+from dataclasses import dataclass, field
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+
+
+@dataclass
+class PrefetchPlan:
+    """
+    `select_related` and `prefetch_related` lookups needed to serialize a queryset without N+1 queries.
+    """
+    select_related: t.List[str] = field(default_factory=list)
+    prefetch_related: t.List[t.Union[str, Prefetch]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.select_related or self.prefetch_related)
+
+    def __add__(self, other: "PrefetchPlan") -> "PrefetchPlan":
+        plan = PrefetchPlan(list(self.select_related), list(self.prefetch_related))
+        plan.select(*other.select_related)
+        plan.prefetch(*other.prefetch_related)
+        return plan
+
+    def select(self, *lookups: str) -> None:
+        for lookup in lookups:
+            # a longer lookup already joins its prefix
+            if not any(existing == lookup or existing.startswith(f"{lookup}__") for existing in self.select_related):
+                self.select_related = [
+                    existing for existing in self.select_related if not lookup.startswith(f"{existing}__")
+                ]
+                self.select_related.append(lookup)
+
+    def prefetch(self, *lookups: t.Union[str, Prefetch]) -> None:
+        paths = {self._path(lookup) for lookup in self.prefetch_related}
+        for lookup in lookups:
+            if self._path(lookup) not in paths:
+                self.prefetch_related.append(lookup)
+                paths.add(self._path(lookup))
+
+    def apply(self, queryset: models.QuerySet) -> models.QuerySet:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    @staticmethod
+    def _path(lookup: t.Union[str, Prefetch]) -> str:
+        return lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+
+
+class PrefetchPlanner:
+    """
+    Derives a `PrefetchPlan` from the declared fields of a model serializer.
+
+    * a nested serializer or a related field of a single object is joined with `select_related`, its own
+      fields are planned recursively;
+    * a nested `many=True` serializer or a many related field is loaded with a `Prefetch` whose queryset is
+      planned for the child serializer;
+    * a dotted `source` joins every relation it walks through.
+
+    `SerializerMethodField` and fields with `source='*'` are opaque, the queries they run are not planned.
+    Plans are cached per serializer class, declared fields do not depend on the serializer context.
+    """
+    _cache: t.Dict[type, PrefetchPlan] = {}
+
+    def plan(self, serializer: serializers.BaseSerializer) -> PrefetchPlan:
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        cls = type(serializer)
+        if not isinstance(serializer, serializers.ModelSerializer):
+            return PrefetchPlan()
+        if cls not in self._cache:
+            self._cache[cls] = self._plan_serializer(serializer, serializer.Meta.model)
+        return self._cache[cls]
+
+    def _plan_serializer(self, serializer: serializers.Serializer, model: t.Type[models.Model]) -> PrefetchPlan:
+        plan = PrefetchPlan()
+        for serializer_field in serializer.fields.values():
+            if serializer_field.write_only or serializer_field.source == "*":
+                continue
+            self._plan_field(plan, serializer_field, model)
+        return plan
+
+    def _plan_field(self, plan: PrefetchPlan, serializer_field, model: t.Type[models.Model]) -> None:
+        path = []
+        attrs = serializer_field.source_attrs
+        for index, attr in enumerate(attrs):
+            last = index == len(attrs) - 1
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # a property or a method, the relations walked so far are still joined
+                break
+            if not model_field.is_relation or attr != model_field.name:
+                # a column or the `<name>_id` attribute of a foreign key
+                break
+            if model_field.many_to_many or model_field.one_to_many:
+                plan.prefetch(self._prefetch("__".join(path + [attr]), serializer_field if last else None,
+                                             model_field.related_model))
+                break
+            if last and isinstance(serializer_field, PrimaryKeyRelatedField) and model_field.concrete:
+                # rendered from the `<name>_id` column
+                break
+            path.append(attr)
+            model = model_field.related_model
+        else:
+            if isinstance(serializer_field, serializers.ModelSerializer):
+                nested = self.plan(serializer_field)
+                lookup = "__".join(path)
+                plan.select(*(f"{lookup}__{nested_lookup}" for nested_lookup in nested.select_related))
+                plan.prefetch(*(self._prefixed(lookup, nested_lookup) for nested_lookup in nested.prefetch_related))
+        if path:
+            plan.select("__".join(path))
+
+    def _prefetch(self, lookup: str, serializer_field, related_model: t.Type[models.Model]) -> Prefetch:
+        queryset = related_model._default_manager.all()
+        child = getattr(serializer_field, "child", None) or getattr(serializer_field, "child_relation", None)
+        if isinstance(child, serializers.ModelSerializer):
+            queryset = self.plan(child).apply(queryset)
+        elif isinstance(child, RelatedField) and hasattr(queryset, "non_polymorphic"):
+            # only the primary key is rendered, skip the polymorphic downcast queries
+            queryset = queryset.non_polymorphic()
+        return Prefetch(lookup, queryset=queryset)
+
+    @staticmethod
+    def _prefixed(prefix: str, lookup: t.Union[str, Prefetch]) -> t.Union[str, Prefetch]:
+        if isinstance(lookup, Prefetch):
+            return Prefetch(f"{prefix}__{lookup.prefetch_through}", queryset=lookup.queryset)
+        return f"{prefix}__{lookup}"
+
+
+planner = PrefetchPlanner()
+
+
+def plan_for(serializer: serializers.BaseSerializer) -> PrefetchPlan:
+    return planner.plan(serializer)
+
+
+class PrefetchPlanMixin:
+    """
+    Applies the prefetch plan of the serializer class to `get_queryset`.
+
+    `prefetch_plan_extra` adds lookups the serializer needs but the planner can't see, e.g. relations read by
+    `SerializerMethodField`.
+    """
+    prefetch_plan_extra: PrefetchPlan = None
+
+    def get_prefetch_plan(self) -> PrefetchPlan:
+        plan = plan_for(self.get_serializer())
+        if self.prefetch_plan_extra:
+            plan = plan + self.prefetch_plan_extra
+        return plan
+
+    def get_queryset(self):
+        return self.get_prefetch_plan().apply(super().get_queryset())
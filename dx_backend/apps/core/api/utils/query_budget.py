@@ -0,0 +1,87 @@
+import logging
+import re
+import typing as t
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger("core.api.query_budget")
+
+# literals are replaced so the queries of an N+1 loop share one template
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget_settings() -> dict:
+    return getattr(settings, "QUERY_BUDGET", {})
+
+
+class QueryCounter:
+    """
+    Counts the queries executed on the default connection while active.
+    """
+
+    def __init__(self):
+        self.queries: t.List[str] = []
+        self._wrapper = None
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "QueryCounter":
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+        self._wrapper = None
+
+    def repeated(self, limit: int = 3) -> t.List[t.Tuple[str, int]]:
+        """The most repeated query templates, the usual shape of an N+1."""
+        templates = Counter(_LITERALS.sub("?", sql) for sql in self.queries)
+        return [(sql, count) for sql, count in templates.most_common(limit) if count > 1]
+
+
+def check_query_budget(counter: QueryCounter, budget: int, label: str) -> None:
+    """
+    Log the view running more than `budget` queries, raise `QueryBudgetExceeded` when `QUERY_BUDGET["RAISE"]`.
+    """
+    if len(counter) <= budget:
+        return
+    message = f"{label} ran {len(counter)} queries, budget is {budget}"
+    details = "".join(f"\n  {count}x {sql[:200]}" for sql, count in counter.repeated())
+    if query_budget_settings().get("RAISE"):
+        raise QueryBudgetExceeded(message + details)
+    logger.warning(message + details)
+
+
+class QueryBudgetMixin:
+    """
+    Development guard against N+1 queries in API views.
+
+    `query_budgets` maps a viewset action to the maximum number of queries of one request, including
+    authentication. Requests are only counted when `QUERY_BUDGET["ENABLED"]` is set, it defaults to `DEBUG`.
+    """
+    query_budgets: t.Dict[str, int] = {}
+
+    def get_query_budget(self) -> t.Optional[int]:
+        return self.query_budgets.get(getattr(self, "action", None))
+
+    def dispatch(self, request, *args, **kwargs):
+        if not query_budget_settings().get("ENABLED") or not self.query_budgets:
+            return super().dispatch(request, *args, **kwargs)
+        with QueryCounter() as counter:
+            response = super().dispatch(request, *args, **kwargs)
+        budget = self.get_query_budget()
+        if budget is not None:
+            check_query_budget(counter, budget, f"{type(self).__name__}.{self.action}")
+        return response
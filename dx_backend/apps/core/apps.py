@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from apps.core.utils.cache import expire_versions
+
+        request_started.connect(expire_versions, dispatch_uid="core.expire_versions")
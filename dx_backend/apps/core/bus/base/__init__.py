@@ -7,6 +7,7 @@ from typing import Optional, Union
 from pydantic import BaseModel, Field
 
 from ..registry import EventsRegistry, DEFAULT_EVENT_REGISTRY
+from ..routing import Route
 
 
 class GameEventData(BaseModel):
@@ -37,6 +38,8 @@ class GameEvent(BaseModel):
 
     __produced__: bool = False
     __consumed__: bool = False
+    # recipients of the event, see `apps.core.bus.routing.Target`
+    __routes__: tuple[Route, ...] = ()
     ___registry___: EventsRegistry = DEFAULT_EVENT_REGISTRY
 
     def __init_subclass__(cls, **kwargs):
@@ -44,6 +47,9 @@ class GameEvent(BaseModel):
         if isabstract(cls):
             return
 
+        if "__routes__" in cls.__dict__:
+            cls.___registry___.register_routes(cls, *cls.__routes__)
+
         if cls.is_consumed():
             cls.___registry___.register_consumed(cls)
         if cls.is_produced():
@@ -1,6 +1,7 @@
 import uuid
 
 from apps.core.bus.base import GameEventData, CharacterEvent, ProducedMixin
+from apps.core.bus.routing import Route, Target
 
 
 class ChallengeCreatedEventData(GameEventData):
@@ -13,6 +14,7 @@ class ChallengeCreatedEvent(ProducedMixin, CharacterEvent):
     """Event fired when a new challenge is created for a character."""
     data: ChallengeCreatedEventData
     name: str = "challenge_created"
+    __routes__ = (Route(Target.CHARACTER, "character_id"),)
 
     @classmethod
     def create_event(cls, id: uuid.UUID, character_id: uuid.UUID) -> "ChallengeCreatedEvent":
@@ -1,6 +1,7 @@
 import uuid
 
 from apps.core.bus.base import GameEventData, FightEvent, ProducedMixin
+from apps.core.bus.routing import Route, Target
 from apps.core.models import CurrentTurn, FullCharacterInfo, ActionModel, ActionImpactModel
 
 
@@ -12,6 +13,7 @@ class CharacterNewTurnGameEventData(GameEventData):
 class CharacterNewTurnGameEvent(ProducedMixin, FightEvent):
     data: CharacterNewTurnGameEventData
     name: str = "character_turn_init"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.CHARACTER, "character_info.id"))
 
     @classmethod
     def create_event(cls, current_turn: CurrentTurn, character_info: FullCharacterInfo) -> "CharacterNewTurnGameEvent":
@@ -34,6 +36,7 @@ class TurnActionResultGameEventData(GameEventData):
 class FightTurnActionResultGameEvent(ProducedMixin, FightEvent):
     data: TurnActionResultGameEventData
     name: str = "turn_result"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.CHARACTER, "initiator_id"), Route(Target.CHARACTER, "target_id"))
 
     @classmethod
     def create_event(cls, turn_id: uuid.UUID, initiator_id: uuid.UUID, target_id: uuid.UUID, action: ActionModel, impact: ActionImpactModel) -> "FightTurnActionResultGameEvent":
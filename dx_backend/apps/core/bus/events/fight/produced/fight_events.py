@@ -1,6 +1,7 @@
 import uuid
 
 from apps.core.bus.base import GameEventData, FightEvent, ProducedMixin
+from apps.core.bus.routing import Route, Target
 
 
 # Fight State Events
@@ -15,6 +16,7 @@ class FightStartedEventData(GameEventData):
 class FightStartedEvent(ProducedMixin, FightEvent):
     data: FightStartedEventData
     name: str = "fight_started"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.POSITION, "position_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, position_id: uuid.UUID, attacker_id: uuid.UUID,
@@ -38,6 +40,7 @@ class FightEndedEventData(GameEventData):
 class FightEndedEvent(ProducedMixin, FightEvent):
     data: FightEndedEventData
     name: str = "fight_ended"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.POSITION, "position_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, position_id: uuid.UUID, cycle_id: int) -> "FightEndedEvent":
@@ -61,6 +64,7 @@ class CharacterPendingJoinFightEventData(GameEventData):
 class CharacterPendingJoinFightEvent(ProducedMixin, FightEvent):
     data: CharacterPendingJoinFightEventData
     name: str = "character_pending_join_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.FIGHT, "fight_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID,
@@ -82,6 +86,7 @@ class PendingJoinFightEventData(GameEventData):
 class PendingJoinFightEvent(ProducedMixin, FightEvent):
     data: PendingJoinFightEventData
     name: str = "pending_join_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.CHARACTER, "character_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID) -> "PendingJoinFightEvent":
@@ -102,6 +107,7 @@ class CharacterJoinFightEventData(GameEventData):
 class CharacterJoinFightEvent(ProducedMixin, FightEvent):
     data: CharacterJoinFightEventData
     name: str = "character_join_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.FIGHT, "fight_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID,
@@ -123,6 +129,7 @@ class JoinedFightEventData(GameEventData):
 class JoinedFightEvent(ProducedMixin, FightEvent):
     data: JoinedFightEventData
     name: str = "joined_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.CHARACTER, "character_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID) -> "JoinedFightEvent":
@@ -145,6 +152,7 @@ class CharacterLeaveFightEventData(GameEventData):
 class CharacterLeaveFightEvent(ProducedMixin, FightEvent):
     data: CharacterLeaveFightEventData
     name: str = "character_leave_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.FIGHT, "fight_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID,
@@ -166,6 +174,7 @@ class LeftFightEventData(GameEventData):
 class LeftFightEvent(ProducedMixin, FightEvent):
     data: LeftFightEventData
     name: str = "left_fight"
+    __routes__ = (Route(Target.GAME_MASTER), Route(Target.CHARACTER, "character_id"))
 
     @classmethod
     def create_event(cls, fight_id: uuid.UUID, character_id: uuid.UUID) -> "LeftFightEvent":
@@ -3,6 +3,8 @@ from typing import Optional, Union
 from datetime import datetime
 
 from apps.core.bus.base import GameEventData
+from apps.core.bus.registry import DEFAULT_EVENT_REGISTRY
+from apps.core.bus.routing import Route, Target
 from apps.core.models import CharacterActionType
 
 
@@ -35,3 +37,12 @@ class ActionAcceptedData(GameEventData):
     immediate: bool
     accepted: bool
     performed: bool
+
+
+class ActionsAcceptedData(GameEventData):
+    """Actions accepted together, sent once instead of an `action_accepted` event per action."""
+    actions: list[ActionAcceptedData]
+
+
+# World events are built with `GameEvent.create`, so they are routed by name; anything else goes to the game master
+DEFAULT_EVENT_REGISTRY.register_routes("new_cycle", Route(Target.WORLD))
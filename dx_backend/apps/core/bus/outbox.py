@@ -0,0 +1,149 @@
+import logging
+from enum import StrEnum
+from functools import partial
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .base import GameEvent
+from .protocol import Sender
+
+
+class OutboxMode(StrEnum):
+    IMMEDIATE = "immediate"  # send right away, even inside a transaction
+    ON_COMMIT = "on_commit"  # hold events until the surrounding transaction commits
+    TABLE = "table"  # persist events to the outbox table, `outbox_relay` sends them
+
+
+class OnCommitSender(Sender):
+    """
+    Holds events published inside `transaction.atomic` until the transaction commits.
+
+    Events are queued with `transaction.on_commit`, so events of a rolled back transaction or savepoint
+    are discarded and the order of publishing is kept. Outside a transaction events are sent right away.
+    """
+    logger = logging.getLogger("apps.core.bus.outbox")
+
+    def __init__(self, sender: Sender, using=None):
+        self.sender = sender
+        self.using = using
+
+    @property
+    def serializer(self):
+        return self.sender.serializer
+
+    def send(self, message: GameEvent, channel: str) -> None:
+        self._dispatch(partial(self.sender.send, message, channel))
+
+    def broadcast(self, message: GameEvent, channels: list[str]) -> None:
+        self._dispatch(partial(self.sender.broadcast, message, list(channels)))
+
+    def _dispatch(self, callback) -> None:
+        if not connection.in_atomic_block:
+            callback()
+            return
+        # robust: a failing send must not prevent the rest of the events of the transaction from going out
+        transaction.on_commit(callback, using=self.using, robust=True)
+
+
+class OutboxTableSender(Sender):
+    """
+    Stores events in the `OutboxEvent` table as a part of the current transaction.
+
+    An event is stored once per channel, publishing the same `GameEvent.id` to a channel twice is a no-op.
+    """
+    logger = logging.getLogger("apps.core.bus.outbox")
+
+    def __init__(self, sender: Sender):
+        self.sender = sender
+
+    @property
+    def serializer(self):
+        return self.sender.serializer
+
+    def send(self, message: GameEvent, channel: str) -> None:
+        self.broadcast(message, [channel])
+
+    def broadcast(self, message: GameEvent, channels: list[str]) -> None:
+        from apps.core.models import OutboxEvent
+
+        payload = message.model_dump(mode="json")
+        OutboxEvent.objects.bulk_create(
+            [
+                OutboxEvent(event_id=message.id, name=message.full_event_name, channel=channel, payload=payload)
+                for channel in channels
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class OutboxRelay:
+    """
+    Sends pending outbox events through the real sender.
+
+    Rows are locked with `SKIP LOCKED`, several relays can run side by side. A single relay sends events
+    in `id` order; rows of one event that follow each other are sent as a single broadcast.
+    """
+    logger = logging.getLogger("apps.core.bus.outbox")
+
+    def __init__(self, sender: Sender, batch_size: int = 500):
+        self.sender = sender
+        self.batch_size = batch_size
+
+    def relay(self) -> int:
+        """
+        Send one batch of pending events.
+
+        :return: number of relayed rows
+        """
+        from apps.core.models import OutboxEvent
+
+        with transaction.atomic():
+            rows = list(
+                OutboxEvent.objects.filter(published_at__isnull=True)
+                .order_by("id")
+                .select_for_update(skip_locked=True)[:self.batch_size]
+            )
+            if not rows:
+                return 0
+            for event, channels in self.group(rows):
+                if len(channels) == 1:
+                    self.sender.send(event, channels[0])
+                else:
+                    self.sender.broadcast(event, channels)
+            OutboxEvent.objects.filter(id__in=[row.id for row in rows]).update(published_at=timezone.now())
+        self.logger.debug(f"Relayed {len(rows)} outbox events")
+        return len(rows)
+
+    def relay_all(self) -> int:
+        total = 0
+        while relayed := self.relay():
+            total += relayed
+        return total
+
+    @staticmethod
+    def group(rows) -> list[tuple[GameEvent, list[str]]]:
+        groups = []
+        for row in rows:
+            if groups and groups[-1][0].id == row.event_id:
+                groups[-1][1].append(row.channel)
+                continue
+            groups.append((GameEvent.model_validate(row.payload), [row.channel]))
+        return groups
+
+    @staticmethod
+    def purge(older_than) -> int:
+        """Delete relayed events published before `older_than`."""
+        from apps.core.models import OutboxEvent
+
+        deleted, _ = OutboxEvent.objects.filter(published_at__lt=older_than).delete()
+        return deleted
+
+
+def wrap_sender(sender: Sender, mode: str) -> Sender:
+    mode = OutboxMode(mode)
+    if mode == OutboxMode.ON_COMMIT:
+        return OnCommitSender(sender)
+    if mode == OutboxMode.TABLE:
+        return OutboxTableSender(sender)
+    return sender
@@ -1,9 +1,12 @@
 import logging
 from typing import Protocol
 
+from django.conf import settings
+
 from .base import GameEvent
-from .channels import Channel
+from .outbox import OutboxMode, wrap_sender
 from .protocol import Sender
+from .routing import ChannelResolver, character_index
 
 
 class EventBusProto(Protocol):
@@ -24,6 +27,9 @@ class EventBusProto(Protocol):
 
 class _PubSub(EventBusProto):
     publisher: Sender
+    # sender that talks to the network, `publisher` may wrap it with an outbox
+    transport: Sender
+    resolver = ChannelResolver(character_index)
     logger = logging.getLogger("apps.core.bus.pubsub")
 
     def on_new_message(self, event: GameEvent):
@@ -36,38 +42,22 @@ class _PubSub(EventBusProto):
 
     def publish(self, event: GameEvent):
         self.logger.debug(f"Publishing event {event}")
-        # FIXME: add abstraction of target
-        #  Where:
-        #  - target Character
-        #  - target Group
-        #  - target Position
-        #  - target Location
-        #  - target World
-        #  - target System
-        #  - target GameMaster
-        if event.name == "new_cycle":
-            self.publisher.send(event, Channel.WORLD)
-        elif event.name == "challenge_created":
-            # Send challenge_created event to specific character instead of broadcasting
-            character_id = event.data.character_id
-            if character_id:
-                character_channel = Channel.character(character_id)
-                self.publisher.send(event, character_channel)
-                self.logger.debug(f"Sent challenge_created event to character channel: {character_channel}")
-            else:
-                self.logger.warning("ChallengeCreatedEvent missing character_id, sending to MASTER")
-                self.publisher.send(event, Channel.MASTER)
+        routes = event.___registry___.get_routes(event)
+        channels = self.resolver.resolve(event, routes)
+        if len(channels) == 1:
+            self.publisher.send(event, channels[0])
         else:
-            self.publisher.send(event, Channel.MASTER)
+            self.publisher.broadcast(event, channels)
 
     @classmethod
-    def set_publisher(cls, publisher: Sender):
-        cls.logger.debug(f"Setting publisher to {publisher}")
-        cls.publisher = publisher
+    def set_publisher(cls, publisher: Sender, outbox: OutboxMode = OutboxMode.IMMEDIATE):
+        cls.logger.debug(f"Setting publisher to {publisher} with {outbox} outbox")
+        cls.transport = publisher
+        cls.publisher = wrap_sender(publisher, outbox)
 
 
 event_bus = _PubSub()
 
 
 def setup_publisher(publisher: Sender):
-    event_bus.set_publisher(publisher)
+    event_bus.set_publisher(publisher, getattr(settings, "EVENT_BUS_OUTBOX", OutboxMode.IMMEDIATE))
@@ -1,6 +1,8 @@
 import logging
 import typing
-from typing import Type
+from typing import Type, Union
+
+from ..routing import Route, DEFAULT_ROUTES
 
 if typing.TYPE_CHECKING:
     from ..base import GameEvent
@@ -9,11 +11,14 @@ if typing.TYPE_CHECKING:
 class EventsRegistry:
     produced: set[Type["GameEvent"]]
     consumed: set[Type["GameEvent"]]
+    # routing table, keyed by event class or by event name for events built with `GameEvent.create`
+    routes: dict[Union[Type["GameEvent"], str], tuple[Route, ...]]
     logger = logging.getLogger("apps.core.bus.registry")
 
     def __init__(self):
         self.produced = set()
         self.consumed = set()
+        self.routes = {}
 
     def register_produced(self, event: Type["GameEvent"]):
         self.logger.debug(f"Registering event {event} as produced")
@@ -27,6 +32,16 @@ class EventsRegistry:
         self.register_produced(event)
         self.register_consumed(event)
 
+    def register_routes(self, event: Union[Type["GameEvent"], str], *routes: Route):
+        self.logger.debug(f"Registering routes {routes} for {event}")
+        self.routes[event] = tuple(routes)
+
+    def get_routes(self, event: "GameEvent") -> tuple[Route, ...]:
+        for cls in type(event).__mro__:
+            if cls in self.routes:
+                return self.routes[cls]
+        return self.routes.get(event.name, DEFAULT_ROUTES)
+
     def auto_discover(self, events_module: str = "apps.core.bus.events"):
         # automatically recursivly import all modules in the events directory
         # and register all events in the module
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from enum import StrEnum
+
+from .channels import Channel
+
+if t.TYPE_CHECKING:
+    from .base import GameEvent
+
+
+class Target(StrEnum):
+    WORLD = "world"  # every connected client
+    GAME_MASTER = "game_master"
+    CHARACTER = "character"  # `field` holds a character id
+    POSITION = "position"  # `field` holds a position id, players at the position receive the event
+    FIGHT = "fight"  # `field` holds a fight id, players in the fight receive the event
+    CAMPAIGN = "campaign"  # `field` holds a campaign id, players of the campaign receive the event
+
+
+@dataclass(frozen=True)
+class Route:
+    target: Target
+    field: t.Optional[str] = None  # dotted path to the target id in the event data
+
+    def get_value(self, event: "GameEvent"):
+        value = event.data
+        for part in self.field.split("."):
+            if value is None:
+                return None
+            value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+        return value
+
+
+DEFAULT_ROUTES = (Route(Target.GAME_MASTER),)
+
+
+class CharacterChannelIndex:
+    """
+    In-memory index of player characters by position, fight and campaign.
+
+    Buckets are loaded lazily with one query and kept in sync by `update`/`remove`, which are called
+    from character signals. Changes made by other processes are picked up when a bucket expires after `ttl` seconds.
+    """
+    fields = ("position_id", "fight_id", "campaign_id")
+    logger = logging.getLogger("apps.core.bus.routing")
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._buckets: dict[tuple[str, str], tuple[float, set[str]]] = {}
+        self._characters: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, field: str, value) -> set[str]:
+        key = (field, str(value))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket and time.monotonic() - bucket[0] < self.ttl:
+                return set(bucket[1])
+        rows = self._load(field, value)
+        with self._lock:
+            self._buckets[key] = (time.monotonic(), {character_id for character_id, _ in rows})
+            for character_id, values in rows:
+                self._characters[character_id] = values
+            return set(self._buckets[key][1])
+
+    def _load(self, field: str, value) -> list[tuple[str, dict[str, str]]]:
+        from apps.character.models import Character
+
+        rows = Character.objects.filter(npc=False, is_active=True, **{field: value}).values_list("id", *self.fields)
+        return [(str(row[0]), dict(zip(self.fields, map(self._key, row[1:])))) for row in rows]
+
+    @staticmethod
+    def _key(value) -> t.Optional[str]:
+        return None if value is None else str(value)
+
+    def update(self, character) -> None:
+        """Move a saved character to the buckets of its current position, fight and campaign."""
+        if character.npc or not character.is_active:
+            self.remove(character.pk)
+            return
+        character_id = str(character.pk)
+        values = {field: self._key(getattr(character, field)) for field in self.fields}
+        with self._lock:
+            previous = self._characters.get(character_id, {})
+            for field in self.fields:
+                if previous.get(field) == values[field]:
+                    continue
+                old_bucket = self._buckets.get((field, previous.get(field)))
+                if old_bucket:
+                    old_bucket[1].discard(character_id)
+                new_bucket = self._buckets.get((field, values[field]))
+                if new_bucket:
+                    new_bucket[1].add(character_id)
+            self._characters[character_id] = values
+
+    def remove(self, character_id) -> None:
+        character_id = str(character_id)
+        with self._lock:
+            values = self._characters.pop(character_id, {})
+            for field, value in values.items():
+                bucket = self._buckets.get((field, value))
+                if bucket:
+                    bucket[1].discard(character_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._characters.clear()
+
+
+class ChannelResolver:
+    """Turn the routes of an event into the list of Centrifugo channels."""
+    logger = logging.getLogger("apps.core.bus.routing")
+    index_fields = {
+        Target.POSITION: "position_id",
+        Target.FIGHT: "fight_id",
+        Target.CAMPAIGN: "campaign_id",
+    }
+
+    def __init__(self, index: CharacterChannelIndex):
+        self.index = index
+
+    def resolve(self, event: "GameEvent", routes: t.Iterable[Route]) -> list[str]:
+        channels = {}  # dict keeps the order and drops duplicates
+        for route in routes:
+            for channel in self._resolve_route(event, route):
+                channels[channel] = None
+        if not channels:
+            self.logger.warning(f"Event {event.full_event_name} has no recipients, sending to {Channel.MASTER}")
+            channels[Channel.MASTER.value] = None
+        return list(channels)
+
+    def _resolve_route(self, event: "GameEvent", route: Route) -> list[str]:
+        if route.target == Target.WORLD:
+            return [Channel.WORLD.value]
+        if route.target == Target.GAME_MASTER:
+            return [Channel.MASTER.value]
+
+        value = route.get_value(event)
+        if value is None:
+            self.logger.warning(f"Event {event.full_event_name} has no {route.field} for {route.target} route")
+            return []
+        if route.target == Target.CHARACTER:
+            return [Channel.character(value)]
+        return [Channel.character(character_id)
+                for character_id in sorted(self.index.lookup(self.index_fields[route.target], value))]
+
+
+character_index = CharacterChannelIndex()
@@ -0,0 +1,36 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.bus import event_bus
+from apps.core.bus.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    help = 'Relay game events stored in the outbox table to the event bus transport'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Relay pending events and exit')
+        parser.add_argument('--interval', type=float, default=0.5, help='Seconds between polls when idle')
+        parser.add_argument('--batch-size', type=int, default=500, help='Events relayed per transaction')
+        parser.add_argument('--keep-hours', type=int, default=24, help='Delete relayed events older than this')
+
+    def handle(self, *args, **options):
+        relay = OutboxRelay(event_bus.transport, batch_size=options['batch_size'])
+        keep = datetime.timedelta(hours=options['keep_hours'])
+        if options['once']:
+            self.stdout.write(f"Relayed {relay.relay_all()} events")
+            relay.purge(timezone.now() - keep)
+            return
+        self.loop(relay, options['interval'], keep)
+
+    def loop(self, relay: OutboxRelay, interval: float, keep: datetime.timedelta):
+        last_purge = time.monotonic()
+        while True:
+            if not relay.relay_all():
+                time.sleep(interval)
+            if time.monotonic() - last_purge > 3600:
+                relay.purge(timezone.now() - keep)
+                last_purge = time.monotonic()
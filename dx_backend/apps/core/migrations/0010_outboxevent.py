@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:40
+
+import apps.core.utils.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alter_trigger_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_id', models.UUIDField(help_text='GameEvent.id, an event is stored once per channel')),
+                ('name', models.CharField(max_length=255)),
+                ('channel', models.CharField(max_length=255)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('published_at', models.DateTimeField(blank=True, default=None, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['published_at', 'id'], name='outbox_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event_id', 'channel'), name='unique_outbox_event_channel')],
+            },
+            bases=(apps.core.utils.models.Tagged, models.Model),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:50
+
+import apps.core.utils.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedVersion',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            bases=(apps.core.utils.models.Tagged, models.Model),
+        ),
+    ]
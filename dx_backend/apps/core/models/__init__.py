@@ -1 +1,3 @@
 from .core import *
+from .outbox import OutboxEvent
+from .versions import SharedVersion
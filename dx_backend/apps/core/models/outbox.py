@@ -0,0 +1,32 @@
+from django.db import models
+
+from apps.core.utils.models import Tagged, TagsDescriptor
+
+
+class OutboxEvent(Tagged, models.Model):
+    """
+    Game event waiting to be relayed to a bus channel.
+
+    Rows are written in the same transaction as the game state they describe and relayed
+    by the `outbox_relay` command in `id` order, which keeps the order of events per channel.
+    """
+    game_tags = TagsDescriptor(TagsDescriptor.BaseTags.EXCLUDED)
+    id = models.BigAutoField(primary_key=True)
+    event_id = models.UUIDField(help_text="GameEvent.id, an event is stored once per channel")
+    name = models.CharField(max_length=255)
+    channel = models.CharField(max_length=255)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True, default=None)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["event_id", "channel"], name="unique_outbox_event_channel"),
+        ]
+        indexes = [
+            models.Index(fields=["published_at", "id"], name="outbox_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} -> {self.channel}"
@@ -0,0 +1,18 @@
+from django.db import models
+
+from apps.core.utils.models import Tagged, TagsDescriptor
+
+
+class SharedVersion(Tagged, models.Model):
+    """
+    Version of process-wide cached data, see `CacheVersion`.
+
+    Only used when the Django cache is local to the process and cannot tell other processes about a change.
+    """
+    game_tags = TagsDescriptor(TagsDescriptor.BaseTags.EXCLUDED)
+    key = models.CharField(max_length=255, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} v{self.value}"
@@ -1,3 +1,123 @@
+import uuid
+from unittest.mock import Mock, patch
+
+from django.db import transaction
 from django.test import TestCase
 
-# Create your tests here.
+from apps.character.models import Character
+from apps.core.bus.base import GameEvent, EventCategory
+from apps.core.bus.channels import Channel
+from apps.core.bus.events.challenge.produced.challenge_events import ChallengeCreatedEvent
+from apps.core.bus.events.fight.produced import FightStartedEvent
+from apps.core.bus.events.world import NewCycleData
+from apps.core.bus.outbox import OnCommitSender, OutboxRelay, OutboxTableSender
+from apps.core.bus.pubsub import _PubSub
+from apps.core.bus.routing import CharacterChannelIndex, ChannelResolver
+from apps.core.models import OutboxEvent
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class OnCommitSenderTest(TestCase):
+
+    def test_events_are_sent_after_commit(self):
+        transport = Mock()
+        sender = OnCommitSender(transport)
+        kept, dropped = GameEvent(name="kept", data={}), GameEvent(name="dropped", data={})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sender.send(kept, "world::master")
+            try:
+                with transaction.atomic():
+                    sender.send(dropped, "world::master")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            transport.send.assert_not_called()
+
+        transport.send.assert_called_once_with(kept, "world::master")
+
+
+class OutboxRelayTest(TestCase):
+
+    def test_relay_sends_stored_events_once_in_order(self):
+        transport = Mock()
+        sender = OutboxTableSender(transport)
+        first, second = GameEvent(name="first", data={"a": 1}), GameEvent(name="second", data=[])
+        sender.broadcast(first, ["character::1", "character::2"])
+        sender.send(first, "character::1")  # duplicate
+        sender.send(second, "world::master")
+        self.assertEqual(OutboxEvent.objects.count(), 3)
+        transport.send.assert_not_called()
+
+        self.assertEqual(OutboxRelay(transport).relay_all(), 3)
+        self.assertEqual(OutboxRelay(transport).relay_all(), 0)
+
+        transport.broadcast.assert_called_once_with(first, ["character::1", "character::2"])
+        transport.send.assert_called_once_with(second, "world::master")
+        self.assertFalse(OutboxEvent.objects.filter(published_at__isnull=True).exists())
+
+
+class EventRoutingTest(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.position = PositionFactory()
+        dimension, rank = DimensionFactory(), RankFactory()
+        self.players = [
+            Character.objects.create(name=f"Player {i}", campaign=self.campaign, dimension=dimension, rank=rank,
+                                     position=self.position)
+            for i in range(3)
+        ]
+        Character.objects.create(name="NPC", campaign=self.campaign, dimension=dimension, rank=rank,
+                                 position=self.position, npc=True)
+
+        self.bus = _PubSub()
+        self.bus.publisher = Mock()
+        self.bus.resolver = ChannelResolver(CharacterChannelIndex())
+
+    def test_position_event_is_one_broadcast_to_players_at_position(self):
+        event = FightStartedEvent.create_event(
+            fight_id=uuid.uuid4(), position_id=self.position.id,
+            attacker_id=self.players[0].id, defender_id=self.players[1].id,
+        )
+        with self.assertNumQueries(1):
+            self.bus.publish(event)
+            self.bus.publish(event)
+
+        self.bus.publisher.send.assert_not_called()
+        expected = [Channel.MASTER] + sorted(Channel.character(p.id) for p in self.players)
+        self.bus.publisher.broadcast.assert_called_with(event, expected)
+
+    def test_index_follows_character_moves(self):
+        index = self.bus.resolver.index
+        self.assertEqual(len(index.lookup("position_id", self.position.id)), 3)
+        player = self.players[0]
+        player.position = PositionFactory()
+        player.save()
+        # the signal receiver updates the module level index, this one is fed by hand
+        index.update(player)
+        self.assertEqual(index.lookup("position_id", self.position.id), {str(p.id) for p in self.players[1:]})
+
+    def test_single_recipient_events_use_send(self):
+        cycle = GameEvent.create(
+            category=EventCategory.WORLD, name="new_cycle",
+            data=NewCycleData(id=1, number=1, campaign=self.campaign.id, created_at=self.campaign.created_at,
+                              updated_at=self.campaign.updated_at, is_current=True),
+        )
+        self.bus.publish(cycle)
+        self.bus.publisher.send.assert_called_with(cycle, Channel.WORLD)
+
+        challenge = ChallengeCreatedEvent.create_event(id=uuid.uuid4(), character_id=self.players[0].id)
+        self.bus.publish(challenge)
+        self.bus.publisher.send.assert_called_with(challenge, Channel.character(self.players[0].id))
+
+        other = GameEvent.create(category=EventCategory.WORLD, name="action_accepted", data=NewCycleData(
+            id=1, number=1, campaign=self.campaign.id, created_at=self.campaign.created_at,
+            updated_at=self.campaign.updated_at, is_current=True))
+        self.bus.publish(other)
+        self.bus.publisher.send.assert_called_with(other, Channel.MASTER)
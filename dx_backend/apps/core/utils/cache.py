@@ -0,0 +1,120 @@
+import random
+import threading
+import typing as t
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import F
+
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_cache_shared() -> bool:
+    """False when the default cache keeps its data in the process, other processes do not see it."""
+    return not isinstance(caches["default"], PROCESS_LOCAL_CACHES)
+
+
+class DatabaseVersions:
+    """
+    Versions of `CacheVersion` for deployments without a shared cache, stored in the `SharedVersion` table.
+
+    A process reads a stored version once and again only after `expire`, which runs when a request or a cycle
+    starts, so a change committed by another process is seen from its next request or cycle on. Changes of the
+    process itself are seen right away: every process adds its own counter, bumped on every invalidation.
+    """
+
+    def __init__(self):
+        self._stored: t.Dict[str, int] = {}
+        self._local: t.Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> int:
+        stored = self._stored.get(key)
+        if stored is None:
+            stored = self._stored[key] = self._read(key)
+        return stored << 32 | self._local_counter(key)
+
+    def bump_local(self, key: str) -> None:
+        with self._lock:
+            self._local[key] = (self._local_counter(key) + 1) & 0xFFFFFFFF
+
+    def bump(self, key: str) -> None:
+        """Increment the stored version, other processes see it after their next `expire`."""
+        from apps.core.models import SharedVersion
+
+        if not SharedVersion.objects.filter(key=key).update(value=F("value") + 1):
+            _, created = SharedVersion.objects.get_or_create(key=key, defaults={"value": 1})
+            if not created:
+                SharedVersion.objects.filter(key=key).update(value=F("value") + 1)
+        # the local counter already tells this process, the stored value is read again on `expire`
+        self.bump_local(key)
+
+    def expire(self) -> None:
+        self._stored.clear()
+
+    def _local_counter(self, key: str) -> int:
+        counter = self._local.get(key)
+        if counter is None:
+            # random start, so processes do not produce equal versions for different data
+            counter = self._local.setdefault(key, random.randrange(1 << 32))
+        return counter
+
+    @staticmethod
+    def _read(key: str) -> int:
+        from apps.core.models import SharedVersion
+
+        return SharedVersion.objects.filter(key=key).values_list("value", flat=True).first() or 0
+
+
+database_versions = DatabaseVersions()
+
+
+def expire_versions(**kwargs) -> None:
+    """
+    Read the versions stored in the database again, without a shared cache changes of other processes are not
+    seen before. Called when a request starts and by the workers before a cycle or a batch of fights.
+    """
+    database_versions.expire()
+
+
+class CacheVersion:
+    """
+    Version of some data kept in the Django cache, changes on every `invalidate`.
+
+    With a shared cache backend all processes see the same version. The first value is random,
+    so processes with their own local cache do not produce equal versions for different data.
+    A process-local cache (locmem) cannot reach other processes, the version is then stored in the database
+    and other processes see a committed invalidation from their next request or cycle, see `DatabaseVersions`.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def get(self) -> int:
+        if not is_cache_shared():
+            return database_versions.get(self.key)
+        return cache.get_or_set(self.key, self._initial, timeout=None)
+
+    def bump(self) -> None:
+        if not is_cache_shared():
+            database_versions.bump(self.key)
+            return
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, self._initial(), timeout=None)
+
+    def invalidate(self) -> None:
+        if is_cache_shared():
+            self.bump()
+        else:
+            # the stored version is bumped on commit, other processes cannot see the change before
+            database_versions.bump_local(self.key)
+        # readers that cached the old data before the commit must not keep it after the transaction
+        transaction.on_commit(self.bump)
+
+    @staticmethod
+    def _initial() -> int:
+        return random.randrange(1 << 31)
@@ -0,0 +1,86 @@
+import json
+import typing as t
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    def __init__(self, file: t.TextIO, read_size: int):
+        self.file = file
+        self.read_size = read_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop the consumed part, the buffer holds at most one value plus one read
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at {self.pos}, got {self.text[self.pos]!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.text) and not self.eof and isinstance(value, (int, float)):
+                # a number at the end of the buffer may continue in the next read
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iter_object_arrays(file: t.TextIO, read_size: int = 64 * 1024) -> t.Iterator[t.Tuple[str, t.Any]]:
+    """
+    Stream a JSON object whose values are arrays, yielding `(key, item)` for every array item.
+
+    Only one item is decoded at a time, so large documents are read with constant memory.
+    Values of the top level object that are not arrays are skipped.
+    """
+    buffer = _Buffer(file, read_size)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        key = buffer.value()
+        buffer.expect(":")
+        if buffer.peek() == "[":
+            buffer.expect("[")
+            if buffer.peek() != "]":
+                while True:
+                    yield key, buffer.value()
+                    if buffer.peek() == "]":
+                        break
+                    buffer.expect(",")
+            buffer.expect("]")
+        else:
+            buffer.value()
+        if buffer.peek() == "}":
+            return
+        buffer.expect(",")
@@ -1,7 +1,8 @@
+import typing as t
 import uuid
 from enum import StrEnum
 
-from django.db import models
+from django.db import models, router
 from django.utils import timezone
 
 
@@ -49,3 +50,30 @@ class BaseModel(Tagged, models.Model):
 
     class Meta:
         abstract = True
+
+
+def bulk_insert(model: t.Type[models.Model], objs: t.Sequence[models.Model], batch_size: int = 1000,
+                using: t.Optional[str] = None) -> t.Sequence[models.Model]:
+    """
+    Insert new instances of a model with concrete parents, one batched insert per table of the inheritance chain.
+
+    `bulk_create` refuses multi-table inheritance. Primary keys must already be set on the instances, e.g. by the
+    `uuid4` default of `BaseModel`. `save` is not called and no signals are sent.
+    """
+    using = using or router.db_for_write(model)
+    chain = [*reversed(model._meta.get_parent_list()), model]
+    for obj in objs:
+        if hasattr(obj, "pre_save_polymorphic"):
+            obj.pre_save_polymorphic(using)
+        for concrete in chain:
+            for parent, field in concrete._meta.parents.items():
+                if field:
+                    setattr(obj, field.attname, getattr(obj, parent._meta.pk.attname))
+    for concrete in chain:
+        fields = concrete._meta.local_concrete_fields
+        for start in range(0, len(objs), batch_size):
+            concrete._base_manager._insert(objs[start:start + batch_size], fields=fields, using=using)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db import transaction
 from django.http import HttpResponseRedirect, HttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.urls import path, reverse
@@ -7,15 +6,16 @@ from django.utils.html import format_html
 from django.contrib import messages
 
 from apps.core.utils.models import TagsDescriptor
+from apps.game.services.clone.bulk import BulkInstanceCloner, get_campaign_clone_plan
 from apps.game.services.clone.clone import PolymorphicCloneService
 from apps.game.services.clone.clone_strategy import CampaignCloneStrategy
 from apps.game.services.clone.filter import TaggedContextFilter
-from apps.game.services.clone.hook import SaveCloneHook
-from apps.game.services.clone.new import InstanceDependencyGraph, InstanceDeepCloner
+from apps.game.services.clone.new import InstanceDependencyGraph
 from apps.game.services.clone.present import DependencyGraphPresenter, ShapeDistiller
 from apps.game.services.clone.rel_fix import get_default_relation_updater
+from apps.game.services.world.map_export import on_map_characters_changed
 
-from .models import Campaign, Session, CampaignStartItem
+from .models import Campaign, Session, CampaignStartItem, CampaignSchedule
 
 
 class CampaignStartItemInline(admin.TabularInline):
@@ -270,35 +270,26 @@ class CampaignAdmin(admin.ModelAdmin):
         if campaign is None:
             return self._get_obj_does_not_exist_redirect(request, self.model._meta, object_id)
 
-        # Create dependency graph
-        graph = InstanceDependencyGraph(
-            campaign,
-            model_filter=TaggedContextFilter(tag=TagsDescriptor.BaseTags.CAMPAIGN_TEMPLATE)
-        )
-        dependencies = graph.discover()
-
         try:
-            with transaction.atomic():
-                # Clone campaign with dependencies
-                cloner = InstanceDeepCloner(
-                    root_instance=campaign,
-                    dependencies=dependencies,
-                    strategy=CampaignCloneStrategy(
-                        cloner=PolymorphicCloneService(),
-                        fixer=get_default_relation_updater(),
-                        hook=SaveCloneHook(),
-                    )
-                )
-                cloner.clone()
-
-                # The root_instance attribute of the cloner contains the cloned campaign
-                new_campaign = cloner.root_instance
-
-                messages.success(request,
-                                 f'Campaign "{campaign.name}" was successfully cloned to "{new_campaign.name}"')
-                return HttpResponseRedirect(
-                    reverse('admin:game_campaign_change', args=(new_campaign.pk,))
-                )
+            # Copy the campaign table by table, the plan is discovered once per process
+            cloner = BulkInstanceCloner(
+                root_instance=campaign,
+                plan=get_campaign_clone_plan(),
+                strategy=CampaignCloneStrategy(
+                    cloner=PolymorphicCloneService(),
+                    fixer=get_default_relation_updater(),
+                ),
+            )
+            new_campaign = cloner.clone()
+            # bulk inserts do not send post_save, refresh the map characters once
+            on_map_characters_changed()
+
+            messages.success(request,
+                             f'Campaign "{campaign.name}" was successfully cloned to "{new_campaign.name}": '
+                             f'{cloner.report}')
+            return HttpResponseRedirect(
+                reverse('admin:game_campaign_change', args=(new_campaign.pk,))
+            )
         except Exception as e:
             messages.error(request, f'Error cloning campaign: {str(e)}')
             return HttpResponseRedirect(
@@ -316,6 +307,22 @@ class SessionAdmin(admin.ModelAdmin):
     search_fields = ('client__name', 'character__name')
 
 
+@admin.register(CampaignSchedule)
+class CampaignScheduleAdmin(admin.ModelAdmin):
+    """
+    Admin interface for CampaignSchedule model, the schedule and overrun metrics of the auto cycle player.
+    """
+    list_display = (
+        'campaign', 'interval_seconds', 'deadline_seconds', 'next_run_at', 'worker', 'leased_until', 'last_duration',
+        'last_lag', 'played_cycles', 'failed_cycles', 'overruns', 'max_duration',
+    )
+    search_fields = ('campaign__name', 'worker')
+    readonly_fields = (
+        'worker', 'leased_until', 'last_started_at', 'last_duration', 'last_lag', 'last_error', 'played_cycles',
+        'failed_cycles', 'overruns', 'max_duration',
+    )
+
+
 @admin.register(CampaignStartItem)
 class CampaignStartItemAdmin(admin.ModelAdmin):
     """
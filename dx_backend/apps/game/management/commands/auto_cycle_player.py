@@ -1,71 +1,88 @@
-import time
+import threading
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.utils import timezone
+from django.db import connection
 
-from apps.action.models import Cycle
-from apps.game.models import Campaign
+from apps.game.services.action.cycle_scheduler import CycleScheduler, PlayedCycle, default_worker_id
+from apps.game.services.action.factory import BatchedCharacterActionPlayerServiceFactory
 from apps.gamemaster.tools import ACTION_PIPELINE_TOOL
 
 
 class Command(BaseCommand):
-    help = 'Auto cycle player for campaigns with auto_play=True. Runs every 1.30 minutes.'
+    help = (
+        'Auto cycle player for campaigns with auto_play=True. Every campaign is played on its own schedule, '
+        'any number of players can run side by side and share the campaigns.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batched',
+            action='store_true',
+            help='Play cycles against an in-memory character working set and print per-phase timings.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'CYCLE_SCHEDULER', {}).get('WORKERS', 1),
+            help='Number of worker threads playing campaigns of this process.',
+        )
+        parser.add_argument('--worker-id', default=None, help='Worker name recorded on the played schedules.')
+        parser.add_argument('--once', action='store_true', help='Play the due campaigns once and exit.')
 
     def handle(self, *args, **options):
+        self.batched = options.get('batched', False)
+        worker_id = options['worker_id'] or default_worker_id()
         self.stdout.write(self.style.SUCCESS('Starting auto cycle player...'))
-        self.loop()
-
-    def process_auto_play_campaigns(self):
-        # Find all campaigns with auto_play=True
-        auto_play_campaigns = Campaign.objects.filter(auto_play=True, is_active=True)
 
-        if not auto_play_campaigns.exists():
-            self.stdout.write(self.style.WARNING('No auto-play campaigns found.'))
+        if options['once']:
+            played = self.get_scheduler(worker_id).run_pending(self.report)
+            if not played:
+                self.stdout.write(self.style.WARNING('No auto-play campaigns due.'))
             return
 
-        for campaign in auto_play_campaigns:
-            self.stdout.write(f"Processing campaign: {campaign.name}")
-
-            try:
-                # Get the current cycle for the campaign
-                current_cycle = Cycle.objects.current(campaign=campaign)
-
-                # Create a cycle player service
-                svc = ACTION_PIPELINE_TOOL.cycle_player_factory(
-                    cycle=current_cycle,
-                    factory=ACTION_PIPELINE_TOOL.action_factory
-                )
-
-                # Play the cycle
-                new_cycle = svc.play()
-
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Successfully advanced campaign '{campaign.name}' to cycle {new_cycle.number}"
-                    )
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f"Error processing campaign '{campaign.name}': {str(e)}"
-                    )
-                )
-
-    def loop(self):
-        interval_seconds = 45
-
-        while True:
-            start_time = timezone.now()
-            self.stdout.write(f"Running cycle at {start_time}")
-
-            try:
-                self.process_auto_play_campaigns()
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"Error in auto cycle player: {str(e)}"))
-
-            # Calculate how long to sleep
-            elapsed = (timezone.now() - start_time).total_seconds()
-            sleep_time = max(0, interval_seconds - elapsed)
-
-            if sleep_time > 0:
-                self.stdout.write(f"Sleeping for {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target=self.work, args=(f"{worker_id}/{i}", stop), daemon=True, name=f"cycle-player-{i}")
+            for i in range(max(1, options['workers']))
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping auto cycle player...')
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    def work(self, worker_id: str, stop: threading.Event):
+        try:
+            self.get_scheduler(worker_id).run_forever(self.report, stop)
+        finally:
+            connection.close()
+
+    def get_scheduler(self, worker_id: str) -> CycleScheduler:
+        return CycleScheduler(self.get_cycle_player_factory(), ACTION_PIPELINE_TOOL.action_factory, worker_id)
+
+    def get_cycle_player_factory(self):
+        if getattr(self, 'batched', False):
+            return BatchedCharacterActionPlayerServiceFactory
+        return ACTION_PIPELINE_TOOL.cycle_player_factory
+
+    def report(self, result: PlayedCycle):
+        if result.error:
+            self.stdout.write(self.style.ERROR(f"Error processing campaign '{result.campaign_name}': {result.error}"))
+            return
+        if self.batched and result.report is not None:
+            self.stdout.write(f"Cycle report: {result.report}")
+        message = (
+            f"Successfully advanced campaign '{result.campaign_name}' to cycle {result.cycle_number} "
+            f"in {result.duration:.2f}s ({result.lag:.2f}s late)"
+        )
+        if result.overrun:
+            self.stdout.write(self.style.WARNING(f"{message}, deadline overrun"))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
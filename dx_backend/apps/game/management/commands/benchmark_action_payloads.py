@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.action.api.serializers.openapi import GameMasterCharacterActionLogSerializer
+from apps.action.models import CharacterAction
+from apps.core.bus.events.world import ActionAcceptedData
+from apps.game.services.notifier.payload import ActionPayloadBuilder
+
+
+class Command(BaseCommand):
+    help = 'Compare action event payloads built by the DRF serializer and by ActionPayloadBuilder'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=1000, help='Number of latest actions to serialize')
+
+    def handle(self, *args, **options):
+        ids = list(CharacterAction.objects.order_by('-created_at').values_list('id', flat=True)[:options['limit']])
+        if not ids:
+            self.stdout.write(self.style.WARNING('No actions found.'))
+            return
+        context = {"request": None}
+
+        def drf():
+            return [
+                ActionAcceptedData(**GameMasterCharacterActionLogSerializer(action, context=context).data)
+                for action in CharacterAction.objects.filter(id__in=ids)
+            ]
+
+        def builder():
+            return ActionPayloadBuilder(context).build_many(CharacterAction.objects.filter(id__in=ids))
+
+        expected, drf_seconds, drf_queries = self.measure(drf)
+        built, builder_seconds, builder_queries = self.measure(builder)
+
+        by_id = {payload.id: payload for payload in expected}
+        mismatches = sum(1 for payload in built if by_id.get(payload.id) != payload)
+        self.stdout.write(f"{len(ids)} actions")
+        self.stdout.write(f"DRF serializer:  {drf_seconds * 1000:.1f}ms, {drf_queries} queries")
+        self.stdout.write(f"Payload builder: {builder_seconds * 1000:.1f}ms, {builder_queries} queries")
+        self.stdout.write(f"Speedup: {drf_seconds / builder_seconds:.1f}x" if builder_seconds else "Speedup: -")
+        style = self.style.SUCCESS if not mismatches else self.style.ERROR
+        self.stdout.write(style(f"Payload mismatches: {mismatches}"))
+
+    @staticmethod
+    def measure(func):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            result = func()
+        return result, time.perf_counter() - started, queries
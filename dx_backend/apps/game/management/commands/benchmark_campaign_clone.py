@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.character.models import Character, CharacterBiography, Rank, Stat
+from apps.core.models import CharacterStats, SkillTypes
+from apps.core.utils.models import TagsDescriptor
+from apps.game.models import Campaign
+from apps.game.services.clone.bulk import BulkInstanceCloner, get_campaign_clone_plan
+from apps.game.services.clone.clone import PolymorphicCloneService
+from apps.game.services.clone.clone_strategy import CampaignCloneStrategy
+from apps.game.services.clone.filter import TaggedContextFilter
+from apps.game.services.clone.hook import SaveCloneHook
+from apps.game.services.clone.new import InstanceDeepCloner, InstanceDependencyGraph
+from apps.game.services.clone.rel_fix import get_default_relation_updater
+from apps.items.models import CharacterItem, Item, WorldItem
+from apps.school.models import Skill
+from apps.skills.models import LearnedSkill
+from apps.world.models import Dimension
+
+
+class Command(BaseCommand):
+    help = 'Generate a large campaign, clone it table by table and print the clone rate, nothing is stored'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--characters', type=int, default=500, help='Number of generated characters')
+        parser.add_argument('--items', type=int, default=3, help='Number of items per character')
+        parser.add_argument('--skills', type=int, default=5, help='Number of learned skills per character')
+        parser.add_argument('--compare', action='store_true', help='Clone the campaign with the legacy cloner too')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            started = time.perf_counter()
+            campaign = self.generate(options['characters'], options['items'], options['skills'])
+            self.stdout.write(f"Generated campaign in {time.perf_counter() - started:.2f}s")
+
+            cloner = BulkInstanceCloner(campaign, get_campaign_clone_plan(), self.strategy())
+            cloner.clone()
+            self.stdout.write(f"Bulk clone:   {cloner.report}")
+            for table, rows in cloner.report.rows.items():
+                if rows:
+                    self.stdout.write(f"  {table}: {rows}")
+
+            if options['compare']:
+                started = time.perf_counter()
+                dependencies = InstanceDependencyGraph(
+                    campaign, model_filter=TaggedContextFilter(tag=TagsDescriptor.BaseTags.CAMPAIGN_TEMPLATE)
+                ).discover()
+                InstanceDeepCloner(campaign, dependencies, self.strategy(hook=SaveCloneHook())).clone()
+                seconds = time.perf_counter() - started
+                rows = cloner.report.total_rows
+                self.stdout.write(f"Legacy clone: {rows} rows, {seconds:.2f}s ({rows / seconds:.0f} rows/s)")
+                if cloner.report.seconds:
+                    self.stdout.write(f"Speedup: {seconds / cloner.report.seconds:.1f}x")
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def strategy(hook=None) -> CampaignCloneStrategy:
+        return CampaignCloneStrategy(cloner=PolymorphicCloneService(), fixer=get_default_relation_updater(), hook=hook)
+
+    @staticmethod
+    def generate(characters: int, items: int, skills: int) -> Campaign:
+        campaign = Campaign.objects.create(name="Clone benchmark", description="Generated campaign")
+        dimension = Dimension.objects.get_or_create(id=1, defaults={"speed": 1, "energy": 1})[0]
+        rank = Rank.objects.get_or_create(name="Benchmark rank")[0]
+        item = Item.objects.create(name="Benchmark item")
+        learned = list(Skill.objects.all()[:skills])
+        for index in range(len(learned), skills):
+            learned.append(Skill.objects.create(name=f"Benchmark skill {index}", description="", multi_target=False,
+                                                type=SkillTypes.ATTACK, grade=1))
+        stats, biographies, learned_skills, character_items = [], [], [], []
+        for index in range(characters):
+            character = Character.objects.create(name=f"Character {index}", campaign=campaign, dimension=dimension,
+                                                 rank=rank)
+            stats.extend(Stat(character=character, name=name, base_value=index % 10) for name in CharacterStats)
+            biographies.append(CharacterBiography(character=character, age=20, background="", appearance=""))
+            learned_skills.extend(LearnedSkill(character=character, skill=skill) for skill in learned)
+            for _ in range(items):
+                world_item = WorldItem.objects.create(item=item, campaign=campaign, dimension=dimension)
+                character_items.append(CharacterItem(character=character, world_item=world_item))
+        Stat.objects.bulk_create(stats)
+        CharacterBiography.objects.bulk_create(biographies)
+        LearnedSkill.objects.bulk_create(learned_skills)
+        CharacterItem.objects.bulk_create(character_items)
+        return campaign
@@ -0,0 +1,45 @@
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from apps.core.models import RollOutcome
+from apps.game.services.rand_dice import DiceService, DiceStreams
+
+
+class Command(BaseCommand):
+    help = 'Compare single and batched dice rolls and print the outcome distribution by luck'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Number of rolls per luck')
+        parser.add_argument('--sides', type=int, default=6, help='Number of dice sides')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the dice streams')
+
+    def handle(self, *args, **options):
+        count, sides = options['count'], options['sides']
+        character = SimpleNamespace(pk="benchmark")
+        for luck in (5, 10, 15, 20):
+            with DiceStreams(options['seed']).activate():
+                service = DiceService(character, luck, sides)
+                started = time.perf_counter()
+                outcomes = Counter(service.multiplier_roll().outcome for _ in range(count))
+                single_seconds = time.perf_counter() - started
+
+            self.stdout.write(f"\nLuck {luck}, d{sides}, {count} rolls")
+            for outcome in RollOutcome:
+                self.stdout.write(f"  {outcome.value}: {outcomes[outcome] / count:.2%}")
+            self.stdout.write(f"  Single rolls:  {single_seconds * 1000:.1f}ms")
+
+            try:
+                with DiceStreams(options['seed']).activate():
+                    started = time.perf_counter()
+                    service.multipliers(service.roll_many(count)).mean()
+                    batched_seconds = time.perf_counter() - started
+            except ImportError as e:
+                self.stdout.write(self.style.WARNING(f"  Batched rolls: {e}"))
+                continue
+            self.stdout.write(f"  Batched rolls: {batched_seconds * 1000:.1f}ms")
+            self.stdout.write(
+                f"  Speedup: {single_seconds / batched_seconds:.1f}x" if batched_seconds else "  Speedup: -"
+            )
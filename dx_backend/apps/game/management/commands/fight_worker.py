@@ -1,24 +1,32 @@
-import time
+from django.core.management.base import BaseCommand
 
-from django.core.management.base import BaseCommand, CommandError
-
-from apps.fight.models import Fight
-from apps.game.services.fight.fight import FightService
+from apps.game.services.fight.worker import FightWorker
+from apps.gamemaster.tools import ACTION_PIPELINE_TOOL
 
 
 class Command(BaseCommand):
-    help = 'Manually handle fight steps'
+    help = 'Process changed fights between cycles, woken up by fight change notifications'
 
-    def handle(self, *args, **kwargs):
-        self.loop()
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Campaigns processed in parallel.')
+        parser.add_argument('--poll-seconds', type=float, default=None,
+                            help='Interval of the fallback check of all open fights.')
+        parser.add_argument('--once', action='store_true', help='Process all open fights once and exit.')
 
-    def check_and_process(self):
-        current_fights = Fight.objects.filter(is_ended=False).select_related('current_turn')
-        for fight in current_fights:
-            fight_service = FightService(fight)
-            fight_service.process()
+    def handle(self, *args, **options):
+        worker = FightWorker(ACTION_PIPELINE_TOOL.notifier, workers=options['workers'],
+                             poll_seconds=options['poll_seconds'])
+        if options['once']:
+            worker.mark_open_fights_dirty()
+            self.report(worker.process_dirty())
+            return
+        self.stdout.write(self.style.SUCCESS('Starting fight worker...'))
+        try:
+            worker.run_forever(on_processed=self.report)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping fight worker...')
 
-    def loop(self):
-        while True:
-            time.sleep(1)
-            self.check_and_process()
+    def report(self, results: dict):
+        for campaign_id, result in results.items():
+            changes = {name: len(value) for name, value in result.items()}
+            self.stdout.write(f"Campaign {campaign_id}: {changes}")
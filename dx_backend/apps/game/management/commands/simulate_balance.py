@@ -0,0 +1,119 @@
+import time
+
+import yaml
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.character.models import CharacterTemplate
+from apps.core.models import RollOutcome
+from apps.game.services.catalog import game_catalog
+from apps.game.services.skills.simulation import BalanceSimulator, SimulatedCharacter, SimulatedSkill
+from apps.school.models import Skill
+
+
+class Command(BaseCommand):
+    help = 'Simulate skill impacts and fights to report expected damage, time-to-kill and win rates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trials', type=int, default=100_000, help='Trials per skill and attacker')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the dice streams')
+        parser.add_argument('--max-cycles', type=int, default=20, help='Cycles a simulated fight may last')
+        parser.add_argument('--school', action='append', default=[], help='Only skills of the school, repeatable')
+        parser.add_argument('--fixture', help='JSON or YAML file with skill records to simulate instead of the database')
+        parser.add_argument('--template', action='append', default=[],
+                            help='Character template of the attackers, repeatable, all templates by default')
+        parser.add_argument('--defender', help='Character template of the defender, all stats 10 by default')
+        parser.add_argument('--store', action='store_true',
+                            help='Store the power ratings on the skills, used by SkillPowerService')
+
+    def handle(self, *args, **options):
+        if options['store'] and options['fixture']:
+            raise CommandError('Only skills of the database can be stored')
+        skills = self.load_skills(options)
+        if not skills:
+            self.stdout.write(self.style.WARNING('No skills found.'))
+            return
+        attackers = self.load_attackers(options['template'])
+        defender = self.load_defender(options['defender'])
+
+        simulator = BalanceSimulator(trials=options['trials'], seed=options['seed'], max_cycles=options['max_cycles'])
+        started = time.perf_counter()
+        reports = simulator.evaluate_all(skills, attackers, defender)
+        seconds = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(skills)} skills, {len(attackers)} attackers, {options['trials']} trials each, "
+            f"defender {defender.name} with {defender.max_hp} health, {seconds:.1f}s"
+        )
+        self.stdout.write(f"{'School':<24} {'Skill':<28} {'Impact':>8} {'p5-p95':>11} {'Crit':>6} "
+                          f"{'Kill':>6} {'Cycles':>7} {'Win':>6} {'Power':>8}")
+        for report in sorted(reports, key=lambda r: (r.skill.school, -r.power_rating)):
+            crit = report.outcomes[RollOutcome.CRITICAL_SUCCESS]
+            self.stdout.write(
+                f"{report.skill.school[:24]:<24} {report.skill.name[:28]:<28} {report.mean_impact:>8.1f} "
+                f"{f'{report.p5_impact:.0f}-{report.p95_impact:.0f}':>11} {crit:>6.1%} "
+                f"{self.percent(report.kill_rate):>6} {self.number(report.mean_cycles_to_kill):>7} "
+                f"{self.percent(report.win_rate):>6} {report.power_rating:>8.2f}"
+            )
+
+        self.stdout.write(f"\n{'School':<24} {'Skills':>6} {'Impact':>8} {'Kill':>6} {'Win':>6} {'Power':>8}")
+        for school in simulator.schools(reports):
+            self.stdout.write(
+                f"{school.school[:24]:<24} {school.skills:>6} {school.mean_impact:>8.1f} "
+                f"{self.percent(school.kill_rate):>6} {self.percent(school.win_rate):>6} "
+                f"{school.mean_power_rating:>8.2f}"
+            )
+
+        if options['store']:
+            ratings = {report.skill.id: report.power_rating for report in reports}
+            stored = Skill.objects.filter(id__in=ratings).only('id')
+            for skill in stored:
+                skill.simulated_power = ratings[skill.id]
+            Skill.objects.bulk_update(stored, ['simulated_power'], batch_size=500)
+            # bulk updates send no signals
+            game_catalog.invalidate()
+            self.stdout.write(self.style.SUCCESS(f"Stored power ratings of {len(stored)} skills"))
+
+    @staticmethod
+    def load_skills(options) -> list[SimulatedSkill]:
+        schools = set(options['school'])
+        if options['fixture']:
+            try:
+                with open(options['fixture']) as file:
+                    data = yaml.safe_load(file)
+            except Exception as e:
+                raise CommandError(f"Failed to load the fixture: {e}")
+            skills = [SimulatedSkill.from_fixture(record) for record in data]
+            return [skill for skill in skills if not schools or skill.school in schools]
+
+        queryset = Skill.objects.select_related('school').order_by('school__name', 'grade', 'name')
+        if schools:
+            queryset = queryset.filter(school__name__in=schools)
+        return [SimulatedSkill.from_skill(skill) for skill in queryset]
+
+    @staticmethod
+    def load_attackers(names: list[str]) -> list[SimulatedCharacter]:
+        templates = CharacterTemplate.objects.select_related('stats_template', 'dimension').order_by('name')
+        if names:
+            templates = templates.filter(name__in=names)
+            missing = set(names) - {template.name for template in templates}
+            if missing:
+                raise CommandError(f"Character templates not found: {', '.join(sorted(missing))}")
+        attackers = [SimulatedCharacter.from_template(template) for template in templates]
+        return attackers or [SimulatedCharacter.reference("Attacker")]
+
+    @staticmethod
+    def load_defender(name: str) -> SimulatedCharacter:
+        if not name:
+            return SimulatedCharacter.reference("Defender")
+        template = CharacterTemplate.objects.select_related('stats_template', 'dimension').filter(name=name).first()
+        if template is None:
+            raise CommandError(f"Character template {name} not found")
+        return SimulatedCharacter.from_template(template)
+
+    @staticmethod
+    def percent(value) -> str:
+        return "-" if value is None else f"{value:.1%}"
+
+    @staticmethod
+    def number(value) -> str:
+        return "-" if value is None else f"{value:.1f}"
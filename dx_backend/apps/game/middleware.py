@@ -0,0 +1,14 @@
+from apps.game.services.character.stats_snapshot import CharacterStatsSnapshot
+
+
+class CharacterStatsSnapshotMiddleware:
+    """
+    Serve character stats from a request scoped snapshot, repeated `get_stat` calls hit the database once.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with CharacterStatsSnapshot().activate():
+            return self.get_response(request)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:19
+
+import apps.core.utils.models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0011_campaignstartitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignSchedule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('interval_seconds', models.PositiveIntegerField(default=45, help_text='Seconds between cycle starts.')),
+                ('deadline_seconds', models.PositiveIntegerField(default=40, help_text='Playing a cycle longer than this is recorded as an overrun.')),
+                ('next_run_at', models.DateTimeField(db_index=True)),
+                ('worker', models.CharField(blank=True, help_text='Worker that played the last cycle.', max_length=255)),
+                ('last_started_at', models.DateTimeField(blank=True, null=True)),
+                ('last_duration', models.FloatField(blank=True, help_text='Seconds the last cycle took to play.', null=True)),
+                ('last_lag', models.FloatField(blank=True, help_text='Seconds the last cycle started after it was due.', null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('played_cycles', models.PositiveIntegerField(default=0)),
+                ('failed_cycles', models.PositiveIntegerField(default=0)),
+                ('overruns', models.PositiveIntegerField(default=0)),
+                ('max_duration', models.FloatField(default=0)),
+                ('campaign', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='game.campaign')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(apps.core.utils.models.Tagged, models.Model),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0012_campaignschedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaignschedule',
+            name='leased_until',
+            field=models.DateTimeField(blank=True, help_text='The worker is playing the campaign, other workers skip it until then.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='campaignschedule',
+            name='worker',
+            field=models.CharField(blank=True, help_text='Worker that plays or played the last cycle.', max_length=255),
+        ),
+    ]
@@ -41,3 +41,35 @@ class CampaignStartItem(BaseModel):
     quantity = models.PositiveIntegerField(default=1)
     chance = models.FloatField(default=1.0, help_text="Chance (0.0 to 1.0) that the item is included in the start kit.")
 
+
+
+class CampaignSchedule(BaseModel):
+    """
+    When the auto cycle player plays the next cycle of a campaign and how long playing took.
+
+    A worker claims a due campaign by leasing its schedule until `leased_until`, other workers skip leased
+    schedules, so a cycle is never played twice and campaigns are spread over all running workers. The lease of a
+    worker that died while playing expires and the campaign is picked up again.
+    """
+    campaign = models.OneToOneField(Campaign, on_delete=models.CASCADE, related_name='schedule')
+    interval_seconds = models.PositiveIntegerField(default=45, help_text="Seconds between cycle starts.")
+    deadline_seconds = models.PositiveIntegerField(
+        default=40, help_text="Playing a cycle longer than this is recorded as an overrun."
+    )
+    next_run_at = models.DateTimeField(db_index=True)
+
+    worker = models.CharField(max_length=255, blank=True, help_text="Worker that plays or played the last cycle.")
+    leased_until = models.DateTimeField(
+        null=True, blank=True, help_text="The worker is playing the campaign, other workers skip it until then."
+    )
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True, help_text="Seconds the last cycle took to play.")
+    last_lag = models.FloatField(null=True, blank=True, help_text="Seconds the last cycle started after it was due.")
+    last_error = models.TextField(blank=True)
+    played_cycles = models.PositiveIntegerField(default=0)
+    failed_cycles = models.PositiveIntegerField(default=0)
+    overruns = models.PositiveIntegerField(default=0)
+    max_duration = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.campaign_id} every {self.interval_seconds}s, next at {self.next_run_at}"
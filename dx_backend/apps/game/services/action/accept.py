@@ -1,13 +1,93 @@
+import logging
+import threading
 import typing
+from contextlib import contextmanager
 
+from django.utils import timezone
+
+from apps.action.models import CharacterAction
 from apps.core.models import CharacterStats
+from apps.game.exceptions import GameException
 from apps.game.services.character.core import CharacterService
+from apps.game.services.fight.wakeup import notify_fights_changed
 
 if typing.TYPE_CHECKING:
     from apps.game.services.notifier.base import BaseNotifier
-    from apps.action.models import CharacterAction
     from apps.game.services.action.factory import CharacterActionFactory
 
+_thread_locals = threading.local()
+
+
+def get_acceptance_batch() -> typing.Optional["ActionAcceptanceBatch"]:
+    """
+    Return the acceptance batch activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'acceptance_batch', None)
+
+
+class ActionAcceptanceBatch:
+    """
+    Collects the actions accepted while the batch is active.
+
+    `ActionAcceptor` validates and accepts every action right away, so later actions see the spent resources,
+    but only marks it as accepted in memory. `flush` saves all collected actions with one `bulk_update` and
+    publishes one `actions_accepted` event. Speed and max AP used for the order are read once per initiator.
+    """
+    logger = logging.getLogger("game.services.action.accept")
+    model = CharacterAction
+    fields = ['accepted', 'order', 'updated_at', 'fight', 'position']
+    batch_size = 500
+
+    def __init__(self, notify: "BaseNotifier" = None):
+        self.notify = notify
+        self.actions: typing.List[CharacterAction] = []
+        self._order_factors: typing.Dict[typing.Any, typing.Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def order_factors(self, initiator_svc: CharacterService) -> typing.Tuple[int, int]:
+        pk = initiator_svc.character.pk
+        if pk not in self._order_factors:
+            self._order_factors[pk] = ActionAcceptor.order_factors(initiator_svc)
+        return self._order_factors[pk]
+
+    def add(self, action: CharacterAction, order: float):
+        action.mark_accepted(order)
+        self.actions.append(action)
+
+    def flush(self) -> typing.List[CharacterAction]:
+        """
+        Save the collected actions and publish the batch event.
+
+        :return: flushed actions
+        """
+        if not self.actions:
+            return []
+        actions, self.actions = self.actions, []
+        now = timezone.now()
+        for action in actions:
+            # bulk_update skips auto_now fields
+            action.updated_at = now
+        self.model.objects.bulk_update(actions, self.fields, batch_size=self.batch_size)
+        self.logger.debug(f"Accepted {len(actions)} actions in one batch")
+        notify_fights_changed(action.fight_id for action in actions)
+        if self.notify:
+            self.notify.actions_accepted(actions)
+        return actions
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the batch visible for the current thread, nested activation restores the previous one on exit.
+        """
+        previous = get_acceptance_batch()
+        _thread_locals.acceptance_batch = self
+        try:
+            yield self
+        finally:
+            _thread_locals.acceptance_batch = previous
+
 
 class ActionAcceptor:
     character_svc_cls = CharacterService
@@ -18,17 +98,22 @@ class ActionAcceptor:
         self.notify = notify
 
     def accept(self):
+        batch = get_acceptance_batch()
         try:
             self.action_service.check_acceptance(self.action)
             self.action_service.accept(self.action)
-            self.action.accept(
-                order=self.calculate_order(),
-            )
+            if batch is not None:
+                batch.add(self.action, order=self.calculate_order())
+            else:
+                self.action.accept(
+                    order=self.calculate_order(),
+                )
         except Exception as e:
             if self.notify:
                 self.notify.action_not_accepted(self.action, e)
             raise e
-        if self.notify:
+        # a batch sends one event for all its actions on flush
+        if self.notify and batch is None:
             self.notify.action_accepted(self.action)
 
     def calculate_order(self) -> float:
@@ -38,11 +123,16 @@ class ActionAcceptor:
         :return: A float representing the action order index (lower is better).
         """
         initiator_svc = self.character_svc_cls(self.action.initiator)
-        speed = initiator_svc.get_stat(CharacterStats.SPEED)
-        max_ap = initiator_svc.get_max_ap()
+        batch = get_acceptance_batch()
+        speed, max_ap = batch.order_factors(initiator_svc) if batch is not None else self.order_factors(initiator_svc)
         current_ap = initiator_svc.get_current_ap()
         return self._calculate_order(speed, max_ap, current_ap)
 
+    @staticmethod
+    def order_factors(initiator_svc: CharacterService) -> typing.Tuple[int, int]:
+        """Speed and max AP of the initiator."""
+        return initiator_svc.get_stat(CharacterStats.SPEED), initiator_svc.get_max_ap()
+
     def _calculate_order(self, speed: int, max_ap: int, current_ap: int) -> float:
         """
         Calculates the order index for the action based on the initiator's speed and turn progress.
@@ -67,4 +157,4 @@ class AccpetorFactory:
 
     @staticmethod
     def create(action: "CharacterAction", factory: "CharacterActionFactory", notify: "BaseNotifier" = None) -> ActionAcceptor:
-        return ActionAcceptor(action, factory, notify)
\ No newline at end of file
+        return ActionAcceptor(action, factory, notify)
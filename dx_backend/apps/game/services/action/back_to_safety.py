@@ -1,6 +1,7 @@
-from apps.action.models import CharacterAction, SpecialAction
+from apps.action.models import CharacterAction
 from apps.game.exceptions import GameException
 from apps.game.services.action.base_service import CharacterActionServicePrototype
+from apps.game.services.catalog import game_catalog
 from apps.game.services.character.core import CharacterService
 from apps.game.services.cost import DefaultCostService
 from apps.world.models import Position
@@ -30,12 +31,12 @@ class BackToSafeService(CharacterActionServicePrototype):
         if char_svc.is_knocked_out():
             raise GameException("Character is knocked out")
         # TODO: reuse special action acceptance
-        special_action = SpecialAction.objects.get(pk=action.action_type)
+        special_action = game_catalog.special_action(action.action_type)
         self.cost_svc.validate(special_action.cost, char_svc)
 
     def accept(self, action: CharacterAction):
         char_svc = self.character_svc_cls(action.initiator)
         # TODO: reuse special action acceptance
-        special_action = SpecialAction.objects.get(pk=action.action_type)
+        special_action = game_catalog.special_action(action.action_type)
         self.cost_svc.spend(special_action.cost, char_svc)
         char_svc.spend_all_ap()
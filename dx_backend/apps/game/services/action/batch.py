@@ -0,0 +1,172 @@
+import logging
+import time
+import typing as t
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from apps.action.models import Cycle
+from apps.character.models import Character
+from .player import ManualCharacterActionPlayerService
+from ..character.stats_snapshot import CharacterStatsSnapshot
+from ..character.working_set import CharacterWorkingSet
+from ..rand_dice import DiceStreams
+from ..shield.state import get_shield_state
+
+
+@dataclass
+class PhaseTiming:
+    name: str
+    seconds: float = 0.0
+    queries: int = 0
+
+
+@dataclass
+class CyclePhaseReport:
+    """
+    Per-phase timing of a played cycle, the query counter is attached to the default connection.
+    """
+    cycle: t.Optional[Cycle] = None
+    phases: t.List[PhaseTiming] = field(default_factory=list)
+    tracked_characters: int = 0
+    flushed_rows: int = 0
+    flushed_shields: int = 0
+    stats_cache: t.Dict[str, int] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str):
+        timing = PhaseTiming(name=name)
+        self.phases.append(timing)
+
+        def count_queries(execute, sql, params, many, context):
+            timing.queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_queries):
+                yield timing
+        finally:
+            timing.seconds = time.perf_counter() - started
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(p.seconds for p in self.phases)
+
+    @property
+    def total_queries(self) -> int:
+        return sum(p.queries for p in self.phases)
+
+    def as_dict(self) -> dict:
+        return {
+            "cycle": self.cycle.number if self.cycle else None,
+            "tracked_characters": self.tracked_characters,
+            "flushed_rows": self.flushed_rows,
+            "flushed_shields": self.flushed_shields,
+            "stats_cache": self.stats_cache,
+            "total_seconds": round(self.total_seconds, 4),
+            "total_queries": self.total_queries,
+            "phases": [
+                {"name": p.name, "seconds": round(p.seconds, 4), "queries": p.queries} for p in self.phases
+            ],
+        }
+
+    def __str__(self):
+        phases = ", ".join(f"{p.name}={p.seconds:.3f}s/{p.queries}q" for p in self.phases)
+        return (
+            f"cycle={self.cycle.number if self.cycle else '-'} "
+            f"characters={self.tracked_characters} flushed={self.flushed_rows} shields={self.flushed_shields} "
+            f"stats_cache={self.stats_cache} "
+            f"total={self.total_seconds:.3f}s/{self.total_queries}q [{phases}]"
+        )
+
+
+class BatchedCharacterActionPlayerService(ManualCharacterActionPlayerService):
+    """
+    Plays the cycle against an in-memory working set of the campaign characters.
+
+    Effects, actions and `update_characters` change the shared character instances only, the dirty rows are
+    written once with `bulk_update` before the post-cycle services run, shields hit during the cycle likewise.
+    Everything up to the next cycle preparation happens in a single transaction.
+    """
+    logger = logging.getLogger("game.services.action.batch")
+    working_set_cls = CharacterWorkingSet
+    stats_snapshot_cls = CharacterStatsSnapshot
+    report_cls = CyclePhaseReport
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.working_set = self.working_set_cls()
+        self.report = self.report_cls(cycle=self.cycle)
+
+    def play(self) -> Cycle:
+        self.working_set = self.working_set_cls()
+        self.report = self.report_cls(cycle=self.cycle)
+        stats_snapshot = self.stats_snapshot_cls()
+
+        with stats_snapshot.activate(), DiceStreams.for_cycle(self.cycle).activate():
+            next_cycle = self._play_batched(stats_snapshot)
+        self.report.stats_cache = stats_snapshot.counters()
+
+        self.notify.new_cycle(next_cycle)
+        self.logger.info(f"Batched cycle played: {self.report}")
+        return next_cycle
+
+    def _play_batched(self, stats_snapshot: CharacterStatsSnapshot) -> Cycle:
+        with transaction.atomic():
+            shield_state = self.shield_state_cls()
+            with self.report.phase("load"):
+                self.working_set.load(self.get_cycle_characters())
+                stats_snapshot.prefetch(self.working_set.characters.keys())
+                shield_state.load(self.get_active_shields(), self.working_set.characters.keys())
+                self.report.tracked_characters = len(self.working_set)
+            with self.working_set.activate(), shield_state.activate():
+                with self.report.phase("effects"):
+                    self.apply_effects()
+                with self.report.phase("actions"):
+                    self.apply_actions()
+                with self.report.phase("update_characters"):
+                    self.update_characters()
+                with self.report.phase("flush"):
+                    flushed = self.working_set.flush()
+                    self.report.flushed_rows = len(flushed)
+                    self.report.flushed_shields = sum(shield_state.flush())
+            with self.report.phase("notify"):
+                # one change event per flushed row instead of one per save
+                for character in flushed:
+                    self.notify.character_changed(character)
+            with self.report.phase("post"):
+                self.post_cycle()
+
+        with self.report.phase("prepare"):
+            next_cycle = Cycle.objects.next(campaign=self.cycle.campaign)
+            self.prepare(next_cycle)
+        return next_cycle
+
+    def perform_single_action(self, action):
+        shield_state = get_shield_state()
+        # savepoint per action, a failed action must neither abort the whole cycle transaction nor leave changes
+        # of the tracked characters and shields to be flushed
+        with transaction.atomic(), self.working_set.savepoint(), \
+                (shield_state.savepoint() if shield_state else nullcontext()):
+            self.track_action_characters(action)
+            super().perform_single_action(action)
+
+    def track_action_characters(self, action):
+        """Replace the initiator and the prefetched targets of the action with the tracked instances."""
+        action.initiator = self.working_set.track(action.initiator)
+        targets = getattr(action, "_prefetched_objects_cache", {}).get("targets")
+        if targets is not None:
+            targets._result_cache = [self.working_set.track(target) for target in targets]
+
+    def get_actions(self) -> QuerySet:
+        # targets are loaded with the actions, so `targets.all()` yields the tracked characters
+        return super().get_actions().prefetch_related("targets")
+
+    def get_effect_characters(self):
+        return self.working_set.characters
+
+    def get_cycle_characters(self) -> QuerySet:
+        return Character.objects.filter(is_active=True, campaign=self.cycle.campaign)
@@ -0,0 +1,286 @@
+import logging
+import os
+import socket
+import threading
+import time
+import typing as t
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.action.models import Cycle
+from apps.core.utils.cache import expire_versions
+from apps.game.models import Campaign, CampaignSchedule
+
+if t.TYPE_CHECKING:
+    from apps.game.services.action.factory import CharacterActionFactory
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class PlayedCycle:
+    campaign_id: t.Any
+    campaign_name: str
+    cycle_number: t.Optional[int]
+    duration: float
+    lag: float
+    overrun: bool
+    error: str = ""
+    report: t.Any = None
+
+
+class LeaseLost(Exception):
+    """The lease of a schedule was taken over by another worker while the cycle was played."""
+
+
+class ScheduleLease:
+    """
+    Keeps the lease of a claimed schedule while its cycle is played.
+
+    A heartbeat thread extends `leased_until` every `heartbeat_seconds`, so a cycle playing longer than the lease is
+    not claimed by another worker. The renewal only succeeds while the lease is still held by this worker; once it
+    fails the lease is lost and every further query of the playing thread raises `LeaseLost`, which aborts the cycle.
+    """
+    logger = logging.getLogger("game.services.action.cycle_scheduler")
+
+    def __init__(self, schedule: CampaignSchedule, worker_id: str, lease_seconds: float, heartbeat_seconds: float):
+        self.schedule = schedule
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lost = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+
+    def renew(self) -> bool:
+        leased_until = timezone.now() + timedelta(seconds=self.lease_seconds)
+        updated = type(self.schedule).objects.filter(
+            pk=self.schedule.pk, worker=self.worker_id, leased_until=self.schedule.leased_until,
+        ).update(leased_until=leased_until)
+        if updated:
+            self.schedule.leased_until = leased_until
+        return bool(updated)
+
+    def _heartbeat(self) -> None:
+        try:
+            while not self._stopped.wait(self.heartbeat_seconds):
+                try:
+                    renewed = self.renew()
+                except Exception:
+                    # the lease may still be renewed by the next heartbeat before it expires
+                    self.logger.exception(f"Failed to renew the lease of campaign '{self.schedule.campaign_id}'")
+                    continue
+                if not renewed:
+                    self.lost.set()
+                    self.logger.error(f"Lease of campaign '{self.schedule.campaign_id}' was lost, aborting the cycle")
+                    return
+        finally:
+            connection.close()
+
+    def _check(self, execute, sql, params, many, context):
+        if self.lost.is_set():
+            raise LeaseLost(f"Lease of campaign '{self.schedule.campaign_id}' was lost")
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "ScheduleLease":
+        self._thread = threading.Thread(target=self._heartbeat, name="cycle-lease", daemon=True)
+        self._thread.start()
+        self._wrapper = connection.execute_wrapper(self._check)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._wrapper.__exit__(exc_type, exc_val, exc_tb)
+        self._stopped.set()
+        self._thread.join()
+
+
+class CycleScheduler:
+    """
+    Plays the due cycles of auto play campaigns, any number of schedulers can run side by side.
+
+    Every campaign has a `CampaignSchedule`. A scheduler claims the most overdue schedule in a short transaction:
+    the row is picked with `select_for_update(skip_locked=True)` and leased to the worker for `LEASE_SECONDS`,
+    renewed every `HEARTBEAT_SECONDS` while the cycle plays, see `ScheduleLease`.
+    The cycle is played after the claim is committed, outside of any transaction of the scheduler, so the cycle
+    player and its own workers commit as they go. Other schedulers skip leased schedules and pick another
+    campaign, the schedule is moved forward and the lease released once the cycle is played, so a cycle is never
+    played twice. The lease of a worker that died expires and the campaign is played by another worker.
+    A campaign playing longer than its deadline is recorded as an overrun on its schedule.
+    """
+    logger = logging.getLogger("game.services.action.cycle_scheduler")
+    lease_cls = ScheduleLease
+    campaign_model = Campaign
+    schedule_model = CampaignSchedule
+    cycle_model = Cycle
+
+    def __init__(self, player_factory: t.Callable, action_factory: "CharacterActionFactory", worker_id: str = None):
+        self.player_factory = player_factory
+        self.action_factory = action_factory
+        self.worker_id = worker_id or default_worker_id()
+        config = getattr(settings, "CYCLE_SCHEDULER", {})
+        self.interval = config.get("INTERVAL", 45)
+        self.deadline = config.get("DEADLINE", 40)
+        self.poll_seconds = config.get("POLL_SECONDS", 5)
+        self.lease_seconds = config.get("LEASE_SECONDS", 600)
+        self.heartbeat_seconds = config.get("HEARTBEAT_SECONDS", self.lease_seconds / 3)
+
+    def ensure_schedules(self) -> int:
+        """
+        Create the schedules of auto play campaigns without one, due right away.
+
+        :return: number of created schedules
+        """
+        campaign_ids = list(self.campaign_model.objects.filter(
+            auto_play=True, is_active=True, schedule__isnull=True,
+        ).values_list("id", flat=True))
+        if not campaign_ids:
+            return 0
+        now = timezone.now()
+        # another worker may create the same schedules concurrently
+        self.schedule_model.objects.bulk_create([
+            self.schedule_model(campaign_id=campaign_id, interval_seconds=self.interval,
+                                deadline_seconds=self.deadline, next_run_at=now)
+            for campaign_id in campaign_ids
+        ], ignore_conflicts=True)
+        return len(campaign_ids)
+
+    def schedules(self):
+        return self.schedule_model.objects.filter(campaign__auto_play=True, campaign__is_active=True)
+
+    def play_next(self) -> t.Optional[PlayedCycle]:
+        """
+        Play the most overdue campaign not played by another worker.
+
+        :return: the played cycle, None when no campaign is due
+        """
+        schedule = self.claim()
+        if schedule is None:
+            return None
+        return self.play(schedule)
+
+    def claim(self) -> t.Optional[CampaignSchedule]:
+        """
+        Lease the most overdue schedule not leased by another worker, the lease is committed right away.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            schedule = self.schedules().filter(
+                Q(leased_until__isnull=True) | Q(leased_until__lte=now),
+                next_run_at__lte=now,
+            ).select_for_update(skip_locked=True, of=("self",)).select_related("campaign").order_by(
+                "next_run_at"
+            ).first()
+            if schedule is None:
+                return None
+            schedule.worker = self.worker_id
+            schedule.leased_until = now + timedelta(seconds=self.lease_seconds)
+            schedule.save(update_fields=["worker", "leased_until", "updated_at"])
+        return schedule
+
+    def play(self, schedule: CampaignSchedule) -> PlayedCycle:
+        """
+        Play the current cycle of the leased schedule, move the schedule forward and release the lease.
+        """
+        campaign = schedule.campaign
+        # see changes of other processes to the cached map, catalog and occupancy
+        expire_versions()
+        started_at = timezone.now()
+        started = time.perf_counter()
+        cycle_number, report, error = None, None, ""
+        try:
+            with self.lease_cls(schedule, self.worker_id, self.lease_seconds, self.heartbeat_seconds):
+                cycle = self.cycle_model.objects.current(campaign=campaign)
+                player = self.player_factory(cycle=cycle, factory=self.action_factory)
+                cycle_number = player.play().number
+                report = getattr(player, "report", None)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            self.logger.exception(f"Error playing campaign '{campaign.name}'")
+        duration = time.perf_counter() - started
+        lag = max(0.0, (started_at - schedule.next_run_at).total_seconds())
+        overrun = duration > schedule.deadline_seconds
+        if overrun:
+            self.logger.warning(
+                f"Campaign '{campaign.name}' took {duration:.2f}s, deadline is {schedule.deadline_seconds}s"
+            )
+        self.advance(schedule, started_at, duration, lag, overrun, error)
+        return PlayedCycle(campaign.id, campaign.name, cycle_number, duration, lag, overrun, error, report)
+
+    def advance(self, schedule: CampaignSchedule, started_at, duration: float, lag: float, overrun: bool,
+                error: str) -> None:
+        interval = timedelta(seconds=schedule.interval_seconds)
+        now = timezone.now()
+        lease = schedule.leased_until
+        if error:
+            # do not retry a failing campaign in a loop
+            schedule.next_run_at = now + interval
+        else:
+            # fixed rate, missed runs are skipped instead of played back to back
+            schedule.next_run_at = max(schedule.next_run_at + interval, now)
+        schedule.worker = self.worker_id
+        schedule.leased_until = None
+        schedule.last_started_at = started_at
+        schedule.last_duration = duration
+        schedule.last_lag = lag
+        schedule.last_error = error
+        schedule.max_duration = max(schedule.max_duration, duration)
+        if error:
+            schedule.failed_cycles += 1
+        else:
+            schedule.played_cycles += 1
+        if overrun:
+            schedule.overruns += 1
+        schedule.updated_at = now
+        fields = [
+            "next_run_at", "worker", "leased_until", "last_started_at", "last_duration", "last_lag", "last_error",
+            "max_duration", "failed_cycles", "played_cycles", "overruns", "updated_at",
+        ]
+        # the result is only recorded while the lease is held, an expired lease may be held by another worker
+        updated = self.schedule_model.objects.filter(
+            pk=schedule.pk, worker=self.worker_id, leased_until=lease,
+        ).update(**{name: getattr(schedule, name) for name in fields})
+        if not updated:
+            self.logger.warning(
+                f"Lease of campaign '{schedule.campaign_id}' expired while it was played, the result is not recorded"
+            )
+
+    def run_pending(self, on_played: t.Callable[[PlayedCycle], None] = None,
+                    stop: threading.Event = None) -> t.List[PlayedCycle]:
+        """Play due campaigns until none is left for this worker."""
+        self.ensure_schedules()
+        played = []
+        while not (stop and stop.is_set()) and (result := self.play_next()) is not None:
+            played.append(result)
+            if on_played:
+                on_played(result)
+        return played
+
+    def seconds_until_next(self) -> float:
+        """
+        Time to sleep before the next campaign is due, at most the poll interval.
+
+        Campaigns still due after `run_pending` are played by other workers, they are checked again in a second.
+        """
+        next_run_at = self.schedules().order_by("next_run_at").values_list("next_run_at", flat=True).first()
+        if next_run_at is None:
+            return self.poll_seconds
+        return min(self.poll_seconds, max(1.0, (next_run_at - timezone.now()).total_seconds()))
+
+    def run_forever(self, on_played: t.Callable[[PlayedCycle], None] = None, stop: threading.Event = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.run_pending(on_played, stop)
+                sleep_time = self.seconds_until_next()
+            except Exception:
+                self.logger.exception("Error in cycle scheduler")
+                sleep_time = self.poll_seconds
+            stop.wait(sleep_time)
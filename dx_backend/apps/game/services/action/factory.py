@@ -11,6 +11,7 @@ from apps.game.services.action.anomaly import CharacterAnomalyInteractionService
 from apps.game.services.action.back_to_safety import BackToSafeService
 from apps.game.services.action.bargain import CharacterGiftService
 from apps.game.services.action.base_service import CharacterActionServicePrototype
+from apps.game.services.action.batch import BatchedCharacterActionPlayerService
 from apps.game.services.action.god_intervention import CharacterGodInterventionActionService
 from apps.game.services.action.dice import DiceRollActionService
 from apps.game.services.action.impact import ImpactAction
@@ -276,3 +277,15 @@ ManualCharacterActionPlayerServiceFactory = partial(
     ),
     spawners=CoreSpawnersService(),
 )
+
+BatchedCharacterActionPlayerServiceFactory = partial(
+    BatchedCharacterActionPlayerService,
+    effects_manager_factory=ManagerEffectFactory(),
+    effects_apply_factory=ApplyEffectFactory(),
+    auto_map_svc=AutoMapService(),
+    bargain_cleanup_svc=bargain_cleaner,
+    notify=BaseNotifier(
+        event_bus
+    ),
+    spawners=CoreSpawnersService(),
+)
@@ -10,6 +10,7 @@ from apps.game.exceptions import GameException
 from apps.game.services.action.base_service import CharacterActionServicePrototype
 from apps.game.services.action.relations import ActionRelationServiceFactory
 from apps.game.services.action.skills import SpecialActionFactory
+from apps.game.services.catalog import SkillDefinition, game_catalog, thaw
 from apps.game.services.character.core import CharacterService
 from apps.game.services.rand_dice import DiceService
 from apps.game.services.shield import ActiveShieldImpactService, ShieldAssessmentService
@@ -77,9 +78,14 @@ class ImpactAction(CharacterActionServicePrototype):
         self.special_action_factory = special_action_factory or SpecialActionFactory()
         self.action_relations_factory = action_relations_factory or ActionRelationServiceFactory()
 
+    @staticmethod
+    def get_skill(action: CharacterAction) -> SkillDefinition:
+        return game_catalog.skill(action.skill_id)
+
     def perform(self, action: CharacterAction):
+        skill = self.get_skill(action)
         initiator = CharacterService(action.initiator)
-        calculated_impacts = SkillImpactService(action.skill, initiator).calculate_impact()
+        calculated_impacts = SkillImpactService(skill, initiator).calculate_impact()
         multiplier = DiceService(initiator.model, initiator.get_stat(CharacterStats.LUCK)).multiplier_roll()
         dice_result = DiceRollResult.objects.create(
             dice_side=multiplier.dice_side,
@@ -87,23 +93,23 @@ class ImpactAction(CharacterActionServicePrototype):
             outcome=multiplier.outcome
         )
 
-        if action.skill.type == SkillTypes.SPECIAL:
+        if skill.type == SkillTypes.SPECIAL:
             self._perform_special(action, calculated_impacts, dice_result, multiplier)
             return
 
-        if action.skill.type == SkillTypes.HEAL:
+        if skill.type == SkillTypes.HEAL:
             self._perform_heal(action, calculated_impacts, dice_result, multiplier)
             return
 
-        if action.skill.type == SkillTypes.ATTACK:
+        if skill.type == SkillTypes.ATTACK:
             self._perform_damage(action, calculated_impacts, dice_result, multiplier)
             return self.action_relations_factory.from_action(action).become_aggressive()
 
-        if action.skill.type == SkillTypes.DEFENSE:
+        if skill.type == SkillTypes.DEFENSE:
             self._perform_defense(action, calculated_impacts, dice_result, multiplier)
             return
 
-        if action.skill.type == SkillTypes.BUFF:
+        if skill.type == SkillTypes.BUFF:
             self._assign_effect(action, calculated_impacts, dice_result, multiplier)
             return
 
@@ -113,14 +119,16 @@ class ImpactAction(CharacterActionServicePrototype):
         pass
 
     def _assign_effect(self, action, calculated_impacts, dice_result, multiplier):
+        # the catalog keeps the effects frozen, the assigner stores their impact
+        skill_effect = thaw(self.get_skill(action).effect)
         for target in action.targets.filter(is_active=True):
-            if action.skill.effect:
-                if isinstance(action.skill.effect, list):
-                    for effect in action.skill.effect:
+            if skill_effect:
+                if isinstance(skill_effect, list):
+                    for effect in skill_effect:
                         self.effect_assigner.assign_effect(effect, CharacterService(target),
                                                            CharacterService(action.initiator))
                     return
-                self.effect_assigner.assign_effect(action.skill.effect, CharacterService(target),
+                self.effect_assigner.assign_effect(skill_effect, CharacterService(target),
                                                    CharacterService(action.initiator))
 
     def check_acceptance(self, action: CharacterAction):
@@ -159,8 +167,9 @@ class ImpactAction(CharacterActionServicePrototype):
     def accept(self, action: CharacterAction):
         self.check_acceptance(action)
         self._accept(action, self.character_svc_cls(action.initiator))
-        SkillCostService(action.skill).apply(action.initiator)
-        action.immediate = action.skill.immediate
+        skill = self.get_skill(action)
+        SkillCostService(skill).apply(action.initiator)
+        action.immediate = skill.immediate
         action.save(update_fields=["immediate"])
 
     # TODO: refactor this to use performers instead
@@ -171,7 +180,7 @@ class ImpactAction(CharacterActionServicePrototype):
             return
 
         try:
-            special_action = self.special_action_factory.create(action.skill)
+            special_action = self.special_action_factory.create(self.get_skill(action))
             calculated_impacts = special_action.perform(
                 action, calculated_impacts=calculated_impacts, dice_result=dice_result, multiplier=multiplier
             )
@@ -1,9 +1,10 @@
 import json
 
-from apps.action.models import CharacterAction, SpecialAction
+from apps.action.models import CharacterAction
 from apps.core.models import MultipleCharacterInspectInfo
 from apps.game.exceptions import GameException
 from apps.game.services.action.base_service import CharacterActionServicePrototype
+from apps.game.services.catalog import game_catalog
 from apps.game.services.character.core import CharacterService
 from apps.game.services.character.inspector import default_inspector
 from apps.game.services.cost import DefaultCostService
@@ -37,13 +38,13 @@ class CharacterInspectorService(CharacterActionServicePrototype):
         if char_svc.get_current_hp() < 1:
             raise GameException("Character is dead")
 
-        special_action = SpecialAction.objects.get(pk=action.action_type)
+        special_action = game_catalog.special_action(action.action_type)
         self.cost_svc.validate(special_action.cost, char_svc)
 
     def accept(self, action: CharacterAction):
         # TODO: FIXME create special ActionClass and move reusable for special actions
         char_svc = self.character_svc_cls(action.initiator)
-        special_action = SpecialAction.objects.get(pk=action.action_type)
+        special_action = game_catalog.special_action(action.action_type)
         self.cost_svc.spend(special_action.cost, char_svc)
         action.immediate = special_action.immediate
         if special_action.final:
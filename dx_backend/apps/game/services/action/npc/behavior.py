@@ -1,11 +1,11 @@
 import logging
-import random
 import typing as t
 from functools import partial
 
 from apps.action.models import CharacterAction, Cycle
 from apps.core.models import SkillTypes, CharacterActionType
 from apps.game.exceptions import GameException
+from apps.game.services.action.npc.rng import get_rng
 from apps.game.services.action.npc.target import TargetSelectionStrategy, RandomSelectCompositeStrategy, \
     TwoToOneStrategy, AggressiveStrategy, DefensiveStrategy, ChaosMonkeyStrategy
 
@@ -97,8 +97,8 @@ class DefaultBehaviorPattern(BehaviorPattern):
         to_attack = self.target_selector.select_attack_targets()
         to_defence = self.target_selector.select_defense_targets()
 
-        deffence_target = random.choice(to_defence) if to_defence else None
-        attack_target = random.choice(to_attack) if to_attack else None
+        deffence_target = get_rng().choice(to_defence) if to_defence else None
+        attack_target = get_rng().choice(to_attack) if to_attack else None
 
         if deffence_target:
             shield_behavior = StandardShieldBehavior(self.ctx, deffence_target, SkillTypes.DEFENSE)
@@ -6,25 +6,43 @@ from apps.character.models import Organization
 from apps.core.models import BehaviorModel
 from apps.game.services.action.npc.context import CharacterPositionActionContext
 from apps.game.services.character.core import CharacterService
-from apps.game.services.relation.service import get_character_relation_service, get_organization_relation_service
+from apps.game.services.relation.matrix import RelationMatrix
 from apps.world.models import Position
 
 logger = logging.getLogger(__name__)
 
 
 class PositionCharactersBehaviorStateService:
+    """
+    Resolve friends, enemies and neutrals of every character at a position.
+
+    All relations between the characters are loaded into a `RelationMatrix` up front and written back
+    in bulk, so the cost of `prepare` is a fixed number of queries whatever the crowd size.
+    """
+    matrix_cls = RelationMatrix
 
     def __init__(self, position: "Position", orgs: dict["Organization", t.Iterable["Character"]]):
         logger.debug(f"Initializing PositionCharactersBehaviorStateService for position {position}")
         logger.debug(f"Organizations count: {len(orgs)}")
         self.position = position
-        self.orgs = orgs
+        self.orgs = {org: list(characters) for org, characters in orgs.items()}
         self._context: dict["Character", CharacterPositionActionContext] = {}
+        # one service per character, contexts compare characters by service identity
+        self._services: dict[t.Any, CharacterService] = {}
+        self.matrix = self.matrix_cls(
+            character for characters in self.orgs.values() for character in characters
+        )
+
+    def get_service(self, character: "Character") -> CharacterService:
+        service = self._services.get(character.pk)
+        if service is None:
+            service = self._services[character.pk] = CharacterService(character)
+        return service
 
     def get_context(self, character: "Character") -> CharacterPositionActionContext:
         logger.debug(f"Getting context for character {character}")
         return self._context.setdefault(character, CharacterPositionActionContext(
-            character=CharacterService(character),
+            character=self.get_service(character),
             friends=set(),
             enemies=set(),
             neutral=set(),
@@ -36,39 +54,29 @@ class PositionCharactersBehaviorStateService:
         This can include initializing attributes, loading data, etc.
         """
         logger.debug("Starting prepare() method")
+        self.matrix.load()
 
         # Phase 1: Process organization-level relations
         logger.debug("Phase 1: Processing organization-level relations")
         for org, characters in self.orgs.items():
-            logger.debug(f"Processing organization {org}")
-            org_relation = get_organization_relation_service(org)
             for target_org in self.orgs:
                 if org == target_org:
                     continue
-                logger.debug(f"Checking relation from {org} to {target_org}")
-                behavior = org_relation.get_relation_to(target_org)
-                logger.debug(f"Organization relation behavior: {behavior}")
+                behavior = self.matrix.org_relation(org, target_org)
+                logger.debug(f"Organization relation from {org} to {target_org}: {behavior}")
                 if behavior == BehaviorModel.AGGRESSIVE:
-                    logger.debug(f"Making {org} members aggressive to {target_org} members")
                     self._make_org_members_aggressive(org, target_org)
                 elif behavior == BehaviorModel.FRIENDLY:
-                    logger.debug(f"Making {org} members friendly to {target_org} members")
                     self._make_org_members_friendly(org, target_org)
 
             # Phase 2: Process character-level overrides
             logger.debug(f"Phase 2: Processing character-level overrides for {org}")
             for character in characters:
-                logger.debug(f"Processing character {character}")
-                char_service = CharacterService(character)
-                char_relation_svc = get_character_relation_service(char_service)
                 for target_org, target_characters in self.orgs.items():
                     if org == target_org:
                         continue
-                    logger.debug(f"Checking {character} relations to {target_org} members")
                     for target_character in target_characters:
-                        target_service = CharacterService(target_character)
-                        behavior = char_relation_svc.get_relation_to(target_service)
-                        logger.debug(f"Character relation behavior from {character} to {target_character}: {behavior}")
+                        behavior = self.matrix.relation(character, target_character)
                         if behavior == BehaviorModel.AGGRESSIVE:
                             logger.debug(
                                 f"Character {character} has aggressive relation, making all {org} members aggressive to {target_org}")
@@ -83,29 +91,23 @@ class PositionCharactersBehaviorStateService:
         # Phase 3: Set up individual character contexts
         logger.debug("Phase 3: Setting up individual character contexts")
         for org, characters in self.orgs.items():
-            logger.debug(f"Setting up contexts for {org} characters")
             for character in characters:
-                logger.debug(f"Setting up context for character {character}")
                 context = self.get_context(character)
                 for target_org, target_characters in self.orgs.items():
                     for target_character in target_characters:
+                        target_service = self.get_service(target_character)
                         if org == target_org:
-                            logger.debug(f"Same organization, making {character} friendly to {target_character}")
-                            self._make_friendly(character, target_character)
+                            context.add_friend(target_service)
                             continue
-                        target_service = CharacterService(target_character)
-                        behavior = get_character_relation_service(context.character).get_relation_to(target_service)
-                        logger.debug(f"Final relation from {character} to {target_character}: {behavior}")
+                        behavior = self.matrix.relation(character, target_character)
                         if behavior == BehaviorModel.AGGRESSIVE:
-                            logger.debug(f"Adding {target_character} as enemy to {character}")
                             context.add_enemy(target_service)
                         elif behavior == BehaviorModel.FRIENDLY:
-                            logger.debug(f"Adding {target_character} as friend to {character}")
                             context.add_friend(target_service)
                         else:
-                            logger.debug(f"Adding {target_character} as neutral to {character}")
                             context.add_neutral(target_service)
 
+        self.matrix.save()
         logger.debug("Completed prepare() method")
         return self
 
@@ -113,36 +115,24 @@ class PositionCharactersBehaviorStateService:
         logger.debug(f"Making all members of {org} aggressive to all members of {target_org}")
         for character in self.orgs[org]:
             for target_character in self.orgs[target_org]:
-                logger.debug(f"Making {character} aggressive to {target_character}")
                 self._make_aggressive(character, target_character)
 
     def _make_org_members_friendly(self, org: "Organization", target_org: "Organization"):
         logger.debug(f"Making all members of {org} friendly to all members of {target_org}")
         for character in self.orgs[org]:
             for target_character in self.orgs[target_org]:
-                logger.debug(f"Making {character} friendly to {target_character}")
                 self._make_friendly(character, target_character)
 
     def _make_aggressive(self, character: "Character", target_character: "Character"):
-        logger.debug(f"Making {character} aggressive to {target_character}")
-        source = CharacterService(character)
-        target = CharacterService(target_character)
-        rel_service = get_character_relation_service(source)
-        rel_service.become_aggressive_to(target)
-        context = self.get_context(character)
-        context.add_enemy(target)
-        logger.debug(f"Successfully made {character} aggressive to {target_character}")
+        self.matrix.set_relation(character, target_character, BehaviorModel.AGGRESSIVE)
+        self.get_context(character).add_enemy(self.get_service(target_character))
 
     def _make_friendly(self, character: "Character", target_character: "Character"):
-        logger.debug(f"Making {character} friendly to {target_character}")
-        source = CharacterService(character)
-        target = CharacterService(target_character)
-        rel_service = get_character_relation_service(source)
         context = self.get_context(character)
-        if rel_service.get_relation_to(target) == BehaviorModel.AGGRESSIVE:
+        target = self.get_service(target_character)
+        if self.matrix.relation(character, target_character) == BehaviorModel.AGGRESSIVE:
             logger.debug(f"Character {character} is already aggressive to {target_character}, adding as enemy instead")
             context.add_enemy(target)
             return
-        rel_service.become_friendly_to(target)
+        self.matrix.set_relation(character, target_character, BehaviorModel.FRIENDLY)
         context.add_friend(target)
-        logger.debug(f"Successfully made {character} friendly to {target_character}")
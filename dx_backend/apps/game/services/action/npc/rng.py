@@ -0,0 +1,26 @@
+import random
+import threading
+import typing as t
+from contextlib import contextmanager
+
+_thread_locals = threading.local()
+
+
+def get_rng() -> t.Union[random.Random, t.Any]:
+    """
+    Random source for NPC decisions, the `random` module unless a seeded generator is active for the current thread.
+    """
+    return getattr(_thread_locals, 'rng', None) or random
+
+
+@contextmanager
+def use_rng(rng: random.Random):
+    """
+    Make NPC decisions of the current thread use the given generator.
+    """
+    previous = getattr(_thread_locals, 'rng', None)
+    _thread_locals.rng = rng
+    try:
+        yield rng
+    finally:
+        _thread_locals.rng = previous
@@ -1,14 +1,26 @@
 import logging
+import multiprocessing
+import random
+import time
 import typing as t
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import partial
 
-from django.db.models import OuterRef, Exists, Q
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
 
-from apps.action.models import Cycle
+from apps.action.models import Cycle, CharacterAction
+from apps.game.services.action.accept import ActionAcceptanceBatch
 from apps.character.models import Character
 from apps.game.services.action.npc.behavior import DefaultBehaviorPattern
 from apps.game.services.action.npc.position import PositionCharactersBehaviorStateService
+from apps.game.services.action.npc.rng import use_rng
 from apps.game.services.npc.bahavior_factory import BehaviorFactory
+from apps.game.services.world.occupancy import get_occupancy
 
 if t.TYPE_CHECKING:
     from apps.world.models import Position
@@ -16,30 +28,30 @@ if t.TYPE_CHECKING:
 
 
 class NpcActionScheduler:
-    def __init__(self, factory: BehaviorFactory):
+    def __init__(self, factory: BehaviorFactory, seed: t.Optional[int] = None):
         self.factory = factory
+        # with a seed every position gets its own generator derived from the seed, cycle and position
+        self.seed = seed
 
     logger = logging.getLogger("game.service.action.npcScheduler")
 
-    def get_active_characters(self, cycle: "Cycle") -> t.Dict["Position", t.Dict["Organization", t.List["Character"]]]:
+    def get_active_characters(self, cycle: "Cycle", position_ids: t.Iterable = None
+                              ) -> t.Dict["Position", t.Dict["Organization", t.List["Character"]]]:
         """
         Version that uses actual Position and Organization model instances as keys.
+
+        Only positions with an active player are considered, they are read from the occupancy index.
         """
-        players_in_position = Character.objects.filter(
-            npc=False,
-            is_active=True,
-            position=OuterRef('position'),
-            campaign=cycle.campaign,
-        )
+        positions = get_occupancy(cycle.campaign_id).positions_with_players()
+        if position_ids is not None:
+            positions &= set(position_ids)
+        if not positions:
+            return {}
 
         active_npcs = Character.objects.filter(
             is_active=True,
-            position__isnull=False,
+            position_id__in=positions,
             campaign=cycle.campaign,
-        ).annotate(
-            has_players=Exists(players_in_position)
-        ).filter(
-            has_players=True
         ).select_related('position', 'organization').order_by('position', 'organization', 'id')
 
         # Exclude fight pending joiners they are not considered active NPCs
@@ -60,7 +72,15 @@ class NpcActionScheduler:
         Schedule NPC actions.
         """
         for position, org_with_characters in self.get_active_characters(cycle).items():
-            logging.debug(f"Scheduling actions for NPCs in position {position} with organization {org_with_characters}")
+            self.schedule_position(cycle, position, org_with_characters)
+
+    def schedule_position(self, cycle: "Cycle", position: "Position",
+                          org_with_characters: t.Dict["Organization", t.List["Character"]]) -> None:
+        logging.debug(f"Scheduling actions for NPCs in position {position} with organization {org_with_characters}")
+        rng = self.position_rng(cycle, position)
+        # actions of the position are accepted one by one in memory and saved together
+        batch = ActionAcceptanceBatch()
+        with use_rng(rng) if rng else nullcontext(), batch.activate():
             context = PositionCharactersBehaviorStateService(position, org_with_characters).prepare()
             for org_name, characters in org_with_characters.items():
                 for character in characters:
@@ -69,3 +89,175 @@ class NpcActionScheduler:
                     svc = DefaultBehaviorPattern(context.get_context(character), self.factory.actions_acceptor)
                     if svc.can_behave():
                         svc.behave()
+        batch.flush()
+
+    def position_rng(self, cycle: "Cycle", position: "Position") -> t.Optional[random.Random]:
+        if self.seed is None:
+            return None
+        return random.Random(f"{self.seed}:{cycle.pk}:{position.pk}")
+
+
+@dataclass
+class ShardReport:
+    index: int
+    positions: int = 0
+    characters: int = 0
+    actions: int = 0
+    seconds: float = 0.0
+    # (order, position id, sequence in position, action id) of every accepted action
+    accepted: t.List[tuple] = field(default_factory=list)
+
+    def __str__(self):
+        return (f"shard {self.index}: {self.positions} positions, {self.characters} characters, "
+                f"{self.actions} actions in {self.seconds * 1000:.1f}ms")
+
+
+class RecordingAcceptor:
+    """
+    Wraps the action acceptor of a shard and records the accepted actions.
+    """
+
+    def __init__(self, acceptor: partial, action: "CharacterAction", sink: t.List["CharacterAction"]):
+        self.acceptor = acceptor
+        self.action = action
+        self.sink = sink
+
+    def accept(self):
+        self.acceptor(self.action).accept()
+        self.sink.append(self.action)
+
+
+class ParallelNpcActionScheduler(NpcActionScheduler):
+    """
+    Schedules NPC actions of different positions in parallel.
+
+    Positions are independent, so they are split into `workers` shards balanced by the number of characters.
+    Thread workers use their own database connection, process workers set Django up themselves and
+    use the default action factory. The prepare phase of the cycle runs outside the cycle transaction,
+    so every worker sees the committed state.
+
+    Accepted actions are merged deterministically: actions with an equal `order` are spread by a tiny
+    step in (position, acceptance sequence) order, so the play order does not depend on worker timing.
+    Seeded generators are per position, so seeded runs are reproducible whatever the shard layout.
+    """
+    order_tie_step = 1e-9
+
+    def __init__(self, factory: BehaviorFactory, workers: int = 4, executor: str = "thread",
+                 seed: t.Optional[int] = None):
+        super().__init__(factory, seed)
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.report: t.List[ShardReport] = []
+
+    def schedule_actions(self, cycle: "Cycle") -> None:
+        positions = self.get_active_characters(cycle)
+        shards = self.make_shards(positions)
+        if self.executor == "process":
+            self.report = self._run_in_processes(cycle, shards)
+        else:
+            self.report = self._run_in_threads(cycle, positions, shards)
+        for shard in self.report:
+            self.logger.info(f"Cycle {cycle.number} NPC {shard}")
+        self.merge_orders([entry for shard in self.report for entry in shard.accepted])
+
+    def make_shards(self, positions: t.Dict["Position", t.Dict]) -> t.List[t.List["Position"]]:
+        """
+        Greedy split of positions into shards with a similar number of characters.
+        """
+        shards = [[] for _ in range(min(self.workers, len(positions)))]
+        load = [0] * len(shards)
+        by_size = sorted(
+            positions.items(),
+            key=lambda item: (-sum(len(chars) for chars in item[1].values()), str(item[0].pk)),
+        )
+        for position, orgs in by_size:
+            index = load.index(min(load))
+            shards[index].append(position)
+            load[index] += sum(len(chars) for chars in orgs.values())
+        return shards
+
+    def _run_in_threads(self, cycle: "Cycle", positions: t.Dict, shards: t.List[t.List["Position"]]
+                        ) -> t.List[ShardReport]:
+        with ThreadPoolExecutor(max_workers=len(shards) or 1, thread_name_prefix="npc-scheduler") as pool:
+            futures = [
+                pool.submit(self._run_shard, index, cycle, {position: positions[position] for position in shard})
+                for index, shard in enumerate(shards)
+            ]
+            return [future.result() for future in futures]
+
+    def _run_shard(self, index: int, cycle: "Cycle", positions: t.Dict) -> ShardReport:
+        report = ShardReport(index=index, positions=len(positions))
+        started = time.perf_counter()
+        try:
+            for position, org_with_characters in positions.items():
+                accepted = []
+                scheduler = NpcActionScheduler(BehaviorFactory(
+                    actions_acceptor=partial(RecordingAcceptor, self.factory.actions_acceptor, sink=accepted)
+                ), self.seed)
+                scheduler.schedule_position(cycle, position, org_with_characters)
+                report.characters += sum(len(chars) for chars in org_with_characters.values())
+                report.actions += len(accepted)
+                report.accepted.extend(
+                    (action.order, str(position.pk), sequence, action.pk) for sequence, action in enumerate(accepted)
+                )
+        finally:
+            report.seconds = time.perf_counter() - started
+            # thread workers get their own connection, it is not reused after the shard
+            connection.close()
+        return report
+
+    def _run_in_processes(self, cycle: "Cycle", shards: t.List[t.List["Position"]]) -> t.List[ShardReport]:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(shards) or 1, mp_context=context,
+                                 initializer=_init_process_worker) as pool:
+            futures = [
+                pool.submit(_run_process_shard, index, cycle.pk, [position.pk for position in shard], self.seed)
+                for index, shard in enumerate(shards)
+            ]
+            return [future.result() for future in futures]
+
+    def merge_orders(self, accepted: t.List[tuple]) -> None:
+        """
+        Make the order of the accepted actions unique and independent of the worker timing.
+        """
+        changed = []
+        previous_order, step = None, 0
+        for order, position_id, sequence, action_id in sorted(accepted):
+            step = step + 1 if order == previous_order else 0
+            previous_order = order
+            if step:
+                changed.append(CharacterAction(id=action_id, order=order + step * self.order_tie_step))
+        if changed:
+            CharacterAction.objects.bulk_update(changed, ["order"])
+        self.logger.debug(f"Merged {len(accepted)} NPC actions, {len(changed)} orders adjusted")
+
+
+def _init_process_worker():
+    import django
+    django.setup()
+
+
+def _run_process_shard(index: int, cycle_id, position_ids: t.List, seed: t.Optional[int]) -> ShardReport:
+    from apps.game.services.action.accept import ActionAcceptor
+    from apps.game.services.action.factory import CharacterActionFactory
+
+    cycle = Cycle.objects.select_related("campaign").get(pk=cycle_id)
+    scheduler = ParallelNpcActionScheduler(
+        BehaviorFactory(actions_acceptor=partial(ActionAcceptor, factory=CharacterActionFactory())), seed=seed,
+    )
+    return scheduler._run_shard(index, cycle, scheduler.get_active_characters(cycle, position_ids))
+
+
+def build_npc_scheduler(factory: BehaviorFactory) -> NpcActionScheduler:
+    """
+    Sequential scheduler unless `NPC_SCHEDULER["WORKERS"]` asks for more than one worker.
+    """
+    config = getattr(settings, "NPC_SCHEDULER", {})
+    if config.get("WORKERS", 1) <= 1:
+        return NpcActionScheduler(factory, seed=config.get("SEED"))
+    return ParallelNpcActionScheduler(
+        factory,
+        workers=config["WORKERS"],
+        executor=config.get("EXECUTOR", "thread"),
+        seed=config.get("SEED"),
+    )
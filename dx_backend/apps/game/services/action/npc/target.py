@@ -1,8 +1,8 @@
 import abc
-import random
 import typing as t
 
 from apps.game.services.action.npc.context import CharacterPositionActionContext
+from apps.game.services.action.npc.rng import get_rng
 from apps.game.services.character.core import CharacterService
 
 
@@ -32,11 +32,12 @@ class TargetSelectionStrategy(abc.ABC):
 
     def get_available_enemies(self) -> t.List[CharacterService]:
         """Get list of enemies that are not knocked out."""
-        return [enemy for enemy in self.context.enemies if not enemy.is_knocked_out()]
+        # sorted, so seeded selections do not depend on set iteration order
+        return sorted((enemy for enemy in self.context.enemies if not enemy.is_knocked_out()), key=CharacterService.get_id)
 
     def get_available_friends(self) -> t.List[CharacterService]:
         """Get list of friends that are not knocked out."""
-        return [friend for friend in self.context.friends if not friend.is_knocked_out()]
+        return sorted((friend for friend in self.context.friends if not friend.is_knocked_out()), key=CharacterService.get_id)
 
     def get_power_percentage(self, character: CharacterService) -> float:
         """Calculate power percentage: (current_power * 100) / max_power"""
@@ -152,21 +153,21 @@ class ChaosMonkeyStrategy(TargetSelectionStrategy):
 
     def calculate_target_count(self) -> int:
         """Randomly decide how many targets to select."""
-        return random.randint(1, len(self.get_available_enemies()))
+        return get_rng().randint(1, len(self.get_available_enemies()))
 
     def select_attack_targets(self) -> t.List[CharacterService]:
         """Randomly select enemies to attack."""
         available_enemies = self.get_available_enemies()
         target_count = self.calculate_target_count()
 
-        return random.sample(available_enemies, min(target_count, len(available_enemies)))
+        return get_rng().sample(available_enemies, min(target_count, len(available_enemies)))
 
     def select_defense_targets(self) -> t.List[CharacterService]:
         """Randomly select friends to defend."""
         available_friends = self.get_available_friends()
         target_count = self.calculate_target_count()
 
-        return random.sample(available_friends, min(target_count, len(available_friends)))
+        return get_rng().sample(available_friends, min(target_count, len(available_friends)))
 
 
 class RandomSelectCompositeStrategy(TargetSelectionStrategy):
@@ -180,7 +181,7 @@ class RandomSelectCompositeStrategy(TargetSelectionStrategy):
         self.strategies = strategies
 
     def calculate_target_count(self) -> int:
-        return random.choice(self.strategies).calculate_target_count()
+        return get_rng().choice(self.strategies).calculate_target_count()
 
     def select_attack_targets(self) -> t.List[CharacterService]:
         """Select attack targets using a random strategy."""
@@ -202,4 +203,4 @@ def get_random_target_selection_strategy(
         DefensiveStrategy(context)
     ]
 
-    return random.choice(strategies)
+    return get_rng().choice(strategies)
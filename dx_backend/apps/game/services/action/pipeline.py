@@ -2,6 +2,7 @@ import logging
 import typing as t
 
 from apps.game.exceptions import GameException
+from apps.game.services.action.accept import ActionAcceptanceBatch, get_acceptance_batch
 
 if t.TYPE_CHECKING:
     from apps.game.services.action.accept import AccpetorFactory
@@ -44,18 +45,23 @@ class ActionPipeline:
     def execute(self):
         """
         Execute all actions in the pipeline sequentially.
+
+        Accepted actions are saved in batches, a batch is flushed before an immediate action is applied.
         """
-        for action in self.actions:
-            try:
-                self.execute_action(action)
-            except GameException as e:
-                logging.warning(f"GameException while executing action {action}: {e}")
-                if self.notifier:
-                    self.notifier.action_not_accepted(action, e)
-                continue
-            except Exception as e:
-                logging.warning(f"Error executing action {action}: {e}")
-                continue
+        batch = ActionAcceptanceBatch(self.notifier)
+        with batch.activate():
+            for action in self.actions:
+                try:
+                    self.execute_action(action)
+                except GameException as e:
+                    logging.warning(f"GameException while executing action {action}: {e}")
+                    if self.notifier:
+                        self.notifier.action_not_accepted(action, e)
+                    continue
+                except Exception as e:
+                    logging.warning(f"Error executing action {action}: {e}")
+                    continue
+        batch.flush()
 
         self.actions.clear()
 
@@ -69,5 +75,8 @@ class ActionPipeline:
         acceptor = self.action_acceptor.create(action, self.action_factory, self.notifier)
         acceptor.accept()
         if action.immediate:
+            batch = get_acceptance_batch()
+            if batch is not None:
+                batch.flush()
             svc = self.cycle_player_factory(cycle=action.cycle, factory=self.action_factory)
             svc.apply_single_action(action=action)
@@ -1,22 +1,25 @@
 import typing
 from functools import partial
 
-from django.db.models import QuerySet, Q, F
+from django.db.models import QuerySet
 
 from apps.action.models import Cycle
 from apps.character.models import Character
 from apps.core.models import EffectType
-from apps.game.services.action.npc.scheduler import NpcActionScheduler
+from apps.game.services.action.npc.scheduler import build_npc_scheduler
+from apps.game.services.world.occupancy import get_occupancy
 from apps.shields.models import ActiveShield
 from apps.world.models import SubLocation
 from .accept import ActionAcceptor
 from .base_service import CharacterActionPlayerServicePrototype
 from .stat_changes_applyer import BaseStatChangesApplier
 from ..character.core import CharacterService
+from ..effect.engine import CycleEffectEngine
 from ..fight.integration import FightGameLoopIntegration
 from ..follow.mover import WorldFollowService
+from ..rand_dice import DiceStreams
 from ..npc.bahavior_factory import BehaviorFactory
-from ..shield import ActiveShieldLifeCycleService
+from ..shield import ActiveShieldLifeCycleService, CycleShieldState
 
 if typing.TYPE_CHECKING:
     from ..spawn.spawners import CoreSpawnersService
@@ -30,6 +33,8 @@ if typing.TYPE_CHECKING:
 class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
     char_svc_cls = CharacterService
     active_shields_cls = ActiveShieldLifeCycleService
+    effect_engine_cls = CycleEffectEngine
+    shield_state_cls = CycleShieldState
 
     def __init__(self, cycle: Cycle, factory: "CharacterActionFactory",
                  effects_apply_factory: "ApplyEffectFactory",
@@ -44,7 +49,7 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
         self.effects_apply_factory = effects_apply_factory
         self.effects_manager_factory = effects_manager_factory
         self.base_stats_applier = BaseStatChangesApplier()
-        self.npc_actions_scheduler = NpcActionScheduler(
+        self.npc_actions_scheduler = build_npc_scheduler(
             BehaviorFactory(
                 actions_acceptor=partial(ActionAcceptor, factory=factory)
             )
@@ -71,6 +76,9 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
 
     def post(self):
         self.update_characters()
+        self.post_cycle()
+
+    def post_cycle(self):
         self.active_shields_cls(self.get_active_shields()).decrease_cycles()
         self.bargain_cleanup_svc.cleanup()
 
@@ -81,17 +89,22 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
         self.spawners.process_spawners(self.cycle)
 
     def play(self) -> Cycle:
-        self._play()
-        self.post()
-        # Get the campaign from the current cycle
-        next_cycle = Cycle.objects.next(campaign=self.cycle.campaign)
-        self.prepare(next_cycle)
+        # rolls of the cycle come from seeded streams and can be replayed
+        with DiceStreams.for_cycle(self.cycle).activate():
+            self._play()
+            self.post()
+            # Get the campaign from the current cycle
+            next_cycle = Cycle.objects.next(campaign=self.cycle.campaign)
+            self.prepare(next_cycle)
         self.notify.new_cycle(next_cycle)
         return next_cycle
 
     def _play(self):
         self.apply_effects()
-        self.apply_actions()
+        # shields hit by the actions are written once after all actions
+        with self.shield_state_cls().activate() as shield_state:
+            self.apply_actions()
+            shield_state.flush()
 
     def apply_actions(self):
         for action in self.get_actions():
@@ -99,27 +112,31 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
 
     def apply_single_action(self, action):
         try:
-            action_service = self.factory.from_action(action)
-            action_service.check(action)  # FIXME: it looks like the dead chars perform actions after death
-            action_service.perform(action)
-            action.perform()
+            self.perform_single_action(action)
             self.notify.action_performed(action)
         except Exception as e:
             self.notify.action_failed(action, e)
 
+    def perform_single_action(self, action):
+        action_service = self.factory.from_action(action)
+        action_service.check(action)  # FIXME: it looks like the dead chars perform actions after death
+        action_service.perform(action)
+        action.perform()
+
     def apply_effects(self):
-        qs = Character.objects.filter(is_active=True, campaign=self.cycle.campaign)
-        for char in qs:
-            for effect in char.effects.all():
-                svc = self.effects_apply_factory.from_active_effect(effect)
-                svc.apply_effect(char)
+        engine = self.effect_engine_cls(self.cycle, self.effects_apply_factory)
+        return engine.load(self.get_effect_characters()).apply()
+
+    def get_effect_characters(self) -> typing.Optional[typing.Mapping[typing.Any, Character]]:
+        """Already loaded campaign characters by pk for the effect engine, None to load them with the effects."""
+        return None
 
     def update_characters(self):
+        self.remove_inactive_effects()
         for char in self._get_suitable_characters():
 
             if not char.model.npc:
                 print(char.model)
-            self.remove_inactive_effects(char)
             if char.is_knocked_out():
                 if not char.has_effects([EffectType.KNOCKED_OUT, EffectType.COMA]):
                     manager = self.effects_manager_factory.from_effect_id(EffectType.KNOCKED_OUT)
@@ -132,21 +149,14 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
 
             char.refill_ap()
 
-    def remove_inactive_effects(self, char: CharacterService):
-        expired_e = char.model.effects.filter(
-            Q(effect__permanent=False) & Q(duration__gte=0) & Q(duration__gte=F("ends_in"))
-        ).select_related("effect")
-        self.effects_manager_factory.default().remove_many([
-            effect.effect.id for effect in expired_e
-        ], char)
+    def remove_inactive_effects(self):
+        return self.effect_engine_cls(self.cycle, self.effects_apply_factory).expire()
 
     def _active_sub_loactions(self) -> [SubLocation]:
         """
         Retrutn sub locaton where at least one non npc character is active
         """
-        return Character.objects.filter(is_active=True, npc=False, campaign=self.cycle.campaign).values_list(
-            "position__sub_location",
-            flat=True).distinct()
+        return list(get_occupancy(self.cycle.campaign_id).sub_locations_with_players())
 
     def _get_suitable_characters(self) -> ["CharacterService"]:
         """
@@ -171,7 +181,7 @@ class ManualCharacterActionPlayerService(CharacterActionPlayerServicePrototype):
         ).select_related("initiator", "skill", "item", "position")
 
     def get_active_shields(self) -> QuerySet:
-        return ActiveShield.objects.all()
+        return ActiveShield.objects.filter(target__campaign=self.cycle.campaign)
 
     def perform_follow_chase(self):
         """
@@ -34,11 +34,10 @@ class UseItemActionService(CharacterActionServicePrototype):
             raise GameException("Item not equipped or not owned by the character")
         if item.charges_left < 1:
             raise GameException("Item has no charges left")
-        if item.item.skill is None:
+        if item.item.skill_id is None:
             raise GameException("Item is not usable")
 
     def accept(self, action: CharacterAction):
-        item_skill = action.item.item.skill
-        action.skill = item_skill
+        action.skill_id = action.item.item.skill_id
         action.save()
         self.use_skill_service.accept(action)
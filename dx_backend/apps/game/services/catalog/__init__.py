@@ -0,0 +1,204 @@
+import logging
+import threading
+import typing as t
+from types import MappingProxyType
+
+from apps.action.models import SpecialAction
+from apps.core.utils.cache import CacheVersion
+from apps.effects.models import Effect
+from apps.game.services.skills.power import SkillPowerService
+from apps.items.models import Item
+from apps.school.models import School, Skill
+from .definitions import (
+    EffectDefinition, ItemDefinition, SchoolDefinition, SkillDefinition, SpecialActionDefinition, cost_totals, freeze,
+    thaw,
+)
+
+
+class GameCatalog:
+    """
+    Immutable snapshot of the game definitions: skills, schools, effects, items and special actions.
+
+    Every definition is compiled once into a frozen structure with its JSON data frozen, cost totals and the
+    skill power rating precomputed, so hot paths resolve definitions by id without queries or deserialization.
+    Items are not only the canonical ones, world items may refer to any item.
+    Definitions are shared between threads and cannot be modified.
+    """
+
+    def __init__(self, version: int = 0):
+        self.version = version
+        self.skills: t.Mapping[int, SkillDefinition] = MappingProxyType({})
+        self.schools: t.Mapping[t.Any, SchoolDefinition] = MappingProxyType({})
+        self.effects: t.Mapping[str, EffectDefinition] = MappingProxyType({})
+        self.items: t.Mapping[t.Any, ItemDefinition] = MappingProxyType({})
+        self.special_actions: t.Mapping[str, SpecialActionDefinition] = MappingProxyType({})
+        self.skills_by_type: t.Mapping[str, t.Tuple[SkillDefinition, ...]] = MappingProxyType({})
+        self.skills_by_name: t.Mapping[str, SkillDefinition] = MappingProxyType({})
+
+    @classmethod
+    def load(cls, version: int = 0) -> "GameCatalog":
+        catalog = cls(version)
+        catalog.skills = MappingProxyType({skill.pk: cls.compile_skill(skill) for skill in Skill.objects.all()})
+        by_school: t.Dict[t.Any, t.List[int]] = {}
+        by_type: t.Dict[str, t.List[SkillDefinition]] = {}
+        by_name: t.Dict[str, SkillDefinition] = {}
+        # skills are ordered by grade, the lowest grade skill of a name wins
+        for skill in catalog.skills.values():
+            by_school.setdefault(skill.school_id, []).append(skill.id)
+            by_type.setdefault(skill.type, []).append(skill)
+            by_name.setdefault(skill.name, skill)
+        catalog.skills_by_type = MappingProxyType({key: tuple(skills) for key, skills in by_type.items()})
+        catalog.skills_by_name = MappingProxyType(by_name)
+        catalog.schools = MappingProxyType({
+            school.pk: SchoolDefinition(
+                id=school.pk, name=school.name, is_base=school.is_base, game_master_only=school.game_master_only,
+                skill_ids=tuple(by_school.get(school.pk, ())),
+            )
+            for school in School.objects.all()
+        })
+        catalog.effects = MappingProxyType({
+            effect.pk: EffectDefinition(id=effect.pk, permanent=effect.permanent, ends_in=effect.ends_in)
+            for effect in Effect.objects.all()
+        })
+        catalog.items = MappingProxyType({
+            item.pk: ItemDefinition(
+                id=item.pk, name=item.name, type=item.type, charges=item.charges, weight=item.weight,
+                visibility=item.visibility, skill_id=item.skill_id, effect_id=item.effect_id,
+                base_price=item.base_price,
+            )
+            for item in Item.objects.all()
+        })
+        catalog.special_actions = MappingProxyType({
+            action.pk: SpecialActionDefinition(
+                action_type=action.pk, name=action.name, immediate=action.immediate, final=action.final,
+                cost=freeze(action.cost or []), cost_totals=cost_totals(action.cost or []),
+            )
+            for action in SpecialAction.objects.all()
+        })
+        return catalog
+
+    @staticmethod
+    def compile_skill(skill: Skill) -> SkillDefinition:
+        return SkillDefinition(
+            id=skill.pk, name=skill.name, grade=skill.grade, type=skill.type, special=skill.special,
+            school_id=skill.school_id, multi_target=skill.multi_target, immediate=skill.immediate,
+            impact=freeze(skill.impact or []), cost=freeze(skill.cost or []), effect=freeze(skill.effect or []),
+            simulated_power=skill.simulated_power,
+            power=SkillPowerService(skill, use_cache=False).calculate_power_rating(),
+            cost_totals=cost_totals(skill.cost or []),
+        )
+
+    def __len__(self) -> int:
+        return (len(self.skills) + len(self.schools) + len(self.effects) + len(self.items)
+                + len(self.special_actions))
+
+
+class GameCatalogCache:
+    """
+    Process-wide `GameCatalog`, recompiled lazily after a definition changes.
+
+    The catalog has a `CacheVersion`: with a shared cache backend a save in one process makes every worker reload
+    at once, otherwise from the next request or cycle of the worker on. Definition signals call `invalidate`, bulk
+    writes that bypass signals must call it too.
+    """
+    logger = logging.getLogger("game.services.catalog")
+    models = {
+        "skills": Skill,
+        "schools": School,
+        "effects": Effect,
+        "items": Item,
+        "special_actions": SpecialAction,
+    }
+
+    def __init__(self):
+        self.versions = CacheVersion("game_catalog:version")
+        self._catalog: t.Optional[GameCatalog] = None
+        self._lock = threading.Lock()
+        # pks looked up in vain, valid for the catalog they were looked up in
+        self._misses: t.Tuple[t.Optional[GameCatalog], t.Set[tuple]] = (None, set())
+
+    @property
+    def version(self) -> int:
+        return self.versions.get()
+
+    def get(self) -> GameCatalog:
+        version = self.version
+        catalog = self._catalog
+        if catalog is not None and catalog.version == version:
+            return catalog
+        with self._lock:
+            if self._catalog is None or self._catalog.version != version:
+                self._catalog = self._load(version)
+            return self._catalog
+
+    def invalidate(self) -> None:
+        self.versions.invalidate()
+        self._catalog = None
+
+    def skill(self, pk) -> SkillDefinition:
+        return self._lookup("skills", pk)
+
+    def school(self, pk) -> SchoolDefinition:
+        return self._lookup("schools", pk)
+
+    def effect(self, pk) -> EffectDefinition:
+        return self._lookup("effects", pk)
+
+    def item(self, pk) -> ItemDefinition:
+        return self._lookup("items", pk)
+
+    def special_action(self, pk) -> SpecialActionDefinition:
+        return self._lookup("special_actions", pk)
+
+    def _lookup(self, kind: str, pk):
+        catalog = self.get()
+        definition = getattr(catalog, kind).get(pk)
+        if definition is None and (kind, pk) not in self._misses_of(catalog) and \
+                self.models[kind].objects.filter(pk=pk).exists():
+            # saved by another process that the version does not tell about yet, reload once
+            with self._lock:
+                if self._catalog is catalog:
+                    self._catalog = self._load(catalog.version)
+            catalog = self.get()
+            definition = getattr(catalog, kind).get(pk)
+        if definition is None:
+            self._misses_of(catalog).add((kind, pk))
+            model = self.models[kind]
+            raise model.DoesNotExist(f"{model.__name__} {pk} does not exist")
+        return definition
+
+    def _misses_of(self, catalog: GameCatalog) -> t.Set[tuple]:
+        """
+        Pks looked up in vain in the catalog. A miss costs one single-row query, it is remembered until the catalog
+        is replaced.
+        """
+        if self._misses[0] is not catalog:
+            self._misses = (catalog, set())
+        return self._misses[1]
+
+    def _load(self, version: int) -> GameCatalog:
+        catalog = GameCatalog.load(version)
+        self.logger.debug(f"Loaded game catalog v{version}: {len(catalog)} definitions")
+        return catalog
+
+
+game_catalog = GameCatalogCache()
+
+
+def get_game_catalog() -> GameCatalog:
+    return game_catalog.get()
+
+
+__all__ = [
+    "GameCatalog",
+    "GameCatalogCache",
+    "game_catalog",
+    "get_game_catalog",
+    "SkillDefinition",
+    "SchoolDefinition",
+    "EffectDefinition",
+    "ItemDefinition",
+    "SpecialActionDefinition",
+    "freeze",
+    "thaw",
+]
@@ -0,0 +1,112 @@
+import typing as t
+import uuid
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+from apps.core.models import AttributeType
+
+
+def freeze(value):
+    """
+    Return a read-only copy of JSON data, dicts become mapping proxies and lists become tuples.
+    """
+    if isinstance(value, t.Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    Return a mutable copy of frozen data, e.g. to store it in a JSON field.
+    """
+    if isinstance(value, t.Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def cost_totals(cost: t.Iterable[t.Mapping]) -> t.Mapping[str, int]:
+    totals: t.Dict[str, int] = {}
+    for item in cost:
+        totals[item["kind"]] = totals.get(item["kind"], 0) + item["value"]
+    return MappingProxyType(totals)
+
+
+class CostTotals:
+    __slots__ = ()
+    cost_totals: t.Mapping[str, int]
+
+    @property
+    def ap_cost(self) -> int:
+        return self.cost_totals.get(AttributeType.ACTION_POINTS, 0)
+
+    @property
+    def ep_cost(self) -> int:
+        return self.cost_totals.get(AttributeType.ENERGY, 0)
+
+    @property
+    def hp_cost(self) -> int:
+        return self.cost_totals.get(AttributeType.HEALTH, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class SkillDefinition(CostTotals):
+    """
+    Read-only skill, accepted by the skill services in place of a `Skill` instance.
+    """
+    id: int
+    name: str
+    grade: int
+    type: str
+    special: str
+    school_id: t.Optional[uuid.UUID]
+    multi_target: bool
+    immediate: bool
+    impact: t.Tuple[t.Mapping, ...]
+    cost: t.Tuple[t.Mapping, ...]
+    effect: t.Tuple[t.Mapping, ...]
+    simulated_power: t.Optional[float]
+    power: float
+    cost_totals: t.Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+
+
+@dataclass(frozen=True, slots=True)
+class SchoolDefinition:
+    id: uuid.UUID
+    name: str
+    is_base: bool
+    game_master_only: bool
+    skill_ids: t.Tuple[int, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class EffectDefinition:
+    id: str
+    permanent: bool
+    ends_in: t.Optional[int]
+
+
+@dataclass(frozen=True, slots=True)
+class ItemDefinition:
+    id: uuid.UUID
+    name: str
+    type: str
+    charges: int
+    weight: float
+    visibility: float
+    skill_id: t.Optional[int]
+    effect_id: t.Optional[str]
+    base_price: int
+
+
+@dataclass(frozen=True, slots=True)
+class SpecialActionDefinition(CostTotals):
+    action_type: str
+    name: t.Optional[str]
+    immediate: bool
+    final: bool
+    cost: t.Tuple[t.Mapping, ...]
+    cost_totals: t.Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
@@ -1,120 +1,92 @@
 import typing as t
 
 from apps.core.models import CharacterAbility, SkillTypes
+from apps.game.services.catalog import SkillDefinition, game_catalog, get_game_catalog
 from apps.game.services.cost import DefaultCostService
-from apps.game.services.skills.power import get_skill_power, SkillPowerComparer
 
 if t.TYPE_CHECKING:
     from apps.game.services.character.core import CharacterService
 
 
 class CharacterAbilities:
+    """
+    Resolves the skills and items a character can use, skill definitions come from the game catalog.
+    """
 
-    def can(self, character: "CharacterService", skill_type: "SkillTypes") -> CharacterAbility:
+    def usable_skills(self, character: "CharacterService", skill_type: "SkillTypes") -> t.List[SkillDefinition]:
         """
-        Check if the character can perform actions of the given skill type.
-        Returns skills and items sorted by power (most powerful first).
+        Learned skills of the type the character can afford, most powerful first.
         """
-        learned_skills = character.character.learned_skills.filter(
-            character=character.character,
-            skill__type=skill_type,
-        ).order_by("skill__grade")
-
-        owned_items = character.character.equipped_items.filter(
-            world_item__item__skill__type=skill_type,
-            world_item__charges_left__gt=0
-        ).order_by("world_item__item__skill__grade")
-
-        # Filter skills and items that character can afford
-        possible_skills = list(filter(
-            lambda skill: DefaultCostService.validate(
-                cost=skill.skill.cost,
-                character_svc=character,
-                raise_exception=False
-            ),
-            learned_skills
-        ))
-
-        possible_items = list(filter(
-            lambda item: DefaultCostService.validate(
-                cost=item.world_item.item.skill.cost,
-                character_svc=character,
-                raise_exception=False
-            ),
-            owned_items
-        ))
-
-        # Sort skills by power (most powerful first)
-        sorted_skills = sorted(
-            possible_skills,
-            key=lambda skill_obj: get_skill_power(skill_obj.skill),
-            reverse=True
+        skills = [
+            game_catalog.skill(skill_id)
+            for skill_id in character.character.learned_skills.values_list("skill_id", flat=True)
+        ]
+        return self._by_power(
+            skill for skill in skills
+            if skill.type == skill_type and self._can_afford(character, skill)
         )
 
-        # Sort items by their skill's power (most powerful first)
-        sorted_items = sorted(
-            possible_items,
-            key=lambda item_obj: get_skill_power(item_obj.world_item.item.skill),
-            reverse=True
-        )
+    def usable_items(self, character: "CharacterService",
+                     skill_type: "SkillTypes") -> t.List[t.Tuple[t.Any, t.Any, SkillDefinition]]:
+        """
+        Charged equipped items with a skill of the type the character can afford, as (world item id, item id,
+        skill) tuples, most powerful first.
+        """
+        items = character.character.equipped_items.filter(
+            world_item__item__skill__isnull=False,
+            world_item__charges_left__gt=0
+        ).values_list("world_item_id", "world_item__item_id", "world_item__item__skill_id")
+        usable = [
+            (world_item_id, item_id, game_catalog.skill(skill_id))
+            for world_item_id, item_id, skill_id in items
+        ]
+        usable = [item for item in usable if item[2].type == skill_type and self._can_afford(character, item[2])]
+        usable.sort(key=lambda item: item[2].grade)
+        usable.sort(key=lambda item: item[2].power, reverse=True)
+        return usable
+
+    @staticmethod
+    def _can_afford(character: "CharacterService", skill: SkillDefinition) -> bool:
+        return DefaultCostService.validate(cost=skill.cost, character_svc=character, raise_exception=False)
+
+    @staticmethod
+    def _by_power(skills: t.Iterable[SkillDefinition]) -> t.List[SkillDefinition]:
+        # equal powers keep the lower grade first
+        return sorted(sorted(skills, key=lambda skill: skill.grade), key=lambda skill: skill.power, reverse=True)
 
+    def can(self, character: "CharacterService", skill_type: "SkillTypes") -> CharacterAbility:
+        """
+        Check if the character can perform actions of the given skill type.
+        Returns skills and items sorted by power (most powerful first).
+        """
         return CharacterAbility(
             type=skill_type,
-            skills=(skill.skill.id for skill in sorted_skills),
-            items=(item.world_item.id for item in sorted_items)
+            skills=[skill.id for skill in self.usable_skills(character, skill_type)],
+            items=[world_item_id for world_item_id, _, _ in self.usable_items(character, skill_type)]
         )
 
     def can_with_power_details(self, character: "CharacterService", skill_type: "SkillTypes") -> dict:
         """
         Extended version that returns detailed power information for debugging/UI.
         """
-        learned_skills = character.character.learned_skills.filter(
-            character=character.character,
-            skill__type=skill_type,
-        ).order_by("skill__grade")
-
-        owned_items = character.character.equipped_items.filter(
-            world_item__item__skill__type=skill_type,
-            world_item__charges_left__gt=0
-        ).order_by("world_item__item__skill__grade")
-
-        # Filter and collect skills with power ratings
-        possible_skills = []
-        for skill_obj in learned_skills:
-            if DefaultCostService.validate(
-                    cost=skill_obj.skill.cost,
-                    character_svc=character,
-                    raise_exception=False
-            ):
-                power = get_skill_power(skill_obj.skill)
-                possible_skills.append({
-                    'skill_obj': skill_obj,
-                    'skill_id': skill_obj.skill.id,
-                    'power_rating': power,
-                    'grade': skill_obj.skill.grade
-                })
-
-        # Filter and collect items with power ratings
-        possible_items = []
-        for item_obj in owned_items:
-            if DefaultCostService.validate(
-                    cost=item_obj.world_item.item.skill.cost,
-                    character_svc=character,
-                    raise_exception=False
-            ):
-                power = get_skill_power(item_obj.world_item.item.skill)
-                possible_items.append({
-                    'item_obj': item_obj,
-                    'world_item_id': item_obj.world_item.id,  # WorldItem ID for CharacterAction
-                    'item_id': item_obj.world_item.item.id,  # Item ID for reference
-                    'skill_id': item_obj.world_item.item.skill.id,
-                    'power_rating': power,
-                    'grade': item_obj.world_item.item.skill.grade
-                })
-
-        # Sort by power
-        sorted_skills = sorted(possible_skills, key=lambda x: x['power_rating'], reverse=True)
-        sorted_items = sorted(possible_items, key=lambda x: x['power_rating'], reverse=True)
+        sorted_skills = [
+            {
+                'skill_id': skill.id,
+                'power_rating': skill.power,
+                'grade': skill.grade
+            }
+            for skill in self.usable_skills(character, skill_type)
+        ]
+        sorted_items = [
+            {
+                'world_item_id': world_item_id,  # WorldItem ID for CharacterAction
+                'item_id': item_id,  # Item ID for reference
+                'skill_id': skill.id,
+                'power_rating': skill.power,
+                'grade': skill.grade
+            }
+            for world_item_id, item_id, skill in self.usable_items(character, skill_type)
+        ]
 
         return {
             'type': skill_type,
@@ -150,24 +122,9 @@ class CharacterAbilities:
 
     def preload_skill_cache(self, character: "CharacterService"):
         """
-        Preload cache for all character's skills to improve performance.
-        Call this during character loading or session start.
+        Preload the power ratings of the character's skills, they are compiled with the game catalog.
         """
-        # Get all skills from learned skills and equipped items
-        all_skills = []
-
-        # Add learned skills
-        for learned_skill in character.character.learned_skills.all():
-            all_skills.append(learned_skill.skill)
-
-        # Add item skills
-        for equipped_item in character.character.equipped_items.all():
-            if hasattr(equipped_item.world_item.item, 'skill'):
-                all_skills.append(equipped_item.world_item.item.skill)
-
-        # Preload cache for all unique skills
-        unique_skills = list(set(all_skills))
-        SkillPowerComparer.preload_cache(unique_skills)
+        get_game_catalog()
 
 
 default_abilities = CharacterAbilities()
@@ -18,7 +18,12 @@ from apps.game.exceptions import GameLogicException
 from apps.game.services.character.character_abilities import can
 from apps.game.services.character.character_items import has_item
 from apps.game.services.character.character_normalizer import normalize_character_power
+from apps.game.services.character.stats_snapshot import get_stats_snapshot
+from apps.game.services.character.working_set import get_working_set
+from apps.game.services.effect.index import get_effect_index
 from apps.game.services.rand_dice import DiceService
+from apps.game.services.shield.state import get_shield_state
+from apps.game.services.world.occupancy import get_occupancy
 from apps.items.models import Item
 from apps.school.models import Skill
 from apps.shields.models import ActiveShield
@@ -28,7 +33,18 @@ class CharacterService:
     logger = logging.getLogger("game.services.character")
 
     def __init__(self, character: Character):
-        self.character = character
+        working_set = get_working_set()
+        self.character = working_set.track(character) if working_set else character
+
+    def save_fields(self, *fields: str):
+        """
+        Save changed fields of the character, inside an active working set the write is deferred until flush.
+        """
+        working_set = get_working_set()
+        if working_set:
+            working_set.mark_dirty(self.character, *fields)
+            return
+        self.character.save(update_fields=fields)
 
     def get_dice_service(self) -> partial[DiceService]:
         return functools.partial(DiceService, self.character, self.get_stat(CharacterStats.LUCK))
@@ -44,9 +60,7 @@ class CharacterService:
         self.character.current_health_points = 0
         self.character.current_active_points = 0
         self.character.current_energy_points = 0
-        self.character.save(
-            update_fields=['current_health_points', 'current_active_points', 'current_energy_points', 'updated_at']
-        )
+        self.save_fields('current_health_points', 'current_active_points', 'current_energy_points', 'updated_at')
 
     def increase_attribute(self, name: AttributeType | str, amount: int):
         if name == AttributeType.HEALTH:
@@ -90,25 +104,25 @@ class CharacterService:
 
     def spend_all_ap(self):
         self.character.current_active_points = 0
-        self.character.save(update_fields=['current_active_points'])
+        self.save_fields('current_active_points')
 
     def spend_ap(self, amount: int):
         self.character.current_active_points -= amount
         if self.character.current_active_points < 0:
             self.character.current_active_points = 0
-        self.character.save(update_fields=['current_active_points'])
+        self.save_fields('current_active_points')
 
     def spend_energy(self, amount: int):
         self.character.current_energy_points -= amount
         if self.character.current_energy_points < 0:
             self.character.current_energy_points = 0
-        self.character.save(update_fields=['current_energy_points'])
+        self.save_fields('current_energy_points')
 
     def spend_hp(self, amount: int):
         self.character.current_health_points -= amount
         if self.character.current_health_points < 0:
             self.character.current_health_points = 0
-        self.character.save(update_fields=['current_health_points'])
+        self.save_fields('current_health_points')
 
     def add_hp(self, amount: int):
         current_hp = self.character.current_health_points
@@ -117,7 +131,7 @@ class CharacterService:
             self.character.current_health_points = max_hp
         else:
             self.character.current_health_points += amount
-        self.character.save(update_fields=['current_health_points', 'updated_at'])
+        self.save_fields('current_health_points', 'updated_at')
 
     def add_ap(self, amount: int):
         current_ap = self.character.current_active_points
@@ -126,7 +140,7 @@ class CharacterService:
             self.character.current_active_points = max_ap
         else:
             self.character.current_active_points += amount
-        self.character.save(update_fields=['current_active_points', 'updated_at'])
+        self.save_fields('current_active_points', 'updated_at')
 
     def add_energy(self, amount: int):
         current_energy = self.character.current_energy_points
@@ -135,7 +149,7 @@ class CharacterService:
             self.character.current_energy_points = max_energy
         else:
             self.character.current_energy_points += amount
-        self.character.save(update_fields=['current_energy_points', 'updated_at'])
+        self.save_fields('current_energy_points', 'updated_at')
 
     def get_max_ap(self):
         return int(round(self.get_stat(CharacterStats.SPEED) * 0.5 * self.character.dimension.speed))
@@ -162,7 +176,9 @@ class CharacterService:
         return self.character.current_energy_points
 
     def get_character_info(self, refresh=True) -> FullCharacterInfo:
-        if refresh:
+        working_set = get_working_set()
+        # refreshing a character with deferred changes would drop them
+        if refresh and not (working_set and working_set.is_dirty(self.character)):
             self.character.refresh_from_db()
         coordinates = Coordinate(
             x=0,
@@ -206,6 +222,11 @@ class CharacterService:
         return self.get_stat(CharacterStats.SPEED) * self.character.dimension.speed
 
     def get_stat(self, param: CharacterStats) -> int:
+        snapshot = get_stats_snapshot()
+        if snapshot:
+            if param not in CharacterStats._value2member_map_:
+                raise GameLogicException(f"Unknown stat {param}")
+            return snapshot.get_stat(self.character.pk, param)
         modifier = self.character.stats_modifiers.filter(name=param).aggregate(models.Sum('value'))['value__sum'] or 0
         real_stat = self.get_real_stat(param)
         return real_stat + modifier
@@ -213,6 +234,9 @@ class CharacterService:
     def get_real_stat(self, param: CharacterStats) -> int:
         if param not in CharacterStats._value2member_map_:
             raise GameLogicException(f"Unknown stat {param}")
+        snapshot = get_stats_snapshot()
+        if snapshot:
+            return snapshot.get_real_stat(self.character.pk, param)
         # TODO: Calculate the impact if any
         try:
             return self.character.stats.get(name=param).value
@@ -241,7 +265,7 @@ class CharacterService:
                 self.logger.info(f"Attacker {self.character.id} received critical fail and cant kill the target")
                 self.character.current_health_points = 1
             # TODO: draw the dice d20 and if critical success heal it to 1hp
-        self.character.save(update_fields=['current_health_points', 'updated_at'])
+        self.save_fields('current_health_points', 'updated_at')
         self.logger.info(
             f"Character {self.character.id} received {calculated_impact['value']} of {calculated_impact['kind']} damage")
 
@@ -252,15 +276,15 @@ class CharacterService:
 
     def refill_ap(self):
         self.character.current_active_points = self.get_max_ap()
-        self.character.save(update_fields=['current_active_points', 'updated_at'])
+        self.save_fields('current_active_points', 'updated_at')
 
     def refill_energy(self):
         self.character.current_energy_points = self.get_max_energy()
-        self.character.save(update_fields=['current_energy_points', 'updated_at'])
+        self.save_fields('current_energy_points', 'updated_at')
 
     def refill_health(self):
         self.character.current_health_points = self.get_max_hp()
-        self.character.save(update_fields=['current_health_points', 'updated_at'])
+        self.save_fields('current_health_points', 'updated_at')
 
     # TODO: move this to the dimension service
     def dimension_shift(self, action: CharacterAction) -> ActionImpact:
@@ -320,20 +344,30 @@ class CharacterService:
         return self.character.fight.get_character_side(self.character)
 
     def has_effect(self, effect: EffectType) -> bool:
+        index = get_effect_index()
+        if index and index.covers(self.character.pk):
+            return index.has_any(self.character.pk, effect)
         return self.character.effects.filter(effect=effect, active=True).exists()
 
     def has_effects(self, effects: [EffectType]) -> bool:
+        if isinstance(effects, str):
+            effects = [effects]
+        index = get_effect_index()
+        if index and index.covers(self.character.pk):
+            return index.has_any(self.character.pk, effects)
         return self.character.effects.filter(effect__in=effects, active=True).exists()
 
     def get_shields(self) -> [ActiveShield]:
+        state = get_shield_state()
+        if state:
+            return state.shields_for(self.character)
         return self.character.shields.all()
 
     def is_in_safe_place(self) -> bool:
         return self.character.position.is_safe
 
     def not_alone(self) -> bool:
-        return Character.objects.filter(position=self.character.position, is_active=True).exclude(
-            id=self.character.id).exists()
+        return get_occupancy(self.character.campaign_id).has_others(self.character.position_id, self.character.pk)
 
     @property
     def rank_grade(self) -> int:
@@ -0,0 +1,122 @@
+import logging
+import threading
+import typing as t
+from contextlib import contextmanager
+
+from django.db import models
+
+from apps.character.models import Stat, StatModifier
+
+_thread_locals = threading.local()
+
+
+def get_stats_snapshot() -> t.Optional["CharacterStatsSnapshot"]:
+    """
+    Return the stats snapshot activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'stats_snapshot', None)
+
+
+def invalidate_character_stats(character_id=None):
+    """
+    Drop cached stats of the character (or all characters) from the active snapshot, no-op without one.
+    """
+    snapshot = get_stats_snapshot()
+    if snapshot:
+        snapshot.invalidate(character_id)
+
+
+class CharacterStatsSnapshot:
+    """
+    Cycle or request scoped cache of character stats.
+
+    Stats and stat modifiers of a set of characters are loaded with two queries and `get_stat`/`get_real_stat`
+    are served from memory afterwards. Entries are dropped explicitly with `invalidate` when stats, modifiers or
+    equipment of a character change.
+    """
+    logger = logging.getLogger("game.services.character.stats_snapshot")
+    stat_model = Stat
+    modifier_model = StatModifier
+
+    def __init__(self):
+        self.stats: t.Dict[t.Any, t.Dict[str, int]] = {}
+        self.modifiers: t.Dict[t.Any, t.Dict[str, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def prefetch(self, character_ids: t.Iterable) -> "CharacterStatsSnapshot":
+        """
+        Load stats and modifiers of all given characters, two queries regardless of the number of characters.
+        """
+        character_ids = {pk for pk in character_ids if pk not in self.stats}
+        if not character_ids:
+            return self
+        for pk in character_ids:
+            self.stats[pk] = {}
+            self.modifiers[pk] = {}
+
+        rows = self.stat_model.objects.filter(character_id__in=character_ids).values_list(
+            "character_id", "name", "base_value", "additional_value"
+        )
+        for character_id, name, base_value, additional_value in rows:
+            self.stats[character_id][name] = base_value + additional_value
+
+        rows = self.modifier_model.objects.filter(character_id__in=character_ids).values(
+            "character_id", "name"
+        ).annotate(total=models.Sum("value")).values_list("character_id", "name", "total")
+        for character_id, name, total in rows:
+            self.modifiers[character_id][name] = total or 0
+
+        self.loads += 1
+        return self
+
+    def _ensure_loaded(self, character_id):
+        if character_id in self.stats:
+            self.hits += 1
+            return
+        self.misses += 1
+        self.prefetch([character_id])
+
+    def get_real_stat(self, character_id, name: str) -> int:
+        self._ensure_loaded(character_id)
+        return self.stats[character_id].get(name, 0)
+
+    def get_modifier(self, character_id, name: str) -> int:
+        self._ensure_loaded(character_id)
+        return self.modifiers[character_id].get(name, 0)
+
+    def get_stat(self, character_id, name: str) -> int:
+        return self.get_real_stat(character_id, name) + self.modifiers[character_id].get(name, 0)
+
+    def invalidate(self, character_id=None):
+        if character_id is None:
+            self.stats.clear()
+            self.modifiers.clear()
+        else:
+            self.stats.pop(character_id, None)
+            self.modifiers.pop(character_id, None)
+        self.invalidations += 1
+
+    def counters(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "characters": len(self.stats),
+        }
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the snapshot visible for the current thread, nested activation restores the previous one on exit.
+        """
+        previous = get_stats_snapshot()
+        _thread_locals.stats_snapshot = self
+        try:
+            yield self
+        finally:
+            _thread_locals.stats_snapshot = previous
+            self.logger.debug(f"Stats snapshot released: {self.counters()}")
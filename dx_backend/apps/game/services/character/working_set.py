@@ -0,0 +1,150 @@
+import logging
+import threading
+import typing as t
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+from apps.character.models import Character
+from apps.core.bus.routing import character_index
+from apps.game.services.world.map_export import on_map_characters_changed
+from apps.game.services.world.occupancy import occupancy_index
+
+_thread_locals = threading.local()
+
+
+def get_working_set() -> t.Optional["CharacterWorkingSet"]:
+    """
+    Return the working set activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'working_set', None)
+
+
+class CharacterWorkingSet:
+    """
+    In-memory identity map of the characters touched during a cycle.
+
+    While the working set is active every `CharacterService` built for a tracked character shares the same
+    `Character` instance and HP/AP/energy writes are collected as dirty fields instead of being saved one by one.
+    `flush` writes all dirty rows at once with `bulk_update`. Changes made inside a `savepoint` block are undone
+    in memory when the block fails.
+    """
+    logger = logging.getLogger("game.services.character.working_set")
+    model = Character
+    batch_size = 500
+
+    def __init__(self):
+        self.characters: t.Dict[t.Any, Character] = {}
+        self.dirty: t.Dict[t.Any, t.Set[str]] = {}
+        # state of the characters touched inside the current savepoint, as it was before
+        self._undo: t.Optional[t.Dict[t.Any, tuple]] = None
+
+    def load(self, queryset) -> "CharacterWorkingSet":
+        """
+        Load characters from the queryset into the working set, already tracked instances are kept as is.
+        """
+        for character in queryset.select_related("dimension", "rank", "position"):
+            self.characters.setdefault(character.pk, character)
+        return self
+
+    def track(self, character: Character) -> Character:
+        """
+        Return the tracked instance for the character, starts tracking it when it is not known yet.
+        """
+        if not isinstance(character, self.model) or character.pk is None:
+            return character
+        character = self.characters.setdefault(character.pk, character)
+        if self._undo is not None and character.pk not in self._undo:
+            dirty = self.dirty.get(character.pk)
+            self._undo[character.pk] = (
+                dict(character.__dict__), dict(character._state.fields_cache), set(dirty) if dirty else None,
+            )
+        return character
+
+    def get(self, pk) -> t.Optional[Character]:
+        return self.characters.get(pk)
+
+    def mark_dirty(self, character: Character, *fields: str):
+        character = self.track(character)
+        self.dirty.setdefault(character.pk, set()).update(fields)
+
+    def is_dirty(self, character: Character) -> bool:
+        return character.pk in self.dirty
+
+    def flush(self) -> t.List[Character]:
+        """
+        Persist all dirty characters with a single `bulk_update` per set of changed fields.
+
+        `bulk_update` does not send `post_save`, callers are responsible for notifying about the flushed characters,
+        only the bus channel and occupancy indexes are kept in sync here.
+
+        :return: flushed characters
+        """
+        if not self.dirty:
+            return []
+        now = timezone.now()
+        grouped: t.Dict[t.FrozenSet[str], t.List[Character]] = {}
+        for pk, fields in self.dirty.items():
+            character = self.characters[pk]
+            # bulk_update skips auto_now fields, so updated_at has to be set by hand
+            character.updated_at = now
+            grouped.setdefault(frozenset(fields | {'updated_at'}), []).append(character)
+
+        flushed = []
+        for fields, characters in grouped.items():
+            self.model.objects.bulk_update(characters, sorted(fields), batch_size=self.batch_size)
+            flushed.extend(characters)
+        for character in flushed:
+            character_index.update(character)
+        occupancy_index.changed(flushed, set().union(*grouped))
+        on_map_characters_changed(set().union(*grouped))
+        self.logger.debug(f"Flushed {len(flushed)} characters from the working set")
+        self.dirty.clear()
+        return flushed
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Undo the in-memory changes of the block when it raises, use it together with a database savepoint.
+
+        A character is copied when it is first tracked inside the block, `CharacterService` tracks the characters
+        it is built for, so the copy is taken before the block changes them.
+        """
+        outer, self._undo = self._undo, {}
+        try:
+            yield self
+        except BaseException:
+            self._restore(self._undo)
+            raise
+        finally:
+            undo, self._undo = self._undo, outer
+            if outer is not None:
+                for pk, state in undo.items():
+                    outer.setdefault(pk, state)
+
+    def _restore(self, undo: t.Dict[t.Any, tuple]) -> None:
+        for pk, (values, fields_cache, dirty) in undo.items():
+            character = self.characters[pk]
+            character.__dict__.clear()
+            character.__dict__.update(values)
+            character._state.fields_cache = fields_cache
+            if dirty is None:
+                self.dirty.pop(pk, None)
+            else:
+                self.dirty[pk] = dirty
+        self.logger.debug(f"Restored {len(undo)} characters of a failed savepoint")
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the working set visible for the current thread, nested activation restores the previous one on exit.
+        """
+        previous = get_working_set()
+        _thread_locals.working_set = self
+        try:
+            yield self
+        finally:
+            _thread_locals.working_set = previous
+
+    def __len__(self):
+        return len(self.characters)
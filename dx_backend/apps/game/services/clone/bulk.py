@@ -0,0 +1,291 @@
+import copy
+import dataclasses
+import functools
+import logging
+import time
+import typing as t
+from collections import deque
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import ForeignKey, ForeignObjectRel, ManyToManyRel, Model
+
+from apps.core.utils.models import TagsDescriptor
+from apps.game.services.clone.clone_strategy import CloneStrategy
+from apps.game.services.clone.filter import ModelFilter, TaggedContextFilter
+
+logger = logging.getLogger("apps.game.services.clone")
+
+
+class ClonePlanError(Exception):
+    """Raised when the models reachable from the root cannot be copied table by table."""
+
+
+def _model_key(model: t.Type[Model]) -> str:
+    return model._meta.label_lower
+
+
+def _concrete_root(model: t.Type[Model]) -> t.Type[Model]:
+    """Return the table that owns the primary key values of a multi-table inheritance chain."""
+    parents = model._meta.get_parent_list()
+    return parents[-1] if parents else model
+
+
+def _chunks(values: t.Sequence, size: int) -> t.Iterator[t.Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+@dataclasses.dataclass
+class CloneTable:
+    """
+    One table of a clone plan.
+
+    `links` are the foreign keys of the table pointing to an already copied table, a row is copied when any of them
+    points to a copied row. `parent_link` tables extend the rows of a copied parent table and reuse its new keys.
+    """
+    model: t.Type[Model]
+    links: t.List[t.Tuple[ForeignKey, t.Type[Model]]] = dataclasses.field(default_factory=list)
+    parent_link: bool = False
+
+    @property
+    def key(self) -> str:
+        return _model_key(self.model)
+
+    @property
+    def fields(self) -> list:
+        return list(self.model._meta.local_concrete_fields)
+
+    @property
+    def foreign_keys(self) -> t.List[ForeignKey]:
+        return [field for field in self.fields if field.many_to_one or field.one_to_one]
+
+
+class ClonePlan:
+    """
+    Model level dependency graph of a root model, discovered once from the model metadata.
+
+    Follows the same relations as `InstanceDependencyGraph`: reverse relations of the visited models pointing to
+    models accepted by the filter. `tables` are ordered so every table comes after the tables it references.
+    """
+
+    def __init__(self, root_model: t.Type[Model], tables: t.List[CloneTable]):
+        self.root_model = root_model
+        self.tables = tables
+        self.roots = {_concrete_root(root_model)} | {_concrete_root(table.model) for table in tables}
+
+    @classmethod
+    def discover(cls, root_model: t.Type[Model], model_filter: ModelFilter = None) -> "ClonePlan":
+        tables: t.Dict[t.Type[Model], CloneTable] = {}
+        queue = deque([root_model])
+        while queue:
+            model = queue.popleft()
+            for field in model._meta.get_fields():
+                if not isinstance(field, ForeignObjectRel):
+                    continue
+                related = field.related_model
+                if related is root_model or (model_filter and not model_filter.filter(related)):
+                    continue
+                if isinstance(field, ManyToManyRel):
+                    raise ClonePlanError(
+                        f"{_model_key(related)} is related to {_model_key(model)} by a many to many relation, "
+                        f"rows shared by several instances can not be copied table by table"
+                    )
+                table = tables.get(related)
+                if table is None:
+                    table = tables[related] = CloneTable(related)
+                    queue.append(related)
+                if (field.field, model) not in table.links:
+                    table.links.append((field.field, model))
+                table.parent_link = table.parent_link or bool(field.parent_link)
+        return cls(root_model, cls.sort_tables(root_model, tables))
+
+    @staticmethod
+    def sort_tables(root_model: t.Type[Model], tables: t.Dict[t.Type[Model], CloneTable]) -> t.List[CloneTable]:
+        from apps.game.services.clone.present import DependencyGraph
+
+        graph = DependencyGraph()
+        copied = set(tables) | {root_model}
+        for model, table in tables.items():
+            for field in table.foreign_keys:
+                target = field.related_model
+                if target not in copied:
+                    continue
+                if not field.target_field.primary_key:
+                    raise ClonePlanError(f"{field} references {target._meta.label}.{field.target_field.name}, "
+                                         f"only primary keys can be remapped")
+                if target is not model:
+                    graph.add_edge(_model_key(target), _model_key(model), 1, target, model)
+        order = [graph.models[key] for key in graph.topological_sort() if graph.models[key] is not root_model]
+        if len(order) != len(tables):
+            cyclic = sorted(_model_key(model) for model in set(tables) - set(order))
+            raise ClonePlanError(f"Models reference each other and can not be ordered: {', '.join(cyclic)}")
+        for table in (tables[model] for model in order):
+            pk = table.model._meta.pk
+            if not table.parent_link and not pk.has_default():
+                raise ClonePlanError(f"{table.model._meta.label} primary key has no default, new keys are unknown")
+        return [tables[model] for model in order]
+
+    def __str__(self):
+        return " -> ".join([_model_key(self.root_model)] + [table.key for table in self.tables])
+
+
+@functools.cache
+def get_campaign_clone_plan() -> ClonePlan:
+    from apps.game.models import Campaign
+
+    return ClonePlan.discover(Campaign, TaggedContextFilter(tag=TagsDescriptor.BaseTags.CAMPAIGN_TEMPLATE))
+
+
+@dataclasses.dataclass
+class CloneReport:
+    rows: t.Dict[str, int] = dataclasses.field(default_factory=dict)
+    seconds: float = 0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.seconds if self.seconds else 0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": dict(self.rows),
+            "total_rows": self.total_rows,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+    def __str__(self):
+        return (f"{self.total_rows} rows in {len(self.rows)} tables, {self.seconds:.2f}s "
+                f"({self.rows_per_second:.0f} rows/s)")
+
+
+class BulkInstanceCloner:
+    """
+    Copy a root instance with everything depending on it table by table.
+
+    Unlike `InstanceDeepCloner` the instances are never loaded one by one: the rows of every table of the plan are
+    selected by the old keys of the tables they depend on, get new primary keys, their foreign keys and many to many
+    relations are remapped in memory and they are written with batched inserts. The number of queries depends on
+    the number of tables and batches, not on the number of rows. Model `save` and signals are not called for the
+    copied rows, only for the root instance.
+    """
+    batch_size = 1000
+
+    def __init__(self, root_instance: Model, plan: ClonePlan, strategy: t.Optional[CloneStrategy] = None,
+                 using: str = DEFAULT_DB_ALIAS):
+        self.source = root_instance
+        self.plan = plan
+        self.strategy = strategy
+        self.using = using
+        self.root_instance: t.Optional[Model] = None
+        self.report = CloneReport()
+        # (concrete root model, old pk) -> new pk
+        self.pk_map: t.Dict[t.Tuple[t.Type[Model], t.Any], t.Any] = {}
+        # model -> old primary keys of the copied rows
+        self.old_keys: t.Dict[t.Type[Model], t.List[t.Any]] = {}
+
+    def clone(self) -> Model:
+        started = time.perf_counter()
+        with transaction.atomic(using=self.using):
+            self.root_instance = self.clone_root()
+            for table in self.plan.tables:
+                self.report.rows[table.key] = self.clone_table(table)
+            for model in [self.plan.root_model] + [table.model for table in self.plan.tables]:
+                for field in model._meta.local_many_to_many:
+                    copied = self.clone_many_to_many(model, field)
+                    if copied:
+                        self.report.rows[_model_key(field.remote_field.through)] = copied
+        self.report.seconds = time.perf_counter() - started
+        logger.info(f"Cloned {_model_key(self.plan.root_model)} {self.source.pk} to {self.root_instance.pk}: "
+                    f"{self.report}")
+        return self.root_instance
+
+    def clone_root(self) -> Model:
+        if self.strategy:
+            instance = self.strategy.clone_root_instance(self.source)
+        else:
+            instance = copy.deepcopy(self.source)
+            instance.pk = None
+        instance.save(using=self.using)
+        self.pk_map[(_concrete_root(self.plan.root_model), self.source.pk)] = instance.pk
+        self.old_keys[self.plan.root_model] = [self.source.pk]
+        self.report.rows[_model_key(self.plan.root_model)] = 1
+        return instance
+
+    def fetch_rows(self, table: CloneTable) -> t.List[tuple]:
+        model = table.model
+        attnames = [field.attname for field in table.fields]
+        queryset = model._base_manager.db_manager(self.using).all()
+        if hasattr(queryset, "non_polymorphic"):
+            queryset = queryset.non_polymorphic()
+        pk_index = attnames.index(model._meta.pk.attname)
+        rows: t.Dict[t.Any, tuple] = {}
+        for field, source in table.links:
+            for chunk in _chunks(self.old_keys.get(source, []), self.batch_size):
+                for row in queryset.filter(**{f"{field.attname}__in": chunk}).values_list(*attnames):
+                    rows.setdefault(row[pk_index], row)
+        return list(rows.values())
+
+    def clone_table(self, table: CloneTable) -> int:
+        model, fields = table.model, table.fields
+        root = _concrete_root(model)
+        pk_field = model._meta.pk
+        attnames = [field.attname for field in fields]
+        rows = self.fetch_rows(table)
+        old_keys = [row[attnames.index(pk_field.attname)] for row in rows]
+        self.old_keys[model] = old_keys
+        if not table.parent_link:
+            # keys of parent link tables are remapped with the parent table keys below
+            for old_pk in old_keys:
+                self.pk_map[(root, old_pk)] = pk_field.get_default()
+
+        remapped = [
+            (field.attname, _concrete_root(field.related_model))
+            for field in table.foreign_keys if _concrete_root(field.related_model) in self.plan.roots
+        ]
+        if not table.parent_link:
+            remapped.append((pk_field.attname, root))
+        instances = []
+        for row in rows:
+            instance = model.from_db(self.using, attnames, row)
+            for attname, target in remapped:
+                value = getattr(instance, attname)
+                if value is not None:
+                    setattr(instance, attname, self.pk_map.get((target, value), value))
+            instances.append(instance)
+
+        for batch in _chunks(instances, self.batch_size):
+            # bulk_create refuses multi-table inheritance, insert the local columns of this table only
+            model._base_manager._insert(batch, fields=fields, using=self.using)
+        logger.debug(f"Cloned {len(instances)} {model._meta.label} rows")
+        return len(instances)
+
+    def clone_many_to_many(self, model: t.Type[Model], field) -> int:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            # explicit through models are tables of the plan when they belong to the cloned context
+            return 0
+        source = through._meta.get_field(field.m2m_field_name())
+        target = through._meta.get_field(field.m2m_reverse_field_name())
+        source_root, target_root = _concrete_root(source.related_model), _concrete_root(target.related_model)
+        links = []
+        for chunk in _chunks(self.old_keys.get(model, []), self.batch_size):
+            links.extend(
+                through._base_manager.db_manager(self.using)
+                .filter(**{f"{source.attname}__in": chunk})
+                .values_list(source.attname, target.attname)
+            )
+        through._base_manager.db_manager(self.using).bulk_create(
+            [
+                through(**{
+                    source.attname: self.pk_map[(source_root, source_id)],
+                    target.attname: self.pk_map.get((target_root, target_id), target_id),
+                })
+                for source_id, target_id in links
+            ],
+            batch_size=self.batch_size,
+        )
+        return len(links)
@@ -18,15 +18,21 @@ class BaseActiveEffectService(abc.ABC):
     def apply(self, target: 'Character') -> None:
         pass
 
-    def apply_effect(self, target: 'Character') -> None:
+    def apply_effect(self, target: 'Character') -> bool:
+        """
+        Apply one cycle of the effect to the target.
+
+        :return: True when the effect was applied and its counters advanced
+        """
         if not self.is_applicable(target):
-            return
+            return False
         self._update_counters()
         if self._is_first_application():
             self.on_start(target)
         self.apply(target)
         if self._is_last_application():
             self.on_finish(target)
+        return True
 
     def on_start(self, target: 'Character') -> None:
         pass
@@ -48,8 +54,10 @@ class DefaultActiveEffectService(BaseActiveEffectService, ABC):
     char_svc = CharacterService
     effect_assign_svc = DefaultEffectManager
 
-    def __init__(self, active_effect: ActiveEffect):
+    def __init__(self, active_effect: ActiveEffect, save_counters: bool = True):
         self.active_effect = active_effect
+        # `CycleEffectEngine` advances the counters of all applied effects with a single update
+        self.save_counters = save_counters
 
     def is_applicable(self, target: 'Character') -> bool:
         char_svc = CharacterService(target)
@@ -59,7 +67,8 @@ class DefaultActiveEffectService(BaseActiveEffectService, ABC):
         self.active_effect.duration += 1
         # if self._is_last_application():
         #     self.active_effect.active = False
-        self.active_effect.save(update_fields=['duration', 'active', 'updated_at'])
+        if self.save_counters:
+            self.active_effect.save(update_fields=['duration', 'active', 'updated_at'])
 
     def _is_first_application(self) -> bool:
         return self.active_effect.duration == 1
@@ -4,6 +4,8 @@ import random
 import typing as t
 
 from apps.effects.models import Effect
+from apps.game.services.catalog import game_catalog
+from apps.game.services.character.stats_snapshot import invalidate_character_stats
 from apps.game.services.formula.base import FormulaService
 
 if t.TYPE_CHECKING:
@@ -17,9 +19,9 @@ class BaseEffectAssigner(abc.ABC):
     logger = logging.getLogger("services.effect.assigner")
 
     def assign_world_effect(self, effect_id: "EffectType", target: "CharacterService"):
-        core_effect = Effect.objects.get(id=effect_id)
+        core_effect = game_catalog.effect(effect_id)
         new_effect, _ = target.model.effects.update_or_create(
-            effect=core_effect,
+            effect_id=core_effect.id,
             defaults={
                 'impact': {},
                 'ends_in': core_effect.ends_in
@@ -72,14 +74,15 @@ class DefaultEffectManager(BaseEffectAssigner):
             self.logger.info(
                 f"Effect {effect['name']} failed to apply to {target} with chance {base_chance} and result {rand_result}")
             return
-        core_effect, _ = self.model.objects.get_or_create(
-            id=effect["name"],
-            defaults={
-                'icon': None,
-                'permanent': False,
-                'ends_in': 1,
-            }
-        )
+        if effect["name"] not in game_catalog.get().effects:
+            self.model.objects.get_or_create(
+                id=effect["name"],
+                defaults={
+                    'icon': None,
+                    'permanent': False,
+                    'ends_in': 1,
+                }
+            )
 
         duration = self.formula_svc_cls(
             initiator,
@@ -88,7 +91,7 @@ class DefaultEffectManager(BaseEffectAssigner):
         ).evaluate_int()
 
         new_effect, _ = target.model.effects.update_or_create(
-            effect=core_effect,
+            effect_id=effect["name"],
             defaults={
                 'ends_in': duration,
                 'impact': effect.get("impact", {}),
@@ -116,10 +119,13 @@ class DefaultEffectManager(BaseEffectAssigner):
     def remove(self, effect_id: "EffectType", target: "CharacterService", initiator: "CharacterService" = None):
         self.remove_inactive_modifiers(target)
         target.model.effects.filter(effect_id=effect_id).delete()
+        # modifiers applied by the effect are removed by cascade
+        invalidate_character_stats(target.model.pk)
         self.logger.info(f"Effect {effect_id} removed from {target}")
 
     def remove_inactive_modifiers(self, target: "CharacterService"):
         target.model.stats_modifiers.filter(applied_by_effect__active=False).delete()
+        invalidate_character_stats(target.model.pk)
         self.logger.info(f"Removed inactive stat modifiers from {target}")
 
     def remove_all(self, target: "CharacterService", initiator: "CharacterService" = None):
@@ -0,0 +1,127 @@
+import logging
+import typing as t
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.character.models import Character
+from apps.effects.models import ActiveEffect
+from apps.game.services.character.stats_snapshot import invalidate_character_stats
+from .applier import UnknownActiveEffectService
+from .index import ActiveEffectIndex
+
+if t.TYPE_CHECKING:
+    from apps.action.models import Cycle
+    from .facctory import ApplyEffectFactory
+
+
+@dataclass
+class EffectCycleResult:
+    loaded: int = 0
+    advanced: int = 0
+    by_type: t.Dict[str, int] = field(default_factory=dict)
+
+
+class CycleEffectEngine:
+    """
+    Applies the active effects of a campaign for one cycle with a constant number of queries.
+
+    All active effects of the active campaign characters are loaded with one query and grouped by effect type.
+    Types without a dedicated service only count their duration, effects of other types run their service with
+    the counter save deferred. The durations of all applied effects are advanced with a single `F()` update and
+    `expire` removes the finished effects with one delete.
+
+    Services of a tracked character share its instance, inside a `CharacterWorkingSet` the instances of the
+    working set, and `has_effect` checks are answered from an `ActiveEffectIndex` while the effects are applied.
+    """
+    logger = logging.getLogger("game.services.effect.engine")
+    model = ActiveEffect
+    index_cls = ActiveEffectIndex
+
+    def __init__(self, cycle: "Cycle", apply_factory: "ApplyEffectFactory"):
+        self.cycle = cycle
+        self.apply_factory = apply_factory
+        self.characters: t.Dict[t.Any, Character] = {}
+        self.by_type: t.Dict[str, t.List[ActiveEffect]] = {}
+        self.index = self.index_cls()
+
+    def get_queryset(self):
+        return self.model.objects.filter(
+            target__campaign_id=self.cycle.campaign_id, target__is_active=True
+        ).order_by("target_id", "created_at")
+
+    def load(self, characters: t.Mapping[t.Any, Character] = None) -> "CycleEffectEngine":
+        """
+        Load the active effects, `characters` are the already loaded campaign characters by pk.
+        """
+        queryset = self.get_queryset()
+        if characters is None:
+            queryset = queryset.select_related("target")
+            characters = {}
+        self.characters = dict(characters)
+        self.index = self.index_cls(self.characters)
+        self.by_type = defaultdict(list)
+        for effect in queryset:
+            target = self.characters.get(effect.target_id)
+            if target is None:
+                target = self.characters[effect.target_id] = effect.target
+            else:
+                # share one instance per character, changes of one effect are seen by the next
+                effect.target = target
+            self.index.add(effect.target_id, effect.effect_id)
+            self.by_type[effect.effect_id].append(effect)
+        self.by_type = dict(self.by_type)
+        return self
+
+    def apply(self) -> EffectCycleResult:
+        result = EffectCycleResult(loaded=sum(len(effects) for effects in self.by_type.values()))
+        advanced = []
+        with self.index.activate():
+            for effect_type, effects in self.by_type.items():
+                service_cls = self.apply_factory.service_cls(effect_type)
+                if service_cls is UnknownActiveEffectService:
+                    # nothing to apply, the duration is counted for every effect of the type
+                    applied = [effect for effect in effects if self._is_alive(effect.target)]
+                else:
+                    applied = [effect for effect in effects if self._apply(service_cls, effect)]
+                advanced.extend(effect.pk for effect in applied)
+                result.by_type[effect_type] = len(applied)
+
+        if advanced:
+            self.model.objects.filter(pk__in=advanced).update(duration=F("duration") + 1, updated_at=timezone.now())
+        result.advanced = len(advanced)
+        self.logger.debug(f"Applied {result.advanced} of {result.loaded} effects in campaign {self.cycle.campaign_id}")
+        return result
+
+    def _apply(self, service_cls, effect: ActiveEffect) -> bool:
+        if not self._is_alive(effect.target):
+            return False
+        return service_cls(effect, save_counters=False).apply_effect(effect.target)
+
+    @staticmethod
+    def _is_alive(target: Character) -> bool:
+        # a coma may deactivate or delete an NPC, its other effects are not applied anymore
+        return target.pk is not None and target.is_active
+
+    def expire(self) -> t.Set[t.Any]:
+        """
+        Delete the finished non-permanent effects of the campaign, stat modifiers applied by them are removed by
+        cascade. Effects deactivated otherwise are kept, the game master still sees them.
+
+        :return: ids of the characters that lost effects
+        """
+        expired = self.model.objects.filter(
+            Q(effect__permanent=False) & Q(duration__gte=0) & Q(duration__gte=F("ends_in")),
+            target__campaign_id=self.cycle.campaign_id,
+        )
+        rows = list(expired.values_list("id", "target_id"))
+        if not rows:
+            return set()
+        self.model.objects.unsafe_all().filter(id__in=[pk for pk, _ in rows]).delete()
+        character_ids = {target_id for _, target_id in rows}
+        for character_id in character_ids:
+            invalidate_character_stats(character_id)
+        self.logger.debug(f"Expired {len(rows)} effects of {len(character_ids)} characters")
+        return character_ids
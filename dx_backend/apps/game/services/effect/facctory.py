@@ -26,6 +26,8 @@ class ApplyEffectFactory:
         EffectType.COMA: KomaActiveEffectService
     }
 
-    def from_active_effect(self, active_effect: 'ActiveEffect') -> DefaultActiveEffectService:
-        effect_type = active_effect.effect.id
-        return self.mapping.get(effect_type, UnknownActiveEffectService)(active_effect)
+    def from_active_effect(self, active_effect: 'ActiveEffect', **kwargs) -> DefaultActiveEffectService:
+        return self.service_cls(active_effect.effect_id)(active_effect, **kwargs)
+
+    def service_cls(self, effect_type: str) -> type[DefaultActiveEffectService]:
+        return self.mapping.get(effect_type, UnknownActiveEffectService)
@@ -0,0 +1,50 @@
+import threading
+import typing as t
+from contextlib import contextmanager
+
+_thread_locals = threading.local()
+
+
+def get_effect_index() -> t.Optional["ActiveEffectIndex"]:
+    """
+    Return the effect index activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'effect_index', None)
+
+
+class ActiveEffectIndex:
+    """
+    In-memory view of the active effects of a set of characters.
+
+    While the index is active `CharacterService.has_effect`/`has_effects` of the covered characters are answered
+    from memory. The index is a snapshot of the effects loaded by `CycleEffectEngine`, it is activated only while
+    the engine applies them.
+    """
+
+    def __init__(self, characters: t.Iterable = ()):
+        self.characters: t.Set[t.Any] = set(characters)
+        self.effects: t.Dict[t.Any, t.Set[str]] = {}
+
+    def add(self, character_id, effect_id: str) -> None:
+        self.characters.add(character_id)
+        self.effects.setdefault(character_id, set()).add(effect_id)
+
+    def covers(self, character_id) -> bool:
+        return character_id in self.characters
+
+    def has_any(self, character_id, effect_ids: t.Union[str, t.Iterable[str]]) -> bool:
+        if isinstance(effect_ids, str):
+            effect_ids = [effect_ids]
+        return not self.effects.get(character_id, set()).isdisjoint(effect_ids)
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the index visible for the current thread, nested activation restores the previous one on exit.
+        """
+        previous = get_effect_index()
+        _thread_locals.effect_index = self
+        try:
+            yield self
+        finally:
+            _thread_locals.effect_index = previous
@@ -7,6 +7,7 @@ from apps.action.models import Cycle
 from apps.character.models import Character
 from apps.fight.models import Fight, CharactersPendingJoinFight
 from apps.game.services.character.core import CharacterService
+from apps.game.services.world.occupancy import get_occupancy
 
 if t.TYPE_CHECKING:
     from apps.game.services.notifier.base import BaseNotifier
@@ -80,15 +81,21 @@ class FightAutoJoiner:
         Returns:
             List of potential joiner characters
         """
+        # Active characters at the fight position that are not already in any fight
+        candidate_ids = [
+            occupant.id for occupant in get_occupancy(fight.campaign_id).at(fight.position_id)
+            if occupant.fight_id is None
+        ]
+        if not candidate_ids:
+            return []
+
         # Get characters already pending to join this fight
         pending_character_ids = CharactersPendingJoinFight.objects.filter(
             fight=fight
         ).values_list('character_id', flat=True)
 
         return list(Character.objects.filter(
-            position=fight.position,
-            is_active=True,
-            fight__isnull=True  # Not already in any fight
+            id__in=candidate_ids,
         ).exclude(
             id__in=pending_character_ids
         ))
@@ -2,6 +2,7 @@ import logging
 import typing as t
 
 from .detector import FightDetector
+from .engine import FightLifecycleEngine
 from .auto_joiner import FightAutoJoiner
 from .auto_leaver import FightAutoLeaver
 from .pending_joiner import FightPendingJoiner
@@ -22,7 +23,11 @@ class FightCoordinator:
     3. Managing pending joiners
     4. Handling authorized leavers
     5. Closing finished fights
+
+    Steps 2-5 run in `FightLifecycleEngine`, which applies the rules of the per-fight services
+    to all fights of the campaign at once.
     """
+    engine_cls = FightLifecycleEngine
 
     def __init__(self, notifier: "BaseNotifier", cycle: "Cycle"):
         self.notifier = notifier
@@ -59,21 +64,13 @@ class FightCoordinator:
             results['detected_fights'] = self.detector.detect_fights(self.cycle)
             self.logger.debug(f"Detected {len(results['detected_fights'])} new fights")
 
-            # Handle authorized leavers (characters who should leave fights)
-            results['auto_leaves'] = self.auto_leaver.process_auto_leave(self.cycle)
-            self.logger.debug(f"Processed authorized leavers for {len(results['auto_leaves'])} fights")
-
-            # Convert pending joiners to active participants
-            results['pending_joins'] = self.pending_joiner.process_pending_joiners(self.cycle)
-            self.logger.debug(f"Processed pending joiners for {len(results['pending_joins'])} fights")
-
-            # Process auto-joining (add characters at fight positions to pending)
-            results['auto_joins'] = self.auto_joiner.process_auto_joins(self.cycle)
-            self.logger.debug(f"Processed auto-joins for {len(results['auto_joins'])} fights")
-
-            # Close fights that should end
-            results['closed_fights'] = self.fight_closer.process_fight_endings(self.cycle)
-            self.logger.debug(f"Closed {len(results['closed_fights'])} fights")
+            # Leave, join pending, auto-join and close all fights in memory, then save once
+            results.update(self.engine_cls(self.notifier, self.cycle).load().process())
+            self.logger.debug(
+                f"Processed leavers for {len(results['auto_leaves'])}, pending joiners for "
+                f"{len(results['pending_joins'])} and auto-joins for {len(results['auto_joins'])} fights, "
+                f"closed {len(results['closed_fights'])} fights"
+            )
 
             self.logger.info(f"Completed fight processing for cycle {self.cycle.number}")
 
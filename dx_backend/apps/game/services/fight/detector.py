@@ -47,11 +47,16 @@ class FightDetector:
 
         aggressive_actions = self._get_aggressive_actions(previous_cycle)
         created_fights = []
+        # positions with an open fight, loaded once instead of a query per action
+        fight_positions = set(Fight.objects.filter(
+            position_id__in={action.position_id for action in aggressive_actions}, open=True
+        ).values_list('position_id', flat=True))
 
         for action in aggressive_actions:
-            if self._should_create_fight(action):
+            if self._should_create_fight(action, fight_positions):
                 fight = self._create_fight_from_action(action, cycle)
                 if fight:
+                    fight_positions.add(fight.position_id)
                     created_fights.append(fight)
                     self._emit_fight_started_event(fight)
 
@@ -115,12 +120,17 @@ class FightDetector:
 
         return False
 
-    def _should_create_fight(self, action: CharacterAction) -> bool:
+    def _active_targets(self, action: CharacterAction) -> list[Character]:
+        """Active targets of the action ordered by id, read from the prefetched targets."""
+        return sorted((target for target in action.targets.all() if target.is_active), key=lambda target: target.pk)
+
+    def _should_create_fight(self, action: CharacterAction, fight_positions: t.Optional[set] = None) -> bool:
         """
         Determine if an action should create a fight.
 
         Args:
             action: The CharacterAction to evaluate
+            fight_positions: Ids of positions with an open fight, queried when not given
 
         Returns:
             bool: True if a fight should be created
@@ -130,15 +140,15 @@ class FightDetector:
             return False
 
         # Check if any targets are still active
-        active_targets = action.targets.filter(is_active=True)
-        if not active_targets.exists():
+        active_targets = self._active_targets(action)
+        if not active_targets:
             return False
 
         # Check if there's already a fight at this position
-        existing_fight = Fight.objects.filter(
-            position=action.position,
-            open=True
-        ).first()
+        if fight_positions is None:
+            existing_fight = Fight.objects.filter(position_id=action.position_id, open=True).exists()
+        else:
+            existing_fight = action.position_id in fight_positions
 
         if existing_fight:
             self.logger.debug(f"Fight already exists at position {action.position}")
@@ -148,7 +158,7 @@ class FightDetector:
             self.logger.debug(f"Character {action.initiator} cannot start a fight at position {action.position}")
             return False
 
-        first_target = active_targets.first()
+        first_target = active_targets[0]
         if not first_target:
             self.logger.debug(f"No active targets found for action {action.id}")
             return False
@@ -164,8 +174,8 @@ class FightDetector:
         if svc.is_knocked_out():
             self.logger.debug(f"Character {character} is incapacitated and cannot start a fight")
             return False
-        # Check if character is at the position
-        if character.position != posittion:
+        # Check if character is at the position, compared by id to avoid loading the character position
+        if character.position_id != getattr(posittion, 'pk', posittion):
             self.logger.debug(f"Character {character} is not at the fight position {posittion}")
             return False
         return True
@@ -182,7 +192,8 @@ class FightDetector:
         """
         try:
             # Get the first active target as defender
-            defender = action.targets.filter(is_active=True).first()
+            active_targets = self._active_targets(action)
+            defender = active_targets[0] if active_targets else None
             if not defender:
                 self.logger.warning(f"No active defender found for action {action.id}")
                 return None
@@ -214,9 +225,9 @@ class FightDetector:
 
             event = FightStartedEvent.create_event(
                 fight_id=fight.id,
-                position_id=fight.position.id,
-                attacker_id=fight.attacker.id,
-                defender_id=fight.defender.id
+                position_id=fight.position_id,
+                attacker_id=fight.attacker_id,
+                defender_id=fight.defender_id
             )
 
             self.notifier.bus.publish(event)
@@ -0,0 +1,343 @@
+import logging
+import typing as t
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.action.models import CharacterAction, Cycle
+from apps.character.models import Character
+from apps.core.models import EffectType, ImpactType
+from apps.effects.models import ActiveEffect
+from apps.fight.models import Fight, CharactersPendingJoinFight
+from apps.game.services.character.core import CharacterService
+from apps.game.services.character.working_set import CharacterWorkingSet, get_working_set
+
+if t.TYPE_CHECKING:
+    from apps.game.services.notifier.base import BaseNotifier
+
+# effects that keep a character from joining a fight, see `FightAutoJoiner` and `FightPendingJoiner`
+INCAPACITATING_EFFECTS = frozenset({
+    EffectType.KNOCKED_OUT,
+    EffectType.COMA,
+    EffectType.SLEEPING,
+    EffectType.PARALYZED,
+})
+# effects that take a participant out of a fight, see `FightCloser`
+FIGHT_ENDING_EFFECTS = frozenset({
+    EffectType.KNOCKED_OUT,
+    EffectType.COMA,
+})
+INACTIVE_AFTER_CYCLES = 2
+
+
+@dataclass
+class PendingRecord:
+    id: t.Any
+    fight_id: t.Any
+    character_id: t.Any
+    cycle_number: int
+
+
+class FightLifecycleEngine:
+    """
+    Set-based version of `FightAutoLeaver`, `FightPendingJoiner`, `FightAutoJoiner` and `FightCloser`.
+
+    The fights of the campaign, their participants, pending joiners, characters at fight positions, incapacitating
+    effects and recent fight activity are loaded with a fixed number of queries. Leaves, joins and closures are
+    decided in memory with the rules of the per-fight services, in the same order, and written back with one
+    statement per kind of change. The number of queries does not depend on the number of fights.
+    """
+    logger = logging.getLogger("game.services.fight.FightLifecycleEngine")
+
+    def __init__(self, notifier: "BaseNotifier", cycle: Cycle, fight_ids: t.Iterable = None):
+        self.notifier = notifier
+        self.cycle = cycle
+        # only these fights of the campaign are processed, all when None
+        self.fight_ids = set(fight_ids) if fight_ids is not None else None
+        self.fights: t.Dict[t.Any, Fight] = {}
+        self.characters: t.Dict[t.Any, Character] = {}
+        self.pending: t.Dict[t.Any, t.Dict[t.Any, PendingRecord]] = defaultdict(dict)  # by fight, then by id
+        self.participants: t.Dict[t.Any, t.Set[t.Any]] = defaultdict(set)  # character ids by `fight_id`
+        self.effects: t.Dict[t.Any, t.Set[str]] = defaultdict(set)
+        self.active_fight_ids: t.Set[t.Any] = set()
+        self.recent_cycles: t.List[Cycle] = []
+
+        self._outer_working_set = get_working_set()
+        self.working_set = self._outer_working_set or CharacterWorkingSet()
+        self._deleted_pending: t.Set[t.Any] = set()
+        self._new_pending: t.List[CharactersPendingJoinFight] = []
+        self._closed: t.List[Fight] = []
+        self._events: t.List[t.Callable[[], None]] = []
+
+    def load(self) -> "FightLifecycleEngine":
+        campaign = self.cycle.campaign
+        # open fights and closed fights that still have joined characters, the auto leaver detaches them
+        fights = Fight.objects.filter(Q(open=True) | Q(joined__isnull=False), campaign=campaign)
+        if self.fight_ids is not None:
+            fights = fights.filter(id__in=self.fight_ids)
+        self.fights = {fight.id: fight for fight in fights.distinct().select_related('position', 'created')}
+        open_fights = [fight for fight in self.fights.values() if fight.open]
+        open_ids = [fight.id for fight in open_fights]
+
+        for row in CharactersPendingJoinFight.objects.filter(fight_id__in=open_ids).values_list(
+                'id', 'fight_id', 'character_id', 'cycle__number'):
+            record = PendingRecord(*row)
+            self.pending[record.fight_id][record.id] = record
+        pending_ids = {record.character_id for records in self.pending.values() for record in records.values()}
+
+        main_ids = {fight.attacker_id for fight in open_fights} | {fight.defender_id for fight in open_fights}
+        rows = Character.objects.filter(
+            Q(fight_id__in=list(self.fights))
+            | Q(id__in=main_ids | pending_ids)
+            | Q(position_id__in={fight.position_id for fight in open_fights}, is_active=True, fight__isnull=True)
+        )
+        self.characters = {character.pk: self.working_set.track(character) for character in rows}
+        for character in self.characters.values():
+            if character.fight_id is not None:
+                self.participants[character.fight_id].add(character.pk)
+
+        for target_id, effect_id in ActiveEffect.objects.filter(
+                target_id__in=list(self.characters), effect_id__in=INCAPACITATING_EFFECTS
+        ).values_list('target_id', 'effect_id'):
+            self.effects[target_id].add(effect_id)
+
+        self._load_activity(open_ids)
+        self.logger.debug(
+            f"Loaded {len(self.fights)} fights, {len(pending_ids)} pending joiners and "
+            f"{len(self.characters)} characters for cycle {self.cycle.number}"
+        )
+        return self
+
+    def _load_activity(self, fight_ids: t.List[t.Any]) -> None:
+        """Previous cycles and fights with aggressive actions in them, see `FightCloser._is_fight_inactive`."""
+        if self.cycle.number == 0 or not fight_ids:
+            return
+        self.recent_cycles = list(
+            Cycle.objects.filter(campaign=self.cycle.campaign, number__lt=self.cycle.number)
+            .order_by('-number')[:INACTIVE_AFTER_CYCLES + 1]
+        )
+        self.active_fight_ids = set(
+            CharacterAction.objects.filter(
+                fight_id__in=fight_ids,
+                cycle__in=self.recent_cycles[:INACTIVE_AFTER_CYCLES],
+                impacts__type__in=ImpactType.get_aggressive_types(),
+                performed=True,
+            ).values_list('fight_id', flat=True).distinct()
+        )
+
+    def process(self) -> dict:
+        """
+        Run leaves, pending joins, auto joins and closures, then save the changes and publish the events.
+
+        :return: results keyed like `FightCoordinator.process_all_fights`
+        """
+        results = {
+            'auto_leaves': self._process_leaves(),
+            'pending_joins': self._process_pending_joins(),
+            'auto_joins': self._process_auto_joins(),
+            'closed_fights': self._process_closures(),
+        }
+        self.save()
+        for emit in self._events:
+            emit()
+        self._events = []
+        return results
+
+    # -- rules
+
+    def _participants(self, fight: Fight) -> t.List[Character]:
+        return [self.characters[pk] for pk in sorted(self.participants[fight.id], key=str)]
+
+    def _pending_of(self, fight: Fight) -> t.List[PendingRecord]:
+        return list(self.pending[fight.id].values())
+
+    def _has_effect(self, character: Character, effects: t.FrozenSet[str]) -> bool:
+        return not self.effects[character.pk].isdisjoint(effects)
+
+    def _process_leaves(self) -> t.Dict[t.Any, t.List[Character]]:
+        results = {}
+        for fight in self.fights.values():
+            leavers = [
+                character for character in self._participants(fight)
+                if (not fight.open and fight.ended_at_id is None)
+                or character.position_id != fight.position_id
+                or not character.is_active
+            ]
+            for character in leavers:
+                self._set_fight(character, None)
+                self._drop_pending(record for record in self._pending_of(fight) if record.character_id == character.pk)
+                self._emit_pair('CharacterLeaveFightEvent', 'LeftFightEvent', fight, character)
+            if leavers:
+                results[fight.id] = leavers
+        self.logger.info(f"Removed {sum(map(len, results.values()))} characters from {len(results)} fights")
+        return results
+
+    def _process_pending_joins(self) -> t.Dict[t.Any, t.List[Character]]:
+        results = {}
+        for fight in self.fights.values():
+            if not fight.open:
+                continue
+            joined = []
+            for record in self._pending_of(fight):
+                character = self.characters.get(record.character_id)
+                if record.cycle_number >= self.cycle.number or character is None:
+                    continue
+                if not character.is_active or character.position_id != fight.position_id:
+                    continue
+                if self._has_effect(character, INCAPACITATING_EFFECTS):
+                    continue
+                self._drop_pending([record])
+                self._set_fight(character, fight)
+                joined.append(character)
+                self._emit_pair('CharacterJoinFightEvent', 'JoinedFightEvent', fight, character)
+            if joined:
+                results[fight.id] = joined
+        self.logger.info(f"Converted {sum(map(len, results.values()))} pending joiners in {len(results)} fights")
+        return results
+
+    def _process_auto_joins(self) -> t.Dict[t.Any, t.List[Character]]:
+        results = {}
+        by_position = defaultdict(list)
+        for character in self.characters.values():
+            by_position[character.position_id].append(character)
+        with self.working_set.activate():
+            for fight in self.fights.values():
+                if not fight.open or fight.ended_at_id is not None:
+                    continue
+                pending_ids = {record.character_id for record in self._pending_of(fight)}
+                added = []
+                for character in by_position[fight.position_id]:
+                    if not character.is_active or character.fight_id is not None or character.pk in pending_ids:
+                        continue
+                    if self._has_effect(character, INCAPACITATING_EFFECTS):
+                        continue
+                    record = CharactersPendingJoinFight(character=character, fight=fight, cycle=self.cycle)
+                    self._new_pending.append(record)
+                    self.pending[fight.id][record.id] = PendingRecord(
+                        record.id, fight.id, character.pk, self.cycle.number
+                    )
+                    self._set_fight(character, fight)
+                    CharacterService(character).spend_all_ap()
+                    added.append(character)
+                    self._emit_pair('CharacterPendingJoinFightEvent', 'PendingJoinFightEvent', fight, character)
+                if added:
+                    results[fight.id] = added
+        self.logger.info(f"Added {sum(map(len, results.values()))} pending joiners to {len(results)} fights")
+        return results
+
+    def _process_closures(self) -> t.List[Fight]:
+        for fight in self.fights.values():
+            if not fight.open or not self._should_close(fight):
+                continue
+            fight.open = False
+            fight.ended_at = self.cycle
+            for character in self._participants(fight):
+                self._set_fight(character, None)
+            self._drop_pending(self._pending_of(fight))
+            self._closed.append(fight)
+            self._events.append(lambda fight=fight: self._publish(
+                'FightEndedEvent', fight_id=fight.id, position_id=fight.position_id, cycle_id=self.cycle.id
+            ))
+        self.logger.info(f"Closed {len(self._closed)} fights")
+        return list(self._closed)
+
+    def _should_close(self, fight: Fight) -> bool:
+        if self._viable_count(fight) < 2:
+            self.logger.debug(f"Fight {fight.id} has no viable participants")
+            return True
+        if self._is_inactive(fight):
+            self.logger.debug(f"Fight {fight.id} is inactive")
+            return True
+        if not self._has_participants_at_position(fight):
+            self.logger.debug(f"Fight {fight.id} has no participants at position")
+            return True
+        return False
+
+    def _is_viable(self, character: t.Optional[Character]) -> bool:
+        return (
+            character is not None
+            and character.current_health_points > 0
+            and character.is_active
+            and not self._has_effect(character, FIGHT_ENDING_EFFECTS)
+        )
+
+    def _viable_count(self, fight: Fight) -> int:
+        # pending joiners count next to the joined characters, as in `FightCloser._has_viable_participants`
+        joined = sum(1 for character in self._participants(fight) if self._is_viable(character))
+        pending = sum(
+            1 for record in self._pending_of(fight) if self._is_viable(self.characters.get(record.character_id))
+        )
+        return joined + pending
+
+    def _is_inactive(self, fight: Fight) -> bool:
+        if self.cycle.number == 0 or fight.created is None:
+            return False
+        # more than INACTIVE_AFTER_CYCLES cycles since the fight was created
+        if len(self.recent_cycles) <= INACTIVE_AFTER_CYCLES \
+                or self.recent_cycles[INACTIVE_AFTER_CYCLES].number < fight.created.number:
+            return False
+        return fight.id not in self.active_fight_ids
+
+    def _has_participants_at_position(self, fight: Fight) -> bool:
+        candidates = [self.characters.get(fight.attacker_id), self.characters.get(fight.defender_id)]
+        candidates += [self.characters.get(record.character_id) for record in self._pending_of(fight)]
+        return any(
+            character is not None and character.position_id == fight.position_id and character.is_active
+            for character in candidates
+        )
+
+    # -- changes
+
+    def _set_fight(self, character: Character, fight: t.Optional[Fight]) -> None:
+        self.participants[character.fight_id].discard(character.pk)
+        character.fight = fight
+        if fight is not None:
+            self.participants[fight.id].add(character.pk)
+        self.working_set.mark_dirty(character, 'fight')
+
+    def _drop_pending(self, records: t.Iterable[PendingRecord]) -> None:
+        for record in list(records):
+            self.pending[record.fight_id].pop(record.id, None)
+            self._deleted_pending.add(record.id)
+
+    def save(self) -> None:
+        """Write all changes: one DELETE and one INSERT of pending joiners, one UPDATE of fights and characters."""
+        new_ids = {record.id for record in self._new_pending}
+        new_pending = [record for record in self._new_pending if record.id not in self._deleted_pending]
+        deleted = self._deleted_pending - new_ids
+        with transaction.atomic():
+            if deleted:
+                CharactersPendingJoinFight.objects.filter(id__in=deleted).delete()
+            if new_pending:
+                CharactersPendingJoinFight.objects.bulk_create(new_pending)
+            if self._closed:
+                Fight.objects.filter(id__in=[fight.id for fight in self._closed]).update(
+                    open=False, ended_at=self.cycle, updated_at=timezone.now()
+                )
+            if self._outer_working_set is None:
+                self.working_set.flush()
+        self.logger.debug(
+            f"Saved fights: {len(deleted)} pending joiners removed, {len(new_pending)} added, "
+            f"{len(self._closed)} fights closed"
+        )
+        self._deleted_pending, self._new_pending, self._closed = set(), [], []
+
+    # -- events
+
+    def _emit_pair(self, position_event: str, character_event: str, fight: Fight, character: Character) -> None:
+        """Queue the event for characters at the fight position and the event for the character itself."""
+        self._events.append(lambda: self._publish(
+            position_event, fight_id=fight.id, character_id=character.id, position_id=fight.position_id
+        ))
+        self._events.append(lambda: self._publish(character_event, fight_id=fight.id, character_id=character.id))
+
+    def _publish(self, name: str, **data) -> None:
+        try:
+            from apps.core.bus.events.fight.produced import fight_events
+
+            self.notifier.bus.publish(getattr(fight_events, name).create_event(**data))
+        except Exception as e:
+            self.logger.error(f"Failed to emit {name} for fight {data.get('fight_id')}: {e}")
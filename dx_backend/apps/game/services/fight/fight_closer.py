@@ -7,6 +7,7 @@ from apps.core.models import ImpactType
 from apps.fight.models import Fight
 from apps.character.models import Character
 from apps.game.services.character.core import CharacterService
+from apps.game.services.world.occupancy import occupancy_index
 from apps.action.models import Cycle
 
 if t.TYPE_CHECKING:
@@ -264,6 +265,8 @@ class FightCloser:
             Character.objects.filter(
                 fight=fight
             ).update(fight=None)
+            # update does not send post_save
+            occupancy_index.invalidate(fight.campaign_id)
             self.logger.debug(f"Cleared fight field for all characters in fight {fight.id}")
         except Exception as e:
             self.logger.error(f"Failed to clear character fight fields for fight {fight.id}: {e}")
@@ -0,0 +1,75 @@
+import logging
+import select
+import typing as t
+
+from django.db import connection, transaction
+
+logger = logging.getLogger("game.services.fight.wakeup")
+
+FIGHT_CHANGED_CHANNEL = "fight_changed"
+# a NOTIFY payload is limited to 8000 bytes, uuids are 36 characters
+IDS_PER_NOTIFICATION = 200
+
+
+def notify_fights_changed(fight_ids: t.Iterable) -> None:
+    """
+    Wake up the fight workers for the given fights once the current transaction commits.
+
+    Only PostgreSQL delivers the notifications, the fight workers of other databases find the fights by polling.
+    """
+    fight_ids = sorted({str(pk) for pk in fight_ids if pk})
+    if not fight_ids or connection.vendor != "postgresql":
+        return
+
+    def send():
+        try:
+            with connection.cursor() as cursor:
+                for i in range(0, len(fight_ids), IDS_PER_NOTIFICATION):
+                    payload = ",".join(fight_ids[i:i + IDS_PER_NOTIFICATION])
+                    cursor.execute("SELECT pg_notify(%s, %s)", [FIGHT_CHANGED_CHANNEL, payload])
+        except Exception as e:
+            # the fight workers poll for missed changes
+            logger.warning(f"Failed to notify fight workers about {len(fight_ids)} fights: {e}")
+
+    transaction.on_commit(send)
+
+
+class FightChangeListener:
+    """
+    Receives the fight ids sent with `notify_fights_changed` on a dedicated database connection.
+    """
+    channel = FIGHT_CHANGED_CHANNEL
+
+    def __init__(self, db_connection=None):
+        self.connection = db_connection or connection
+
+    @property
+    def available(self) -> bool:
+        return self.connection.vendor == "postgresql"
+
+    def listen(self) -> None:
+        self.connection.ensure_connection()
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+
+    def wait(self, timeout: float) -> t.Set[str]:
+        """
+        Block until notifications arrive or `timeout` seconds pass.
+
+        :return: ids of the changed fights, empty on timeout
+        """
+        raw = self.connection.connection
+        if raw.notifies or select.select([raw], [], [], max(0.0, timeout)) != ([], [], []):
+            return self.drain()
+        return set()
+
+    def drain(self) -> t.Set[str]:
+        raw = self.connection.connection
+        raw.poll()
+        fight_ids = set()
+        while raw.notifies:
+            fight_ids.update(pk for pk in raw.notifies.pop(0).payload.split(",") if pk)
+        return fight_ids
+
+    def close(self) -> None:
+        self.connection.close()
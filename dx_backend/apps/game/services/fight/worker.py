@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+import typing as t
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.action.models import Cycle
+from apps.core.utils.cache import expire_versions
+from apps.fight.models import Fight
+from apps.game.models import CampaignSchedule
+from .engine import FightLifecycleEngine
+from .wakeup import FightChangeListener
+
+if t.TYPE_CHECKING:
+    from apps.game.services.notifier.base import BaseNotifier
+
+
+class FightWorker:
+    """
+    Processes the lifecycle of changed fights between cycles.
+
+    Fights are marked dirty by `notify_fights_changed` notifications (actions accepted into a fight, fights and
+    pending joiners saved) and, as a fallback for missed notifications and databases without LISTEN/NOTIFY, all
+    open fights every `poll_seconds`. Dirty fights are grouped by campaign and processed with
+    `FightLifecycleEngine`, campaigns in parallel on `workers` threads. A campaign whose cycle is being played
+    is skipped and retried, the cycle player processes its fights itself.
+    """
+    logger = logging.getLogger("game.services.fight.worker")
+    engine_cls = FightLifecycleEngine
+    listener_cls = FightChangeListener
+    # seconds to wait for a campaign whose cycle is being played
+    retry_seconds = 1.0
+
+    def __init__(self, notifier: "BaseNotifier", workers: int = None, poll_seconds: float = None,
+                 debounce_seconds: float = None):
+        config = getattr(settings, "FIGHT_WORKER", {})
+        self.notifier = notifier
+        self.workers = max(1, workers or config.get("WORKERS", 4))
+        self.poll_seconds = poll_seconds or config.get("POLL_SECONDS", 60)
+        self.debounce_seconds = config.get("DEBOUNCE_SECONDS", 0.2) if debounce_seconds is None else debounce_seconds
+        self.dirty: t.Set[t.Any] = set()
+        self.listener = self.listener_cls()
+
+    def mark_dirty(self, fight_ids: t.Iterable) -> None:
+        self.dirty.update(fight_ids)
+
+    def mark_open_fights_dirty(self) -> None:
+        self.mark_dirty(Fight.objects.filter(open=True).values_list("id", flat=True))
+
+    def process_dirty(self, executor: ThreadPoolExecutor = None) -> t.Dict[t.Any, dict]:
+        """
+        Process the dirty fights, fights of busy campaigns stay dirty.
+
+        Cached versions are read again first, see `expire_versions`.
+
+        :return: engine results by campaign id
+        """
+        fight_ids, self.dirty = self.dirty, set()
+        expire_versions()
+        by_campaign = defaultdict(set)
+        for fight_id, campaign_id in Fight.objects.filter(id__in=fight_ids).values_list("id", "campaign_id"):
+            by_campaign[campaign_id].add(fight_id)
+        if not by_campaign:
+            return {}
+
+        if executor is None:
+            outcomes = [(campaign_id, self.process_campaign(campaign_id, ids)) for campaign_id, ids in
+                        by_campaign.items()]
+        else:
+            futures = {campaign_id: executor.submit(self._process_in_thread, campaign_id, ids)
+                       for campaign_id, ids in by_campaign.items()}
+            outcomes = []
+            for campaign_id, future in futures.items():
+                try:
+                    outcomes.append((campaign_id, future.result()))
+                except Exception:
+                    self.logger.exception(f"Error processing fights of campaign {campaign_id}")
+                    outcomes.append((campaign_id, {}))
+
+        results = {}
+        for campaign_id, result in outcomes:
+            if result is None:
+                self.mark_dirty(by_campaign[campaign_id])
+            else:
+                results[campaign_id] = result
+        return results
+
+    def _process_in_thread(self, campaign_id, fight_ids: t.Set[t.Any]) -> t.Optional[dict]:
+        try:
+            return self.process_campaign(campaign_id, fight_ids)
+        finally:
+            connection.close()
+
+    def process_campaign(self, campaign_id, fight_ids: t.Set[t.Any]) -> t.Optional[dict]:
+        """
+        Process the fights of one campaign with its current cycle.
+
+        :return: engine results, None when the campaign is busy
+        """
+        with transaction.atomic():
+            if self._is_cycle_being_played(campaign_id):
+                return None
+            cycle = Cycle.objects.filter(campaign_id=campaign_id).select_related("campaign").order_by(
+                "-number").first()
+            if cycle is None:
+                return {}
+            started = time.perf_counter()
+            results = self.engine_cls(self.notifier, cycle, fight_ids=fight_ids).load().process()
+        self.logger.debug(
+            f"Processed {len(fight_ids)} fights of campaign {campaign_id} in {time.perf_counter() - started:.3f}s"
+        )
+        return results
+
+    @staticmethod
+    def _is_cycle_being_played(campaign_id) -> bool:
+        """
+        The cycle player leases the campaign schedule while playing, see `CycleScheduler`.
+
+        The schedule is locked for the rest of the transaction, so the cycle player cannot lease it meanwhile.
+        A schedule locked by another transaction is being claimed.
+        """
+        schedules = CampaignSchedule.objects.filter(campaign_id=campaign_id)
+        if not schedules.exists():
+            return False
+        leases = list(schedules.select_for_update(skip_locked=True).values_list("leased_until", flat=True)[:1])
+        if not leases:
+            return True
+        return leases[0] is not None and leases[0] > timezone.now()
+
+    def run_forever(self, stop: threading.Event = None,
+                    on_processed: t.Callable[[t.Dict[t.Any, dict]], None] = None) -> None:
+        stop = stop or threading.Event()
+        listening = self._listen()
+        next_poll = time.monotonic()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="fight-worker") as executor:
+            while not stop.is_set():
+                try:
+                    if time.monotonic() >= next_poll:
+                        self.mark_open_fights_dirty()
+                        next_poll = time.monotonic() + self.poll_seconds
+                    if self.dirty:
+                        results = self.process_dirty(executor)
+                        if results and on_processed:
+                            on_processed(results)
+                    timeout = next_poll - time.monotonic()
+                    if self.dirty:
+                        timeout = min(timeout, self.retry_seconds)
+                    if listening:
+                        self.wait(timeout, stop)
+                    else:
+                        stop.wait(max(0.0, timeout))
+                except Exception:
+                    self.logger.exception("Error in fight worker, polling all open fights")
+                    self.listener.close()
+                    stop.wait(self.retry_seconds)
+                    listening = self._listen()
+                    next_poll = time.monotonic()
+        self.listener.close()
+
+    def wait(self, timeout: float, stop: threading.Event) -> None:
+        fight_ids = self.listener.wait(timeout)
+        if fight_ids and self.debounce_seconds:
+            # actions of one request are accepted in quick succession, process them together
+            stop.wait(self.debounce_seconds)
+            fight_ids |= self.listener.drain()
+        self.mark_dirty(fight_ids)
+
+    def _listen(self) -> bool:
+        if not self.listener.available:
+            self.logger.info(f"Fight change notifications are not available, polling every {self.poll_seconds}s")
+            return False
+        try:
+            self.listener.listen()
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to listen for fight changes, polling every {self.poll_seconds}s: {e}")
+            return False
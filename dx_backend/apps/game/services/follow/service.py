@@ -3,6 +3,8 @@ from apps.core.models import MoveTypes
 from apps.game.exceptions import GameException
 from apps.game.services.character.core import CharacterService
 from apps.game.services.world.movemant import MovementService
+from apps.game.services.world.position_connection import PositionConnectionService
+from apps.world.models import Position
 
 
 class FollowTheLeaderService:
@@ -33,6 +35,9 @@ class FollowTheLeaderService:
         Move the follower towards the leader.
         This method should be called periodically to update the follower's position.
         """
+        if self.rule.type == MoveTypes.WALK:
+            self.walk()
+            return
         if self.rule.type != MoveTypes.TELEPORT:
             raise GameException("Not implemented yet")
 
@@ -41,4 +46,20 @@ class FollowTheLeaderService:
             position=self.leader.character.position
         )
 
+    def walk(self):
+        """
+        Make one move along the shortest path to the leader, through connections the follower can pass.
+        """
+        follower = self.follower.character
+        path = self.movement_service.graph().shortest_path(
+            follower.position_id,
+            self.leader.character.position_id,
+            passable=lambda connection: PositionConnectionService(connection).is_accessible(self.follower),
+        )
+        if path is None:
+            raise GameException(f"{self.leader.character} is not reachable for {follower}")
+        if len(path) < 2:
+            return
+        self.movement_service.move(follower, Position.objects.get(pk=path[1]))
+
 
@@ -1,19 +1,31 @@
 import logging
+import threading
 
 from apps.action.models import Cycle, CharacterAction
 from apps.character.models import Character
 from apps.core.bus import EventBusProto
 from apps.core.bus.base import GameEvent, EventCategory
-from apps.core.bus.events.world import NewCycleData, ActionAcceptedData
+from apps.core.bus.events.world import NewCycleData, ActionAcceptedData, ActionsAcceptedData
 from apps.core.models import RegisteredImpact, RegisteredDiceRoll
 from apps.game.services.character.core import CharacterService
+from apps.game.services.notifier.payload import ActionPayloadBuilder
 
 
 class BaseNotifier:
     logger = logging.getLogger("game.services.notifier")
+    payload_builder_cls = ActionPayloadBuilder
 
     def __init__(self, bus: EventBusProto):
         self.bus = bus
+        self._local = threading.local()
+
+    @property
+    def payloads(self) -> ActionPayloadBuilder:
+        """Action payload builder of the current thread, its caches are not shared between threads."""
+        builder = getattr(self._local, "payloads", None)
+        if builder is None:
+            builder = self._local.payloads = self.payload_builder_cls()
+        return builder
 
     def new_cycle(self, cycle: Cycle):
         event = GameEvent.create(
@@ -44,14 +56,7 @@ class BaseNotifier:
         )
 
     def _serialize_action_to_accepted_data(self, action: CharacterAction) -> ActionAcceptedData:
-        # Ugly import to avoid circular imports and looks like a hack
-        from apps.action.api.serializers.openapi import GameMasterCharacterActionLogSerializer
-        # get current request and add this to context of the serializer
-        from dx_backend.middleware import get_current_request
-        context = {
-            "request": get_current_request()
-        }
-        return ActionAcceptedData(**GameMasterCharacterActionLogSerializer(action, context=context).data)
+        return self.payloads.build(action)
 
     def action_not_accepted(self, action: CharacterAction, exception: Exception):
         self.logger.warning(
@@ -75,6 +80,15 @@ class BaseNotifier:
         )
         self.bus.publish(event)
 
+    def actions_accepted(self, actions: list[CharacterAction]):
+        self.logger.debug(f"{len(actions)} actions accepted")
+        event = GameEvent.create(
+            name="actions_accepted",
+            category=EventCategory.WORLD,
+            data=ActionsAcceptedData(actions=self.payloads.build_many(actions)),
+        )
+        self.bus.publish(event)
+
     def action_performed(self, action: CharacterAction):
         self.logger.debug(f"Action {action} performed")
         action_data = self._serialize_action_to_accepted_data(action)
@@ -97,9 +111,9 @@ class BaseNotifier:
         )
         self.bus.publish(event)
 
-    def character_changed(self, character: Character):
+    def character_changed(self, character: Character, refresh: bool = True):
         self.logger.debug(f"Character {character} changed")
-        character_data = CharacterService(character).get_character_info()
+        character_data = CharacterService(character).get_character_info(refresh=refresh)
         event = GameEvent.create(
             name="character_changed",
             category=EventCategory.WORLD,
@@ -0,0 +1,114 @@
+import logging
+import typing as t
+from collections import OrderedDict
+
+from django.db.models import Prefetch
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+from apps.action.models import CharacterAction, ActionImpact
+from apps.core.bus.events.world import ActionAcceptedData
+from apps.core.models import GameObject
+
+
+def render_field(field, instance):
+    """Same as one step of `Serializer.to_representation`, `SkipField` is left to the caller."""
+    attribute = field.get_attribute(instance)
+    check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+    return None if check_for_none is None else field.to_representation(attribute)
+
+
+class ActionPayloadBuilder:
+    """
+    Builds `ActionAcceptedData` of action events without creating a DRF serializer per action.
+
+    The field tree of `GameMasterCharacterActionLogSerializer` is bound once and reused, so the payload is the
+    same as the serializer output. Actions of a batch are loaded with one query plan (`prefetch`). Skills,
+    positions and cycles do not change during a cycle and their nested representation is cached until the
+    cycle changes; characters change with every action and are cached for one batch only.
+    """
+    logger = logging.getLogger("game.services.notifier.payload")
+    # nested fields cached per cycle, keyed by the related object id
+    cycle_cached_fields = ("skill", "position", "cycle")
+    # nested character fields cached per batch
+    batch_cached_fields = ("initiator",)
+
+    def __init__(self, context: dict = None):
+        from apps.action.api.serializers.openapi import GameMasterCharacterActionLogSerializer
+
+        self._context = context
+        self.serializer = GameMasterCharacterActionLogSerializer(context=context or {})
+        self.fields = [field for field in self.serializer.fields.values() if not field.write_only]
+        self.cycle_id = None
+        self._cycle_cache: t.Dict[tuple, t.Any] = {}
+        self._batch_cache: t.Optional[t.Dict[tuple, t.Any]] = None  # only set inside `build_many`
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def context(self) -> dict:
+        if self._context is not None:
+            return self._context
+        # the request of the current thread, None in the game loop
+        from dx_backend.middleware import get_current_request
+        return {"request": get_current_request()}
+
+    @staticmethod
+    def queryset():
+        return CharacterAction.objects.select_related(
+            "initiator", "skill", "position", "cycle",
+        ).prefetch_related(
+            # targets are serialized as game objects, skip the polymorphic downcast queries
+            Prefetch("targets", queryset=GameObject.objects.non_polymorphic()),
+            Prefetch("impacts", queryset=ActionImpact.objects.select_related("target", "dice_roll_result")),
+        )
+
+    def prefetch(self, actions: t.Iterable[CharacterAction]) -> t.List[CharacterAction]:
+        """Reload the actions with everything the payload needs, order is kept."""
+        actions = list(actions)
+        loaded = self.queryset().in_bulk([action.pk for action in actions])
+        return [loaded.get(action.pk, action) for action in actions]
+
+    def build_many(self, actions: t.Iterable[CharacterAction], prefetch: bool = True) -> t.List[ActionAcceptedData]:
+        actions = self.prefetch(actions) if prefetch else list(actions)
+        self._batch_cache = {}
+        try:
+            return [self.build(action) for action in actions]
+        finally:
+            self._batch_cache = None
+
+    def build(self, action: CharacterAction) -> ActionAcceptedData:
+        self._use_context()
+        if action.cycle_id != self.cycle_id:
+            self.cycle_id = action.cycle_id
+            self._cycle_cache = {}
+        data = OrderedDict()
+        for field in self.fields:
+            try:
+                data[field.field_name] = self._render(field, action)
+            except SkipField:
+                continue
+        return ActionAcceptedData(**data)
+
+    def _use_context(self) -> None:
+        context = self.context
+        if context.get("request") is not self.serializer.context.get("request"):
+            # absolute image urls depend on the request
+            self.serializer._context = context
+            self._cycle_cache = {}
+
+    def _render(self, field, action: CharacterAction):
+        name = field.field_name
+        if name in self.cycle_cached_fields:
+            cache = self._cycle_cache
+        elif name in self.batch_cached_fields and self._batch_cache is not None:
+            cache = self._batch_cache
+        else:
+            return render_field(field, action)
+        key = (name, getattr(action, f"{field.source}_id"))
+        if key in cache:
+            self.hits += 1
+            return cache[key]
+        self.misses += 1
+        cache[key] = value = render_field(field, action)
+        return value
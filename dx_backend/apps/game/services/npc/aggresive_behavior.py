@@ -114,17 +114,15 @@ class AggressiveBehaviorService(BaseBehaviorService):
         # Make attack action here
         if not self.has_targets():
             return None
-        learned_skill = self.character.learned_skills.filter(
-            skill__type=SkillTypes.ATTACK,
-        ).select_related('skill').order_by('skill__grade', 'is_base')
-        if not learned_skill:
+        learned_skills = self.get_learned_skills(SkillTypes.ATTACK)
+        if not learned_skills:
             return None
         # select most suitable by action points
-        for skill in learned_skill:
-            for cost in skill.skill.cost:
+        for skill in learned_skills:
+            for cost in skill.cost:
                 if cost["kind"] == AttributeType.ACTION_POINTS:
                     if cost["value"] <= self.character_svc.get_current_ap():
-                        return self.make_skill_action(skill.skill, self.visible_targets)
+                        return self.make_skill_action(skill, self.visible_targets)
 
     def has_targets(self) -> bool:
         return bool(self.visible_targets)
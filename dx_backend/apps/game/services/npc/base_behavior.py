@@ -4,9 +4,9 @@ import typing as t
 from apps.action.models import CharacterAction, Cycle
 from apps.character.models import Character
 from apps.core.models import SkillTypes, GameObject
+from apps.game.services.catalog import SkillDefinition, game_catalog, get_game_catalog
 from apps.game.services.character.core import CharacterService
 from apps.game.services.npc.behavior import BehaviorServiceProtocol
-from apps.school.models import Skill
 
 
 class BaseBehaviorService(BehaviorServiceProtocol):
@@ -21,6 +21,20 @@ class BaseBehaviorService(BehaviorServiceProtocol):
         self._scheduled_heal = False
         self._scheduled_shield = False
         self._scheduled_energy = False
+        self._learned_skills: t.Optional[t.List[t.Tuple[SkillDefinition, bool]]] = None
+
+    def get_learned_skills(self, skill_type: SkillTypes) -> t.List[SkillDefinition]:
+        """
+        Learned skills of the type ordered by grade, base skills last, loaded once per behavior.
+        """
+        if self._learned_skills is None:
+            self._learned_skills = [
+                (game_catalog.skill(skill_id), is_base)
+                for skill_id, is_base in self.character.learned_skills.values_list("skill_id", "is_base")
+            ]
+        learned = [(skill, is_base) for skill, is_base in self._learned_skills if skill.type == skill_type]
+        learned.sort(key=lambda entry: (entry[0].grade, entry[1]))
+        return [skill for skill, _ in learned]
 
     def behave(self) -> None:
         last_ap = self.character_svc.get_current_ap()
@@ -57,11 +71,11 @@ class BaseBehaviorService(BehaviorServiceProtocol):
     def make_self_heal_action(self) -> t.Optional[CharacterAction]:
         return self.make_heal_action([self.character])
 
-    def make_skill_action(self, skill: Skill, targets: [GameObject]) -> CharacterAction:
+    def make_skill_action(self, skill: SkillDefinition, targets: [GameObject]) -> CharacterAction:
         action = CharacterAction.objects.create(
             action_type=CharacterAction.ActionType.USE_SKILL,
             initiator=self.character,
-            skill=skill,
+            skill_id=skill.id,
             position=self.character.position,
             cycle=Cycle.objects.current(campaign=self.character.campaign),
         )
@@ -72,46 +86,36 @@ class BaseBehaviorService(BehaviorServiceProtocol):
         return action
 
     def has_heal_skill(self) -> bool:
-        return self.character.learned_skills.filter(
-            skill__type=SkillTypes.HEAL,
-        ).exists()
+        return bool(self.get_learned_skills(SkillTypes.HEAL))
 
     def has_shield_skill(self) -> bool:
-        return self.character.learned_skills.filter(
-            skill__type=SkillTypes.DEFENSE,
-        ).exists()
+        return bool(self.get_learned_skills(SkillTypes.DEFENSE))
 
     def has_energy_skill(self) -> bool:
-        return Skill.objects.filter(
-            name="Flow Accumulation").exists()
+        return "Flow Accumulation" in get_game_catalog().skills_by_name
 
     def make_heal_action(self, targets: [Character]) -> t.Optional[CharacterAction]:
         self._scheduled_heal = True
         # Make heal action here
-        learned_skill = self.character.learned_skills.select_related('skill').filter(
-            skill__type=SkillTypes.HEAL,
-        ).order_by('skill__grade', "is_base").first()
-        if not learned_skill:
+        learned_skills = self.get_learned_skills(SkillTypes.HEAL)
+        if not learned_skills:
             return None
         target = random.choice(targets)
-        return self.make_skill_action(learned_skill.skill, [target])
+        return self.make_skill_action(learned_skills[0], [target])
 
     def make_shield_action(self, targets: [Character]) -> t.Optional[CharacterAction]:
         self._scheduled_shield = True
         # Make shield action here
-        learned_skill = self.character.learned_skills.filter(
-            skill__type=SkillTypes.DEFENSE,
-        ).select_related('skill').order_by('skill__grade', "is_base").first()
-        if not learned_skill:
+        learned_skills = self.get_learned_skills(SkillTypes.DEFENSE)
+        if not learned_skills:
             return None
         target = random.choice(targets)
-        return self.make_skill_action(learned_skill.skill, [target])
+        return self.make_skill_action(learned_skills[0], [target])
 
     def make_energy_action(self, targets: [Character]) -> t.Optional[CharacterAction]:
         self._scheduled_energy = True
         # Make energy action here
-        learned_skill = Skill.objects.filter(
-            name="Flow Accumulation").first()
+        learned_skill = get_game_catalog().skills_by_name.get("Flow Accumulation")
         if not learned_skill:
             return None
         target = random.choice(targets)
@@ -124,13 +128,11 @@ class BaseBehaviorService(BehaviorServiceProtocol):
         """
         Create a buff action targeting the specified ally.
         """
-        learned_skill = self.character.learned_skills.filter(
-            skill__type=SkillTypes.BUFF,
-        ).select_related('skill').order_by('skill__grade').first()
-        if not learned_skill:
+        learned_skills = self.get_learned_skills(SkillTypes.BUFF)
+        if not learned_skills:
             return None
         target = random.choice(targets)
-        return self.make_skill_action(learned_skill.skill, [target])
+        return self.make_skill_action(learned_skills[0], [target])
 
     def make_self_buff_action(self) -> t.Optional[CharacterAction]:
         """
@@ -142,9 +144,7 @@ class BaseBehaviorService(BehaviorServiceProtocol):
         """
         Check if the NPC has any buff skills.
         """
-        return self.character.learned_skills.filter(
-            skill__type=SkillTypes.BUFF,
-        ).exists()
+        return bool(self.get_learned_skills(SkillTypes.BUFF))
 
     def has_targets(self) -> bool:
         return False
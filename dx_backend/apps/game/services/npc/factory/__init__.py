@@ -1,4 +1,5 @@
 from .interface import NPCFactoryConfig, NPCFactoryProtocol
 from .default import NPCFactory
+from .plan import NPCSpawn, NPCSpawnPlan
 
-__all__ = ['NPCFactoryConfig', 'NPCFactoryProtocol', 'NPCFactory']
+__all__ = ['NPCFactoryConfig', 'NPCFactoryProtocol', 'NPCFactory', 'NPCSpawn', 'NPCSpawnPlan']
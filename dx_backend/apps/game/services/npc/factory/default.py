@@ -5,16 +5,19 @@ from django.db import transaction
 
 from apps.character.models import Character, CharacterTemplate, CharacterStatsTemplate, CharacterStatTemplate, CharacterBiographyTemplate, CharacterSchoolTemplate, CharacterModifierTemplate, CharacterEquipmentTemplate, CharacterSkillTemplate, CharacterBiography
 from apps.character.models.player import StatModifier
+from apps.core.bus import event_bus
 from apps.core.models import CharacterStats, CharacterBio
 from apps.game.services.character.character_clone import CharacterCloner
 from apps.game.services.character.core import CharacterService
 from apps.game.services.items.world_item import default_world_item_factory
+from apps.game.services.notifier.base import BaseNotifier
 from apps.game.services.npc.rank import NpcRankService
-from apps.game.services.npc.stats import StatsApplier
+from apps.game.services.npc.stats import StatsApplier, get_character_class
 from apps.skills.models import LearnedSchool, LearnedSkill
 from apps.items.models import CharacterItem
-from apps.world.models import Position, SubLocation, Dimension
+from apps.world.models import Dimension
 from .interface import NPCFactoryConfig, NPCFactoryProtocol
+from .plan import NPCSpawn, NPCSpawnPlan, get_default_npc_position
 from ...character.character_items import default_items_svc_factory
 
 
@@ -23,7 +26,8 @@ class NPCFactory(NPCFactoryProtocol):
 
     logger = logging.getLogger("services.npc.factory")
 
-    def __init__(self):
+    def __init__(self, notify: t.Optional["BaseNotifier"] = None):
+        self.notify = notify or BaseNotifier(event_bus)
         self.logger.info("NPCFactory initialized")
 
     def create_template_from_npc(self, npc: Character, template_name: str = None) -> CharacterTemplate:
@@ -291,8 +295,13 @@ class NPCFactory(NPCFactoryProtocol):
             raise ValueError("Count must be greater than 0")
 
         self.logger.info(f"Creating {count} NPCs with config: {config}")
-        npcs = []
+        if config.template:
+            # the template is compiled once and all NPCs are inserted table by table
+            plan = self.compile(config)
+            names = [f"{config.name} {i + 1}" if config.name else config.template.name for i in range(count)]
+            return plan.create([NPCSpawn(name, config.campaign, config.position) for name in names], self.notify)
 
+        npcs = []
         for i in range(count):
             # Create a copy of the config to avoid modifying the original
             npc_config = NPCFactoryConfig(
@@ -317,17 +326,16 @@ class NPCFactory(NPCFactoryProtocol):
 
         return npcs
 
+    def compile(self, config: NPCFactoryConfig) -> NPCSpawnPlan:
+        """Compile a template config into a plan that creates any number of NPCs in bulk."""
+        return NPCSpawnPlan.compile(config)
+
     def _create_from_template(self, config: NPCFactoryConfig) -> Character:
         """Create an NPC from a CharacterTemplate."""
         self.logger.info(f"Creating NPC from template: {config.template.name}")
 
         # Create a new character
-        default_pos, _ = Position.objects.get_or_create(
-            grid_x=1999,
-            grid_y=42,
-            grid_z=13,
-            sub_location=SubLocation.objects.first()
-        )
+        default_pos = get_default_npc_position() if not config.position else None
         npc = Character.objects.create(
             owner=None,  # NPCs don't have owners
             name=config.name or config.template.name,
@@ -409,18 +417,7 @@ class NPCFactory(NPCFactoryProtocol):
         self.logger.info(f"Applying rank {grade}-{grade_rank} to NPC: {npc.name}")
 
         # Use the specified character class or a default balanced class
-        if character_class:
-            # Convert string stat names to CharacterStats enum values
-            class_priorities = [(getattr(CharacterStats, stat_name), priority)
-                                for stat_name, priority in character_class]
-        else:
-            # Default to a balanced character class
-            class_priorities = [
-                (CharacterStats.PHYSICAL_STRENGTH, 3),
-                (CharacterStats.SPEED, 3),
-                (CharacterStats.KNOWLEDGE, 3),
-                (CharacterStats.FLOW_MANIPULATION, 3),
-            ]
+        class_priorities = get_character_class(character_class)
 
         # Create a stats applier with the character class
         stats_applier = StatsApplier(class_priorities)
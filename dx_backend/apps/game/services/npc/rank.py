@@ -1,3 +1,5 @@
+import typing as t
+
 from apps.character.models import Rank
 from .stats import StatsApplier
 
@@ -7,10 +9,15 @@ class NpcRankService:
     def __init__(self, applier: StatsApplier):
         self.applier = applier
 
-    def rank_npc(self, npc, grade: int, grade_rank: int):
-        current_ncp_rank = npc.rank
+    def get_rank(self, current_rank: Rank, grade: int, grade_rank: int) -> t.Tuple[Rank, int]:
+        """
+        Return the new rank and the stat points gained by moving to it from the current rank.
+        """
         new_npc_rank = Rank.objects.get(grade=grade, grade_rank=grade_rank)
-        spent_skill_points = Rank.objects.get_skill_points(current_ncp_rank.grade, new_npc_rank.grade)
+        return new_npc_rank, Rank.objects.get_skill_points(current_rank.grade, new_npc_rank.grade)
+
+    def rank_npc(self, npc, grade: int, grade_rank: int):
+        new_npc_rank, spent_skill_points = self.get_rank(npc.rank, grade, grade_rank)
         self.applier.spend_stat_points(npc, spent_skill_points)
         npc.rank = new_npc_rank
         npc.experience = new_npc_rank.experience_needed + 1
@@ -30,6 +30,22 @@ balanced_character_class = [
     (CharacterStats.LUCK, 1),
 ]
 
+default_character_class = [
+    (CharacterStats.PHYSICAL_STRENGTH, 3),
+    (CharacterStats.SPEED, 3),
+    (CharacterStats.KNOWLEDGE, 3),
+    (CharacterStats.FLOW_MANIPULATION, 3),
+]
+
+
+def get_character_class(character_class: t.Optional[t.List[t.Tuple[str, int]]] = None) -> t.List[T_StatPriority]:
+    """
+    Convert a character class given by stat member names, e.g. `("SPEED", 3)`, to stat priorities.
+    """
+    if not character_class:
+        return default_character_class
+    return [(getattr(CharacterStats, stat_name), priority) for stat_name, priority in character_class]
+
 
 class StatsApplier:
     logger = logging.getLogger("services.npc.stats")
@@ -38,36 +54,40 @@ class StatsApplier:
         self.priorities = priorities
         self.logger.info(f"StatsApplier initialized with priorities: {self.priorities}")
 
-    def spend_stat_points(self, character: Character, points: int):
+    def allocate(self, points: int) -> t.Dict[CharacterStats, int]:
         """
-        Spend points on stats based on the priorities
+        Split points between the stats by priority, the remainder goes to the highest priority stat.
         """
-        self.logger.info(f"Starting stat allocation for character: {character.name} with {points} points.")
         sum_priorities = sum(priority[1] for priority in self.priorities)
         if sum_priorities == 0:
             self.logger.warning("Sum of priorities is zero. No points will be allocated.")
-            return
+            return {}
 
         points_per_priority = points // sum_priorities
         self.logger.debug(f"Calculated points per priority unit: {points_per_priority}")
 
+        allocation: t.Dict[CharacterStats, int] = {}
         for stat_name, priority in self.priorities:
             additional_value = int(points_per_priority * priority)
-            stat, _ = character.stats.get_or_create(name=stat_name)
-            self.logger.debug(f"Allocating {additional_value} points to stat '{stat_name}' "
-                              f"(current value: {stat.additional_value}).")
-            stat.additional_value += additional_value
-            stat.save(update_fields=['additional_value', 'updated_at'])
+            allocation[stat_name] = allocation.get(stat_name, 0) + additional_value
             points -= additional_value
-            self.logger.info(f"{additional_value} points allocated to '{stat_name}'. Remaining points: {points}.")
 
         if points > 0:
             stat_name, _ = max(self.priorities, key=lambda x: x[1])
+            allocation[stat_name] = allocation.get(stat_name, 0) + points
+            self.logger.debug(f"Remaining {points} points allocated to highest priority stat '{stat_name}'.")
+        return allocation
+
+    def spend_stat_points(self, character: Character, points: int):
+        """
+        Spend points on stats based on the priorities
+        """
+        self.logger.info(f"Starting stat allocation for character: {character.name} with {points} points.")
+        for stat_name, additional_value in self.allocate(points).items():
             stat, _ = character.stats.get_or_create(name=stat_name)
-            self.logger.debug(f"Allocating remaining {points} points to highest priority stat '{stat_name}' "
+            self.logger.debug(f"Allocating {additional_value} points to stat '{stat_name}' "
                               f"(current value: {stat.additional_value}).")
-            stat.additional_value += points
+            stat.additional_value += additional_value
             stat.save(update_fields=['additional_value', 'updated_at'])
-            self.logger.info(f"Remaining {points} points allocated to '{stat_name}'.")
 
         self.logger.info(f"Stat allocation complete for character: {character.name}.")
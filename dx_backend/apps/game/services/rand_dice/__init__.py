@@ -1,11 +1,12 @@
-import hashlib
 import logging
 import random
-import time
-from collections import Counter
-from typing import Protocol
+from typing import Protocol, TYPE_CHECKING
 
 from apps.core.models import RollOutcome, DiceRollResult
+from .streams import DiceStreams, get_dice_streams, get_random
+
+if TYPE_CHECKING:
+    import numpy
 
 
 class CharacterProtocol(Protocol):
@@ -27,22 +28,54 @@ class DiceService:
         self.random_gen = self.create_random_gen_for_character()
         self.logger.debug(f"Created dice service d{sides} for character {self.character.pk} with luck {self.luck}")
 
-    def create_random_gen_for_character(self):
-        # Create a unique seed based on the character's unique ID and possibly other factors
-        unique_string = str(self.character.pk) + str(self.luck + time.time())
-        seed = int(hashlib.md5(unique_string.encode()).hexdigest(), 16) % (2 ** 32 - 1)
-        return random.Random(seed)
+    def create_random_gen_for_character(self) -> random.Random:
+        # the character substream of the played cycle, see `DiceStreams`
+        return get_random(self.character.pk)
+
+    @property
+    def luck_adjustment(self) -> float:
+        return (self.luck - self.base_luck) / self.base_luck * 1.3
 
     def roll(self) -> int:
 
         base_roll = self.random_gen.randint(1, self.sides)
         # Adjust the roll based on luck
-        luck_adjustment = (self.luck - self.base_luck) / self.base_luck * 1.3
+        luck_adjustment = self.luck_adjustment
         adjusted_roll = base_roll + (luck_adjustment * self.random_gen.randint(0, 1))
         adjusted_roll = max(self.min_value, min(self.sides, round(adjusted_roll)))
         self.logger.debug(f"Character {self.character.pk} rolled {adjusted_roll} luck adjustment {luck_adjustment}")
         return adjusted_roll
 
+    def roll_many(self, count: int) -> "numpy.ndarray":
+        """
+        `count` rolls at once with the distribution of `roll`, for simulations. Requires NumPy.
+
+        The NumPy generator is seeded from the character stream, so the rolls are reproducible like single rolls.
+        """
+        np = _numpy()
+        generator = np.random.default_rng(self.random_gen.getrandbits(64))
+        base_rolls = generator.integers(1, self.sides, size=count, endpoint=True)
+        luck_rolls = generator.integers(0, 1, size=count, endpoint=True)
+        # rint rounds half to even like `round`
+        adjusted = np.rint(base_rolls + self.luck_adjustment * luck_rolls)
+        return np.clip(adjusted, self.min_value, self.sides).astype(np.int64)
+
+    def multipliers(self, rolls: "numpy.ndarray") -> "numpy.ndarray":
+        """Multipliers of `_calculate_multiplier` for an array of rolls."""
+        np = _numpy()
+        middle = (self.min_value + self.sides) / 2
+        return np.select(
+            [
+                rolls == self.min_value,
+                rolls == self.sides,
+                (self.min_value < rolls) & (rolls < middle - 0.5),
+                (middle - 0.25 <= rolls) & (rolls <= middle + 0.25),
+                (middle + 0.5 < rolls) & (rolls < self.sides),
+            ],
+            [0.5, 2.0, 0.75, 1.0, 1.25],
+            default=1.0,
+        )
+
     def _calculate_multiplier(self) -> tuple[int, float, RollOutcome]:
         """
         The multiplier is calculated as follows and adjusted by character's luck:
@@ -99,32 +132,12 @@ class DiceService:
         Returns:
             bool: True if the roll is successful, False otherwise
         """
-        return random.random() <= chance
+        return get_random().random() <= chance
 
 
-if __name__ == '__main__':
-    def check_luck(luck: int, sides: int, count: int = 10_000):
-        """
-        Check the luck of the character
-        """
-        print(f"\n------------------------------------------\n"
-              f"Checking luck for character with luck {luck} and dice with {sides} sides",
-              "\n------------------------------------------")
-        character = type("Character", (), {"id": "character_id"})
-        dice_service = DiceService(character, luck, sides)
-        outcome_results = Counter()
-
-        for _ in range(count):
-            roll, multiplier, outcome = dice_service.multiplier_roll()
-            outcome_results[outcome] += 1
-
-        # Print the results
-        for outcome in RollOutcome:
-            print(f"{outcome.value}: {outcome_results[outcome]} times")
-
-
-    count = 100_000
-    check_luck(5, 6, count)
-    check_luck(10, 6, count)
-    check_luck(15, 6, count)
-    check_luck(20, 6, count)
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Batched dice rolls require NumPy, install it with `pip install numpy`") from e
+    return numpy
@@ -0,0 +1,88 @@
+import hashlib
+import random
+import threading
+import typing as t
+from contextlib import contextmanager
+
+from django.conf import settings
+
+if t.TYPE_CHECKING:
+    from apps.action.models import Cycle
+
+_thread_locals = threading.local()
+
+
+def get_dice_streams() -> t.Optional["DiceStreams"]:
+    """
+    Return the dice streams activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'dice_streams', None)
+
+
+def derive_seed(*parts) -> int:
+    """64 bit seed from the given parts, the same parts give the same seed in every process."""
+    material = ":".join(str(part) for part in parts).encode()
+    return int.from_bytes(hashlib.blake2b(material, digest_size=8).digest(), "big")
+
+
+def _default_random() -> random.Random:
+    """Unseeded generator of the current thread, used outside of a played cycle."""
+    generator = getattr(_thread_locals, 'default_random', None)
+    if generator is None:
+        generator = _thread_locals.default_random = random.Random()
+    return generator
+
+
+class DiceStreams:
+    """
+    Seeded random streams of one campaign cycle.
+
+    Every character rolls from its own substream, derived from the cycle seed and the character id, so the rolls
+    of a character do not depend on how many times other characters rolled before. Replaying a cycle with the
+    same seed gives the same rolls. Rolls that do not belong to a character use the `shared` stream.
+    """
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.shared = random.Random(derive_seed(seed, "shared"))
+        self._streams: t.Dict[str, random.Random] = {}
+
+    @classmethod
+    def for_cycle(cls, cycle: "Cycle") -> "DiceStreams":
+        return cls(derive_seed(cls.root_seed(), cycle.campaign_id, cycle.number))
+
+    @staticmethod
+    def root_seed() -> str:
+        # the secret key keeps the rolls unpredictable for players unless an explicit seed is configured
+        return getattr(settings, "DICE", {}).get("SEED") or settings.SECRET_KEY
+
+    def for_character(self, pk) -> random.Random:
+        key = str(pk)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = random.Random(derive_seed(self.seed, key))
+        return stream
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the streams visible for the current thread, nested activation restores the previous ones on exit.
+        """
+        previous = get_dice_streams()
+        _thread_locals.dice_streams = self
+        try:
+            yield self
+        finally:
+            _thread_locals.dice_streams = previous
+
+
+def get_random(pk=None) -> random.Random:
+    """
+    Generator for rolls of the character `pk`, or for rolls without a character.
+
+    Inside a played cycle the seeded streams of the cycle are used, otherwise an unseeded generator of the thread.
+    """
+    streams = get_dice_streams()
+    if streams is None:
+        return _default_random()
+    return streams.shared if pk is None else streams.for_character(pk)
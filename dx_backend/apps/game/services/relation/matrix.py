@@ -0,0 +1,183 @@
+import logging
+import typing as t
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from apps.character.models import Organization, OrganizationRelation, CharacterRelation, Character
+from apps.core.models import BehaviorModel
+from apps.game.services.relation.service import RelationshipCalculator
+
+
+class RelationMatrix:
+    """
+    Relations between a fixed group of characters and their organizations, loaded with two queries.
+
+    Reads and writes follow the rules of `OrganizationRelationService` and `CharacterRelationService`:
+    missing relations get the same defaults, immutable relations are never changed and organization relations
+    are recalculated from character relations after a change. Nothing is written until `save`, which stores
+    new relations with one `bulk_create` per model and changed ones with one `bulk_update`.
+
+    Matrices of different positions may share organizations and are saved concurrently by the parallel NPC
+    scheduler, so organization relations rely on their unique pair: a default relation already created by
+    another matrix is kept, a recalculated one overwrites it.
+    """
+    logger = logging.getLogger("game.services.relation.matrix")
+
+    def __init__(self, characters: t.Iterable[Character]):
+        self.characters = {character.id: character for character in characters}
+        self.organizations: dict = {
+            character.organization_id: character.organization
+            for character in self.characters.values()
+            if character.organization_id
+        }
+        self._org_relations: dict[tuple, OrganizationRelation] = {}
+        self._relations: dict[tuple, CharacterRelation] = {}
+        self._new_org_relations: list[OrganizationRelation] = []
+        self._new_relations: list[CharacterRelation] = []
+        self._changed_relations: dict[tuple, CharacterRelation] = {}
+        self._affected_org_pairs: set[tuple] = set()
+
+    def load(self) -> "RelationMatrix":
+        for relation in OrganizationRelation.objects.filter(
+                organization_from_id__in=self.organizations, organization_to_id__in=self.organizations):
+            self._org_relations.setdefault((relation.organization_from_id, relation.organization_to_id), relation)
+        for relation in CharacterRelation.objects.filter(
+                character_from_id__in=self.characters, character_to_id__in=self.characters):
+            self._relations.setdefault((relation.character_from_id, relation.character_to_id), relation)
+        self.logger.debug(
+            f"Loaded {len(self._org_relations)} organization and {len(self._relations)} character relations "
+            f"for {len(self.characters)} characters"
+        )
+        return self
+
+    def org_relation(self, organization: t.Optional[Organization], target: t.Optional[Organization]) -> BehaviorModel:
+        """Same as `OrganizationRelationService.get_relation_to`."""
+        if organization is None or target is None or organization.id == target.id:
+            return BehaviorModel.PASSIVE
+        key = (organization.id, target.id)
+        relation = self._org_relations.get(key)
+        if relation is None:
+            relation = OrganizationRelation(
+                organization_from=organization,
+                organization_to=target,
+                type=BehaviorModel.AGGRESSIVE if target.behavior == BehaviorModel.AGGRESSIVE else BehaviorModel.PASSIVE,
+            )
+            self._org_relations[key] = relation
+            self._new_org_relations.append(relation)
+        return relation.type
+
+    def relation(self, character: Character, target: Character) -> BehaviorModel:
+        """Same as `CharacterRelationService.get_relation_to`."""
+        if character.id == target.id or character.organization_id == target.organization_id:
+            return BehaviorModel.FRIENDLY
+        return self._get_or_create_relation(character, target).type
+
+    def set_relation(self, character: Character, target: Character, relation_type: BehaviorModel) -> bool:
+        """
+        Same as `CharacterRelationService.set_relation_to`.
+
+        :return: False when the relation is immutable
+        """
+        relation = self._get_or_create_relation(character, target)
+        if relation.immutable:
+            return False
+        if relation.type == relation_type:
+            return True
+        relation.type = relation_type
+        if relation.pk:
+            self._changed_relations[(character.id, target.id)] = relation
+        if character.organization_id and target.organization_id \
+                and character.organization_id != target.organization_id:
+            self._affected_org_pairs.add((character.organization_id, target.organization_id))
+        return True
+
+    def _get_or_create_relation(self, character: Character, target: Character) -> CharacterRelation:
+        key = (character.id, target.id)
+        relation = self._relations.get(key)
+        if relation is None:
+            relation = CharacterRelation(
+                character_from=character,
+                character_to=target,
+                type=self._initial_relation_type(character, target),
+            )
+            self._relations[key] = relation
+            self._new_relations.append(relation)
+        return relation
+
+    def _initial_relation_type(self, character: Character, target: Character) -> BehaviorModel:
+        relation_type = character.behavior
+        if relation_type != BehaviorModel.AGGRESSIVE:
+            if character.organization_id and target.organization_id \
+                    and character.organization_id != target.organization_id:
+                if self.org_relation(character.organization, target.organization) == BehaviorModel.AGGRESSIVE:
+                    relation_type = BehaviorModel.AGGRESSIVE
+            if target.behavior == BehaviorModel.AGGRESSIVE:
+                relation_type = BehaviorModel.AGGRESSIVE
+        return relation_type
+
+    def save(self) -> None:
+        if not (self._new_org_relations or self._new_relations or self._changed_relations):
+            return
+        with transaction.atomic():
+            if self._new_org_relations:
+                OrganizationRelation.objects.bulk_create(self._new_org_relations, ignore_conflicts=True)
+            if self._new_relations:
+                CharacterRelation.objects.bulk_create(self._new_relations)
+            if self._changed_relations:
+                CharacterRelation.objects.bulk_update(self._changed_relations.values(), ["type"])
+            self.logger.debug(
+                f"Saved {len(self._new_org_relations)} new organization relations, {len(self._new_relations)} new "
+                f"and {len(self._changed_relations)} changed character relations"
+            )
+            self._new_org_relations, self._new_relations, self._changed_relations = [], [], {}
+            if self._affected_org_pairs:
+                self._recalculate_org_relations()
+
+    def _recalculate_org_relations(self) -> None:
+        """
+        Set-based `OrganizationRelationService.recalculate_relation_with` for every organization pair
+        that had a character relation changed.
+        """
+        pairs, self._affected_org_pairs = self._affected_org_pairs, set()
+        organization_ids = {org_id for pair in pairs for org_id in pair}
+
+        members = dict(
+            Character.objects.filter(organization_id__in=organization_ids)
+            .values("organization_id").annotate(count=Count("id")).values_list("organization_id", "count")
+        )
+        counts = defaultdict(lambda: defaultdict(int))
+        for row in CharacterRelation.objects.filter(
+                character_from__organization_id__in=organization_ids,
+                character_to__organization_id__in=organization_ids,
+        ).values("character_from__organization_id", "character_to__organization_id", "type").annotate(count=Count("id")):
+            pair = (row["character_from__organization_id"], row["character_to__organization_id"])
+            counts[pair][row["type"]] += row["count"]
+
+        changed, created = [], []
+        for pair in pairs:
+            relation = self._org_relations.get(pair)
+            if relation is not None and relation.immutable:
+                continue
+            aggressive = counts[pair][BehaviorModel.AGGRESSIVE]
+            friendly = counts[pair][BehaviorModel.FRIENDLY]
+            # characters without explicit relations count as passive
+            passive = members.get(pair[0], 0) * members.get(pair[1], 0) - aggressive - friendly
+            new_type = RelationshipCalculator.determine_relation_from_counts(aggressive, friendly, passive)
+            if relation is None or relation.pk is None:
+                # also relations created by `save` without a primary key, they may belong to another matrix
+                relation = OrganizationRelation(organization_from_id=pair[0], organization_to_id=pair[1], type=new_type)
+                self._org_relations[pair] = relation
+                created.append(relation)
+            elif relation.type != new_type:
+                relation.type = new_type
+                changed.append(relation)
+        if created:
+            OrganizationRelation.objects.bulk_create(
+                created, update_conflicts=True, unique_fields=["organization_from", "organization_to"],
+                update_fields=["type"],
+            )
+        if changed:
+            OrganizationRelation.objects.bulk_update(changed, ["type"])
+        self.logger.debug(f"Recalculated {len(pairs)} organization relations, {len(changed) + len(created)} changed")
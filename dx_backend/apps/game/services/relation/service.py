@@ -97,13 +97,14 @@ class OrganizationRelationService:
             else BehaviorModel.PASSIVE
         )
 
-        OrganizationRelation.objects.create(
+        # another process may have created the relation meanwhile, the pair is unique
+        relation, _ = OrganizationRelation.objects.get_or_create(
             organization_from=self.organization,
             organization_to=target_organization,
-            type=relation_type
+            defaults={"type": relation_type},
         )
 
-        return relation_type
+        return relation.type
 
     @transaction.atomic
     def recalculate_relation_with(self, target_organization: Organization) -> BehaviorModel:
@@ -1,20 +1,44 @@
+import logging
+import typing as t
+
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
 from apps.action.models import DiceRollResult
 from apps.core.models import GameObject
 from apps.game.dto.impact import CalculatedImpact
 from apps.shields.models import ActiveShield
+from .state import CycleShieldState, get_shield_state
 
 
 class ActiveShieldLifeCycleService:
+    """
+    Decreases the cycles left of the active shields once per cycle with one update, expired shields are removed
+    with one delete.
+    """
+    logger = logging.getLogger("game.services.shield.lifecycle")
+    model = ActiveShield
 
-    def __init__(self, shields: [ActiveShield]):
+    def __init__(self, shields: t.Union[QuerySet, t.Iterable[ActiveShield]]):
         self.active_shields = shields
 
-    def decrease_cycles(self):
-        for shield in self.active_shields:
-            shield.cycles_left -= 1
-            shield.save()
-            if shield.cycles_left <= 0:
-                shield.delete()
+    def get_queryset(self) -> QuerySet:
+        if isinstance(self.active_shields, QuerySet):
+            return self.active_shields
+        return self.model.objects.filter(pk__in=[shield.pk for shield in self.active_shields])
+
+    def decrease_cycles(self) -> t.List[t.Any]:
+        """
+        :return: ids of the expired and removed shields
+        """
+        shields = self.get_queryset()
+        # shields in their last cycle expire now, the default manager would not see them after the decrease
+        expired_ids = list(shields.filter(cycles_left__lte=1).values_list("pk", flat=True))
+        if expired_ids:
+            self.model.objects.unsafe_all().filter(pk__in=expired_ids).delete()
+            self.logger.debug(f"Removed {len(expired_ids)} expired shields")
+        shields.filter(cycles_left__gt=1).update(cycles_left=F("cycles_left") - 1, updated_at=timezone.now())
+        return expired_ids
 
 
 class ShieldAssessmentService:
@@ -23,20 +47,23 @@ class ShieldAssessmentService:
         self.target = target
 
     def assign_shield(self, calculated_impact: CalculatedImpact, dice_result: DiceRollResult):
-        self.target.shields.update_or_create(
+        shield, _ = self.target.shields.update_or_create(
             shield_id=calculated_impact.get('violation'),
             defaults={
                 'health': calculated_impact.get('value', 15),
                 'cycles_left': min(dice_result.dice_side, 5)
             }
         )
+        state = get_shield_state()
+        if state:
+            state.put(shield)
 
 
 class ActiveShieldImpactService:
 
     def __init__(self, shields: [ActiveShield]):
         self.map = {
-            shield.shield.id: shield for shield in shields
+            shield.shield_id: shield for shield in shields
         }
 
     def apply_impact(self, impact: CalculatedImpact) -> CalculatedImpact:
@@ -51,12 +78,20 @@ class ActiveShieldImpactService:
 
     def impact_shield(self, shield: ActiveShield, value: int) -> int:
         shield.health -= value
+        # inside a cycle the shield changes are written once by `CycleShieldState.flush`
+        state = get_shield_state()
 
         if shield.health < 0:
-            shield.delete()
-            self.map.pop(shield.shield.id)
+            self.map.pop(shield.shield_id)
+            if state:
+                state.mark_broken(shield)
+            else:
+                shield.delete()
             return abs(shield.health)
-        shield.save(
-            update_fields=['health', 'updated_at']
-        )
+        if state:
+            state.mark_dirty(shield)
+        else:
+            shield.save(
+                update_fields=['health', 'updated_at']
+            )
         return 0
@@ -0,0 +1,128 @@
+import logging
+import threading
+import typing as t
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+from apps.shields.models import ActiveShield
+
+_thread_locals = threading.local()
+
+
+def get_shield_state() -> t.Optional["CycleShieldState"]:
+    """
+    Return the shield state activated for the current thread, if any.
+    """
+    return getattr(_thread_locals, 'shield_state', None)
+
+
+class CycleShieldState:
+    """
+    In-memory active shields of the characters hit during a cycle.
+
+    While the state is active `CharacterService.get_shields` returns the same shield instances for a character
+    every time, `ActiveShieldImpactService` changes their health in memory and `flush` writes all changed shields
+    with one `bulk_update` and deletes the broken ones with one delete. Hits inside a failed `savepoint` block are
+    undone.
+    """
+    logger = logging.getLogger("game.services.shield.state")
+    model = ActiveShield
+    batch_size = 500
+
+    def __init__(self):
+        self.shields: t.Dict[t.Any, t.Dict[str, ActiveShield]] = {}
+        self.dirty: t.Dict[t.Any, ActiveShield] = {}
+        self.broken: t.Set[t.Any] = set()
+        # shields of the characters touched inside the current savepoint with their health, as they were before
+        self._undo: t.Optional[t.Dict[t.Any, t.Dict[str, t.Tuple[ActiveShield, int]]]] = None
+
+    def load(self, queryset, character_ids: t.Iterable = ()) -> "CycleShieldState":
+        """
+        Load the shields of the queryset, `character_ids` without loaded shields are known to have none.
+        """
+        for character_id in character_ids:
+            self.shields.setdefault(character_id, {})
+        for shield in queryset:
+            self.shields.setdefault(shield.target_id, {}).setdefault(shield.shield_id, shield)
+        return self
+
+    def shields_for(self, character) -> t.List[ActiveShield]:
+        shields = self.shields.get(character.pk)
+        if shields is None:
+            shields = self.shields[character.pk] = {shield.shield_id: shield for shield in character.shields.all()}
+        if self._undo is not None and character.pk not in self._undo:
+            self._undo[character.pk] = {key: (shield, shield.health) for key, shield in shields.items()}
+        return list(shields.values())
+
+    def put(self, shield: ActiveShield) -> None:
+        """Track a shield written to the database, e.g. a newly assigned one."""
+        shields = self.shields.setdefault(shield.target_id, {})
+        if self._undo is not None and shield.target_id not in self._undo:
+            self._undo[shield.target_id] = {key: (known, known.health) for key, known in shields.items()}
+        shields[shield.shield_id] = shield
+        self.dirty.pop(shield.pk, None)
+        self.broken.discard(shield.pk)
+
+    def mark_dirty(self, shield: ActiveShield) -> None:
+        self.dirty[shield.pk] = shield
+
+    def mark_broken(self, shield: ActiveShield) -> None:
+        self.shields.get(shield.target_id, {}).pop(shield.shield_id, None)
+        self.dirty.pop(shield.pk, None)
+        self.broken.add(shield.pk)
+
+    def flush(self) -> t.Tuple[int, int]:
+        """
+        Persist the changed health of the shields and delete the broken ones.
+
+        :return: count of updated and deleted shields
+        """
+        dirty, broken = list(self.dirty.values()), list(self.broken)
+        if dirty:
+            now = timezone.now()
+            for shield in dirty:
+                # bulk_update skips auto_now fields
+                shield.updated_at = now
+            self.model.objects.bulk_update(dirty, ["health", "updated_at"], batch_size=self.batch_size)
+        if broken:
+            self.model.objects.unsafe_all().filter(pk__in=broken).delete()
+        self.dirty.clear()
+        self.broken.clear()
+        if dirty or broken:
+            self.logger.debug(f"Flushed {len(dirty)} shields, deleted {len(broken)} broken shields")
+        return len(dirty), len(broken)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Undo the shield hits of the block when it raises, use it together with a database savepoint.
+        """
+        outer, self._undo = self._undo, {}
+        dirty, broken = dict(self.dirty), set(self.broken)
+        try:
+            yield self
+        except BaseException:
+            for character_id, shields in self._undo.items():
+                for shield, health in shields.values():
+                    shield.health = health
+                self.shields[character_id] = {key: shield for key, (shield, _) in shields.items()}
+            self.dirty, self.broken = dirty, broken
+            raise
+        finally:
+            undo, self._undo = self._undo, outer
+            if outer is not None:
+                for character_id, shields in undo.items():
+                    outer.setdefault(character_id, shields)
+
+    @contextmanager
+    def activate(self):
+        """
+        Make the state visible for the current thread, nested activation restores the previous one on exit.
+        """
+        previous = get_shield_state()
+        _thread_locals.shield_state = self
+        try:
+            yield self
+        finally:
+            _thread_locals.shield_state = previous
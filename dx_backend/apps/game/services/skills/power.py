@@ -70,6 +70,9 @@ class SkillPowerService:
     """
     Service for calculating skill power rating for sorting and comparison purposes.
     This is a fast calculation that doesn't require character stats.
+
+    Skills rated by the balance simulation (`simulate_balance --store`) use the simulated rating instead of the
+    heuristic estimate.
     """
     logger = logging.getLogger("game.services.skill_power")
 
@@ -86,6 +89,10 @@ class SkillPowerService:
         :param force_recalculate: If True, bypasses cache and recalculates.
         :return: A numeric power rating that can be used for sorting skills.
         """
+        simulated_power = getattr(self.skill, 'simulated_power', None)
+        if simulated_power is not None:
+            return simulated_power
+
         # Check cache first (unless forced to recalculate or cache disabled)
         if not force_recalculate and self.use_cache and self.cache:
             cached_power = self.cache.get_power(self.skill.id)
@@ -210,6 +217,7 @@ class SkillPowerService:
         breakdown = {
             'skill_id': self.skill.id,
             'total_power': self.calculate_power_rating(force_recalculate),
+            'simulated': getattr(self.skill, 'simulated_power', None) is not None,
             'impacts': [],
             'resource_costs': {
                 'energy_cost': getattr(self.skill, 'energy_cost', 1),
@@ -0,0 +1,373 @@
+import logging
+import math
+import typing as t
+from dataclasses import dataclass, field
+
+from apps.core.models import CharacterStats, ImpactType, RollOutcome, SkillTypes
+from apps.game.services.cost import CostService
+from apps.game.services.formula.base import FormulaService
+from apps.game.services.rand_dice import DiceService, DiceStreams
+from apps.game.services.rand_dice.streams import derive_seed
+
+if t.TYPE_CHECKING:
+    import numpy
+    from apps.character.models import CharacterTemplate
+    from apps.game.services.character.core import CharacterService
+    from apps.school.models import Skill
+
+# stat value of characters without a stats template, the default of `CharacterStatsTemplate`
+DEFAULT_STAT_VALUE = 10
+
+MULTIPLIER_OUTCOMES = {
+    0.5: RollOutcome.CRITICAL_FAIL,
+    2.0: RollOutcome.CRITICAL_SUCCESS,
+    0.75: RollOutcome.BAD_LUCK,
+    1.0: RollOutcome.BASE_VALUE,
+    1.25: RollOutcome.GOOD_LUCK,
+}
+
+
+@dataclass(frozen=True)
+class SimulatedCharacter:
+    """
+    Combat attributes of a character without the ORM, derived from the stats like `CharacterService` does.
+    """
+    name: str
+    stats: t.Mapping[str, int]
+    dimension_speed: float = 1.0
+
+    @classmethod
+    def reference(cls, name: str = "Reference") -> "SimulatedCharacter":
+        return cls(name, {stat: DEFAULT_STAT_VALUE for stat in CharacterStats})
+
+    @classmethod
+    def from_template(cls, template: "CharacterTemplate") -> "SimulatedCharacter":
+        if template.stats_template is None:
+            stats = {stat: DEFAULT_STAT_VALUE for stat in CharacterStats}
+        else:
+            stats = template.stats_template.get_all_stats()
+        speed = template.dimension.speed if template.dimension else 1.0
+        return cls(template.name, stats, speed)
+
+    @classmethod
+    def from_service(cls, character: "CharacterService") -> "SimulatedCharacter":
+        stats = {stat: character.get_stat(stat) for stat in CharacterStats}
+        return cls(character.character.name, stats, character.character.dimension.speed)
+
+    @property
+    def pk(self) -> str:
+        # dice substreams are keyed by the character
+        return self.name
+
+    def get_stat(self, stat: CharacterStats) -> int:
+        return self.stats.get(stat, 0)
+
+    @property
+    def luck(self) -> int:
+        return self.get_stat(CharacterStats.LUCK)
+
+    @property
+    def max_hp(self) -> int:
+        return round(self.get_stat(CharacterStats.PHYSICAL_STRENGTH) * 7.5)
+
+    @property
+    def max_energy(self) -> int:
+        return 100 + round(self.get_stat(CharacterStats.MENTAL_STRENGTH) * 5.5)
+
+    @property
+    def max_ap(self) -> int:
+        return int(round(self.get_stat(CharacterStats.SPEED) * 0.5 * self.dimension_speed))
+
+
+@dataclass(frozen=True)
+class SimulatedSkill:
+    """
+    Impacts and costs of a skill, from the database or from a skill fixture.
+    """
+    name: str
+    type: str
+    impact: t.List[dict]
+    cost: t.List[dict]
+    school: str = ""
+    id: t.Optional[int] = None
+
+    @classmethod
+    def from_skill(cls, skill: "Skill") -> "SimulatedSkill":
+        school = skill.school.name if skill.school_id else ""
+        return cls(skill.name, skill.type, skill.impact or [], skill.cost or [], school, skill.id)
+
+    @classmethod
+    def from_fixture(cls, data: dict, school: str = "") -> "SimulatedSkill":
+        """
+        Build from a skill fixture entry, either a Django fixture record like `load_skills` reads or bare fields.
+        """
+        fields = data.get("fields", data)
+        impact = fields.get("impact") or []
+        skill_type = fields.get("type") or cls._guess_type(impact)
+        return cls(fields["name"], skill_type, impact, fields.get("cost") or [], str(fields.get("school", school)),
+                   data.get("pk"))
+
+    @staticmethod
+    def _guess_type(impact: t.List[dict]) -> str:
+        kinds = {item["kind"] for item in impact}
+        if ImpactType.DAMAGE in kinds:
+            return SkillTypes.ATTACK
+        if ImpactType.HEAL in kinds:
+            return SkillTypes.HEAL
+        if ImpactType.SHIELD in kinds:
+            return SkillTypes.DEFENSE
+        return SkillTypes.UTILITY
+
+    @property
+    def costs(self) -> CostService:
+        return CostService(self.cost)
+
+    @property
+    def deals_damage(self) -> bool:
+        return any(item["kind"] == ImpactType.DAMAGE for item in self.impact)
+
+
+@dataclass
+class SkillReport:
+    skill: SimulatedSkill
+    trials: int
+    mean_impact: float
+    std_impact: float
+    p5_impact: float
+    p50_impact: float
+    p95_impact: float
+    outcomes: t.Dict[RollOutcome, float]
+    uses_per_cycle: float
+    power_rating: float
+    # only for skills dealing damage, cycles needed to bring the defender down
+    kill_rate: t.Optional[float] = None
+    mean_cycles_to_kill: t.Optional[float] = None
+    p95_cycles_to_kill: t.Optional[float] = None
+    win_rate: t.Optional[float] = None
+    cycles_to_kill: t.Optional["numpy.ndarray"] = field(default=None, repr=False)
+
+
+@dataclass
+class SchoolReport:
+    school: str
+    skills: int
+    mean_power_rating: float
+    mean_impact: float
+    kill_rate: t.Optional[float]
+    win_rate: t.Optional[float]
+
+
+class BalanceSimulator:
+    """
+    Monte Carlo simulation of skill impacts and fights, vectorized with NumPy.
+
+    Impact values are calculated once per attacker with the formula of `SkillImpactService`, the trials only differ
+    in the dice: every use of a skill rolls `DiceService` with the luck of the attacker and scales the impacts by the
+    multiplier like `ImpactAction` does. A fight lasts until the defender health is spent, a critical fail can not
+    kill like in `CharacterService.impacted`, action points limit the uses per cycle and energy the uses per fight.
+    Shields, effects and health costs are not simulated.
+
+    Trials of one attacker and skill roll from their own dice stream derived from `seed`, so the results do not
+    depend on the order skills are evaluated in.
+    """
+    logger = logging.getLogger("game.services.skills.simulation")
+    dice_service_cls = DiceService
+
+    def __init__(self, trials: int = 100_000, seed: int = 0, max_cycles: int = 20, chunk_size: int = 20_000):
+        self.trials = trials
+        self.seed = seed
+        self.max_cycles = max_cycles
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def impact_values(attacker: SimulatedCharacter, skill: SimulatedSkill) -> t.List[int]:
+        """Impact values before the dice, like `SkillImpactService.calculate_damage`."""
+        values = []
+        for impact in skill.impact:
+            formula = impact["formula"]
+            efficiencies = [
+                FormulaService.calculate_efficiency(
+                    attacker.get_stat(requirement["stat"]),
+                    requirement["value"],
+                    scaling["value"],
+                    formula.get("max_efficiency", 3),
+                    formula.get("min_efficiency", 0.01),
+                )
+                for requirement, scaling in zip(formula.get("requires", []), formula.get("scaling", []))
+            ]
+            values.append(int(formula.get("base", 0) * min(efficiencies or [1])))
+        return values
+
+    def uses_per_cycle(self, attacker: SimulatedCharacter, skill: SimulatedSkill) -> int:
+        ap_cost = skill.costs.get_ap_cost()
+        # skills without action points cost are counted once per cycle
+        return attacker.max_ap // ap_cost if ap_cost > 0 else 1
+
+    def uses_per_fight(self, attacker: SimulatedCharacter, skill: SimulatedSkill) -> int:
+        energy_cost = skill.costs.get_ep_cost()
+        per_cycle = self.uses_per_cycle(attacker, skill)
+        uses = self.max_cycles * per_cycle
+        if energy_cost > 0:
+            uses = min(uses, attacker.max_energy // energy_cost)
+        return uses
+
+    def roll_impacts(self, attacker: SimulatedCharacter, skill: SimulatedSkill, dice: DiceService,
+                     shape: t.Tuple[int, ...], kinds: t.Collection[str] = None):
+        """
+        Impacts of `shape` skill uses.
+
+        :return: total impact of every use, rolls of the uses
+        """
+        np = _numpy()
+        rolls = dice.roll_many(math.prod(shape)).reshape(shape)
+        multipliers = dice.multipliers(rolls)
+        total = np.zeros(shape, dtype=np.int64)
+        for impact, value in zip(skill.impact, self.impact_values(attacker, skill)):
+            if kinds is None or impact["kind"] in kinds:
+                # truncated per impact like `ImpactAction._perform_damage`
+                total += np.trunc(abs(value) * multipliers).astype(np.int64)
+        return total, rolls
+
+    def dice(self, attacker: SimulatedCharacter, skill: SimulatedSkill, purpose: str) -> DiceService:
+        """Dice of the attacker rolling from a stream of its own for the skill and the purpose."""
+        with DiceStreams(derive_seed(self.seed, purpose, skill.school, skill.name, attacker.name)).activate():
+            return self.dice_service_cls(attacker, attacker.luck)
+
+    def cycles_to_kill(self, attacker: SimulatedCharacter, skill: SimulatedSkill,
+                       defender: SimulatedCharacter) -> "numpy.ndarray":
+        """
+        Cycles the attacker needs to bring the defender down with the skill in every trial, inf when it can not
+        within `max_cycles`.
+        """
+        np = _numpy()
+        per_cycle = self.uses_per_cycle(attacker, skill)
+        uses = self.uses_per_fight(attacker, skill)
+        if not uses or not skill.deals_damage:
+            return np.full(self.trials, np.inf)
+
+        dice = self.dice(attacker, skill, "fight")
+        chunks = []
+        for start in range(0, self.trials, self.chunk_size):
+            size = min(self.chunk_size, self.trials - start)
+            damage, rolls = self.roll_impacts(attacker, skill, dice, (size, uses), kinds=(ImpactType.DAMAGE,))
+            critical_fail = rolls == dice.min_value
+            use = np.arange(uses)
+
+            crossed = np.cumsum(damage, axis=1) >= defender.max_hp
+            has_crossed = crossed.any(axis=1)
+            first = crossed.argmax(axis=1)
+            # a critical fail leaves the defender with 1 health point, the next lethal use brings it down
+            saved = has_crossed & critical_fail[np.arange(size), first]
+            lethal = (damage >= 1) & ~critical_fail & (use > first[:, None])
+            has_lethal = lethal.any(axis=1)
+            killing_use = np.where(saved, np.where(has_lethal, lethal.argmax(axis=1), -1),
+                                   np.where(has_crossed, first, -1))
+            chunks.append(np.where(killing_use >= 0, killing_use // per_cycle + 1, np.inf))
+        return np.concatenate(chunks)
+
+    def evaluate(self, skill: SimulatedSkill, attackers: t.Sequence[SimulatedCharacter],
+                 defender: SimulatedCharacter = None) -> SkillReport:
+        """
+        Impact distribution of one use of the skill by the attackers, and the cycles to bring the defender down.
+        """
+        np = _numpy()
+        defender = defender or SimulatedCharacter.reference("Defender")
+        trials = self.trials * len(attackers)
+
+        impacts, outcomes, uses_per_cycle, ratings, cycles = [], [], [], [], []
+        for attacker in attackers:
+            dice = self.dice(attacker, skill, "impact")
+            for start in range(0, self.trials, self.chunk_size):
+                size = min(self.chunk_size, self.trials - start)
+                total, rolls = self.roll_impacts(attacker, skill, dice, (size,))
+                impacts.append(total)
+                outcomes.append(dice.multipliers(rolls))
+            uses_per_cycle.append(self.uses_per_cycle(attacker, skill))
+            if skill.deals_damage:
+                cycles.append(self.cycles_to_kill(attacker, skill, defender))
+
+        impacts = np.concatenate(impacts)
+        multipliers = np.concatenate(outcomes)
+        report = SkillReport(
+            skill=skill,
+            trials=trials,
+            mean_impact=float(impacts.mean()),
+            std_impact=float(impacts.std()),
+            p5_impact=float(np.percentile(impacts, 5)),
+            p50_impact=float(np.percentile(impacts, 50)),
+            p95_impact=float(np.percentile(impacts, 95)),
+            outcomes={outcome: float((multipliers == value).mean()) for value, outcome in MULTIPLIER_OUTCOMES.items()},
+            uses_per_cycle=float(np.mean(uses_per_cycle)),
+            power_rating=self.power_rating(skill, float(impacts.mean())),
+        )
+        if cycles:
+            cycles = np.concatenate(cycles)
+            killed = cycles[np.isfinite(cycles)]
+            report.cycles_to_kill = cycles
+            report.kill_rate = float(killed.size / cycles.size)
+            if killed.size:
+                report.mean_cycles_to_kill = float(killed.mean())
+                report.p95_cycles_to_kill = float(np.percentile(killed, 95))
+        self.logger.debug(f"Simulated {trials} uses of skill {skill.name}: mean impact {report.mean_impact:.2f}")
+        return report
+
+    @staticmethod
+    def power_rating(skill: SimulatedSkill, mean_impact: float) -> float:
+        """
+        Expected impact per use over the geometric mean of the energy and action points costs, the efficiency
+        `SkillPowerService` applies to its estimated impact.
+        """
+        costs = skill.costs
+        return mean_impact / math.sqrt(max(costs.get_ep_cost(), 1) * max(costs.get_ap_cost(), 1))
+
+    def evaluate_all(self, skills: t.Iterable[SimulatedSkill], attackers: t.Sequence[SimulatedCharacter],
+                     defender: SimulatedCharacter = None) -> t.List[SkillReport]:
+        reports = [self.evaluate(skill, attackers, defender) for skill in skills]
+        self.win_rates(reports)
+        return reports
+
+    @staticmethod
+    def win_rates(reports: t.Sequence[SkillReport]) -> None:
+        """
+        Round robin of the damage skills: a duel is won by the side bringing its opponent down in fewer cycles,
+        both sides having the defender health. Same cycles count as half a win.
+        """
+        np = _numpy()
+        fighters = [report for report in reports if report.cycles_to_kill is not None]
+        if len(fighters) < 2:
+            return
+        cycles = np.stack([report.cycles_to_kill for report in fighters])
+        for i, report in enumerate(fighters):
+            opponents = np.delete(cycles, i, axis=0)
+            wins = (cycles[i] < opponents).mean() + (cycles[i] == opponents).mean() / 2
+            report.win_rate = float(wins)
+
+    @staticmethod
+    def schools(reports: t.Sequence[SkillReport]) -> t.List[SchoolReport]:
+        by_school: t.Dict[str, t.List[SkillReport]] = {}
+        for report in reports:
+            by_school.setdefault(report.skill.school, []).append(report)
+
+        def mean(values):
+            values = [value for value in values if value is not None]
+            return sum(values) / len(values) if values else None
+
+        return [
+            SchoolReport(
+                school=school,
+                skills=len(school_reports),
+                mean_power_rating=mean(report.power_rating for report in school_reports),
+                mean_impact=mean(report.mean_impact for report in school_reports),
+                kill_rate=mean(report.kill_rate for report in school_reports),
+                win_rate=mean(report.win_rate for report in school_reports),
+            )
+            for school, school_reports in sorted(by_school.items())
+        ]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("The balance simulation requires NumPy, install it with `pip install numpy`") from e
+    return numpy
@@ -2,8 +2,11 @@ import abc
 import logging
 import typing as t
 
-from apps.game.services.npc.factory import NPCFactoryConfig, NPCFactory
-from apps.spawner.models import NPCSpawner
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.game.services.npc.factory import NPCFactoryConfig, NPCFactory, NPCSpawn
+from apps.spawner.models import NPCSpawner, SpawnedEntity, Spawner
 
 if t.TYPE_CHECKING:
     from apps.action.models import Cycle
@@ -21,19 +24,75 @@ class SpecificSpawnerService(t.Protocol):
 
 
 class CoreSpawnersService:
+    """
+    Evaluates all spawners of a campaign once per cycle.
+
+    Spawners are evaluated with one annotated query, rescheduled and deactivated spawners are written with one
+    update each and due spawners of the same template share a compiled spawn plan, so the cost of a cycle does not
+    grow with the number of spawners.
+    """
     logger = logging.getLogger(__name__)
 
+    def __init__(self, factory: t.Optional[NPCFactory] = None):
+        self.factory = factory or NPCFactory()
+
     def process_spawners(self, cycle: "Cycle"):
         self.process_npc_spawners(cycle)
 
-    def process_npc_spawners(self, cycle: "Cycle"):
-        npc_spawners = NPCSpawner.objects.filter(is_active=True, campaign=cycle.campaign)
-        for spawner in npc_spawners:
-            service = NPCSpawnerService(spawner)
-            if service.should_spawn(cycle):
-                npc = service.spawn()
+    def get_npc_spawners(self, cycle: "Cycle"):
+        """
+        Active spawners of the cycle campaign below their spawn limit and not waiting for a later cycle.
+        """
+        return (
+            NPCSpawner.objects.filter(is_active=True, campaign=cycle.campaign)
+            .annotate(spawned_count=Count("spawned_entities"))
+            .filter(spawned_count__lt=F("spawn_limit"))
+            .filter(Q(next_spawn_cycle_number__lte=cycle.number) | Q(respawn_cycles__lte=0))
+            .select_related("character_template", "position__sub_location")
+        )
+
+    def process_npc_spawners(self, cycle: "Cycle") -> t.List["GameObject"]:
+        deactivated, rescheduled = [], []
+        due: t.Dict[t.Any, t.List[NPCSpawner]] = {}
+        for spawner in self.get_npc_spawners(cycle):
+            if spawner.respawn_cycles <= 0:
+                deactivated.append(spawner.pk)
+            elif spawner.next_spawn_cycle_number < cycle.number:
+                rescheduled.append(spawner.pk)
+            else:
+                due.setdefault(spawner.character_template_id, []).append(spawner)
+
+        now = timezone.now()
+        if deactivated:
+            Spawner.objects.filter(pk__in=deactivated).update(is_active=False, updated_at=now)
+            self.logger.debug(f"Deactivated {len(deactivated)} spawners due to non-positive respawn cycles.")
+        if rescheduled:
+            Spawner.objects.filter(pk__in=rescheduled).update(
+                next_spawn_cycle_number=cycle.number + F("respawn_cycles"), updated_at=now
+            )
+
+        spawned, entities = [], []
+        for spawners in due.values():
+            npcs = self.spawn_npcs(spawners, cycle.campaign)
+            for spawner, npc in zip(spawners, npcs):
                 self.logger.info(f"Spawned NPC {npc} from spawner {spawner.id} at position {spawner.position}")
-                spawner.spawned_entities.create(game_object=npc, spawned_at=cycle)
+                entities.append(SpawnedEntity(spawner=spawner, game_object=npc, spawned_at=cycle))
+            spawned.extend(npcs)
+        SpawnedEntity.objects.bulk_create(entities)
+        return spawned
+
+    def spawn_npcs(self, spawners: t.List[NPCSpawner], campaign) -> t.List["GameObject"]:
+        """Spawn one NPC per spawner, all spawners share the same character template."""
+        template = spawners[0].character_template
+        plan = self.factory.compile(NPCFactoryConfig(
+            template=template,
+            behavior=template.behavior,
+            campaign=campaign,
+        ))
+        return plan.create(
+            [NPCSpawn(template.name, campaign, spawner.position) for spawner in spawners],
+            self.factory.notify,
+        )
 
 
 class NPCSpawnerService(SpecificSpawnerService):
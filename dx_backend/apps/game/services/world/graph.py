@@ -0,0 +1,236 @@
+import heapq
+import logging
+import threading
+import typing as t
+from collections import deque
+
+from apps.core.utils.cache import CacheVersion
+from apps.world.models import Position, PositionConnection
+
+PositionId = t.Any  # UUID of a position, a `Position` is accepted as well
+Passable = t.Callable[[PositionConnection], bool]
+
+
+def _pk(position) -> PositionId:
+    return position.pk if isinstance(position, Position) else position
+
+
+class WorldGraph:
+    """
+    Immutable snapshot of the world map: positions and their connections, loaded with two queries.
+
+    Positions are numbered and kept in arrays, the adjacency of a position is a list of position numbers and
+    connections are indexed by the ordered pair of numbers, so a connection lookup is a dict access.
+    Connection instances are shared between threads and must not be modified.
+    """
+
+    def __init__(self, version: int = 0):
+        self.version = version
+        self.ids: t.List[PositionId] = []
+        self.index: t.Dict[PositionId, int] = {}
+        self.coordinates: t.List[t.Tuple[int, int, int]] = []
+        self.by_coordinates: t.Dict[t.Tuple[int, int, int], int] = {}
+        self.adjacency: t.List[t.List[int]] = []
+        self.edges: t.Dict[t.Tuple[int, int], PositionConnection] = {}
+        self.max_span = 1  # longest connection in grid steps, keeps the A* heuristic admissible
+        self._components: t.Optional[t.List[int]] = None
+
+    @classmethod
+    def load(cls, version: int = 0) -> "WorldGraph":
+        graph = cls(version)
+        for position_id, x, y, z in Position.objects.values_list("id", "grid_x", "grid_y", "grid_z").order_by("id"):
+            graph.add_position(position_id, (x, y, z))
+        for connection in PositionConnection.objects.order_by("id"):
+            graph.add_connection(connection)
+        return graph
+
+    def add_position(self, position_id: PositionId, coordinates: t.Tuple[int, int, int]) -> int:
+        number = len(self.ids)
+        self.ids.append(position_id)
+        self.index[position_id] = number
+        self.coordinates.append(coordinates)
+        self.by_coordinates[coordinates] = number
+        self.adjacency.append([])
+        return number
+
+    def add_connection(self, connection: PositionConnection) -> None:
+        a = self.index.get(connection.position_from_id)
+        b = self.index.get(connection.position_to_id)
+        if a is None or b is None or a == b:
+            return
+        key = (a, b) if a < b else (b, a)
+        if key in self.edges:
+            return
+        self.edges[key] = connection
+        self.adjacency[a].append(b)
+        self.adjacency[b].append(a)
+        self.max_span = max(self.max_span, self._distance(a, b))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, position) -> bool:
+        return _pk(position) in self.index
+
+    def position_at(self, x: int, y: int, z: int) -> t.Optional[PositionId]:
+        number = self.by_coordinates.get((x, y, z))
+        return None if number is None else self.ids[number]
+
+    def coordinates_of(self, position) -> t.Tuple[int, int, int]:
+        return self.coordinates[self.index[_pk(position)]]
+
+    def connection(self, position, other) -> t.Optional[PositionConnection]:
+        """Connection between two positions in any direction."""
+        a, b = self.index.get(_pk(position)), self.index.get(_pk(other))
+        if a is None or b is None:
+            return None
+        return self.edges.get((a, b) if a < b else (b, a))
+
+    def is_adjacent(self, position, other) -> bool:
+        return self.connection(position, other) is not None
+
+    def positions(self, level: t.Optional[int] = None) -> t.List[PositionId]:
+        """All positions, or the positions on the given `grid_z`."""
+        if level is None:
+            return list(self.ids)
+        return [position_id for position_id, (_, _, z) in zip(self.ids, self.coordinates) if z == level]
+
+    def connections(self, level: t.Optional[int] = None) -> t.List[PositionConnection]:
+        """All connections, or the connections with at least one end on the given `grid_z`."""
+        if level is None:
+            return list(self.edges.values())
+        return [
+            connection for (a, b), connection in self.edges.items()
+            if self.coordinates[a][2] == level or self.coordinates[b][2] == level
+        ]
+
+    def neighbors(self, position, passable: Passable = None) -> t.List[PositionId]:
+        number = self.index[_pk(position)]
+        return [self.ids[other] for other in self._neighbors(number, passable)]
+
+    def _neighbors(self, number: int, passable: t.Optional[Passable]) -> t.Iterator[int]:
+        for other in self.adjacency[number]:
+            if passable is None or passable(self.edges[(number, other) if number < other else (other, number)]):
+                yield other
+
+    def _distance(self, a: int, b: int) -> int:
+        (ax, ay, az), (bx, by, bz) = self.coordinates[a], self.coordinates[b]
+        return abs(ax - bx) + abs(ay - by) + abs(az - bz)
+
+    def shortest_path(self, start, goal, passable: Passable = None) -> t.Optional[t.List[PositionId]]:
+        """
+        A* search over the connections, every connection costs one move.
+
+        :return: positions from `start` to `goal` inclusive, None when the goal is not reachable
+        """
+        source, target = self.index.get(_pk(start)), self.index.get(_pk(goal))
+        if source is None or target is None:
+            return None
+
+        def heuristic(number: int) -> int:
+            return -(-self._distance(number, target) // self.max_span)
+
+        came_from = {source: None}
+        cost = {source: 0}
+        queue = [(heuristic(source), 0, source)]
+        while queue:
+            _, steps, number = heapq.heappop(queue)
+            if number == target:
+                path = []
+                while number is not None:
+                    path.append(self.ids[number])
+                    number = came_from[number]
+                return path[::-1]
+            if steps > cost[number]:
+                continue
+            for other in self._neighbors(number, passable):
+                if steps + 1 < cost.get(other, steps + 2):
+                    cost[other] = steps + 1
+                    came_from[other] = number
+                    heapq.heappush(queue, (steps + 1 + heuristic(other), steps + 1, other))
+        return None
+
+    def within_radius(self, position, radius: int, passable: Passable = None) -> t.Dict[PositionId, int]:
+        """Breadth-first search: positions reachable in at most `radius` moves with their distance."""
+        source = self.index[_pk(position)]
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            number = queue.popleft()
+            if distances[number] == radius:
+                continue
+            for other in self._neighbors(number, passable):
+                if other not in distances:
+                    distances[other] = distances[number] + 1
+                    queue.append(other)
+        return {self.ids[number]: distance for number, distance in distances.items()}
+
+    def component(self, position) -> int:
+        """Number of the connected component, positions with the same number can reach each other."""
+        if self._components is None:
+            self._components = self._label_components()
+        return self._components[self.index[_pk(position)]]
+
+    def is_reachable(self, position, other) -> bool:
+        return self.component(position) == self.component(other)
+
+    def _label_components(self) -> t.List[int]:
+        """Components over the active connections."""
+        labels = [-1] * len(self.ids)
+        passable = lambda connection: connection.is_active  # noqa: E731
+        for start in range(len(self.ids)):
+            if labels[start] != -1:
+                continue
+            labels[start] = start
+            queue = deque([start])
+            while queue:
+                number = queue.popleft()
+                for other in self._neighbors(number, passable):
+                    if labels[other] == -1:
+                        labels[other] = start
+                        queue.append(other)
+        return labels
+
+
+class WorldGraphCache:
+    """
+    Process-wide `WorldGraph`, rebuilt lazily after the map changes.
+
+    The graph has a `CacheVersion`: with a shared cache backend an invalidation in one process is seen by all
+    of them at once, otherwise from their next request or cycle on. Position and connection signals call
+    `invalidate`.
+    """
+    logger = logging.getLogger("game.services.world.graph")
+
+    def __init__(self):
+        self.versions = CacheVersion("world_graph:version")
+        self._graph: t.Optional[WorldGraph] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        return self.versions.get()
+
+    def get(self) -> WorldGraph:
+        version = self.version
+        graph = self._graph
+        if graph is not None and graph.version == version:
+            return graph
+        with self._lock:
+            if self._graph is None or self._graph.version != version:
+                self._graph = WorldGraph.load(version)
+                self.logger.debug(
+                    f"Loaded world graph v{version}: {len(self._graph)} positions, {len(self._graph.edges)} connections"
+                )
+            return self._graph
+
+    def invalidate(self) -> None:
+        self.versions.invalidate()
+        self._graph = None
+
+
+world_graph = WorldGraphCache()
+
+
+def get_world_graph() -> WorldGraph:
+    return world_graph.get()
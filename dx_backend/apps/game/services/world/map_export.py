@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import typing as t
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, F
+
+from apps.character.models import Character, CharacterBiography
+from apps.core.utils.cache import CacheVersion
+from apps.game.services.world.graph import world_graph
+from apps.world.models import Position, PositionConnection
+
+DEFAULT_WORLD_MAP_SETTINGS = {
+    "TILE_SIZE": 32,
+    "MAX_CACHED_BYTES": 8 * 1024 * 1024,
+    "CACHE_TIMEOUT": 3600,
+}
+
+# character fields shown on the map, saving other fields does not change the map
+MAP_CHARACTER_FIELDS = {"position", "position_id", "is_active", "name", "npc"}
+
+map_characters_version = CacheVersion("world_map:characters")
+
+
+def on_map_characters_changed(fields: t.Optional[t.Iterable[str]] = None) -> None:
+    if fields is None or MAP_CHARACTER_FIELDS.intersection(fields):
+        map_characters_version.invalidate()
+
+
+def get_map_settings() -> dict:
+    return {**DEFAULT_WORLD_MAP_SETTINGS, **getattr(settings, "WORLD_MAP", {})}
+
+
+@dataclass(frozen=True)
+class MapTile:
+    """
+    Part of the map: the whole world, one `grid_z` level or a square region of a level.
+    """
+    grid_z: t.Optional[int] = None
+    x: t.Optional[int] = None  # tile column, covers grid_x from x * size to (x + 1) * size - 1
+    y: t.Optional[int] = None  # tile row
+    size: int = DEFAULT_WORLD_MAP_SETTINGS["TILE_SIZE"]
+
+    @classmethod
+    def from_params(cls, params, size: int = None) -> "MapTile":
+        """
+        Build a tile from `grid_z`, `tile_x` and `tile_y` query parameters.
+
+        :raises ValueError: when the parameters are not integers or a region is requested without a level
+        """
+        values = {name: params.get(name) for name in ("grid_z", "tile_x", "tile_y")}
+        values = {name: None if value in (None, "") else int(value) for name, value in values.items()}
+        if (values["tile_x"] is None) != (values["tile_y"] is None):
+            raise ValueError("tile_x and tile_y must be given together")
+        if values["tile_x"] is not None and values["grid_z"] is None:
+            raise ValueError("grid_z is required for a tile")
+        return cls(values["grid_z"], values["tile_x"], values["tile_y"], size or get_map_settings()["TILE_SIZE"])
+
+    @property
+    def key(self) -> str:
+        if self.grid_z is None:
+            return "world"
+        if self.x is None:
+            return f"z{self.grid_z}"
+        return f"z{self.grid_z}:{self.size}:{self.x}:{self.y}"
+
+    def positions(self, prefix: str = "") -> Q:
+        """Filter for positions of the tile, `prefix` is the lookup path to the position."""
+        if self.grid_z is None:
+            return Q()
+        lookups = {f"{prefix}grid_z": self.grid_z}
+        if self.x is not None:
+            lookups.update({
+                f"{prefix}grid_x__gte": self.x * self.size,
+                f"{prefix}grid_x__lt": (self.x + 1) * self.size,
+                f"{prefix}grid_y__gte": self.y * self.size,
+                f"{prefix}grid_y__lt": (self.y + 1) * self.size,
+            })
+        return Q(**lookups)
+
+
+class MapExporter:
+    """
+    Streams the world map JSON of `JsonDumper` for a tile.
+
+    Rows are read with `values_list` iterators and written in chunks, the whole map is never held as objects.
+    Every section is cached as a pre-rendered string under the version of its data: positions and
+    connections use the world graph version, characters use `map_characters_version`. The same versions
+    make the ETag, which changes only when the map data of the tile changes. Without a shared cache the
+    versions come from the database, so moves of the cycle workers change them from the next request on.
+    """
+    logger = logging.getLogger("game.services.world.map_export")
+    chunk_size = 2000
+
+    def __init__(self, tile: MapTile = MapTile(), context: dict = None, max_cached_bytes: int = None,
+                 cache_timeout: int = None):
+        config = get_map_settings()
+        self.tile = tile
+        self.context = context or {}
+        self.max_cached_bytes = config["MAX_CACHED_BYTES"] if max_cached_bytes is None else max_cached_bytes
+        self.cache_timeout = config["CACHE_TIMEOUT"] if cache_timeout is None else cache_timeout
+        self.map_version = world_graph.version
+        self.characters_version = map_characters_version.get()
+        self._avatar_storage = CharacterBiography._meta.get_field("avatar").storage
+
+    @property
+    def etag(self) -> str:
+        return f"map-{self.tile.key}-{self.map_version}-{self.characters_version}-{self._base_url_key}"
+
+    @property
+    def _base_url_key(self) -> str:
+        # avatar urls are absolute when a request is known, the cached characters depend on the host
+        request = self.context.get("request")
+        base_url = request.build_absolute_uri("/") if request else ""
+        return hashlib.md5(base_url.encode()).hexdigest()[:8]
+
+    def sections(self) -> t.List[t.Tuple[str, str, t.Callable[[], t.Iterator[str]]]]:
+        map_version = f"{self.map_version}"
+        characters_version = f"{self.characters_version}:{self._base_url_key}"
+        return [
+            ("rooms", map_version, self._rooms),
+            ("connections", map_version, lambda: self._connections(vertical=False)),
+            ("virtualConnections", map_version, lambda: self._connections(vertical=True)),
+            ("characters", characters_version, self._characters),
+        ]
+
+    def iter_json(self) -> t.Iterator[str]:
+        yield "{"
+        for number, (name, version, render) in enumerate(self.sections()):
+            yield f"{',' if number else ''}{json.dumps(name)}:"
+            yield from self._cached(name, version, render)
+        yield "}"
+
+    def _cached(self, name: str, version: str, render: t.Callable[[], t.Iterator[str]]) -> t.Iterator[str]:
+        key = f"world_map:{name}:{self.tile.key}:{version}"
+        blob = cache.get(key)
+        if blob is not None:
+            yield blob
+            return
+        chunks, size = [], 0
+        for chunk in render():
+            yield chunk
+            if chunks is not None:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.max_cached_bytes:
+                    chunks = None
+        if chunks is not None:
+            cache.set(key, "".join(chunks), self.cache_timeout)
+        else:
+            self.logger.debug(f"Map section {name} of {self.tile.key} is larger than {self.max_cached_bytes} bytes")
+
+    def _array(self, items: t.Iterable) -> t.Iterator[str]:
+        yield "["
+        batch, first = [], True
+        for item in items:
+            batch.append(json.dumps(item))
+            if len(batch) == self.chunk_size:
+                yield ("" if first else ",") + ",".join(batch)
+                batch, first = [], False
+        if batch:
+            yield ("" if first else ",") + ",".join(batch)
+        yield "]"
+
+    def _rooms(self) -> t.Iterator[str]:
+        rows = Position.objects.filter(self.tile.positions()).order_by("grid_z", "grid_y", "grid_x").values_list(
+            "id", "grid_x", "grid_y", "grid_z", "labels"
+        )
+        return self._array(
+            {
+                "id": str(position_id),
+                "grid_x": grid_x,
+                "grid_y": grid_y,
+                "grid_z": grid_z,
+                "type": labels[0] if labels else "unknown",
+                "label": labels[1] if len(labels) > 1 else "regular",
+                "name": labels[2] if len(labels) > 2 else "unknown",
+            }
+            for position_id, grid_x, grid_y, grid_z, labels in rows.iterator(chunk_size=self.chunk_size)
+        )
+
+    def _connections(self, vertical: bool) -> t.Iterator[str]:
+        rows = PositionConnection.objects.filter(
+            self.tile.positions("position_from__") | self.tile.positions("position_to__"),
+            is_active=True,
+        )
+        same_level = Q(position_from__grid_z=F("position_to__grid_z"))
+        rows = rows.exclude(same_level) if vertical else rows.filter(same_level)
+        rows = rows.order_by("id").values_list("position_from_id", "position_to_id")
+        return self._array(
+            {"room_a": str(room_a), "room_b": str(room_b)}
+            for room_a, room_b in rows.iterator(chunk_size=self.chunk_size)
+        )
+
+    def _characters(self) -> t.Iterator[str]:
+        """Characters grouped by position id, rows come sorted by position so groups are written one by one."""
+        rows = Character.objects.filter(self.tile.positions("position__"), is_active=True).order_by(
+            "position_id", "id"
+        ).values_list("id", "name", "npc", "position_id", "biography__avatar")
+
+        def groups():
+            position_id, characters = None, []
+            for character_id, name, npc, character_position_id, avatar in rows.iterator(chunk_size=self.chunk_size):
+                if characters and character_position_id != position_id:
+                    yield position_id, characters
+                    characters = []
+                position_id = character_position_id
+                characters.append({
+                    "id": str(character_id),
+                    "name": name,
+                    "npc": npc,
+                    "avatar": self._avatar_url(avatar),
+                })
+            if characters:
+                yield position_id, characters
+
+        yield "{"
+        for number, (position_id, characters) in enumerate(groups()):
+            yield f"{',' if number else ''}{json.dumps(str(position_id))}:{json.dumps(characters)}"
+        yield "}"
+
+    def _avatar_url(self, name: t.Optional[str]) -> t.Optional[str]:
+        if not name:
+            return None
+        url = self._avatar_storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -1,13 +1,13 @@
 import logging
 
-from django.db import models
-
 from apps.character.models import Character
-from apps.core.models import BehaviorModel, CharacterStats
+from apps.core.models import CharacterStats
 from apps.game.exceptions import GameException
 from apps.game.services.character.core import CharacterService
+from apps.game.services.world.graph import WorldGraph, get_world_graph
+from apps.game.services.world.occupancy import CampaignOccupancy, get_occupancy
 from apps.game.services.world.position_connection import PositionConnectionService
-from apps.world.models import Position, PositionConnection
+from apps.world.models import Position
 
 
 class MovementService:
@@ -16,6 +16,16 @@ class MovementService:
     class MovementError(GameException):
         pass
 
+    def __init__(self, graph_getter=get_world_graph, occupancy_getter=get_occupancy):
+        self.graph_getter = graph_getter
+        self.occupancy_getter = occupancy_getter
+
+    def graph(self) -> WorldGraph:
+        return self.graph_getter()
+
+    def occupancy(self, campaign) -> CampaignOccupancy:
+        return self.occupancy_getter(campaign)
+
     def teleport(self, character: Character, position: Position):
         """
         Teleport the player to the given position.
@@ -55,10 +65,7 @@ class MovementService:
         current_position = character.position
 
         # Find the connection between the current position and the target position
-        connection = PositionConnection.objects.filter(
-            models.Q(position_from=current_position, position_to=position) |
-            models.Q(position_from=position, position_to=current_position)
-        ).first()
+        connection = self.graph().connection(current_position.pk, position.pk)
 
         if not connection:
             raise self.MovementError(f"Position {position} is not reachable from {current_position}.")
@@ -83,16 +90,17 @@ class MovementService:
         For example, if the character is attacked by an aggressive NPC, the move is canceled.
         """
 
-        current_position = character.position
-        npc_chars = current_position.gameobject_set.instance_of(Character).filter(
-            character__npc=True,
-            character__is_active=True,
-            character__behavior=BehaviorModel.AGGRESSIVE
-        )
+        npc_ids = self.occupancy(character.campaign_id).aggressive_npcs_at(character.position_id)
+        if not npc_ids:
+            return
+        npc_chars = list(Character.objects.filter(pk__in=npc_ids).order_by("id"))
         char_svc = CharacterService(character)
+        # the dice and speed of the character are the same for every NPC
+        char_dice = char_svc.get_dice_service()(sides=20)
+        char_speed = char_svc.get_stat(CharacterStats.SPEED)
         for npc_char in npc_chars:
             npc_char_svc = CharacterService(npc_char)
-            dice_roll_char = char_svc.roll_dice(sides=20) + char_svc.get_stat(CharacterStats.SPEED)
+            dice_roll_char = char_dice.roll() + char_speed
             dice_roll_npc = npc_char_svc.roll_dice(sides=20) + npc_char_svc.get_stat(CharacterStats.SPEED)
             if dice_roll_char < dice_roll_npc:
                 self.logger.debug(f"Character {character} was attacked by {npc_char} and the move was canceled.")
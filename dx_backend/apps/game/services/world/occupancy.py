@@ -0,0 +1,198 @@
+import logging
+import threading
+import typing as t
+
+from apps.core.models import BehaviorModel
+from apps.core.utils.cache import CacheVersion
+
+OCCUPANCY_FIELDS = {
+    "position", "position_id", "is_active", "npc", "organization", "organization_id", "fight", "fight_id",
+    "behavior", "campaign", "campaign_id",
+}
+
+
+def _pk(value):
+    return getattr(value, "pk", value)
+
+
+class Occupant(t.NamedTuple):
+    """Active character with a position, as stored in the occupancy index."""
+    id: t.Any
+    position_id: t.Any
+    sub_location_id: t.Any
+    npc: bool
+    organization_id: t.Any
+    fight_id: t.Any
+    behavior: str
+
+    @property
+    def state(self) -> tuple:
+        return self.position_id, self.npc, self.organization_id, self.fight_id, self.behavior
+
+    @staticmethod
+    def state_of(character) -> t.Optional[tuple]:
+        """State of a character instance comparable with `Occupant.state`, None when it is not indexed."""
+        if not character.is_active or character.position_id is None:
+            return None
+        return character.position_id, character.npc, character.organization_id, character.fight_id, \
+            character.behavior
+
+
+class CampaignOccupancy:
+    """
+    Immutable snapshot of the active characters of a campaign by position, loaded with one query.
+
+    Positions map to their occupants and sub-locations to their occupied positions, so "who is here" questions
+    of the cycle services are dict lookups instead of queries over the polymorphic `GameObject` table.
+    """
+
+    def __init__(self, campaign_id, version: int = 0):
+        self.campaign_id = campaign_id
+        self.version = version
+        self.characters: t.Dict[t.Any, Occupant] = {}
+        self.positions: t.Dict[t.Any, t.List[Occupant]] = {}
+        self.sub_locations: t.Dict[t.Any, t.Set[t.Any]] = {}
+
+    @classmethod
+    def load(cls, campaign_id, version: int = 0) -> "CampaignOccupancy":
+        from apps.character.models import Character
+
+        occupancy = cls(campaign_id, version)
+        rows = Character.objects.filter(
+            campaign_id=campaign_id, is_active=True, position__isnull=False,
+        ).values_list("id", "position_id", "position__sub_location_id", "npc", "organization_id", "fight_id",
+                      "behavior").order_by("id")
+        for row in rows:
+            occupancy.add(Occupant(*row))
+        return occupancy
+
+    def add(self, occupant: Occupant) -> None:
+        self.characters[occupant.id] = occupant
+        self.positions.setdefault(occupant.position_id, []).append(occupant)
+        self.sub_locations.setdefault(occupant.sub_location_id, set()).add(occupant.position_id)
+
+    def __len__(self) -> int:
+        return len(self.characters)
+
+    def __contains__(self, character) -> bool:
+        return _pk(character) in self.characters
+
+    def at(self, position, npc: t.Optional[bool] = None, behavior: t.Optional[str] = None) -> t.List[Occupant]:
+        """Active characters at the position, optionally only NPCs or players, or only of the given behavior."""
+        return [
+            occupant for occupant in self.positions.get(_pk(position), ())
+            if (npc is None or occupant.npc == npc) and (behavior is None or occupant.behavior == behavior)
+        ]
+
+    def ids_at(self, position, npc: t.Optional[bool] = None, behavior: t.Optional[str] = None) -> t.List[t.Any]:
+        return [occupant.id for occupant in self.at(position, npc, behavior)]
+
+    def aggressive_npcs_at(self, position) -> t.List[t.Any]:
+        return self.ids_at(position, npc=True, behavior=BehaviorModel.AGGRESSIVE)
+
+    def has_others(self, position, character) -> bool:
+        """True if another active character is at the position."""
+        character_id = _pk(character)
+        return any(occupant.id != character_id for occupant in self.positions.get(_pk(position), ()))
+
+    def positions_with_players(self) -> t.Set[t.Any]:
+        return {
+            position_id for position_id, occupants in self.positions.items()
+            if any(not occupant.npc for occupant in occupants)
+        }
+
+    def sub_locations_with_players(self) -> t.Set[t.Any]:
+        return {occupant.sub_location_id for occupant in self.characters.values() if not occupant.npc}
+
+    def positions_in(self, sub_location) -> t.Set[t.Any]:
+        """Occupied positions of the sub-location."""
+        return set(self.sub_locations.get(_pk(sub_location), ()))
+
+    def state_of(self, character) -> t.Optional[tuple]:
+        occupant = self.characters.get(_pk(character))
+        return occupant.state if occupant else None
+
+
+class OccupancyIndex:
+    """
+    Process-wide `CampaignOccupancy` per campaign, reloaded lazily after the characters of the campaign move.
+
+    Every campaign has its own `CacheVersion`, so a move in one campaign does not reload the others. Other processes
+    see a move at once with a shared cache backend, otherwise from their next request or cycle on. `changed` is
+    called from the character signals and from bulk writers that bypass them (working set flush, spawn plans); it
+    only bumps the version when a character was created, moved, changed fight, behavior or organization, or was
+    (de)activated.
+    """
+    logger = logging.getLogger("game.services.world.occupancy")
+
+    def __init__(self):
+        self._snapshots: t.Dict[t.Any, CampaignOccupancy] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def versions(campaign_id) -> CacheVersion:
+        return CacheVersion(f"occupancy:{campaign_id}")
+
+    def get(self, campaign) -> CampaignOccupancy:
+        campaign_id = _pk(campaign)
+        version = self.versions(campaign_id).get()
+        snapshot = self._snapshots.get(campaign_id)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshots.get(campaign_id)
+            if snapshot is None or snapshot.version != version:
+                snapshot = CampaignOccupancy.load(campaign_id, version)
+                self._snapshots[campaign_id] = snapshot
+                self.logger.debug(f"Loaded occupancy of campaign {campaign_id} v{version}: "
+                                  f"{len(snapshot)} characters at {len(snapshot.positions)} positions")
+            return snapshot
+
+    def invalidate(self, campaign) -> None:
+        campaign_id = _pk(campaign)
+        if campaign_id is None:
+            return
+        self.versions(campaign_id).invalidate()
+        self._snapshots.pop(campaign_id, None)
+
+    def changed(self, characters: t.Iterable, fields: t.Optional[t.Iterable[str]] = None) -> None:
+        """
+        Invalidate the campaigns of saved characters whose occupancy differs from the current snapshot.
+
+        :param fields: saved fields, None when all fields may have changed
+        """
+        if fields is not None and not OCCUPANCY_FIELDS.intersection(fields):
+            return
+        stale, versions = set(), {}
+        for character in characters:
+            campaign_id = character.campaign_id
+            if campaign_id not in stale:
+                snapshot = self._snapshots.get(campaign_id)
+                if snapshot is not None and campaign_id not in versions:
+                    versions[campaign_id] = self.versions(campaign_id).get()
+                if snapshot is None or snapshot.version != versions[campaign_id] or \
+                        snapshot.state_of(character) != Occupant.state_of(character):
+                    stale.add(campaign_id)
+            # a character moved to another campaign has to leave the snapshot of its previous campaign
+            for snapshot in list(self._snapshots.values()):
+                if snapshot.campaign_id != campaign_id and character.pk in snapshot:
+                    stale.add(snapshot.campaign_id)
+        for campaign_id in stale:
+            self.invalidate(campaign_id)
+
+    def removed(self, character) -> None:
+        self.invalidate(character.campaign_id)
+        for snapshot in list(self._snapshots.values()):
+            if character.pk in snapshot:
+                self.invalidate(snapshot.campaign_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+occupancy_index = OccupancyIndex()
+
+
+def get_occupancy(campaign) -> CampaignOccupancy:
+    return occupancy_index.get(campaign)
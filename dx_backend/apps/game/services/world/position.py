@@ -1,12 +1,16 @@
 import json
 import logging
+import time
 import uuid
 from abc import abstractmethod
-from typing import Any, List, Dict
+from dataclasses import dataclass
+from typing import Any
 
 from django.db import transaction, IntegrityError
 
-from apps.character.models import Character
+from apps.core.utils.json_stream import iter_object_arrays
+from apps.game.services.world.graph import world_graph
+from apps.game.services.world.map_export import MapExporter, MapTile
 from apps.world.models import Position, PositionConnection
 
 
@@ -41,11 +45,16 @@ class Reporter:
     def report(self):
         pass
 
+    def on_progress(self, stage: str, processed: int):
+        """Called by the bulk loader after every chunk, `processed` counts the items of the stage so far."""
+        pass
+
 
 class ConsoleReporter(Reporter):
     def __init__(self):
         self.rooms = 0
         self.connections = 0
+        self.started = time.monotonic()
 
     def on_position_processed(self, room):
         self.rooms += 1
@@ -53,19 +62,27 @@ class ConsoleReporter(Reporter):
     def on_connection_processed(self, connection):
         self.connections += 1
 
+    def on_progress(self, stage: str, processed: int):
+        print(f"{stage}: {processed} processed, {processed / self._elapsed():.0f}/s")
+
+    def _elapsed(self) -> float:
+        return max(time.monotonic() - self.started, 1e-6)
+
     def report(self):
         print(f"Rooms: {self.rooms}")
         print(f"Connections: {self.connections}")
+        print(f"Done in {self._elapsed():.2f}s")
 
 
 class PositionLoader:
     logger = logging.getLogger(__name__)
 
-    def __init__(self, json_file_path, default_sub_location, id_translator: IdTranslator = UUIDTranslator()):
+    def __init__(self, json_file_path, default_sub_location, id_translator: IdTranslator = UUIDTranslator(),
+                 reporter: Reporter = None):
         self.json_file_path = json_file_path
         self.default_sub_location = default_sub_location
         self.id_translator = id_translator
-        self.reporter = ConsoleReporter()
+        self.reporter = reporter or ConsoleReporter()
 
     def load(self):
         with open(self.json_file_path, 'r') as file:
@@ -81,14 +98,18 @@ class PositionLoader:
             self._load_connections(virtualConnections)
             self.reporter.report()
 
+    @staticmethod
+    def _room_labels(room) -> list:
+        labels = room.get('labels', [])
+        labels.extend([
+            room['type'],
+            room.get('label', 'regular'),
+            room['name'],
+        ])
+        return labels
+
     def _load_positions(self, rooms):
         for room in rooms:
-            labels = room.get('labels', [])
-            labels.extend([
-                room['type'],
-                room.get('label', 'regular'),
-                room['name'],
-            ])
             p, _ = Position.objects.update_or_create(
                 pk=self.id_translator.to_internal_id(room['id']),
                 defaults={
@@ -96,7 +117,7 @@ class PositionLoader:
                     'grid_y': room['grid_y'],
                     'grid_z': room['grid_z'],
                     'sub_location': self.default_sub_location,
-                    'labels': labels
+                    'labels': self._room_labels(room)
                 }
             )
             self.reporter.on_position_processed(p)
@@ -143,90 +164,172 @@ class PositionLoader:
                 )
 
 
+@dataclass
+class ImportDiff:
+    positions_created: int = 0
+    positions_updated: int = 0
+    positions_unchanged: int = 0
+    connections_created: int = 0
+    connections_existing: int = 0
+    connections_skipped: int = 0  # connections to rooms that are neither in the file nor in the database
+
+    def __str__(self):
+        return (
+            f"Positions: {self.positions_created} new, {self.positions_updated} changed, "
+            f"{self.positions_unchanged} unchanged\n"
+            f"Connections: {self.connections_created} new, {self.connections_existing} existing, "
+            f"{self.connections_skipped} skipped"
+        )
+
+
+class BulkPositionLoader(PositionLoader):
+    """
+    Imports the same JSON as `PositionLoader` with a constant number of queries per chunk.
+
+    The file is parsed as a stream, rooms are upserted with `bulk_create(update_conflicts=True)` chunk by chunk
+    and connections, which only need two ids each, are collected and inserted after all rooms.
+    Every chunk costs one lookup and one write. With `dry_run` nothing is written and `load` only
+    returns the difference between the file and the database.
+    """
+    position_fields = ('grid_x', 'grid_y', 'grid_z', 'sub_location_id', 'labels')
+
+    def __init__(self, json_file_path, default_sub_location, id_translator: IdTranslator = UUIDTranslator(),
+                 reporter: Reporter = None, chunk_size: int = 1000, dry_run: bool = False):
+        super().__init__(json_file_path, default_sub_location, id_translator, reporter)
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.diff = ImportDiff()
+        self._known_positions = set()
+        self._seen_connections = set()
+
+    def load(self) -> ImportDiff:
+        self.diff = ImportDiff()
+        rooms, connections = [], []
+        processed = 0
+        with open(self.json_file_path, 'r') as file, transaction.atomic():
+            for key, item in iter_object_arrays(file):
+                if key == "rooms":
+                    rooms.append(item)
+                    if len(rooms) == self.chunk_size:
+                        processed += self._save_positions(rooms)
+                        self.reporter.on_progress("Rooms", processed)
+                        rooms = []
+                elif key in ("connections", "virtualConnections"):
+                    connections.append((item['room_a'], item['room_b']))
+            if rooms:
+                processed += self._save_positions(rooms)
+                self.reporter.on_progress("Rooms", processed)
+
+            for start in range(0, len(connections), self.chunk_size):
+                self._save_connections(connections[start:start + self.chunk_size])
+                self.reporter.on_progress("Connections", min(start + self.chunk_size, len(connections)))
+
+            if not self.dry_run:
+                # bulk writes do not send signals
+                world_graph.invalidate()
+        self.reporter.report()
+        return self.diff
+
+    def _save_positions(self, rooms) -> int:
+        positions = {}
+        for room in rooms:
+            position = Position(
+                pk=self.id_translator.to_internal_id(room['id']),
+                grid_x=room['grid_x'],
+                grid_y=room['grid_y'],
+                grid_z=room['grid_z'],
+                sub_location=self.default_sub_location,
+                labels=self._room_labels(room),
+            )
+            positions[position.pk] = position
+        existing = {
+            pk: tuple(values)
+            for pk, *values in Position.objects.filter(pk__in=positions).values_list('pk', *self.position_fields)
+        }
+
+        changed = []
+        for pk, position in positions.items():
+            current = existing.get(pk)
+            if current is None:
+                self.diff.positions_created += 1
+            elif current != tuple(getattr(position, field) for field in self.position_fields):
+                self.diff.positions_updated += 1
+            else:
+                self.diff.positions_unchanged += 1
+                continue
+            changed.append(position)
+        self._known_positions.update(positions)
+
+        if changed and not self.dry_run:
+            Position.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['id'],
+                update_fields=['grid_x', 'grid_y', 'grid_z', 'sub_location', 'labels'],
+            )
+        for position in positions.values():
+            self.reporter.on_position_processed(position)
+        return len(positions)
+
+    def _save_connections(self, pairs):
+        chunk = []
+        for room_a, room_b in pairs:
+            a, b = self.id_translator.to_internal_id(room_a), self.id_translator.to_internal_id(room_b)
+            # same ordering as PositionConnection.save
+            key = (a, b) if a < b else (b, a)
+            if a == b or key in self._seen_connections:
+                continue
+            self._seen_connections.add(key)
+            chunk.append(key)
+
+        ids = {position_id for key in chunk for position_id in key}
+        unknown = ids - self._known_positions
+        if unknown:
+            self._known_positions.update(Position.objects.filter(pk__in=unknown).values_list('pk', flat=True))
+        existing = set(
+            PositionConnection.objects.filter(position_from_id__in=ids, position_to_id__in=ids)
+            .values_list('position_from_id', 'position_to_id')
+        )
+
+        new_connections = []
+        for a, b in chunk:
+            if a not in self._known_positions or b not in self._known_positions:
+                self.logger.warning(f"Connection between {a} and {b} skipped. Room not found.")
+                self.diff.connections_skipped += 1
+            elif (a, b) in existing or (b, a) in existing:
+                self.diff.connections_existing += 1
+            else:
+                new_connections.append(
+                    PositionConnection(position_from_id=a, position_to_id=b, is_active=True, is_public=True)
+                )
+        self.diff.connections_created += len(new_connections)
+
+        if new_connections and not self.dry_run:
+            PositionConnection.objects.bulk_create(new_connections, ignore_conflicts=True)
+        for connection in new_connections:
+            self.reporter.on_connection_processed(connection)
+
+
 class JsonDumper:
     logger = logging.getLogger(__name__)
 
-    def __init__(self, output_file_path, context=None):
+    def __init__(self, output_file_path, context=None, tile: MapTile = MapTile()):
         self.output_file_path = output_file_path
         self.context = context
+        self.tile = tile
 
-    def dump(self):
-        data = self.as_dict()
+    def exporter(self) -> MapExporter:
+        return MapExporter(self.tile, context=self.context)
 
+    def dump(self):
         with open(self.output_file_path, 'w') as file:
-            json.dump(data, file, indent=4)
+            for chunk in self.exporter().iter_json():
+                file.write(chunk)
 
         self.logger.info(f"Data successfully dumped to {self.output_file_path}")
 
     def as_dict(self) -> dict:
-        return {
-            "rooms": self._dump_positions(),
-            "connections": self._dump_connections(vertical=False),
-            "virtualConnections": self._dump_connections(vertical=True),
-            "characters": self._dump_characters(),
-        }
-
-    def _build_url(self, url: str) -> str:
-        if not self.context or 'request' not in self.context:
-            return url
-        request = self.context['request']
-        return request.build_absolute_uri(url)
-
-    def _dump_characters(self) -> Dict[str, List[Any]]:
-        self.logger.info("Dumping characters")
-        characters = Character.objects.filter(is_active=True)
-        mapping = {}
-        self.logger.info(f"Found {characters.count()} characters")
-        for character in characters:
-            avatar = None
-            if character.biography and character.biography.avatar:
-                avatar = self._build_url(character.biography.avatar.url)
-
-            char_serialized = {
-                "id": str(character.pk),
-                "name": character.name,
-                "npc": character.npc,
-                "avatar": avatar,
-            }
-            mapping.setdefault(str(character.position_id), []).append(char_serialized)
-            self.logger.debug(f"Character {character.pk} dumped to {character.position_id}")
-        self.logger.info("Characters dumped")
-        return mapping
-
-    def _dump_positions(self) -> List[Dict[str, Any]]:
-        positions = Position.objects.all()
-        rooms = []
-
-        for position in positions:
-            room_data = {
-                "id": str(position.pk),  # Serialize UUID as string
-                "grid_x": position.grid_x,
-                "grid_y": position.grid_y,
-                "grid_z": position.grid_z,
-                "type": position.labels[0] if position.labels else "unknown",
-                "label": position.labels[1] if len(position.labels) > 1 else "regular",
-                "name": position.labels[2] if len(position.labels) > 2 else "unknown",
-            }
-            rooms.append(room_data)
-
-        return rooms
-
-    def _dump_connections(self, vertical=False) -> List[Dict[str, Any]]:
-        connections = PositionConnection.objects.filter(is_active=True)
-        connection_list = []
-
-        for connection in connections:
-            if vertical and not connection.is_vertical():
-                continue
-            if not vertical and connection.is_vertical():
-                continue
-            connection_data = {
-                "room_a": str(connection.position_from.pk),
-                "room_b": str(connection.position_to.pk),
-            }
-            connection_list.append(connection_data)
-
-        return connection_list
+        return json.loads("".join(self.exporter().iter_json()))
 
 
 class MiniMapDumper:
@@ -1,8 +1,23 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
-from apps.character.models import Character
+from apps.action.models import CharacterAction, SpecialAction
+from apps.character.models import Character, CharacterBiography, Stat, StatModifier
 from apps.core.bus import event_bus
+from apps.core.bus.routing import character_index
+from apps.effects.models import Effect
+from apps.fight.models import Fight, CharactersPendingJoinFight
+from apps.game.services.catalog import game_catalog
+from apps.game.services.fight.wakeup import notify_fights_changed
+from apps.game.services.character.stats_snapshot import invalidate_character_stats
 from apps.game.services.notifier.base import BaseNotifier
+from apps.game.services.skills.power import SkillPowerCache
+from apps.game.services.world.graph import world_graph
+from apps.game.services.world.map_export import on_map_characters_changed
+from apps.game.services.world.occupancy import occupancy_index
+from apps.items.models import CharacterItem, Item
+from apps.modificators.models import CharacterModificator
+from apps.school.models import School, Skill
+from apps.world.models import Position, PositionConnection
 
 notifier = BaseNotifier(event_bus)
 
@@ -13,3 +28,86 @@ def on_character_changed(sender, instance, created, **kwargs):
 
 
 post_save.connect(on_character_changed, sender=Character)
+
+
+def on_character_moved(sender, instance, update_fields=None, **kwargs):
+    character_index.update(instance)
+    occupancy_index.changed([instance], update_fields)
+    on_map_characters_changed(update_fields)
+
+
+def on_character_deleted(sender, instance, **kwargs):
+    character_index.remove(instance.pk)
+    occupancy_index.removed(instance)
+    on_map_characters_changed()
+
+
+def on_character_avatar_changed(sender, **kwargs):
+    on_map_characters_changed()
+
+
+post_save.connect(on_character_moved, sender=Character)
+post_delete.connect(on_character_deleted, sender=Character)
+post_save.connect(on_character_avatar_changed, sender=CharacterBiography)
+post_delete.connect(on_character_avatar_changed, sender=CharacterBiography)
+
+
+def on_character_stats_changed(sender, instance, **kwargs):
+    invalidate_character_stats(instance.character_id)
+
+
+# StatModifier deletes are invalidated explicitly by the effect manager, a post_delete receiver would
+# disable fast deletes of modifiers
+post_save.connect(on_character_stats_changed, sender=Stat)
+post_delete.connect(on_character_stats_changed, sender=Stat)
+post_save.connect(on_character_stats_changed, sender=StatModifier)
+post_save.connect(on_character_stats_changed, sender=CharacterItem)
+post_delete.connect(on_character_stats_changed, sender=CharacterItem)
+post_save.connect(on_character_stats_changed, sender=CharacterModificator)
+post_delete.connect(on_character_stats_changed, sender=CharacterModificator)
+
+
+def on_world_map_changed(sender, **kwargs):
+    world_graph.invalidate()
+
+
+post_save.connect(on_world_map_changed, sender=Position)
+post_delete.connect(on_world_map_changed, sender=Position)
+post_save.connect(on_world_map_changed, sender=PositionConnection)
+post_delete.connect(on_world_map_changed, sender=PositionConnection)
+
+
+def on_catalog_changed(sender, **kwargs):
+    game_catalog.invalidate()
+
+
+def on_skill_changed(sender, instance, **kwargs):
+    SkillPowerCache().invalidate_skill(instance.pk)
+    game_catalog.invalidate()
+
+
+post_save.connect(on_skill_changed, sender=Skill)
+post_delete.connect(on_skill_changed, sender=Skill)
+for catalog_model in (School, Effect, Item, SpecialAction):
+    post_save.connect(on_catalog_changed, sender=catalog_model)
+    post_delete.connect(on_catalog_changed, sender=catalog_model)
+
+
+def on_fight_changed(sender, instance, **kwargs):
+    notify_fights_changed([instance.pk])
+
+
+def on_fight_joiner_changed(sender, instance, **kwargs):
+    notify_fights_changed([instance.fight_id])
+
+
+def on_action_accepted(sender, instance, update_fields=None, **kwargs):
+    # accepted in batches are notified by `ActionAcceptanceBatch.flush`
+    if instance.fight_id and update_fields and 'accepted' in update_fields:
+        notify_fights_changed([instance.fight_id])
+
+
+post_save.connect(on_fight_changed, sender=Fight)
+post_save.connect(on_fight_joiner_changed, sender=CharactersPendingJoinFight)
+post_delete.connect(on_fight_joiner_changed, sender=CharactersPendingJoinFight)
+post_save.connect(on_action_accepted, sender=CharacterAction)
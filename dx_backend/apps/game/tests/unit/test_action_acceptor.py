@@ -0,0 +1,84 @@
+"""
+Unit tests for batched action acceptance.
+"""
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase
+
+from apps.action.models import CharacterAction, Cycle
+from apps.character.models import Character, Stat
+from apps.core.models import CharacterStats, CharacterActionType
+from apps.game.exceptions import GameException
+from apps.game.services.action.accept import ActionAcceptor, AccpetorFactory
+from apps.game.services.action.pipeline import ActionPipeline
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class SpendApService:
+    """Action service that costs 2 AP and rejects actions without enough AP."""
+
+    def check_acceptance(self, action):
+        if action.initiator.current_active_points < 2:
+            raise GameException("Not enough resources")
+
+    def accept(self, action):
+        action.initiator.current_active_points -= 2
+
+
+class ActionAcceptanceBatchTest(TestCase):
+    """Test actions of a pipeline accepted in one batch and published with one event."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        campaign = CampaignFactory()
+        cycle = Cycle.objects.create(campaign=campaign, number=0)
+        dimension, rank, position = DimensionFactory(speed=1.0), RankFactory(), PositionFactory()
+        self.factory = MagicMock()
+        self.factory.from_action.return_value = SpendApService()
+        self.notify = MagicMock()
+        self.actions = []
+        for i in range(3):
+            character = Character.objects.create(name=f"Test Character {i}", campaign=campaign, dimension=dimension,
+                                                 rank=rank, position=position, current_active_points=5)
+            Stat.objects.create(character=character, name=CharacterStats.SPEED, base_value=10)
+            for _ in range(3):
+                self.actions.append(CharacterAction.objects.create(
+                    initiator=character, cycle=cycle, action_type=CharacterActionType.USE_SKILL,
+                ))
+
+    def execute(self, actions):
+        pipeline = ActionPipeline(action_acceptor=AccpetorFactory(), action_factory=self.factory,
+                                  cycle_player_factory=MagicMock(), notifier=self.notify)
+        for action in actions:
+            pipeline.chain(action)
+        pipeline.execute()
+
+    def test_pipeline_accepts_in_one_batch(self):
+        self.execute(self.actions)
+
+        # the third action of every initiator runs out of AP
+        accepted = set(CharacterAction.objects.filter(accepted=True).values_list("id", flat=True))
+        self.assertEqual(len(accepted), 6)
+        self.notify.actions_accepted.assert_called_once()
+        self.assertEqual({a.pk for a in self.notify.actions_accepted.call_args.args[0]}, accepted)
+        self.notify.action_accepted.assert_not_called()
+        self.notify.action_not_accepted.assert_called()
+
+    def test_orders_match_single_acceptance(self):
+        self.execute(self.actions[:2])
+        orders = dict(CharacterAction.objects.filter(accepted=True).values_list("id", "order"))
+        # max AP is 5 for speed 10, the order grows with the spent AP
+        self.assertEqual([orders[a.pk] for a in self.actions[:2]], [2 / 5 + 1 / 10, 4 / 5 + 1 / 10])
+
+        single = self.actions[3]
+        ActionAcceptor(single, self.factory, self.notify).accept()
+        single.refresh_from_db()
+        self.assertTrue(single.accepted)
+        self.assertEqual(single.order, 2 / 5 + 1 / 10)
+        self.assertEqual(single.position_id, single.initiator.position_id)
+        # outside of a batch the acceptance is published on its own
+        self.notify.action_accepted.assert_called_once_with(single)
@@ -0,0 +1,65 @@
+"""
+Unit tests for the action event payload builder.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.action.api.serializers.openapi import GameMasterCharacterActionLogSerializer
+from apps.action.models import CharacterAction, Cycle, ActionImpact, DiceRollResult
+from apps.character.models import Character
+from apps.core.bus.events.world import ActionAcceptedData
+from apps.core.models import CharacterActionType, ImpactType, ImpactViolationType
+from apps.game.services.notifier.payload import ActionPayloadBuilder
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class ActionPayloadBuilderTest(TestCase):
+    """Test payloads match the DRF serializer with a fixed number of queries."""
+    context = {"request": None}
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        campaign = CampaignFactory()
+        cycle = Cycle.objects.create(campaign=campaign, number=0)
+        dimension, rank, position = DimensionFactory(), RankFactory(), PositionFactory()
+        characters = [
+            Character.objects.create(name=f"Test Character {i}", campaign=campaign, dimension=dimension, rank=rank,
+                                     position=position)
+            for i in range(3)
+        ]
+        for i in range(6):
+            initiator, target = characters[i % 3], characters[(i + 1) % 3]
+            action = CharacterAction.objects.create(initiator=initiator, cycle=cycle, position=position,
+                                                    action_type=CharacterActionType.USE_SKILL, accepted=True)
+            action.targets.add(target)
+            ActionImpact.objects.create(
+                action=action, target=target, type=ImpactType.DAMAGE, violation=ImpactViolationType.PHYSICAL,
+                size=i, dice_roll_result=DiceRollResult.objects.create(dice_side=i + 1, outcome="Success"),
+            )
+        self.ids = list(CharacterAction.objects.values_list("id", flat=True))
+
+    def test_payload_matches_serializer(self):
+        expected = {
+            action.id: ActionAcceptedData(**GameMasterCharacterActionLogSerializer(action, context=self.context).data)
+            for action in CharacterAction.objects.filter(id__in=self.ids)
+        }
+        builder = ActionPayloadBuilder(self.context)
+        payloads = builder.build_many(CharacterAction.objects.filter(id__in=self.ids))
+
+        self.assertEqual(len(payloads), 6)
+        for payload in payloads:
+            self.assertEqual(payload, expected[payload.id])
+        # skill, position and cycle are shared by all actions, initiators by two actions each
+        self.assertEqual(builder.misses, 3 + 3)
+
+    def test_batch_is_built_with_fixed_number_of_queries(self):
+        actions = list(CharacterAction.objects.filter(id__in=self.ids))
+        builder = ActionPayloadBuilder(self.context)
+        # actions with related objects, targets, impacts with their targets and dice rolls
+        with self.assertNumQueries(3):
+            builder.build_many(actions)
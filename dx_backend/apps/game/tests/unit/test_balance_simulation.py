@@ -0,0 +1,82 @@
+"""
+Unit tests for the Monte Carlo balance simulator.
+"""
+import unittest
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from apps.core.models import CharacterStats
+from apps.game.services.skills.power import SkillPowerService
+from apps.game.services.skills.simulation import BalanceSimulator, SimulatedCharacter, SimulatedSkill
+from apps.school.models import Skill
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def damage_skill(name: str, base: int, ap: int = 5, energy: int = 5) -> dict:
+    return {
+        "name": name,
+        "impact": [{"kind": "Damage", "type": "Heat", "formula": {
+            "base": base,
+            "requires": [{"stat": CharacterStats.FLOW_MANIPULATION, "value": 10}],
+            "scaling": [{"stat": CharacterStats.FLOW_MANIPULATION, "value": 0.2}],
+        }}],
+        "cost": [{"kind": "Action Points", "value": ap}, {"kind": "Energy", "value": energy}],
+    }
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class BalanceSimulatorTest(SimpleTestCase):
+    """Test simulated impacts and fights follow the game rules."""
+
+    def setUp(self):
+        self.simulator = BalanceSimulator(trials=200_000, seed=1)
+        # all stats 10: the requirements are met exactly, 5 action points and 75 health points
+        self.attacker = SimulatedCharacter.reference()
+
+    def test_mean_impact_matches_dice_multipliers(self):
+        report = self.simulator.evaluate(SimulatedSkill.from_fixture(damage_skill("Spark", 15)), [self.attacker])
+
+        # d6 faces give 7, 11, 15, 15, 18 and 30 damage
+        self.assertAlmostEqual(report.mean_impact, 16, delta=0.1)
+        self.assertEqual((report.p5_impact, report.p95_impact), (7, 30))
+        self.assertEqual(report.uses_per_cycle, 1)
+
+    def test_critical_fail_can_not_kill(self):
+        skill = SimulatedSkill.from_fixture(damage_skill("Meteor", 1000))
+
+        cycles = self.simulator.cycles_to_kill(self.attacker, skill, self.attacker)
+
+        self.assertAlmostEqual((cycles == 1).mean(), 5 / 6, delta=0.01)
+        self.assertAlmostEqual((cycles == 2).mean(), 5 / 36, delta=0.01)
+
+    def test_stronger_skill_wins(self):
+        skills = [SimulatedSkill.from_fixture(damage_skill(name, base)) for name, base in (("Weak", 10), ("Strong", 30))]
+
+        weak, strong = self.simulator.evaluate_all(skills, [self.attacker])
+
+        self.assertGreater(strong.win_rate, 0.9)
+        self.assertAlmostEqual(weak.win_rate + strong.win_rate, 1)
+        self.assertLess(strong.mean_cycles_to_kill, weak.mean_cycles_to_kill)
+
+
+@unittest.skipUnless(numpy, "NumPy is not installed")
+class SimulatedPowerTest(TestCase):
+    """Test stored simulated ratings are used by the skill power service."""
+
+    def test_store_simulated_power(self):
+        fields = damage_skill("Spark", 15)
+        skill = Skill.objects.create(description="", multi_target=False, **fields)
+        heuristic = SkillPowerService(skill, use_cache=False).calculate_power_rating()
+
+        call_command("simulate_balance", trials=1000, store=True, stdout=StringIO())
+
+        skill.refresh_from_db()
+        self.assertAlmostEqual(skill.simulated_power, 16 / 5, delta=0.5)
+        self.assertNotEqual(skill.simulated_power, heuristic)
+        self.assertEqual(SkillPowerService(skill).calculate_power_rating(), skill.simulated_power)
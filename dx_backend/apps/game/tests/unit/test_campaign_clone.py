@@ -0,0 +1,79 @@
+"""
+Unit tests for the table by table campaign cloner.
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.character.models import Character, Stat
+from apps.core.models import CharacterStats
+from apps.game.models import Campaign
+from apps.game.services.clone.bulk import BulkInstanceCloner, get_campaign_clone_plan
+from apps.game.services.clone.clone import PolymorphicCloneService
+from apps.game.services.clone.clone_strategy import CampaignCloneStrategy
+from apps.game.services.clone.rel_fix import get_default_relation_updater
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.items.models import CharacterItem, Item, WorldItem
+from apps.world.tests.factories import DimensionFactory
+
+
+class BulkCampaignClonerTest(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.campaign = CampaignFactory(is_active=True)
+        self.dimension, self.rank = DimensionFactory(), RankFactory()
+        self.item = Item.objects.create(name="Sword")
+
+    def populate(self, count: int):
+        for index in range(count):
+            character = Character.objects.create(name=f"Hero {index}", campaign=self.campaign,
+                                                 dimension=self.dimension, rank=self.rank)
+            for name in (CharacterStats.PHYSICAL_STRENGTH, CharacterStats.MENTAL_STRENGTH):
+                Stat.objects.create(character=character, name=name, base_value=index)
+            world_item = WorldItem.objects.create(item=self.item, campaign=self.campaign,
+                                                  dimension=self.dimension)
+            CharacterItem.objects.create(character=character, world_item=world_item)
+
+    def clone(self) -> BulkInstanceCloner:
+        cloner = BulkInstanceCloner(
+            self.campaign, get_campaign_clone_plan(),
+            CampaignCloneStrategy(cloner=PolymorphicCloneService(), fixer=get_default_relation_updater()),
+        )
+        cloner.clone()
+        return cloner
+
+    def test_clone_remaps_relations(self):
+        self.populate(2)
+
+        cloner = self.clone()
+        clone = cloner.root_instance
+
+        self.assertIn("(clone)", clone.name)
+        self.assertFalse(Campaign.objects.get(pk=clone.pk).is_active)
+        characters = Character.objects.filter(campaign=clone)
+        self.assertEqual(sorted(characters.values_list("name", flat=True)), ["Hero 0", "Hero 1"])
+        self.assertEqual(Stat.objects.filter(character__campaign=clone).count(), 4)
+        for character_item in CharacterItem.objects.filter(character__campaign=clone):
+            self.assertEqual(character_item.world_item.campaign_id, clone.pk)
+            self.assertEqual(character_item.world_item.item_id, self.item.pk)
+        # originals are untouched
+        self.assertEqual(Character.objects.filter(campaign=self.campaign).count(), 2)
+        self.assertEqual(cloner.report.rows["character.character"], 2)
+        self.assertEqual(cloner.report.rows["items.characteritem"], 2)
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.populate(1)
+        small = self.count_clone_queries()
+        self.populate(5)
+
+        self.assertEqual(self.count_clone_queries(), small)
+
+    def count_clone_queries(self) -> int:
+        with CaptureQueriesContext(connection) as context:
+            self.clone()
+        return len(context.captured_queries)
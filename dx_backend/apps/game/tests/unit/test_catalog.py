@@ -0,0 +1,89 @@
+"""
+Unit tests for the process-wide game catalog.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.action.models import SpecialAction
+from apps.core.models import (
+    AttributeType, CharacterSpecialActionType, ImpactType, ImpactViolationType, SharedVersion, SkillTypes,
+)
+from apps.core.utils.cache import expire_versions
+from apps.game.services.catalog import GameCatalog, game_catalog
+from apps.items.models import Item
+from apps.school.models import Skill
+
+
+class GameCatalogTest(TestCase):
+    """Test definitions are compiled once, frozen and reloaded after a save."""
+
+    def setUp(self):
+        game_catalog.invalidate()
+        self.skill = Skill.objects.create(
+            name="Fireball", description="", multi_target=False, type=SkillTypes.ATTACK, grade=1,
+            impact=[{"kind": ImpactType.DAMAGE, "type": ImpactViolationType.HEAT, "formula": {"base": 20}}],
+            cost=[{"kind": AttributeType.ACTION_POINTS, "value": 2}, {"kind": AttributeType.ENERGY, "value": 5},
+                  {"kind": AttributeType.ENERGY, "value": 1}],
+        )
+
+    def test_skill_is_compiled_frozen(self):
+        skill = game_catalog.skill(self.skill.pk)
+
+        self.assertEqual((skill.ap_cost, skill.ep_cost, skill.hp_cost), (2, 6, 0))
+        self.assertEqual(skill.impact[0]["formula"]["base"], 20)
+        self.assertGreater(skill.power, 0)
+        self.assertIn(skill, game_catalog.get().skills_by_type[SkillTypes.ATTACK])
+        with self.assertRaises(TypeError):
+            skill.impact[0]["formula"]["base"] = 100
+        with self.assertRaises(AttributeError):
+            skill.grade = 2
+
+    def test_lookups_do_not_query(self):
+        SpecialAction.objects.create(action_type=CharacterSpecialActionType.INSPECT, description="",
+                                     cost=[{"kind": AttributeType.ACTION_POINTS, "value": 1}])
+        game_catalog.get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(game_catalog.skill(self.skill.pk).name, "Fireball")
+            self.assertEqual(game_catalog.special_action(CharacterSpecialActionType.INSPECT).ap_cost, 1)
+
+    def test_save_bumps_version(self):
+        version = game_catalog.get().version
+
+        Skill.objects.filter(pk=self.skill.pk).update(grade=3)
+        self.assertEqual(game_catalog.skill(self.skill.pk).grade, 1)
+
+        self.skill.grade = 3
+        self.skill.save()
+        self.assertNotEqual(game_catalog.version, version)
+        self.assertEqual(game_catalog.skill(self.skill.pk).grade, 3)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_saves_of_other_processes_are_seen_after_expiry(self):
+        item = Item.objects.create(name="Old Map", canonical=False)
+        self.assertEqual(game_catalog.item(item.pk).name, "Old Map")
+
+        # another process renames the item and bumps the stored version when it commits
+        Item.objects.filter(pk=item.pk).update(name="Torn Map")
+        SharedVersion.objects.update_or_create(key=game_catalog.versions.key, defaults={"value": 3})
+        self.assertEqual(game_catalog.item(item.pk).name, "Old Map")
+
+        expire_versions()
+        self.assertEqual(game_catalog.item(item.pk).name, "Torn Map")
+
+    def test_unknown_definition(self):
+        with self.assertRaises(Skill.DoesNotExist):
+            game_catalog.skill(-1)
+
+    def test_unknown_definition_does_not_reload(self):
+        game_catalog.get()
+
+        with patch.object(GameCatalog, "load", wraps=GameCatalog.load) as load:
+            with self.assertNumQueries(1):
+                with self.assertRaises(Skill.DoesNotExist):
+                    game_catalog.skill(-1)
+            with self.assertNumQueries(0):
+                with self.assertRaises(Skill.DoesNotExist):
+                    game_catalog.skill(-1)
+        load.assert_not_called()
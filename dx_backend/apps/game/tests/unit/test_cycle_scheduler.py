@@ -0,0 +1,195 @@
+"""
+Unit tests for the campaign cycle scheduler.
+"""
+import threading
+import time
+from datetime import timedelta
+from functools import partial
+from unittest.mock import Mock, patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from apps.action.models import CharacterAction, Cycle
+from apps.character.models import CharacterSkillTemplate
+from apps.core.models import AttributeType, BehaviorModel, SkillTypes
+from apps.game.models import CampaignSchedule
+from apps.game.services.action.cycle_scheduler import CycleScheduler
+from apps.game.services.action.factory import CharacterActionFactory, ManualCharacterActionPlayerServiceFactory
+from apps.game.services.npc.factory import NPCFactory, NPCFactoryConfig
+from apps.game.tests.factories import CampaignFactory, CharacterTemplateFactory, OrganizationFactory, RankFactory
+from apps.school.models import Skill
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class FakeCyclePlayer:
+    """Advances the campaign to the next cycle, `on_play` runs while the cycle is played."""
+    on_play = None
+
+    def __init__(self, cycle, factory):
+        self.cycle = cycle
+
+    def play(self):
+        if self.on_play:
+            self.on_play(self.cycle)
+        return Cycle.objects.create(campaign=self.cycle.campaign, number=self.cycle.number + 1)
+
+
+class CycleSchedulerTest(TestCase):
+    """Test campaigns are played on their schedules."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaigns = [CampaignFactory(auto_play=True) for _ in range(2)]
+        self.manual = CampaignFactory(auto_play=False)
+        self.scheduler = CycleScheduler(FakeCyclePlayer, action_factory=None, worker_id="test")
+
+    def test_due_campaigns_are_played_once(self):
+        played = self.scheduler.run_pending()
+
+        self.assertCountEqual([result.campaign_id for result in played], [c.id for c in self.campaigns])
+        self.assertEqual([result.cycle_number for result in played], [1, 1])
+        self.assertFalse(Cycle.objects.filter(campaign=self.manual).exists())
+        # nothing is due until the next interval
+        self.assertEqual(self.scheduler.run_pending(), [])
+        for schedule in CampaignSchedule.objects.all():
+            self.assertEqual(schedule.played_cycles, 1)
+            self.assertEqual(schedule.worker, "test")
+            self.assertGreater(schedule.next_run_at, timezone.now() + timedelta(seconds=30))
+
+    def test_failures_and_overruns_are_recorded(self):
+        self.scheduler.ensure_schedules()
+        CampaignSchedule.objects.filter(campaign=self.campaigns[0]).update(deadline_seconds=0)
+        CampaignSchedule.objects.filter(campaign=self.campaigns[1]).update(
+            next_run_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        def fail(cycle):
+            raise RuntimeError("broken cycle")
+
+        with patch.object(FakeCyclePlayer, "on_play", staticmethod(fail)):
+            [result] = self.scheduler.run_pending()
+
+        self.assertEqual(result.error, "broken cycle")
+        self.assertTrue(result.overrun)
+        schedule = CampaignSchedule.objects.get(campaign=self.campaigns[0])
+        self.assertEqual((schedule.played_cycles, schedule.failed_cycles, schedule.overruns), (0, 1, 1))
+        self.assertEqual(schedule.last_error, "broken cycle")
+        # a failing campaign is retried after one interval, the lease is released
+        self.assertGreater(schedule.next_run_at, timezone.now() + timedelta(seconds=30))
+        self.assertIsNone(schedule.leased_until)
+
+
+class CycleSchedulerLockTest(TransactionTestCase):
+    """Test a campaign played by one worker is skipped by the others."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.campaign = CampaignFactory(auto_play=True)
+
+    def test_campaign_being_played_is_skipped(self):
+        concurrent = []
+
+        def play_concurrently(cycle):
+            def other_worker():
+                try:
+                    concurrent.append(CycleScheduler(FakeCyclePlayer, None, "other").play_next())
+                finally:
+                    connection.close()
+
+            thread = threading.Thread(target=other_worker)
+            thread.start()
+            thread.join()
+
+        with patch.object(FakeCyclePlayer, "on_play", staticmethod(play_concurrently)):
+            played = CycleScheduler(FakeCyclePlayer, None, "test").run_pending()
+
+        self.assertEqual(len(played), 1)
+        self.assertEqual(concurrent, [None])
+        self.assertEqual(Cycle.objects.filter(campaign=self.campaign).count(), 2)
+
+    @override_settings(CYCLE_SCHEDULER={"LEASE_SECONDS": 1, "HEARTBEAT_SECONDS": 0.2})
+    def test_lease_is_renewed_while_the_cycle_plays(self):
+        concurrent, plays = [], []
+
+        def play_past_the_lease(cycle):
+            plays.append(cycle.number)
+            if len(plays) == 1:
+                time.sleep(1.5)
+                concurrent.append(CycleScheduler(FakeCyclePlayer, None, "other").play_next())
+
+        with patch.object(FakeCyclePlayer, "on_play", staticmethod(play_past_the_lease)):
+            [result] = CycleScheduler(FakeCyclePlayer, None, "test").run_pending()
+
+        self.assertEqual((result.cycle_number, result.error), (1, ""))
+        self.assertEqual((plays, concurrent), ([0], [None]))
+        self.assertEqual(Cycle.objects.filter(campaign=self.campaign).count(), 2)
+        schedule = CampaignSchedule.objects.get(campaign=self.campaign)
+        self.assertEqual((schedule.played_cycles, schedule.worker, schedule.leased_until), (1, "test", None))
+
+    @override_settings(CYCLE_SCHEDULER={"LEASE_SECONDS": 1, "HEARTBEAT_SECONDS": 0.2})
+    def test_cycle_is_aborted_when_the_lease_is_lost(self):
+        def take_over(cycle):
+            # another worker took the campaign over, e.g. after this one stalled past its lease
+            CampaignSchedule.objects.filter(campaign=self.campaign).update(worker="other")
+            time.sleep(0.5)
+            Cycle.objects.count()
+
+        with patch.object(FakeCyclePlayer, "on_play", staticmethod(take_over)):
+            [result] = CycleScheduler(FakeCyclePlayer, None, "test").run_pending()
+
+        self.assertIn("was lost", result.error)
+        self.assertEqual(Cycle.objects.filter(campaign=self.campaign).count(), 1)
+        schedule = CampaignSchedule.objects.get(campaign=self.campaign)
+        self.assertEqual((schedule.played_cycles, schedule.failed_cycles, schedule.worker), (0, 0, "other"))
+
+
+class ParallelCyclePlayTest(TransactionTestCase):
+    """Test a cycle is played while the NPC actions are scheduled by parallel workers with their own connections."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.campaign = CampaignFactory(auto_play=True)
+        template = CharacterTemplateFactory(rank=RankFactory(), dimension=DimensionFactory())
+        skill = Skill.objects.create(name="Punch", description="", multi_target=False, type=SkillTypes.ATTACK,
+                                     grade=1, cost=[{"kind": AttributeType.ACTION_POINTS, "value": 3}])
+        CharacterSkillTemplate.objects.create(template=template, skill=skill, is_base=True)
+        npc_factory = NPCFactory(notify=Mock())
+        players, monsters = OrganizationFactory(), OrganizationFactory()
+        self.npcs = []
+        # two positions with a player and an aggressive NPC each, one shard per position
+        for _ in range(2):
+            config = NPCFactoryConfig(template=template, behavior=BehaviorModel.AGGRESSIVE, campaign=self.campaign,
+                                      position=PositionFactory())
+            player = npc_factory.create_npc(config)
+            player.npc, player.organization, player.behavior = False, players, BehaviorModel.PASSIVE
+            player.save(update_fields=["npc", "organization", "behavior"])
+            npc = npc_factory.create_npc(config)
+            npc.organization = monsters
+            npc.save(update_fields=["organization"])
+            self.npcs.append(npc)
+
+    @override_settings(NPC_SCHEDULER={"WORKERS": 2, "EXECUTOR": "thread", "SEED": 7})
+    def test_cycle_is_played_with_parallel_npc_scheduler(self):
+        player_factory = partial(ManualCharacterActionPlayerServiceFactory, notify=Mock(), auto_map_svc=Mock())
+        scheduler = CycleScheduler(player_factory, CharacterActionFactory(), "test")
+
+        [result] = scheduler.run_pending()
+
+        self.assertEqual(result.error, "")
+        next_cycle = Cycle.objects.get(campaign=self.campaign, number=result.cycle_number)
+        # the workers see the committed next cycle and accept the NPC attacks into it
+        self.assertEqual(
+            set(CharacterAction.objects.filter(cycle=next_cycle).values_list("initiator_id", flat=True)),
+            {npc.pk for npc in self.npcs},
+        )
+        schedule = CampaignSchedule.objects.get(campaign=self.campaign)
+        self.assertEqual((schedule.played_cycles, schedule.leased_until), (1, None))
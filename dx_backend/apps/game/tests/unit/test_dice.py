@@ -0,0 +1,89 @@
+"""
+Statistical and reproducibility tests for the dice engine.
+"""
+import unittest
+from collections import Counter
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from apps.game.services.rand_dice import DiceService, DiceStreams
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# chi-square critical values at p = 0.001 by degrees of freedom
+CHI2_CRITICAL = {1: 10.83, 2: 13.82, 3: 16.27, 4: 18.47, 5: 20.52, 19: 43.82}
+
+
+def expected_distribution(luck: int, sides: int) -> dict:
+    """Exact probabilities of `DiceService.roll`: uniform base roll, luck adjustment on half of the rolls."""
+    service = DiceService(SimpleNamespace(pk="expected"), luck, sides)
+    probabilities = Counter()
+    for base in range(1, sides + 1):
+        for bonus in (0, 1):
+            value = max(1, min(sides, round(base + service.luck_adjustment * bonus)))
+            probabilities[value] += 1 / (2 * sides)
+    return probabilities
+
+
+def chi_square(observed: Counter, probabilities: dict, count: int) -> float:
+    return sum((observed[value] - p * count) ** 2 / (p * count) for value, p in probabilities.items())
+
+
+class DiceStreamsTest(SimpleTestCase):
+    """Test rolls of a cycle are reproducible per character."""
+
+    def rolls(self, streams: DiceStreams, pk, count=20) -> list:
+        with streams.activate():
+            service = DiceService(SimpleNamespace(pk=pk), luck=10, sides=20)
+            return [service.roll() for _ in range(count)]
+
+    def test_same_seed_gives_same_rolls(self):
+        self.assertEqual(self.rolls(DiceStreams(42), "a"), self.rolls(DiceStreams(42), "a"))
+        self.assertNotEqual(self.rolls(DiceStreams(42), "a"), self.rolls(DiceStreams(43), "a"))
+
+    def test_character_rolls_do_not_depend_on_others(self):
+        alone = self.rolls(DiceStreams(42), "a")
+        streams = DiceStreams(42)
+        self.rolls(streams, "b", count=7)
+        self.assertEqual(self.rolls(streams, "a"), alone)
+
+
+class DiceDistributionTest(SimpleTestCase):
+    """Test the roll distribution against the exact one with a chi-square test."""
+    count = 60_000
+
+    def test_single_rolls(self):
+        for luck, sides in ((10, 6), (5, 6), (15, 6), (20, 20)):
+            with self.subTest(luck=luck, sides=sides), DiceStreams(luck * sides).activate():
+                service = DiceService(SimpleNamespace(pk="character"), luck, sides)
+                observed = Counter(service.roll() for _ in range(self.count))
+                probabilities = expected_distribution(luck, sides)
+                self.assertEqual(set(observed), set(probabilities))
+                statistic = chi_square(observed, probabilities, self.count)
+                self.assertLess(statistic, CHI2_CRITICAL[len(probabilities) - 1])
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_batched_rolls(self):
+        for luck, sides in ((10, 6), (5, 6), (15, 6), (20, 20)):
+            with self.subTest(luck=luck, sides=sides), DiceStreams(luck * sides).activate():
+                rolls = DiceService(SimpleNamespace(pk="character"), luck, sides).roll_many(self.count)
+                observed = Counter(rolls.tolist())
+                probabilities = expected_distribution(luck, sides)
+                self.assertEqual(set(observed), set(probabilities))
+                statistic = chi_square(observed, probabilities, self.count)
+                self.assertLess(statistic, CHI2_CRITICAL[len(probabilities) - 1])
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_batched_multipliers_match_single_rolls(self):
+        for sides in (6, 20):
+            service = DiceService(SimpleNamespace(pk="character"), 10, sides)
+            rolls = numpy.arange(1, sides + 1)
+            expected = []
+            for roll in rolls.tolist():
+                service.roll = lambda roll=roll: roll
+                expected.append(service._calculate_multiplier()[1])
+            self.assertEqual(service.multipliers(rolls).tolist(), expected)
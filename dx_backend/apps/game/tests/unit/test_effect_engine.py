@@ -0,0 +1,82 @@
+"""
+Unit tests for the cycle scoped effect engine.
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.action.models import Cycle
+from apps.character.models import Character
+from apps.core.models import EffectType
+from apps.effects.models import ActiveEffect, Effect
+from apps.game.services.character.working_set import CharacterWorkingSet
+from apps.game.services.effect.engine import CycleEffectEngine
+from apps.game.services.effect.facctory import ApplyEffectFactory
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory
+
+
+class CycleEffectEngineTest(TestCase):
+    """Test effects are applied and expired with a constant number of queries."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.cycle = Cycle.objects.create(campaign=self.campaign, number=1)
+        self.dimension, self.rank = DimensionFactory(speed=1.0), RankFactory()
+        self.burning = Effect.objects.get_or_create(id=EffectType.BURNING, defaults={"ends_in": 2})[0]
+        self.knocked_out = Effect.objects.get_or_create(id=EffectType.KNOCKED_OUT, defaults={"ends_in": 3})[0]
+
+    def create_characters(self, count: int, **fields) -> list[Character]:
+        characters = [
+            Character.objects.create(name=f"Character {i}", campaign=self.campaign, dimension=self.dimension,
+                                     rank=self.rank, current_health_points=50, current_energy_points=50, **fields)
+            for i in range(count)
+        ]
+        for character in characters:
+            ActiveEffect.objects.create(effect=self.burning, target=character, ends_in=2)
+        return characters
+
+    def apply(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            CycleEffectEngine(self.cycle, ApplyEffectFactory()).load().apply()
+        return len(queries)
+
+    def test_queries_do_not_grow_with_effects(self):
+        self.create_characters(2)
+        few = self.apply()
+        self.create_characters(8)
+        self.assertEqual(self.apply(), few)
+        self.assertEqual(set(ActiveEffect.objects.values_list("duration", flat=True)), {1, 2})
+
+    def test_knock_out_applied_in_working_set(self):
+        [character] = self.create_characters(1, current_active_points=5)
+        Character.objects.filter(id=character.id).update(current_health_points=0)
+        ActiveEffect.objects.create(effect=self.knocked_out, target=character, ends_in=3)
+        working_set = CharacterWorkingSet().load(Character.objects.filter(campaign=self.campaign))
+
+        with working_set.activate():
+            result = CycleEffectEngine(self.cycle, ApplyEffectFactory()).load(working_set.characters).apply()
+
+        self.assertEqual(result.by_type, {EffectType.BURNING: 1, EffectType.KNOCKED_OUT: 1})
+        tracked = working_set.get(character.id)
+        self.assertEqual((tracked.current_active_points, tracked.current_energy_points), (0, 0))
+        self.assertTrue(working_set.is_dirty(tracked))
+
+    def test_expire_finished_effects(self):
+        characters = self.create_characters(3)
+        ActiveEffect.objects.filter(target=characters[0]).update(duration=2)
+        ActiveEffect.objects.filter(target=characters[1]).update(active=False, duration=2)
+
+        with self.assertNumQueries(4):
+            expired = CycleEffectEngine(self.cycle, ApplyEffectFactory()).expire()
+
+        self.assertEqual(expired, {characters[0].id})
+        # deactivated effects are kept for the game master
+        self.assertEqual(set(ActiveEffect.objects.unsafe_all().values_list("target_id", flat=True)),
+                         {characters[1].id, characters[2].id})
@@ -0,0 +1,93 @@
+"""
+Unit tests for the set-based fight lifecycle engine.
+"""
+from unittest.mock import patch, MagicMock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.action.models import Cycle
+from apps.character.models import Character
+from apps.fight.models import Fight, CharactersPendingJoinFight
+from apps.game.services.fight.engine import FightLifecycleEngine
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class FightLifecycleEngineTest(TestCase):
+    """Test leaves, joins and closures of many fights at once."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.dimension, self.rank = DimensionFactory(), RankFactory()
+        Cycle.objects.create(campaign=self.campaign, number=0)
+        self.cycle = Cycle.objects.create(campaign=self.campaign, number=1)
+        self.notifier = MagicMock()
+
+    def character(self, name, position, **kwargs) -> Character:
+        return Character.objects.create(name=name, campaign=self.campaign, dimension=self.dimension, rank=self.rank,
+                                        position=position, current_health_points=10, current_active_points=5,
+                                        **kwargs)
+
+    def create_fights(self, count: int) -> list:
+        fights = []
+        for number in range(count):
+            position = PositionFactory()
+            attacker = self.character(f"Attacker {number}", position)
+            defender = self.character(f"Defender {number}", position)
+            fight = Fight.objects.create(campaign=self.campaign, position=position, attacker=attacker,
+                                         defender=defender, created=self.cycle)
+            Character.objects.filter(id__in=[attacker.id, defender.id]).update(fight=fight)
+            self.character(f"Bystander {number}", position)
+            fights.append(fight)
+        return fights
+
+    def process(self) -> dict:
+        return FightLifecycleEngine(self.notifier, self.cycle).load().process()
+
+    def test_query_count_does_not_grow_with_fights(self):
+        self.create_fights(2)
+        with CaptureQueriesContext(connection) as few:
+            self.process()
+        CharactersPendingJoinFight.objects.all().delete()
+        Character.objects.filter(name__startswith="Bystander").update(fight=None)
+
+        self.create_fights(6)
+        with CaptureQueriesContext(connection) as many:
+            results = self.process()
+
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(sum(map(len, results['auto_joins'].values())), 8)
+
+    def test_bystanders_join_as_pending_and_movers_leave(self):
+        fight, other = self.create_fights(2)
+        Character.objects.filter(pk=other.defender_id).update(position=PositionFactory())
+
+        results = self.process()
+
+        bystander = Character.objects.get(name="Bystander 0")
+        self.assertEqual(bystander.fight_id, fight.id)
+        self.assertEqual(bystander.current_active_points, 0)
+        self.assertTrue(CharactersPendingJoinFight.objects.filter(fight=fight, character=bystander).exists())
+        self.assertEqual([c.id for c in results['auto_leaves'][other.id]], [other.defender_id])
+        self.assertIsNone(Character.objects.get(pk=other.defender_id).fight_id)
+        self.assertEqual(results['closed_fights'], [])
+        self.assertEqual(self.notifier.bus.publish.call_count, 2 * 3)
+
+    def test_fight_without_viable_participants_is_closed(self):
+        fight, = self.create_fights(1)
+        Character.objects.filter(pk__in=[fight.defender_id]).update(current_health_points=0)
+        Character.objects.filter(name="Bystander 0").update(is_active=False)
+
+        results = self.process()
+
+        self.assertEqual([f.id for f in results['closed_fights']], [fight.id])
+        fight.refresh_from_db()
+        self.assertFalse(fight.open)
+        self.assertEqual(fight.ended_at_id, self.cycle.id)
+        self.assertFalse(Character.objects.filter(fight=fight).exists())
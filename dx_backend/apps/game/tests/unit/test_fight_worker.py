@@ -0,0 +1,103 @@
+"""
+Unit tests for the event-driven fight worker.
+"""
+from datetime import timedelta
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.action.models import Cycle
+from apps.character.models import Character
+from apps.fight.models import Fight
+from apps.game.models import CampaignSchedule
+from apps.game.services.fight.wakeup import FightChangeListener, notify_fights_changed
+from apps.game.services.fight.worker import FightWorker
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class FightWorkerTestMixin:
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.dimension, self.rank = DimensionFactory(), RankFactory()
+
+    def create_fight(self, campaign) -> Fight:
+        Cycle.objects.get_or_create(campaign=campaign, number=0)
+        position = PositionFactory()
+        attacker, defender = [
+            Character.objects.create(name=f"Fighter {i}", campaign=campaign, dimension=self.dimension,
+                                     rank=self.rank, position=position, current_health_points=10)
+            for i in range(2)
+        ]
+        fight = Fight.objects.create(campaign=campaign, position=position, attacker=attacker, defender=defender)
+        Character.objects.filter(id__in=[attacker.id, defender.id]).update(fight=fight)
+        return fight
+
+
+class FightWorkerTest(FightWorkerTestMixin, TestCase):
+    """Test only dirty fights are processed."""
+
+    def test_processes_dirty_fights_by_campaign(self):
+        campaigns = [CampaignFactory() for _ in range(2)]
+        fights = [self.create_fight(campaigns[0]), self.create_fight(campaigns[0]), self.create_fight(campaigns[1])]
+        worker = FightWorker(MagicMock(), workers=1)
+        worker.mark_dirty([str(fights[0].id), fights[2].id])
+
+        with patch.object(FightWorker, "engine_cls") as engine_cls:
+            engine_cls.return_value.load.return_value.process.return_value = {"closed_fights": []}
+            results = worker.process_dirty()
+
+        self.assertCountEqual(results, [campaigns[0].id, campaigns[1].id])
+        processed = {call.args[1].campaign_id: call.kwargs["fight_ids"] for call in engine_cls.call_args_list}
+        self.assertEqual(processed, {campaigns[0].id: {fights[0].id}, campaigns[1].id: {fights[2].id}})
+        self.assertEqual(worker.dirty, set())
+
+    def test_dirty_fight_is_closed(self):
+        campaign = CampaignFactory()
+        fight = self.create_fight(campaign)
+        Character.objects.filter(fight=fight).update(current_health_points=0)
+        worker = FightWorker(MagicMock(), workers=1)
+        worker.mark_dirty([fight.id])
+
+        [result] = worker.process_dirty().values()
+
+        self.assertEqual(result["closed_fights"], [fight])
+        self.assertFalse(Fight.objects.get(id=fight.id).open)
+
+    def test_fights_of_leased_campaign_stay_dirty(self):
+        campaign = CampaignFactory(auto_play=True)
+        fight = self.create_fight(campaign)
+        CampaignSchedule.objects.create(campaign=campaign, next_run_at=timezone.now(), worker="player",
+                                        leased_until=timezone.now() + timedelta(minutes=5))
+        schedules = CampaignSchedule.objects.filter(campaign=campaign)
+        worker = FightWorker(MagicMock(), workers=1)
+        worker.mark_dirty([fight.id])
+
+        with patch.object(FightWorker, "engine_cls") as engine_cls:
+            self.assertEqual(worker.process_dirty(), {})
+            self.assertEqual(worker.dirty, {fight.id})
+            engine_cls.assert_not_called()
+
+            # the cycle player released the lease
+            schedules.update(leased_until=None)
+            engine_cls.return_value.load.return_value.process.return_value = {"closed_fights": []}
+            self.assertEqual(list(worker.process_dirty()), [campaign.id])
+
+
+class FightChangeListenerTest(FightWorkerTestMixin, TransactionTestCase):
+    """Test fight changes wake up the listener."""
+
+    def test_saved_fight_is_received(self):
+        listener = FightChangeListener()
+        listener.listen()
+        self.addCleanup(listener.close)
+
+        fight = self.create_fight(CampaignFactory())
+        notify_fights_changed([fight.id, None])
+
+        self.assertIn(str(fight.id), listener.wait(timeout=1))
+        self.assertEqual(listener.wait(timeout=0), set())
@@ -0,0 +1,78 @@
+"""
+Unit tests for the streamed, cached world map export.
+"""
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.character.models import Character
+from apps.core.models import SharedVersion
+from apps.core.utils.cache import expire_versions
+from apps.game.services.world.map_export import MapExporter, MapTile, map_characters_version
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.models import PositionConnection
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class MapExporterTest(TestCase):
+    def setUp(self):
+        self.west = PositionFactory(grid_x=0, grid_y=0, grid_z=0, labels=["street", "regular", "West"])
+        self.east = PositionFactory(grid_x=1, grid_y=0, grid_z=0, labels=[])
+        self.far = PositionFactory(grid_x=40, grid_y=0, grid_z=0)
+        self.upstairs = PositionFactory(grid_x=0, grid_y=0, grid_z=1)
+        PositionConnection.objects.create(position_from=self.west, position_to=self.east)
+        PositionConnection.objects.create(position_from=self.west, position_to=self.upstairs)
+
+    def export(self, tile=MapTile()) -> dict:
+        return json.loads("".join(MapExporter(tile).iter_json()))
+
+    def test_exports_the_dumper_format(self):
+        data = self.export()
+        rooms = {room["id"]: room for room in data["rooms"]}
+        self.assertEqual(len(rooms), 4)
+        self.assertEqual(rooms[str(self.west.pk)]["name"], "West")
+        self.assertEqual(rooms[str(self.east.pk)]["type"], "unknown")
+        self.assertEqual(len(data["connections"]), 1)
+        self.assertEqual(len(data["virtualConnections"]), 1)
+        self.assertEqual(data["characters"], {})
+
+    def test_tile_contains_its_region_and_connections_leaving_it(self):
+        data = self.export(MapTile.from_params({"grid_z": "0", "tile_x": "0", "tile_y": "0"}, size=32))
+        self.assertEqual({room["id"] for room in data["rooms"]}, {str(self.west.pk), str(self.east.pk)})
+        self.assertEqual(len(data["virtualConnections"]), 1)
+        with self.assertRaises(ValueError):
+            MapTile.from_params({"tile_x": "0", "tile_y": "0"})
+
+    def test_sections_are_cached_until_the_map_changes(self):
+        exporter = MapExporter()
+        first = "".join(exporter.iter_json())
+        with self.assertNumQueries(0):
+            self.assertEqual("".join(MapExporter().iter_json()), first)
+            self.assertEqual(MapExporter().etag, exporter.etag)
+
+        PositionConnection.objects.create(position_from=self.east, position_to=self.far)
+        updated = MapExporter()
+        self.assertNotEqual(updated.etag, exporter.etag)
+        self.assertEqual(len(json.loads("".join(updated.iter_json()))["connections"]), 2)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_characters_moved_by_other_processes_are_shown_from_the_next_request(self):
+        # the characters and the stored version of the test are rolled back, later tests must not see them
+        self.addCleanup(expire_versions)
+        self.addCleanup(cache.clear)
+        with patch('apps.game.signals.notifier'):
+            hero = Character.objects.create(name="Hero", position=self.west, campaign=CampaignFactory(),
+                                            dimension=DimensionFactory(), rank=RankFactory())
+        exporter = MapExporter()
+        self.assertEqual(list(self.export()["characters"]), [str(self.west.pk)])
+
+        # another process moves the hero and bumps the stored version when it commits
+        Character.objects.filter(pk=hero.pk).update(position=self.east)
+        SharedVersion.objects.update_or_create(key=map_characters_version.key, defaults={"value": 5})
+        # a new request reads the stored versions again
+        expire_versions()
+
+        self.assertNotEqual(MapExporter().etag, exporter.etag)
+        self.assertEqual(list(self.export()["characters"]), [str(self.east.pk)])
@@ -0,0 +1,46 @@
+"""
+Unit tests for the parallel NPC action scheduler.
+"""
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.game.services.action.npc.rng import get_rng, use_rng
+from apps.game.services.action.npc.scheduler import ParallelNpcActionScheduler
+
+
+class FakePosition:
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class ParallelNpcActionSchedulerTest(SimpleTestCase):
+    def setUp(self):
+        self.scheduler = ParallelNpcActionScheduler(factory=None, workers=2, seed=7)
+
+    def test_shards_are_balanced_by_characters(self):
+        positions = {
+            FakePosition(f"p{i}"): {"org": [object()] * size}
+            for i, size in enumerate((6, 3, 3, 2, 1))
+        }
+        shards = self.scheduler.make_shards(positions)
+        loads = sorted(sum(len(positions[position]["org"]) for position in shard) for shard in shards)
+        self.assertEqual(loads, [7, 8])
+
+    def test_equal_orders_are_spread_in_position_order(self):
+        accepted = [(1.0, "b", 0, 3), (1.0, "a", 1, 2), (1.0, "a", 0, 1), (2.0, "a", 2, 4)]
+        with patch("apps.game.services.action.npc.scheduler.CharacterAction.objects.bulk_update") as bulk_update:
+            self.scheduler.merge_orders(accepted)
+        changed = {action.id: action.order for action in bulk_update.call_args.args[0]}
+        self.assertEqual(changed, {2: 1.0 + 1e-9, 3: 1.0 + 2e-9})
+
+    def test_position_rng_is_reproducible(self):
+        cycle, position = SimpleNamespace(pk=1), FakePosition("p")
+        with use_rng(self.scheduler.position_rng(cycle, position)):
+            first = [get_rng().random() for _ in range(3)]
+        with use_rng(self.scheduler.position_rng(cycle, position)):
+            second = [get_rng().random() for _ in range(3)]
+        self.assertEqual(first, second)
+        self.assertIs(get_rng(), random)
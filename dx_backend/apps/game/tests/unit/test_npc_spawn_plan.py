@@ -0,0 +1,68 @@
+"""
+Unit tests for NPCs created in bulk from a compiled template.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.character.models import CharacterEquipmentTemplate, CharacterModifierTemplate, CharacterSkillTemplate
+from apps.core.models import CharacterStats, SkillTypes
+from apps.game.services.character.core import CharacterService
+from apps.game.services.notifier.base import BaseNotifier
+from apps.game.services.npc.factory import NPCFactory, NPCFactoryConfig
+from apps.game.tests.factories import (
+    CampaignFactory, CharacterStatTemplateFactory, CharacterTemplateFactory, RankFactory,
+)
+from apps.items.models import Item
+from apps.school.models import Skill
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class NPCSpawnPlanTest(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.template = CharacterTemplateFactory(rank=RankFactory(), dimension=DimensionFactory(speed=2))
+        for stat, value in ((CharacterStats.PHYSICAL_STRENGTH, 12), (CharacterStats.SPEED, 6)):
+            CharacterStatTemplateFactory(template=self.template.stats_template, stat=stat, value=value)
+        CharacterModifierTemplate.objects.create(template=self.template, stat=CharacterStats.PHYSICAL_STRENGTH,
+                                                 value=2)
+        skill = Skill.objects.create(name="Punch", description="", multi_target=False, type=SkillTypes.ATTACK,
+                                     grade=1)
+        CharacterSkillTemplate.objects.create(template=self.template, skill=skill, is_base=True)
+        CharacterEquipmentTemplate.objects.create(template=self.template, item=Item.objects.create(name="Knife"))
+        self.factory = NPCFactory(notify=MagicMock())
+        self.config = NPCFactoryConfig(template=self.template, position=PositionFactory(), name="Thug",
+                                       campaign=CampaignFactory())
+
+    def test_bulk_npcs_match_single_npc(self):
+        single = self.factory.create_npc(self.config)
+        npcs = self.factory.create_npcs(self.config, 3)
+
+        self.assertEqual([npc.name for npc in npcs], ["Thug 1", "Thug 2", "Thug 3"])
+        self.assertEqual(self.factory.notify.character_changed.call_count, 3)
+        for npc in [single] + npcs:
+            npc.refresh_from_db()
+            service = CharacterService(npc)
+            self.assertEqual(service.get_stat(CharacterStats.PHYSICAL_STRENGTH), 14)
+            self.assertEqual(npc.current_health_points, service.get_max_hp())
+            self.assertEqual(npc.current_active_points, 6)
+            self.assertEqual(npc.current_energy_points, service.get_max_energy())
+            self.assertEqual(npc.stats.count(), single.stats.count())
+            self.assertEqual(list(npc.learned_skills.values_list("is_base", flat=True)), [True])
+            self.assertEqual(npc.equipped_items.get().world_item.position_id, self.config.position.pk)
+            self.assertGreaterEqual(npc.biography.age, 18)
+
+    def test_queries_do_not_grow_with_count(self):
+        self.factory = NPCFactory(notify=BaseNotifier(MagicMock()))
+
+        def count_queries(count: int) -> int:
+            with CaptureQueriesContext(connection) as context:
+                self.factory.create_npcs(self.config, count)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(20))
@@ -0,0 +1,91 @@
+"""
+Unit tests for the per campaign occupancy index.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.character.models import Character
+from apps.core.models import BehaviorModel, SharedVersion
+from apps.core.utils.cache import expire_versions
+from apps.game.services.character.core import CharacterService
+from apps.game.services.world.movemant import MovementService
+from apps.game.services.world.occupancy import get_occupancy, occupancy_index
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class OccupancyIndexTest(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.campaign, self.other_campaign = CampaignFactory(), CampaignFactory()
+        self.dimension, self.rank = DimensionFactory(), RankFactory()
+        self.hall, self.cellar = PositionFactory(), PositionFactory()
+        self.hero = self.create_character("Hero", self.hall)
+        self.guard = self.create_character("Guard", self.hall, npc=True, behavior=BehaviorModel.AGGRESSIVE)
+        self.rat = self.create_character("Rat", self.cellar, npc=True)
+
+    def create_character(self, name, position, campaign=None, **kwargs) -> Character:
+        return Character.objects.create(name=name, position=position, campaign=campaign or self.campaign,
+                                        dimension=self.dimension, rank=self.rank, **kwargs)
+
+    def test_lookups_are_served_from_memory(self):
+        self.create_character("Stranger", self.cellar, campaign=self.other_campaign)
+        occupancy = get_occupancy(self.campaign)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_occupancy(self.campaign), occupancy)
+            self.assertEqual(sorted(occupancy.ids_at(self.hall)), sorted([self.hero.pk, self.guard.pk]))
+            self.assertEqual(occupancy.ids_at(self.hall, npc=False), [self.hero.pk])
+            self.assertEqual(occupancy.aggressive_npcs_at(self.hall), [self.guard.pk])
+            self.assertEqual(occupancy.positions_with_players(), {self.hall.pk})
+            self.assertEqual(occupancy.sub_locations_with_players(), {self.hall.sub_location_id})
+            self.assertEqual(occupancy.positions_in(self.cellar.sub_location_id), {self.cellar.pk})
+            self.assertFalse(occupancy.has_others(self.cellar, self.rat))
+
+    def test_index_follows_moves_and_deactivation(self):
+        occupancy = get_occupancy(self.campaign)
+        self.hero.current_health_points = 1
+        self.hero.save(update_fields=["current_health_points"])
+        self.hero.save()
+        self.assertIs(get_occupancy(self.campaign), occupancy)
+
+        self.hero.position = self.cellar
+        self.hero.save()
+        self.assertEqual(get_occupancy(self.campaign).positions_with_players(), {self.cellar.pk})
+
+        self.rat.is_active = False
+        self.rat.save(update_fields=["is_active"])
+        self.assertEqual(get_occupancy(self.campaign).ids_at(self.cellar), [self.hero.pk])
+
+        self.guard.delete()
+        self.assertEqual(get_occupancy(self.campaign).ids_at(self.hall), [])
+
+    def test_services_use_the_index(self):
+        self.create_character("Stranger", self.cellar, campaign=self.other_campaign)
+        get_occupancy(self.campaign)
+        self.rat.refresh_from_db()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(CharacterService(self.hero).not_alone())
+            # characters of other campaigns do not share the position
+            self.assertFalse(CharacterService(self.rat).not_alone())
+            MovementService().validate_other_requirements(self.rat, self.hall)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_moves_of_other_processes_are_seen_after_expiry(self):
+        self.assertEqual(get_occupancy(self.campaign).ids_at(self.cellar), [self.rat.pk])
+
+        # another process moves the rat and bumps the stored version when it commits
+        Character.objects.filter(pk=self.rat.pk).update(position=self.hall)
+        key = occupancy_index.versions(self.campaign.pk).key
+        SharedVersion.objects.update_or_create(key=key, defaults={"value": 7})
+        self.assertEqual(get_occupancy(self.campaign).ids_at(self.cellar), [self.rat.pk])
+
+        # the next request or cycle reads the stored versions again
+        expire_versions()
+        self.assertEqual(get_occupancy(self.campaign).ids_at(self.cellar), [])
+        self.assertIn(self.rat.pk, get_occupancy(self.campaign).ids_at(self.hall))
@@ -0,0 +1,74 @@
+"""
+Unit tests for the bulk world map importer.
+"""
+import json
+import tempfile
+
+from django.test import TestCase
+
+from apps.game.services.world.position import BulkPositionLoader, Reporter, UUIDTranslator
+from apps.world.models import Position, PositionConnection
+from apps.world.tests.factories import SubLocationFactory
+
+
+class SilentReporter(Reporter):
+    def __init__(self):
+        self.progress = []
+
+    def on_position_processed(self, room):
+        pass
+
+    def on_connection_processed(self, connection):
+        pass
+
+    def on_progress(self, stage, processed):
+        self.progress.append((stage, processed))
+
+    def report(self):
+        pass
+
+
+class BulkPositionLoaderTest(TestCase):
+    def setUp(self):
+        self.sub_location = SubLocationFactory()
+        self.rooms = [
+            {"id": room_id, "name": f"Room {room_id}", "type": "default", "grid_x": room_id, "grid_y": 0, "grid_z": 0}
+            for room_id in range(1, 6)
+        ]
+        self.data = {
+            "rooms": self.rooms,
+            "connections": [{"room_a": 2, "room_b": 1}, {"room_a": 2, "room_b": 3}, {"room_a": 3, "room_b": 99}],
+            "virtualConnections": [{"room_a": 1, "room_b": 2}, {"room_a": 4, "room_b": 5}],
+        }
+
+    def load(self, dry_run=False):
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as file:
+            json.dump(self.data, file)
+            file.flush()
+            reporter = SilentReporter()
+            loader = BulkPositionLoader(file.name, self.sub_location, reporter=reporter, chunk_size=2,
+                                        dry_run=dry_run)
+            return loader.load(), reporter
+
+    def test_dry_run_reports_the_diff_without_writing(self):
+        diff, reporter = self.load(dry_run=True)
+        self.assertEqual((diff.positions_created, diff.connections_created, diff.connections_skipped), (5, 3, 1))
+        self.assertFalse(Position.objects.exists())
+        self.assertEqual(reporter.progress[:3], [("Rooms", 2), ("Rooms", 4), ("Rooms", 5)])
+
+    def test_import_upserts_in_chunks(self):
+        # 3 room and 3 connection chunks with one lookup and at most one write each, the unknown room lookup
+        # and the savepoint
+        with self.assertNumQueries(14):
+            self.load()
+        self.assertEqual(Position.objects.count(), 5)
+        self.assertEqual(PositionConnection.objects.count(), 3)
+        first = Position.objects.get(pk=UUIDTranslator().to_internal_id(1))
+        self.assertEqual(first.labels, ["default", "regular", "Room 1"])
+
+        self.rooms[0]["grid_y"] = 7
+        diff, _ = self.load()
+        self.assertEqual((diff.positions_updated, diff.positions_unchanged), (1, 4))
+        self.assertEqual((diff.connections_created, diff.connections_existing), (0, 3))
+        first.refresh_from_db()
+        self.assertEqual(first.grid_y, 7)
@@ -0,0 +1,89 @@
+"""
+Unit tests for serializer prefetch plans and view query budgets.
+"""
+from unittest.mock import patch
+
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.action.api.serializers.openapi import CharacterActionLogSerializer
+from apps.action.api.views.openai import CharacterActionsLogViewSet
+from apps.action.models import CharacterAction, Cycle, ActionImpact, DiceRollResult
+from apps.character.models import Character
+from apps.client.models import Client
+from apps.core.api.utils.prefetch import plan_for
+from apps.core.api.utils.query_budget import QueryBudgetExceeded, QueryCounter
+from apps.core.models import CharacterActionType, ImpactType, ImpactViolationType
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class PrefetchPlanTest(TestCase):
+    """Test plans derived from the declared serializer fields."""
+
+    def test_plan_of_action_log_serializer(self):
+        plan = plan_for(CharacterActionLogSerializer())
+
+        self.assertCountEqual(plan.select_related, ["skill", "cycle"])
+        prefetches = {lookup.prefetch_through: lookup for lookup in plan.prefetch_related}
+        self.assertCountEqual(prefetches, ["impacts", "targets"])
+        self.assertIsInstance(prefetches["impacts"], Prefetch)
+        self.assertEqual(prefetches["impacts"].queryset.query.select_related, {"dice_roll_result": {}})
+
+
+@override_settings(QUERY_BUDGET={"ENABLED": True, "RAISE": True})
+class ActionsLogQueryBudgetTest(TestCase):
+    """Test the actions log runs the same number of queries for any number of actions."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.cycle = Cycle.objects.create(campaign=self.campaign, number=0)
+        dimension, rank, self.position = DimensionFactory(), RankFactory(), PositionFactory()
+        self.characters = [
+            Character.objects.create(name=f"Test Character {i}", campaign=self.campaign, dimension=dimension,
+                                     rank=rank, position=self.position)
+            for i in range(2)
+        ]
+        self.user = Client.objects.create_user(email="player@example.com", main_character=self.characters[0],
+                                               current_campaign=self.campaign)
+
+    def create_actions(self, count):
+        initiator, target = self.characters
+        for i in range(count):
+            action = CharacterAction.objects.create(initiator=initiator, cycle=self.cycle, position=self.position,
+                                                    action_type=CharacterActionType.USE_SKILL, accepted=True)
+            action.targets.add(target)
+            ActionImpact.objects.create(
+                action=action, target=target, type=ImpactType.DAMAGE, violation=ImpactViolationType.PHYSICAL,
+                size=i, dice_roll_result=DiceRollResult.objects.create(dice_side=i + 1, outcome="Success"),
+            )
+
+    def list_actions(self):
+        request = APIRequestFactory().get("/actions/log/")
+        # a fresh user instance, as loaded by the authentication
+        force_authenticate(request, user=Client.objects.get(pk=self.user.pk))
+        with QueryCounter() as counter:
+            response = CharacterActionsLogViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return response, len(counter)
+
+    def test_queries_do_not_grow_with_actions(self):
+        self.create_actions(2)
+        response, few = self.list_actions()
+        self.assertEqual(response.data["count"], 2)
+
+        self.create_actions(6)
+        response, many = self.list_actions()
+        self.assertEqual(response.data["count"], 8)
+        self.assertEqual(few, many)
+
+    def test_exceeded_budget_fails(self):
+        self.create_actions(2)
+        with patch.object(CharacterActionsLogViewSet, "query_budgets", {"list": 2}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.list_actions()
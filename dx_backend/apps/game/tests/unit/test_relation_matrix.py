@@ -0,0 +1,137 @@
+"""
+Unit tests for the relation matrix used by the NPC position state.
+"""
+import threading
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from apps.character.models import Character, CharacterRelation, Organization, OrganizationRelation
+from apps.core.models import BehaviorModel
+from apps.game.services.action.npc.position import PositionCharactersBehaviorStateService
+from apps.game.services.relation.matrix import RelationMatrix
+from apps.game.services.relation.service import OrganizationRelationService
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class PositionRelationMatrixTest(TestCase):
+    """Test relations resolved for a crowded position."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        campaign = CampaignFactory()
+        self.position = PositionFactory()
+        dimension, rank = DimensionFactory(), RankFactory()
+        self.raiders = Organization.objects.create(name="Raiders", description="", behavior=BehaviorModel.AGGRESSIVE)
+        self.traders = Organization.objects.create(name="Traders", description="")
+        self.orgs = {}
+        for org in (self.raiders, self.traders):
+            self.orgs[org] = [
+                Character.objects.create(name=f"{org.name} {i}", campaign=campaign, dimension=dimension, rank=rank,
+                                         position=self.position, organization=org, npc=True)
+                for i in range(5)
+            ]
+
+    def prepare(self) -> PositionCharactersBehaviorStateService:
+        return PositionCharactersBehaviorStateService(self.position, self.orgs).prepare()
+
+    def test_prepare_resolves_relations_in_fixed_number_of_queries(self):
+        # 2 loads and one bulk create per relation model, wrapped in a savepoint
+        with self.assertNumQueries(6):
+            state = self.prepare()
+
+        trader_context = state.get_context(self.orgs[self.traders][0])
+        self.assertEqual({c.get_id() for c in trader_context.enemies}, {str(c.id) for c in self.orgs[self.raiders]})
+        self.assertEqual(len(trader_context.friends), 4)
+        self.assertEqual(len(trader_context.neutral), 0)
+        raider_context = state.get_context(self.orgs[self.raiders][0])
+        self.assertEqual({c.get_id() for c in raider_context.neutral}, {str(c.id) for c in self.orgs[self.traders]})
+
+        self.assertEqual(CharacterRelation.objects.filter(type=BehaviorModel.AGGRESSIVE).count(), 25)
+        self.assertEqual(CharacterRelation.objects.filter(type=BehaviorModel.PASSIVE).count(), 25)
+        self.assertEqual(OrganizationRelation.objects.count(), 2)
+
+        # second run only reads
+        with self.assertNumQueries(2):
+            self.prepare()
+
+    def test_character_override_spreads_to_organization(self):
+        raider, trader = self.orgs[self.raiders][0], self.orgs[self.traders][0]
+        CharacterRelation.objects.create(character_from=raider, character_to=trader,
+                                         type=BehaviorModel.FRIENDLY, immutable=True)
+        # 2 loads, 2 bulk creates and 3 queries to recalculate the organization relation, wrapped in a savepoint
+        with self.assertNumQueries(9):
+            state = self.prepare()
+
+        self.assertEqual({c.get_id() for c in state.get_context(raider).friends},
+                         {str(c.id) for c in self.orgs[self.raiders] + self.orgs[self.traders]} - {str(raider.id)})
+        self.assertEqual(OrganizationRelation.objects.get(organization_from=self.raiders).type,
+                         BehaviorModel.FRIENDLY)
+
+
+class ConcurrentRelationMatrixTest(TransactionTestCase):
+    """Test matrices of positions sharing organizations saved at the same time, as NPC scheduler shards do."""
+    shards = 4
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        campaign = CampaignFactory()
+        dimension, rank = DimensionFactory(), RankFactory()
+        self.raiders = Organization.objects.create(name="Raiders", description="", behavior=BehaviorModel.AGGRESSIVE)
+        self.traders = Organization.objects.create(name="Traders", description="")
+        self.positions = []
+        for i in range(self.shards):
+            position = PositionFactory()
+            orgs = {
+                org: [Character.objects.create(name=f"{org.name} {i}.{j}", campaign=campaign, dimension=dimension,
+                                               rank=rank, position=position, organization=org, npc=True)
+                      for j in range(2)]
+                for org in (self.raiders, self.traders)
+            }
+            # the override spreads to the other raider, so every shard recalculates the organization relation
+            CharacterRelation.objects.create(character_from=orgs[self.raiders][0], character_to=orgs[self.traders][0],
+                                             type=BehaviorModel.FRIENDLY, immutable=True)
+            self.positions.append((position, orgs))
+
+    def test_shards_share_organization_relations(self):
+        barrier = threading.Barrier(self.shards, timeout=30)
+
+        class SynchronizedMatrix(RelationMatrix):
+            def save(self):
+                # every shard has loaded no organization relation before any of them writes
+                barrier.wait()
+                super().save()
+
+        errors = []
+
+        def prepare(position, orgs):
+            try:
+                state = PositionCharactersBehaviorStateService(position, orgs)
+                state.matrix = SynchronizedMatrix(character for characters in orgs.values() for character in characters)
+                state.prepare()
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+                barrier.abort()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=prepare, args=args) for args in self.positions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(OrganizationRelation.objects.count(), 2)
+        self.assertEqual(OrganizationRelationService(self.traders).get_relation_to(self.raiders),
+                         BehaviorModel.AGGRESSIVE)
+        relation_type = OrganizationRelationService(self.raiders).get_relation_to(self.traders)
+        self.assertEqual(relation_type, OrganizationRelationService(self.raiders).recalculate_relation_with(self.traders))
@@ -0,0 +1,90 @@
+"""
+Unit tests for set-based shield decay and cycle scoped shield state.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.character.models import Character
+from apps.core.models import ImpactType, ImpactViolationType
+from apps.game.services.character.core import CharacterService
+from apps.game.services.shield import ActiveShieldImpactService, ActiveShieldLifeCycleService, CycleShieldState
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.shields.models import ActiveShield, Shield
+from apps.world.tests.factories import DimensionFactory
+
+
+class ShieldTestCase(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.dimension, self.rank = DimensionFactory(), RankFactory()
+        self.heat = Shield.objects.get_or_create(id=ImpactViolationType.HEAT)[0]
+
+    def create_character(self, campaign=None) -> Character:
+        return Character.objects.create(name="Shielded", campaign=campaign or CampaignFactory(),
+                                        dimension=self.dimension, rank=self.rank, current_health_points=50)
+
+    def create_shield(self, character: Character, cycles_left: int = 3, health: int = 30, shield=None) -> ActiveShield:
+        return ActiveShield.objects.create(shield=shield or self.heat, target=character, cycles_left=cycles_left,
+                                           health=health)
+
+
+class ActiveShieldLifeCycleServiceTest(ShieldTestCase):
+    """Test shields of a campaign decay with a constant number of queries."""
+
+    def test_decrease_cycles_of_campaign(self):
+        character = self.create_character()
+        cold = Shield.objects.get_or_create(id=ImpactViolationType.COLD)[0]
+        expiring = self.create_shield(character, cycles_left=1)
+        lasting = self.create_shield(character, cycles_left=3, shield=cold)
+        other = self.create_shield(self.create_character(), cycles_left=1)
+
+        with self.assertNumQueries(3):
+            expired = ActiveShieldLifeCycleService(
+                ActiveShield.objects.filter(target__campaign=character.campaign)
+            ).decrease_cycles()
+
+        self.assertEqual(expired, [expiring.pk])
+        self.assertFalse(ActiveShield.objects.unsafe_all().filter(pk=expiring.pk).exists())
+        self.assertEqual(ActiveShield.objects.get(pk=lasting.pk).cycles_left, 2)
+        self.assertEqual(ActiveShield.objects.get(pk=other.pk).cycles_left, 1)
+
+
+class CycleShieldStateTest(ShieldTestCase):
+    """Test shield hits of a cycle are written once."""
+
+    def hit(self, character: Character, value: int) -> int:
+        impact = {"kind": ImpactType.DAMAGE, "violation": ImpactViolationType.HEAT, "value": value}
+        return ActiveShieldImpactService(CharacterService(character).get_shields()).apply_impact(impact)["value"]
+
+    def test_hits_are_flushed_once(self):
+        character = self.create_character()
+        shield = self.create_shield(character, health=30)
+        state = CycleShieldState().load(ActiveShield.objects.filter(target=character), [character.pk])
+
+        with state.activate(), self.assertNumQueries(0):
+            self.hit(character, 5)
+            self.hit(character, 5)
+            [tracked] = CharacterService(character).get_shields()
+        self.assertLess(tracked.health, 30)
+        self.assertEqual(ActiveShield.objects.get(pk=shield.pk).health, 30)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(state.flush(), (1, 0))
+        self.assertEqual(ActiveShield.objects.get(pk=shield.pk).health, int(tracked.health))
+
+    def test_broken_shield_is_deleted_on_flush(self):
+        character = self.create_character()
+        shield = self.create_shield(character, health=10)
+        state = CycleShieldState().load(ActiveShield.objects.filter(target=character), [character.pk])
+
+        with state.activate():
+            self.hit(character, 1000)
+            self.assertEqual(CharacterService(character).get_shields(), [])
+            self.assertTrue(ActiveShield.objects.filter(pk=shield.pk).exists())
+            state.flush()
+
+        self.assertFalse(ActiveShield.objects.unsafe_all().filter(pk=shield.pk).exists())
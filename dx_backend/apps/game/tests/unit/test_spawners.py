@@ -0,0 +1,68 @@
+"""
+Unit tests for set-based spawner evaluation.
+"""
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.action.models import Cycle
+from apps.character.models import Character
+from apps.game.services.npc.factory import NPCFactory
+from apps.game.services.spawn.spawners import CoreSpawnersService
+from apps.game.tests.factories import CampaignFactory, CharacterTemplateFactory, RankFactory
+from apps.spawner.models import NPCSpawner, SpawnedEntity
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class CoreSpawnersServiceTest(TestCase):
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+        self.campaign = CampaignFactory()
+        self.cycle = Cycle.objects.create(campaign=self.campaign, number=5)
+        self.dimension = DimensionFactory()
+        self.templates = [CharacterTemplateFactory(rank=RankFactory(), dimension=self.dimension) for _ in range(2)]
+        self.service = CoreSpawnersService(NPCFactory(notify=MagicMock()))
+
+    def create_spawner(self, template=None, **kwargs) -> NPCSpawner:
+        kwargs.setdefault("next_spawn_cycle_number", self.cycle.number)
+        return NPCSpawner.objects.create(character_template=template or self.templates[0], campaign=self.campaign,
+                                         position=PositionFactory(), dimension=self.dimension, **kwargs)
+
+    def test_spawners_are_evaluated_together(self):
+        due = [self.create_spawner(), self.create_spawner(), self.create_spawner(self.templates[1])]
+        exhausted = self.create_spawner(spawn_limit=1)
+        SpawnedEntity.objects.create(spawner=exhausted, game_object=self.service.spawn_npcs([due[0]],
+                                                                                            self.campaign)[0])
+        late = self.create_spawner(next_spawn_cycle_number=2, respawn_cycles=3)
+        disabled = self.create_spawner(respawn_cycles=0)
+        waiting = self.create_spawner(next_spawn_cycle_number=7)
+
+        npcs = self.service.process_npc_spawners(self.cycle)
+
+        self.assertEqual(len(npcs), 3)
+        for spawner in due:
+            npc = Character.objects.get(spawned_by__spawner=spawner)
+            self.assertEqual((npc.position_id, npc.name), (spawner.position_id, spawner.character_template.name))
+            self.assertEqual(spawner.spawned_entities.get().spawned_at, self.cycle)
+        for spawner in (exhausted, waiting):
+            self.assertEqual(spawner.spawned_entities.filter(spawned_at=self.cycle).count(), 0)
+        late.refresh_from_db()
+        disabled.refresh_from_db()
+        self.assertEqual(late.next_spawn_cycle_number, 8)
+        self.assertFalse(disabled.is_active)
+
+    def test_queries_do_not_grow_with_spawners(self):
+        def count_queries(spawners: int) -> int:
+            for _ in range(spawners):
+                self.create_spawner()
+                self.create_spawner(next_spawn_cycle_number=1)
+            with CaptureQueriesContext(connection) as context:
+                self.service.process_npc_spawners(self.cycle)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
@@ -0,0 +1,75 @@
+"""
+Unit tests for the character stats snapshot.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.character.models import Character, Stat, StatModifier
+from apps.core.models import CharacterStats
+from apps.game.services.character.core import CharacterService
+from apps.game.services.character.stats_snapshot import CharacterStatsSnapshot
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory
+
+
+class CharacterStatsSnapshotTest(TestCase):
+    """Test stats served from the snapshot."""
+
+    def setUp(self):
+        # character saves publish change events, keep them away from the network
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        campaign = CampaignFactory()
+        dimension = DimensionFactory(speed=1.0)
+        rank = RankFactory()
+        self.characters = []
+        for i in range(3):
+            character = Character.objects.create(
+                name=f"Test Character {i}", campaign=campaign, dimension=dimension, rank=rank,
+            )
+            Stat.objects.create(character=character, name=CharacterStats.SPEED, base_value=10, additional_value=2)
+            Stat.objects.create(character=character, name=CharacterStats.PHYSICAL_STRENGTH, base_value=8)
+            StatModifier.objects.create(character=character, name=CharacterStats.SPEED, value=3)
+            StatModifier.objects.create(character=character, name=CharacterStats.SPEED, value=-1)
+            self.characters.append(character)
+
+    def test_prefetch_serves_stats_without_queries(self):
+        snapshot = CharacterStatsSnapshot()
+        with self.assertNumQueries(2):
+            snapshot.prefetch(c.pk for c in self.characters)
+
+        with snapshot.activate(), self.assertNumQueries(0):
+            for character in self.characters:
+                svc = CharacterService(character)
+                self.assertEqual(svc.get_real_stat(CharacterStats.SPEED), 12)
+                self.assertEqual(svc.get_stat(CharacterStats.SPEED), 14)
+                self.assertEqual(svc.get_stat(CharacterStats.LUCK), 0)
+                self.assertEqual(svc.get_max_hp(), 60)
+
+        self.assertEqual(snapshot.misses, 0)
+        self.assertGreater(snapshot.hits, 0)
+
+    def test_matches_uncached_values(self):
+        svc = CharacterService(self.characters[0])
+        expected = {stat: svc.get_stat(stat) for stat in CharacterStats}
+        with CharacterStatsSnapshot().activate():
+            self.assertEqual({stat: svc.get_stat(stat) for stat in CharacterStats}, expected)
+
+    def test_stat_changes_invalidate_snapshot(self):
+        snapshot = CharacterStatsSnapshot()
+        character = self.characters[0]
+        with snapshot.activate():
+            svc = CharacterService(character)
+            self.assertEqual(svc.get_stat(CharacterStats.SPEED), 14)
+            self.assertEqual(snapshot.misses, 1)
+
+            stat = character.stats.get(name=CharacterStats.SPEED)
+            stat.base_value = 20
+            stat.save()
+            StatModifier.objects.create(character=character, name=CharacterStats.SPEED, value=5)
+
+            self.assertEqual(svc.get_stat(CharacterStats.SPEED), 29)
+            self.assertEqual(snapshot.misses, 2)
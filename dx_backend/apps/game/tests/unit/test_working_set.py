@@ -0,0 +1,160 @@
+"""
+Unit tests for the cycle scoped character working set.
+"""
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from apps.action.models import CharacterAction, Cycle
+from apps.character.models import Character
+from apps.game.exceptions import GameException
+from apps.game.services.action.back_to_safety import BackToSafeService
+from apps.game.services.action.factory import BatchedCharacterActionPlayerServiceFactory
+from apps.game.services.character.core import CharacterService
+from apps.game.services.character.working_set import CharacterWorkingSet, get_working_set
+from apps.game.tests.factories import CampaignFactory, RankFactory
+from apps.world.tests.factories import DimensionFactory, PositionFactory
+
+
+class CharacterWorkingSetTest(TestCase):
+    """Test deferred character writes inside the working set."""
+
+    def setUp(self):
+        # character saves publish change events, keep them away from the network
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.dimension = DimensionFactory(speed=1.0)
+        self.rank = RankFactory()
+        self.characters = [
+            Character.objects.create(
+                name=f"Test Character {i}",
+                campaign=self.campaign,
+                dimension=self.dimension,
+                rank=self.rank,
+                current_health_points=50,
+                current_energy_points=50,
+            )
+            for i in range(3)
+        ]
+
+    def test_services_share_tracked_instance(self):
+        working_set = CharacterWorkingSet().load(Character.objects.filter(campaign=self.campaign))
+        with working_set.activate():
+            first = CharacterService(Character.objects.get(pk=self.characters[0].pk))
+            second = CharacterService(Character.objects.get(pk=self.characters[0].pk))
+            first.spend_hp(10)
+            self.assertIs(first.model, second.model)
+            self.assertEqual(second.get_current_hp(), 40)
+        self.assertIsNone(get_working_set())
+
+    def test_writes_are_deferred_until_flush(self):
+        working_set = CharacterWorkingSet().load(Character.objects.filter(campaign=self.campaign))
+        with working_set.activate():
+            for character in self.characters:
+                svc = CharacterService(character)
+                svc.spend_hp(5)
+                svc.spend_energy(5)
+
+        self.assertEqual(
+            list(Character.objects.filter(campaign=self.campaign).values_list("current_health_points", flat=True)),
+            [50, 50, 50],
+        )
+        # one pk lookup plus one UPDATE per table of the multi-table inheritance, independent of the row count
+        with self.assertNumQueries(3):
+            flushed = working_set.flush()
+        self.assertEqual(len(flushed), 3)
+        self.assertEqual(
+            list(Character.objects.filter(campaign=self.campaign).values_list("current_health_points", flat=True)),
+            [45, 45, 45],
+        )
+        self.assertEqual(working_set.flush(), [])
+
+    def test_saves_immediately_without_working_set(self):
+        CharacterService(self.characters[0]).spend_hp(20)
+        self.characters[0].refresh_from_db()
+        self.assertEqual(self.characters[0].current_health_points, 30)
+
+
+class WoundTargetAndFail:
+    """Action service that changes its initiator and target before it fails."""
+
+    def check(self, action):
+        pass
+
+    def perform(self, action):
+        CharacterService(action.initiator).spend_energy(5)
+        for target in action.targets.all():
+            CharacterService(target).spend_hp(20)
+        raise GameException("Interrupted")
+
+
+class SpendActionPoints:
+
+    def check(self, action):
+        pass
+
+    def perform(self, action):
+        CharacterService(action.initiator).spend_ap(1)
+
+
+class BatchedCyclePlayTest(TestCase):
+    """Test actions of a batched cycle work on the tracked characters."""
+
+    def setUp(self):
+        notifier_patcher = patch('apps.game.signals.notifier')
+        notifier_patcher.start()
+        self.addCleanup(notifier_patcher.stop)
+
+        self.campaign = CampaignFactory()
+        self.cycle = Cycle.objects.create(campaign=self.campaign, number=0)
+        self.hall, self.camp = PositionFactory(is_safe=False), PositionFactory(is_safe=True)
+        dimension, rank = DimensionFactory(speed=1.0), RankFactory()
+        self.hero, self.victim = [
+            Character.objects.create(name=name, campaign=self.campaign, dimension=dimension, rank=rank,
+                                     position=self.hall, last_safe_position=self.camp, current_health_points=50,
+                                     current_energy_points=50)
+            for name in ("Hero", "Victim")
+        ]
+        self.services = {}
+
+    def add_action(self, service, initiator, order, targets=()):
+        action = CharacterAction.objects.create(cycle=self.cycle, initiator=initiator, order=order, accepted=True)
+        action.targets.add(*targets)
+        self.services[action.pk] = service
+        return action
+
+    def play(self):
+        factory = Mock(from_action=lambda action: self.services[action.pk])
+        player = BatchedCharacterActionPlayerServiceFactory(
+            cycle=self.cycle, factory=factory, notify=Mock(), auto_map_svc=Mock(), spawners=Mock(),
+        )
+        player.play()
+        return player
+
+    def test_failed_action_leaves_no_changes(self):
+        failed = self.add_action(WoundTargetAndFail(), self.hero, 1, targets=[self.victim])
+        self.add_action(SpendActionPoints(), self.victim, 2)
+
+        player = self.play()
+
+        player.notify.action_failed.assert_called_once()
+        failed.refresh_from_db()
+        self.assertFalse(failed.performed)
+        self.hero.refresh_from_db()
+        self.victim.refresh_from_db()
+        self.assertEqual((self.hero.current_energy_points, self.victim.current_health_points), (50, 50))
+        self.assertEqual(player.working_set.get(self.victim.pk).current_health_points, 50)
+
+    def test_move_is_kept_by_the_tracked_initiator(self):
+        self.add_action(BackToSafeService(), self.hero, 1)
+        self.add_action(SpendActionPoints(), self.hero, 2)
+
+        player = self.play()
+
+        player.notify.action_failed.assert_not_called()
+        self.assertEqual(player.working_set.get(self.hero.pk).position_id, self.camp.pk)
+        self.hero.refresh_from_db()
+        self.assertEqual(self.hero.position_id, self.camp.pk)
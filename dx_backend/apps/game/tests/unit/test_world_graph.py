@@ -0,0 +1,68 @@
+"""
+Unit tests for the cached world graph.
+"""
+from django.test import TestCase, override_settings
+
+from apps.core.models import SharedVersion
+from apps.core.utils.cache import expire_versions
+from apps.game.services.world.graph import world_graph
+from apps.world.models import PositionConnection
+from apps.world.tests.factories import PositionFactory
+
+
+class WorldGraphTest(TestCase):
+    """A 4x1 corridor on level 0 with a lift from its start to level 1, and a detached room."""
+
+    def setUp(self):
+        self.corridor = [PositionFactory(grid_x=x, grid_y=0, grid_z=0) for x in range(4)]
+        self.upstairs = PositionFactory(grid_x=0, grid_y=0, grid_z=1)
+        self.detached = PositionFactory(grid_x=9, grid_y=9, grid_z=0)
+        for a, b in zip(self.corridor, self.corridor[1:]):
+            PositionConnection.objects.create(position_from=a, position_to=b)
+        self.lift = PositionConnection.objects.create(position_from=self.corridor[0], position_to=self.upstairs)
+
+    def test_queries_are_served_from_memory(self):
+        graph = world_graph.get()
+        first, last = self.corridor[0], self.corridor[-1]
+        with self.assertNumQueries(0):
+            self.assertEqual(world_graph.get(), graph)
+            self.assertEqual(graph.connection(self.upstairs, first).pk, self.lift.pk)
+            self.assertIsNone(graph.connection(first, last))
+            self.assertEqual(graph.shortest_path(self.upstairs, last),
+                             [self.upstairs.pk] + [position.pk for position in self.corridor])
+            self.assertEqual(graph.within_radius(first, 1),
+                             {first.pk: 0, self.corridor[1].pk: 1, self.upstairs.pk: 1})
+            self.assertTrue(graph.is_reachable(self.upstairs, last))
+            self.assertFalse(graph.is_reachable(first, self.detached))
+            self.assertEqual(graph.position_at(0, 0, 1), self.upstairs.pk)
+            self.assertEqual(len(graph.connections(level=1)), 1)
+
+    def test_path_skips_impassable_connections(self):
+        self.lift.locked = True
+        self.lift.save()
+        graph = world_graph.get()
+        self.assertIsNone(graph.shortest_path(self.corridor[-1], self.upstairs, passable=lambda c: not c.locked))
+
+    def test_map_changes_invalidate_the_graph(self):
+        graph = world_graph.get()
+        PositionConnection.objects.create(position_from=self.corridor[-1], position_to=self.detached)
+        updated = world_graph.get()
+        self.assertGreater(updated.version, graph.version)
+        self.assertTrue(updated.is_reachable(self.upstairs, self.detached))
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_changes_of_other_processes_are_seen_after_expiry(self):
+        # the stored version of the test is rolled back, later tests must not keep it
+        self.addCleanup(expire_versions)
+        first, last = self.corridor[0], self.corridor[-1]
+        self.assertTrue(world_graph.get().is_reachable(first, last))
+
+        # another process closes the corridor and bumps the stored version when it commits
+        PositionConnection.objects.filter(
+            position_from__in=self.corridor[1:3], position_to__in=self.corridor[1:3],
+        ).update(is_active=False)
+        SharedVersion.objects.update_or_create(key=world_graph.versions.key, defaults={"value": 2})
+        self.assertTrue(world_graph.get().is_reachable(first, last))
+
+        expire_versions()
+        self.assertFalse(world_graph.get().is_reachable(first, last))
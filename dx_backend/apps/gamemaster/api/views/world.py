@@ -9,20 +9,27 @@ TODO:
  Make possible to lock connections so players can't move through them
  As a result i as a game master can create world map with positions and connections between them and effectively manage it
 """
+import copy
 
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, permissions, status, filters, serializers
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from apps.core.api.utils.etag import streaming_etag_response
+
 from apps.gamemaster.api.serializers.world import PositionSerializer, PositionConnectionSerializer, \
     GridZParameterSerializer, MapResponseSerializer, PositionMoveSerializer, PositionConnectionCreateSerializer, \
     SubLocationSerializer
 from apps.world.api.serializers.openapi import PositionRelationConfigurationSerializer
 from apps.world.models import Position, PositionConnection, SubLocation
+from apps.game.services.world.graph import get_world_graph, world_graph
+from apps.game.services.world.map_export import get_map_settings
 from apps.game.services.world.position_connection import PositionConnectionService
 
 
@@ -54,6 +61,29 @@ class WorldMapViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(grid_z=grid_z)
         return queryset
 
+    @staticmethod
+    def _load_positions(position_ids):
+        return Position.objects.select_related(
+            'sub_location__location__area__city'
+        ).in_bulk(position_ids)
+
+    def _graph_connections(self, grid_z, positions=None):
+        """
+        Connections of the level from the world graph, with both positions loaded in one query.
+        """
+        connections = get_world_graph().connections(None if grid_z is None else int(grid_z))
+        ends = {position_id for c in connections for position_id in (c.position_from_id, c.position_to_id)}
+        positions = dict(positions or {})
+        positions.update(self._load_positions(ends - positions.keys()))
+        result = []
+        for connection in connections:
+            # graph connections are shared, serialize copies
+            connection = copy.copy(connection)
+            connection.position_from = positions[connection.position_from_id]
+            connection.position_to = positions[connection.position_to_id]
+            result.append(connection)
+        return result
+
     def perform_destroy(self, instance):
         """
         Delete a position and all its connections.
@@ -74,13 +104,8 @@ class WorldMapViewSet(viewsets.ModelViewSet):
         """
         grid_z = request.query_params.get('grid_z')
 
-        if grid_z is not None:
-            # Filter connections where either position_from or position_to has the specified grid_z
-            connections = PositionConnection.objects.filter(
-                Q(position_from__grid_z=grid_z) | Q(position_to__grid_z=grid_z)
-            )
-        else:
-            connections = PositionConnection.objects.all()
+        # Connections where either position_from or position_to has the specified grid_z
+        connections = self._graph_connections(grid_z)
 
         serializer = PositionConnectionSerializer(connections, many=True)
         return Response(serializer.data)
@@ -277,32 +302,41 @@ class WorldMapViewSet(viewsets.ModelViewSet):
     def map(self, request):
         """
         Get a complete map structure with positions and connections filtered by grid_z.
+
+        The rendered map is cached and tagged with the world graph version.
         """
         grid_z = request.query_params.get('grid_z')
+        if grid_z is not None:
+            grid_z = int(grid_z)
+        etag = f"gm-map-{grid_z}-{world_graph.version}"
+
+        def content():
+            key = f"world_map:{etag}"
+            blob = cache.get(key)
+            if blob is None:
+                blob = JSONRenderer().render(self._map_data(grid_z))
+                cache.set(key, blob, get_map_settings()["CACHE_TIMEOUT"])
+            return [blob]
 
+        return streaming_etag_response(request, etag, content)
+
+    def _map_data(self, grid_z):
         # Get positions filtered by grid_z
-        if grid_z is not None:
-            positions = Position.objects.filter(grid_z=grid_z)
-        else:
-            positions = Position.objects.all()
+        position_ids = get_world_graph().positions(grid_z)
+        loaded = self._load_positions(position_ids)
+        positions = [loaded[position_id] for position_id in position_ids if position_id in loaded]
 
         # Get connections where either position_from or position_to has the specified grid_z
-        if grid_z is not None:
-            connections = PositionConnection.objects.filter(
-                Q(position_from__grid_z=grid_z) | Q(position_to__grid_z=grid_z)
-            )
-        else:
-            connections = PositionConnection.objects.all()
+        connections = self._graph_connections(grid_z, loaded)
 
         # Serialize the data
         position_serializer = PositionSerializer(positions, many=True)
         connection_serializer = PositionConnectionSerializer(connections, many=True)
 
-        # Return the combined data
-        return Response({
+        return {
             'positions': position_serializer.data,
             'connections': connection_serializer.data
-        })
+        }
 
 
 @extend_schema(
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0010_school_game_master_only'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='simulated_power',
+            field=models.FloatField(blank=True, help_text='Power rating from the balance simulation, see simulate_balance', null=True, verbose_name='Simulated Power'),
+        ),
+    ]
@@ -57,6 +57,9 @@ class Skill(BaseModel):
                                help_text='Special type of the skill', verbose_name='Special Type')
     icon = models.ImageField(upload_to='icons/skill/', null=True, blank=True)
     immediate = models.BooleanField(default=False, help_text='If true, the skill will be performed immediately')
+    simulated_power = models.FloatField(null=True, blank=True,
+                                        help_text='Power rating from the balance simulation, see simulate_balance',
+                                        verbose_name='Simulated Power')
 
     def __str__(self):
         return self.name
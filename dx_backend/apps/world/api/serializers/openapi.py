@@ -3,6 +3,7 @@ from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from apps.character.models import Character
+from apps.core.api.utils.prefetch import plan_for
 from apps.game.services.character.core import CharacterService
 from apps.game.services.world.position_connection import PositionConnectionService
 from apps.world.models import Area, Location, Dimension, City, SubLocation, MapPosition, Map
@@ -216,6 +217,7 @@ class WorldPositionSerializer(serializers.ModelSerializer):
         self._client = self.context.get('request').user if 'request' in self.context else None
         if not self._client:
             raise serializers.ValidationError("User context is required for PositionSerializer.")
+        self._characters_cache = {}
 
     connections = serializers.SerializerMethodField()
     location = serializers.UUIDField(source='sub_location.location_id')
@@ -236,7 +238,7 @@ class WorldPositionSerializer(serializers.ModelSerializer):
         return [
             t.id for t in
             obj.gameobject_set.instance_of(DimensionAnomaly).filter(
-                campaign=self._client.current_campaign
+                campaign_id=self._client.current_campaign_id
             ) if not t.known
         ]
 
@@ -254,20 +256,26 @@ class WorldPositionSerializer(serializers.ModelSerializer):
         )
         return serializer.data
 
+    def _characters(self, obj):
+        """Active characters of the campaign on the position, loaded once for both character fields."""
+        if obj.pk not in self._characters_cache:
+            queryset = Character.objects.filter(
+                position=obj,
+                campaign_id=self._client.current_campaign_id,
+                is_active=True
+            )
+            self._characters_cache[obj.pk] = list(plan_for(CharacterOnPositionSerializer()).apply(queryset))
+        return self._characters_cache[obj.pk]
+
     @extend_schema_field(serializers.ListField(child=serializers.UUIDField()))
     def get_characters(self, obj):
         """Retrieve all characters in the current position."""
-        return [character.id for character in
-                obj.gameobject_set.instance_of(Character).filter(campaign=self._client.current_campaign,
-                                                                 is_active=True)]
+        return [character.id for character in self._characters(obj)]
 
     @extend_schema_field(CharacterOnPositionSerializer(many=True))
     def get_characters_on_position(self, obj):
         """Retrieve all character objects in the current position."""
-        characters = obj.gameobject_set.instance_of(Character).filter(
-            campaign=self._client.current_campaign,
-            is_active=True
-        )
+        characters = self._characters(obj)
         return CharacterOnPositionSerializer(characters, many=True, context=self.context).data
 
     @extend_schema_field(serializers.CharField(allow_null=True))
@@ -9,10 +9,13 @@ from rest_framework.response import Response
 
 from apps.character.models import Character
 from apps.core.api.utils.character import GenericGameViewSet
+from apps.core.api.utils.etag import streaming_etag_response
+from apps.core.api.utils.prefetch import PrefetchPlan, plan_for
+from apps.core.api.utils.query_budget import QueryBudgetMixin
 from apps.core.models import ItemType
 from apps.core.utils.api import CampaignFilterMixin
 from apps.game.services.location import LocationService
-from apps.game.services.world.position import JsonDumper
+from apps.game.services.world.map_export import MapExporter, MapTile
 from apps.world.api.serializers.openapi import LocationSerializer, AreaSerializer, CitySerializer, DimensionSerializer, \
     WorldPositionSerializer, TeleportPositionSerializer, TeleportCoordinatesSerializer, MapPositionSerializer, \
     NewCoordinatesSerializer, MapSerializer, GenericPositionSerializer, GenericPositionIdSerializer, \
@@ -124,10 +127,17 @@ class OpenAIDimensionManagementViewSet(viewsets.ReadOnlyModelViewSet, GenericGam
         return Response(data)
 
 
-class PositionManagementViewSet(GenericGameViewSet):
+class PositionManagementViewSet(QueryBudgetMixin, GenericGameViewSet):
     queryset = Character.objects.filter(is_active=True)
     serializer_class = WorldPositionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # the image falls back to the sub location, location, area and city images
+    position_plan = PrefetchPlan(select_related=["sub_location__location__area__city"])
+    query_budgets = {"current": 10, "info": 10}
+
+    def get_position(self, pk) -> Position:
+        plan = plan_for(self.get_serializer()) + self.position_plan
+        return get_object_or_404(plan.apply(Position.objects.all()), pk=pk)
 
     @action(detail=False, methods=['get'])
     def current(self, request):
@@ -155,7 +165,7 @@ class PositionManagementViewSet(GenericGameViewSet):
         #  # "gameobjects": [ uuid, uuid, ... ] # TODO: implement game objects id, type, interface
 
         character = self.get_character()
-        position = character.position
+        position = self.get_position(character.position_id)
 
         # Serialize the position details
         serializer = self.get_serializer(position, context=self.get_serializer_context())
@@ -163,7 +173,7 @@ class PositionManagementViewSet(GenericGameViewSet):
 
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
     def info(self, request, pk=None):
-        pos = get_object_or_404(Position, pk=pk)
+        pos = self.get_position(pk)
         serializer = WorldPositionSerializer(pos, context=self.get_serializer_context())
         return Response(data=serializer.data)
 
@@ -205,9 +215,15 @@ class PositionManagementViewSet(GenericGameViewSet):
     def map(self, request):
         """
         Return the map of the current location.
+
+        The map can be limited to a `grid_z` level and to a `tile_x`/`tile_y` region of the level.
         """
-        svc = JsonDumper(None, context=self.get_serializer_context())
-        return Response(data=svc.as_dict())
+        try:
+            tile = MapTile.from_params(request.query_params)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        exporter = MapExporter(tile, context=self.get_serializer_context())
+        return streaming_etag_response(request, exporter.etag, exporter.iter_json)
 
 
 class MappedPositionViewSet(viewsets.ReadOnlyModelViewSet):
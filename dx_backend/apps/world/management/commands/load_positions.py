@@ -2,7 +2,7 @@ import os
 
 from django.core.management.base import BaseCommand, CommandError
 
-from apps.game.services.world.position import PositionLoader
+from apps.game.services.world.position import PositionLoader, BulkPositionLoader
 from apps.world.models import SubLocation
 
 
@@ -21,6 +21,22 @@ class Command(BaseCommand):
             default='867126d4-c41f-4342-848f-bdd12cd41c3a',
             help='The id of the default sub-location to associate with the positions.'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Stream the file and import positions and connections in chunks.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show what a bulk import would change.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of rows written at once by a bulk import.'
+        )
 
     def handle(self, *args, **kwargs):
         file_path = kwargs['file_path']
@@ -39,8 +55,18 @@ class Command(BaseCommand):
         # Load positions
         self.stdout.write(f"Loading positions from {file_path}...")
         try:
-            loader = PositionLoader(file_path, sub_location)
-            loader.load()
+            if kwargs['bulk'] or kwargs['dry_run']:
+                loader = BulkPositionLoader(
+                    file_path, sub_location, chunk_size=kwargs['chunk_size'], dry_run=kwargs['dry_run']
+                )
+                diff = loader.load()
+                self.stdout.write(str(diff))
+                if kwargs['dry_run']:
+                    self.stdout.write(self.style.WARNING("Dry run, nothing was changed."))
+                    return
+            else:
+                loader = PositionLoader(file_path, sub_location)
+                loader.load()
             self.stdout.write(self.style.SUCCESS("Positions and connections loaded successfully."))
         except Exception as e:
             raise CommandError(f"An error occurred: {str(e)}")
@@ -100,6 +100,7 @@ MIDDLEWARE = [
     "allauth.account.middleware.AccountMiddleware",
     "dx_backend.middleware.ThreadLocalMiddleware",
     "apps.core.middleware.CampaignContextMiddleware",
+    "apps.game.middleware.CharacterStatsSnapshotMiddleware",
 ]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.UUIDField'
@@ -139,6 +140,16 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache keeps cached data versions (world graph, map export) consistent between processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_CACHE_URL"],
+    } if os.getenv("REDIS_CACHE_URL") else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -312,6 +323,65 @@ SIMPLE_JWT = {
 
 CENTRIFUGO_API_URL = ""
 CENTRIFUGO_API_KEY = ""
+# Outbound events are queued and sent in batches by a background worker, set ASYNC to False to publish inline
+CENTRIFUGO_PUBLISHER = {
+    "ASYNC": True,
+    "QUEUE_SIZE": 10000,
+    "FLUSH_SIZE": 100,
+    "FLUSH_INTERVAL": 0.05,  # seconds
+    "PUT_TIMEOUT": 0.0,  # seconds to wait for a free slot before dropping a message
+}
+# How events published inside a DB transaction are delivered:
+#  immediate - sent right away, on_commit - held until the transaction commits,
+#  table - stored in the outbox table and sent by `manage.py outbox_relay`
+EVENT_BUS_OUTBOX = os.getenv("EVENT_BUS_OUTBOX", "on_commit")
+
+# Dice rolls of a played cycle come from streams seeded by SEED (the secret key when empty), the campaign and the
+# cycle number, replaying a cycle with the same seed gives the same rolls
+DICE = {
+    "SEED": os.getenv("DICE_SEED", ""),
+}
+
+# NPC actions of different positions are scheduled by WORKERS threads ("thread") or processes ("process"),
+# SEED makes NPC decisions reproducible
+NPC_SCHEDULER = {
+    "WORKERS": int(os.getenv("NPC_SCHEDULER_WORKERS", 1)),
+    "EXECUTOR": os.getenv("NPC_SCHEDULER_EXECUTOR", "thread"),
+    "SEED": int(os.environ["NPC_SCHEDULER_SEED"]) if os.getenv("NPC_SCHEDULER_SEED") else None,
+}
+
+# Auto cycle player: defaults of new campaign schedules (INTERVAL between cycle starts, DEADLINE of one cycle) in
+# seconds, idle workers look for due campaigns every POLL_SECONDS, a claimed campaign is skipped by other workers for
+# LEASE_SECONDS unless its worker finishes earlier, the playing worker renews the lease every HEARTBEAT_SECONDS
+CYCLE_SCHEDULER = {
+    "INTERVAL": int(os.getenv("CYCLE_SCHEDULER_INTERVAL", 45)),
+    "DEADLINE": int(os.getenv("CYCLE_SCHEDULER_DEADLINE", 40)),
+    "POLL_SECONDS": int(os.getenv("CYCLE_SCHEDULER_POLL_SECONDS", 5)),
+    "LEASE_SECONDS": int(os.getenv("CYCLE_SCHEDULER_LEASE_SECONDS", 600)),
+    "HEARTBEAT_SECONDS": int(os.getenv("CYCLE_SCHEDULER_HEARTBEAT_SECONDS", 200)),
+    "WORKERS": int(os.getenv("CYCLE_SCHEDULER_WORKERS", 1)),
+}
+
+# Fight worker: changed fights are processed by WORKERS threads, all open fights are checked every POLL_SECONDS
+# in case a notification was missed, notifications within DEBOUNCE_SECONDS are processed together
+FIGHT_WORKER = {
+    "WORKERS": int(os.getenv("FIGHT_WORKER_WORKERS", 4)),
+    "POLL_SECONDS": int(os.getenv("FIGHT_WORKER_POLL_SECONDS", 60)),
+    "DEBOUNCE_SECONDS": float(os.getenv("FIGHT_WORKER_DEBOUNCE_SECONDS", 0.2)),
+}
+
+# World map export: TILE_SIZE positions per tile side, sections up to MAX_CACHED_BYTES are cached pre-rendered
+WORLD_MAP = {
+    "TILE_SIZE": 32,
+    "MAX_CACHED_BYTES": 8 * 1024 * 1024,
+    "CACHE_TIMEOUT": 3600,
+}
+
+# API views with `query_budgets` log (or fail with RAISE) requests running more queries than their budget
+QUERY_BUDGET = {
+    "ENABLED": os.getenv("QUERY_BUDGET_ENABLED", str(DEBUG)).lower() in ("1", "true", "yes"),
+    "RAISE": os.getenv("QUERY_BUDGET_RAISE", "").lower() in ("1", "true", "yes"),
+}
 
 # Integration settings
 INTEGRATION = {